@@ -0,0 +1,171 @@
+# benchmarks/bench_api.py
+"""Test de charge du serveur HTTP (python -m cli serve)
+
+Démarre une instance locale sur une copie de la base (ou vise --url), puis
+N clients simultanés enchaînent des lectures (listes, agrégats, matrices de
+notes) et, selon --ecritures, des enregistrements de copies. Les clients
+renvoient l'ETag reçu (If-None-Match), comme un navigateur.
+
+Relève le débit, les latences (médiane, p95, p99) par type de requête et la
+part de réponses 304 servies depuis le cache des agrégats.
+
+Usage :
+    python benchmarks/bench_api.py [--db nota.db] [--clients 16] [--duree 10] [--ecritures 0.05]
+    python benchmarks/bench_api.py --url http://127.0.0.1:8080
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+class Client:
+    """Connexion HTTP persistante qui mémorise les ETag comme un navigateur"""
+    
+    def __init__(self, url):
+        parties = urlsplit(url)
+        self.connexion = http.client.HTTPConnection(parties.hostname, parties.port, timeout=30)
+        self.etags = {}
+    
+    def get(self, chemin):
+        entetes = {}
+        if chemin in self.etags:
+            entetes['If-None-Match'] = self.etags[chemin]
+        self.connexion.request("GET", chemin, headers=entetes)
+        reponse = self.connexion.getresponse()
+        corps = reponse.read()
+        if reponse.getheader('ETag'):
+            self.etags[chemin] = reponse.getheader('ETag')
+        return reponse.status, corps
+    
+    def put(self, chemin, donnees):
+        corps = json.dumps(donnees).encode('utf-8')
+        self.connexion.request("PUT", chemin, body=corps, headers={'Content-Type': 'application/json'})
+        reponse = self.connexion.getresponse()
+        return reponse.status, reponse.read()
+
+
+def decouvrir(url):
+    """Chemins à interroger et copies modifiables, d'après le contenu de la base"""
+    client = Client(url)
+    
+    def lire(chemin):
+        client.etags.pop(chemin, None)  # corps complet, pas de 304
+        return json.loads(client.get(chemin)[1])
+    
+    classes = lire("/api/classes")
+    devoirs = lire("/api/devoirs")
+    eleves = lire("/api/eleves")
+    
+    lectures = {
+        'liste': ["/api/classes", "/api/eleves"] + [f"/api/classes/{c['id']}/eleves" for c in classes],
+        'agregat': ["/api/stats", "/api/devoirs"] + [f"/api/classes/{c['id']}" for c in classes]
+                   + [f"/api/devoirs/{d['id']}/stats" for d in devoirs]
+                   + [f"/api/eleves/{e['id']}" for e in eleves[:50]],
+        'matrice': [f"/api/devoirs/{d['id']}/notes" for d in devoirs],
+    }
+    copies = []
+    for devoir in devoirs:
+        detail = lire(f"/api/devoirs/{devoir['id']}")
+        questions = [(q['id'], q['points_max']) for q in detail['questions']]
+        if not questions:
+            continue
+        for eleve in lire(f"/api/classes/{devoir['id_classe']}/eleves"):
+            copies.append((devoir['id'], eleve['id'], questions))
+    return lectures, copies
+
+
+def charge(url, lectures, copies, duree, part_ecritures, resultats, verrou):
+    client = Client(url)
+    mesures = []
+    fin = time.perf_counter() + duree
+    while time.perf_counter() < fin:
+        if copies and random.random() < part_ecritures:
+            devoir_id, eleve_id, questions = random.choice(copies)
+            notes = {str(q): round(random.uniform(0, points_max), 1) for q, points_max in questions}
+            debut = time.perf_counter()
+            statut, _ = client.put(f"/api/devoirs/{devoir_id}/eleves/{eleve_id}/notes", {'notes': notes})
+            mesures.append(('ecriture', statut, time.perf_counter() - debut))
+            continue
+        categorie = random.choice(list(lectures))
+        chemin = random.choice(lectures[categorie])
+        debut = time.perf_counter()
+        statut, _ = client.get(chemin)
+        mesures.append((categorie, statut, time.perf_counter() - debut))
+    with verrou:
+        resultats.extend(mesures)
+
+
+def rapport(resultats, duree):
+    print(f"{len(resultats)} requêtes en {duree:.1f} s : {len(resultats) / duree:.0f} requêtes/s")
+    for categorie in sorted({m[0] for m in resultats}):
+        mesures = [m for m in resultats if m[0] == categorie]
+        durees = sorted(m[2] for m in mesures)
+        statuts = {}
+        for m in mesures:
+            statuts[m[1]] = statuts.get(m[1], 0) + 1
+        p95 = durees[int(len(durees) * 0.95) - 1] if len(durees) >= 20 else durees[-1]
+        p99 = durees[int(len(durees) * 0.99) - 1] if len(durees) >= 100 else durees[-1]
+        print(f"  {categorie:<9} {len(mesures):6d} req, médiane {statistics.median(durees) * 1000:6.2f} ms, "
+              f"p95 {p95 * 1000:6.2f} ms, p99 {p99 * 1000:6.2f} ms, statuts {dict(sorted(statuts.items()))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge de l'API HTTP")
+    parser.add_argument("--db", default=os.path.join(ROOT, "nota.db"))
+    parser.add_argument("--url", help="instance déjà lancée (sinon : instance locale sur une copie de --db)")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--duree", type=float, default=10.0)
+    parser.add_argument("--ecritures", type=float, default=0.05, help="part des requêtes qui écrivent")
+    parser.add_argument("--lecteurs", type=int, default=4, help="taille du pool de lecture (instance locale)")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        serveur = None
+        url = args.url
+        if url is None:
+            from utils.api_server import ApiServer
+            
+            db_path = os.path.join(tmp, "nota.db")
+            shutil.copy(args.db, db_path)
+            serveur = ApiServer(db_path, port=0, nb_lecteurs=args.lecteurs)
+            threading.Thread(target=serveur.serve_forever, daemon=True).start()
+            url = serveur.adresse
+            print(f"Instance locale {url} ({args.lecteurs} lecteurs) sur une copie de {args.db}")
+        
+        try:
+            lectures, copies = decouvrir(url)
+            print(f"{sum(len(c) for c in lectures.values())} chemins de lecture, {len(copies)} copies modifiables, "
+                  f"{args.clients} clients pendant {args.duree:.0f} s")
+            
+            resultats = []
+            verrou = threading.Lock()
+            clients = [
+                threading.Thread(target=charge, args=(url, lectures, copies, args.duree, args.ecritures, resultats, verrou))
+                for _ in range(args.clients)
+            ]
+            debut = time.perf_counter()
+            for thread in clients:
+                thread.start()
+            for thread in clients:
+                thread.join()
+            rapport(resultats, time.perf_counter() - debut)
+        finally:
+            if serveur is not None:
+                serveur.shutdown()
+                serveur.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# benchmarks/bench_bulletins.py
+"""Mesure du calcul et de la génération des bulletins d'une classe
+
+Ajoute à une copie de la base une classe synthétique (N élèves, M devoirs
+de Q questions, poids variés, quelques copies incomplètes) puis compare :
+  - get_bulletins_classe : une seule requête pour toute la classe ;
+  - le calcul élève par élève (calculate_note_finale pour chaque copie),
+    comme il faudrait le faire avec les méthodes existantes.
+Vérifie que les deux donnent les mêmes moyennes et les mêmes rangs, puis
+mesure la génération du livret des bulletins avec le moteur natif.
+
+Usage :
+    python benchmarks/bench_bulletins.py [--db nota.db] [--eleves 35] [--devoirs 12] [--questions 10]
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from database.db_manager import DatabaseManager
+
+
+def classe_synthetique(db, nb_eleves, nb_devoirs, nb_questions):
+    """Crée la classe et ses notes en une transaction ; retourne l'id de la classe"""
+    rng = random.Random(42)
+    with db.conn:
+        classe_id = db.conn.execute("INSERT INTO classes (nom) VALUES ('Bench bulletins')").lastrowid
+        eleve_ids = [
+            db.conn.execute("INSERT INTO eleves (nom, prenom, id_classe) VALUES (?, ?, ?)",
+                            (f"Nom{i:03d}", f"Prénom{i}", classe_id)).lastrowid
+            for i in range(nb_eleves)
+        ]
+        for d in range(nb_devoirs):
+            devoir_id = db.conn.execute(
+                "INSERT INTO devoirs (nom, date, id_classe, poids) VALUES (?, ?, ?, ?)",
+                (f"DS{d + 1}", f"2026-{9 + d % 4:02d}-{1 + d:02d}", classe_id, rng.choice([0.5, 1, 2, 3]))
+            ).lastrowid
+            for q in range(nb_questions):
+                points_max = rng.choice([1, 2, 3, 4])
+                question_id = db.conn.execute(
+                    "INSERT INTO questions (id_devoir, numero, intitule, points_max, coefficient) VALUES (?, ?, ?, ?, 1)",
+                    (devoir_id, str(q + 1), f"Question {q + 1}", points_max)
+                ).lastrowid
+                db.conn.executemany(
+                    "INSERT INTO note_question (id_eleve, id_question, points_obtenus, commentaire) VALUES (?, ?, ?, '')",
+                    # 5 % de copies incomplètes
+                    [(eleve_id, question_id, round(rng.uniform(0, points_max), 1))
+                     for eleve_id in eleve_ids if rng.random() > 0.05 / nb_questions]
+                )
+    return classe_id
+
+
+def moyennes_eleve_par_eleve(db, classe_id):
+    """Moyennes pondérées calculées copie par copie (une requête par élève et par devoir)"""
+    devoirs = db.get_all_devoirs(classe_id)
+    moyennes = {}
+    for eleve in db.get_all_eleves(classe_id):
+        total = poids = 0
+        for devoir in devoirs:
+            note = db.calculate_note_finale(eleve['id'], devoir['id'])
+            if note is not None:
+                total += note * devoir['poids']
+                poids += devoir['poids']
+        moyennes[eleve['id']] = total / poids if poids else None
+    return moyennes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calcul et génération des bulletins")
+    parser.add_argument("--db", default=os.path.join(ROOT, "nota.db"))
+    parser.add_argument("--eleves", type=int, default=35)
+    parser.add_argument("--devoirs", type=int, default=12)
+    parser.add_argument("--questions", type=int, default=10)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "nota.db")
+        shutil.copy(args.db, db_path)
+        db = DatabaseManager.open_separate(db_path)
+        classe_id = classe_synthetique(db, args.eleves, args.devoirs, args.questions)
+        print(f"Classe de {args.eleves} élèves, {args.devoirs} devoirs de {args.questions} questions :")
+        
+        debut = time.perf_counter()
+        bulletins = db.get_bulletins_classe(classe_id)
+        duree_requete = time.perf_counter() - debut
+        
+        debut = time.perf_counter()
+        moyennes = moyennes_eleve_par_eleve(db, classe_id)
+        duree_boucle = time.perf_counter() - debut
+        
+        print(f"  get_bulletins_classe (1 requête)       {duree_requete * 1000:8.1f} ms")
+        print(f"  élève par élève ({args.eleves * args.devoirs} requêtes)       {duree_boucle * 1000:8.1f} ms "
+              f"(x{duree_boucle / duree_requete:.0f})")
+        
+        # calculate_note_finale arrondit au centième : tolérance correspondante
+        ecarts = [abs(e['moyenne'] - moyennes[e['id']]) for e in bulletins['eleves'] if e['moyenne'] is not None]
+        assert all(ecart < 0.01 for ecart in ecarts), "moyennes différentes"
+        assert sum(e['moyenne'] is None for e in bulletins['eleves']) == sum(m is None for m in moyennes.values())
+        classes = sorted((e for e in bulletins['eleves'] if e['rang']), key=lambda e: e['rang'])
+        assert all(round(a['moyenne'], 2) >= round(b['moyenne'], 2) for a, b in zip(classes, classes[1:])), "rangs incohérents"
+        print(f"  mêmes moyennes (écart max {max(ecarts, default=0):.4f}), rangs cohérents")
+        
+        from utils.latex_generator import LatexGenerator
+        
+        generator = LatexGenerator(db, renderer="natif")
+        debut = time.perf_counter()
+        pages, erreurs = generator.generate_livret_bulletins(classe_id, None, os.path.join(tmp, "bulletins.pdf"))
+        print(f"  livret natif ({pages} pages)             {(time.perf_counter() - debut) * 1000:8.1f} ms"
+              + (f", {len(erreurs)} erreur(s)" if erreurs else ""))
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# benchmarks/bench_cli.py
+"""Mesure du démarrage de la ligne de commande (python -m cli)
+
+Chaque essai lance un nouveau processus et relève le temps jusqu'à la
+première ligne affichée. Vérifie aussi qu'aucun module Qt n'est importé
+(la ligne de commande doit tourner sur un serveur sans écran).
+
+Usage :
+    python benchmarks/bench_cli.py [--db nota.db] [--runs 10]
+
+La base est copiée dans un dossier temporaire : l'original n'est jamais modifié.
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COMMANDES = [
+    ["--help"],
+    ["recompute-aggregates"],
+    ["export-grades", "--tous"],
+]
+
+# Exécute la commande dans le processus puis liste les modules Qt chargés
+VERIFICATION_QT = (
+    "import sys, io, contextlib, cli\n"
+    "with contextlib.redirect_stdout(io.StringIO()):\n"
+    "    cli.main(sys.argv[1:])\n"
+    "print(sorted(m for m in sys.modules if m.startswith('PyQt')))\n"
+)
+
+
+def premiere_ligne(arguments):
+    """Durée (s) entre le lancement du processus et sa première ligne de sortie"""
+    debut = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-m", "cli"] + arguments, cwd=ROOT,
+                               stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    process.stdout.readline()
+    duree = time.perf_counter() - debut
+    process.stdout.read()
+    process.wait()
+    return duree
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Démarrage de la ligne de commande")
+    parser.add_argument("--db", default=os.path.join(ROOT, "nota.db"))
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "nota.db")
+        shutil.copy(args.db, db_path)
+        
+        print(f"Temps jusqu'à la première ligne ({args.runs} essais) :")
+        for commande in COMMANDES:
+            arguments = ["--db", db_path] + commande
+            durees = [premiere_ligne(arguments) for _ in range(args.runs)]
+            print(f"  {' '.join(commande):<24} médiane {statistics.median(durees) * 1000:6.1f} ms, "
+                  f"max {max(durees) * 1000:6.1f} ms")
+        
+        resultat = subprocess.run([sys.executable, "-c", VERIFICATION_QT, "--db", db_path, "export-grades", "--tous"],
+                                  cwd=ROOT, capture_output=True, text=True)
+        print(f"Modules Qt importés : {resultat.stdout.strip() or resultat.stderr.strip()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+# benchmarks/bench_latex_escape.py
+"""Échappement LaTeX : vérification d'équivalence et micro-benchmark
+
+1. Vérifie sur des textes aléatoires (graine fixe) les propriétés de
+   utils.latex_escape.escape_latex par rapport à l'ancienne implémentation
+   (dix str.replace successifs, recopiée ci-dessous comme référence) :
+     - même résultat pour tout texte sans barre oblique inverse, retour à la
+       ligne, caractère de contrôle ni ponctuation Unicode gérée ;
+     - avec des barres obliques inverses, seule diffère la correction
+       \\textbackslash\\{\\} -> \\textbackslash{} ;
+     - le résultat ne contient plus aucun caractère spécial non échappé.
+2. Compare les temps des deux implémentations sur un corpus de commentaires
+   réalistes (ou ceux d'une base avec --db).
+
+Usage :
+    python benchmarks/bench_latex_escape.py [--cas 20000] [--repetitions 20] [--db nota.db]
+"""
+import argparse
+import os
+import random
+import re
+import sqlite3
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils.latex_escape import escape_latex, _REMPLACEMENTS
+
+
+def escape_sequentiel(text):
+    """Implémentation d'origine de LatexGenerator._escape_latex (référence)"""
+    if text is None:
+        return ""
+    
+    text = str(text)
+    replacements = {
+        '\\': r'\textbackslash{}',
+        '&': r'\&',
+        '%': r'\%',
+        '$': r'\$',
+        '#': r'\#',
+        '_': r'\_',
+        '{': r'\{',
+        '}': r'\}',
+        '~': r'\textasciitilde{}',
+        '^': r'\textasciicircum{}',
+    }
+    
+    for old, new in replacements.items():
+        text = text.replace(old, new)
+    
+    return text
+
+
+# ========== PROPRIÉTÉS ==========
+
+ALPHABET_COMMUN = "abcdeéèàçùôABCZ 0123456789.,;:!?'()-+=/*<>|\"@«»€°²" + "&%$#_{}~^"
+ALPHABET_ETENDU = ALPHABET_COMMUN + "\\\n\r\t\x00\x07\u00a0\u202f\u2009‘’“”–—…"
+
+# Séquences produites par l'échappement, retirées avant de chercher un caractère non échappé
+_SEQUENCES_RE = re.compile(r"\\textbackslash\{\}|\\textasciitilde\{\}|\\textasciicircum\{\}"
+                           r"|\\newline\{\}|\\ldots\{\}|\\,|\\[&%$#_{}]")
+
+
+def texte_aleatoire(rng, alphabet, longueur_max=60):
+    return "".join(rng.choice(alphabet) for _ in range(rng.randint(0, longueur_max)))
+
+
+def verifier_proprietes(nb_cas):
+    rng = random.Random(1234)
+    echecs = []
+    
+    for _ in range(nb_cas):
+        texte = texte_aleatoire(rng, ALPHABET_COMMUN)
+        if escape_latex(texte) != escape_sequentiel(texte):
+            echecs.append(("équivalence", texte))
+        
+        texte = texte_aleatoire(rng, ALPHABET_COMMUN + "\\")
+        attendu = escape_sequentiel(texte).replace(r"\textbackslash\{\}", r"\textbackslash{}")
+        if escape_latex(texte) != attendu:
+            echecs.append(("barre oblique inverse", texte))
+        
+        texte = texte_aleatoire(rng, ALPHABET_ETENDU)
+        resultat = escape_latex(texte)
+        reste = _SEQUENCES_RE.sub("", resultat)
+        if any(c in _REMPLACEMENTS for c in reste if c != "~"):
+            echecs.append(("caractère non échappé", texte))
+        if resultat.startswith(r"\newline{}") or resultat.endswith(r"\newline{}"):
+            echecs.append(("retour à la ligne en bordure", texte))
+    
+    if escape_latex(None) != "" or escape_latex(12.5) != "12.5":
+        echecs.append(("valeurs non textuelles", None))
+    return echecs
+
+
+# ========== BENCHMARK ==========
+
+COMMENTAIRES = [
+    "", "Bien", "Très bien", "Attention aux signes", "Incomplet",
+    "Revoir le cours sur les dérivées",
+    "Erreur de calcul : 3 × 4 ≠ 7",
+    "50% de la démarche, il manque la conclusion",
+    "Bonne idée mais l’unité est oubliée (m/s)",
+    "f(x) = x^2 donc f'(x) = 2x",
+    "Attention à la rédaction ; justifier chaque étape…",
+]
+APPRECIATIONS = [
+    "",
+    "Bon travail dans l’ensemble, continuez ainsi.",
+    "Des progrès notables.\nIl faut cependant soigner la présentation et relire ses calculs.",
+    "Copie sérieuse — quelques imprécisions sur les notations (x_1, x_2).\n\nPoursuivez vos efforts !",
+]
+
+
+def corpus_synthetique(taille):
+    rng = random.Random(42)
+    textes = [rng.choice(COMMENTAIRES) for _ in range(taille)]
+    textes += [rng.choice(APPRECIATIONS) for _ in range(taille // 20)]
+    return textes
+
+
+def corpus_base(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        textes = [r[0] for r in conn.execute("SELECT commentaire FROM note_question WHERE COALESCE(commentaire, '') <> ''")]
+        textes += [r[0] for r in conn.execute("SELECT appreciation FROM compte_rendus WHERE COALESCE(appreciation, '') <> ''")]
+    finally:
+        conn.close()
+    return textes
+
+
+def mesurer(fonction, textes, repetitions):
+    meilleur = None
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        for texte in textes:
+            fonction(texte)
+        duree = time.perf_counter() - debut
+        meilleur = duree if meilleur is None else min(meilleur, duree)
+    return meilleur
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Échappement LaTeX : propriétés et performances")
+    parser.add_argument("--cas", type=int, default=20000, help="nombre de textes aléatoires par propriété")
+    parser.add_argument("--repetitions", type=int, default=20)
+    parser.add_argument("--db", help="utiliser les commentaires et appréciations de cette base")
+    args = parser.parse_args()
+    
+    echecs = verifier_proprietes(args.cas)
+    if echecs:
+        print(f"{len(echecs)} échec(s) :")
+        for propriete, texte in echecs[:20]:
+            print(f"  {propriete} : {texte!r}")
+        sys.exit(1)
+    print(f"Propriétés vérifiées sur {args.cas} textes aléatoires par cas")
+    
+    textes = corpus_base(args.db) if args.db else corpus_synthetique(20000)
+    print(f"Corpus : {len(textes)} textes ({'base' if args.db else 'synthétique'}), meilleur de {args.repetitions} passes")
+    for nom, fonction in (("str.replace successifs", escape_sequentiel), ("escape_latex (une passe)", escape_latex)):
+        duree = mesurer(fonction, textes, args.repetitions)
+        print(f"  {nom:<26} {duree * 1000:8.2f} ms ({duree / len(textes) * 1e9:.0f} ns/texte)")
+
+
+if __name__ == "__main__":
+    main()
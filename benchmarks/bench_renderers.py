@@ -0,0 +1,63 @@
+# benchmarks/bench_renderers.py
+"""Comparaison des moteurs PDF (pdflatex / natif) sur un lot de comptes-rendus
+
+Génère N comptes-rendus synthétiques (mêmes données que bench_templates.py)
+avec chaque moteur disponible et relève le temps total et par document.
+
+Usage :
+    python benchmarks/bench_renderers.py [--eleves 200] [--questions 20] [--moteur latex|natif]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_templates import donnees
+from utils.latex_generator import LatexGenerator
+
+
+def mesurer(nom_moteur, devoir, copies, dossier):
+    generator = LatexGenerator(renderer=nom_moteur)
+    if not generator.renderer.is_available():
+        print(f"  {nom_moteur:<8} indisponible (pdflatex n'est pas installé)")
+        return
+    
+    durees = []
+    taille = 0
+    debut = time.perf_counter()
+    for i, (eleve, notes, note_finale, appreciation) in enumerate(copies):
+        debut_copie = time.perf_counter()
+        vue = generator._cr_vue(devoir, eleve, notes, note_finale, 11.5, appreciation)
+        pdf_path = generator.renderer.render("compte_rendu", vue, os.path.join(dossier, f"CR_{nom_moteur}_{i}.pdf"))
+        durees.append(time.perf_counter() - debut_copie)
+        taille += os.path.getsize(pdf_path)
+    total = time.perf_counter() - debut
+    
+    print(f"  {nom_moteur:<8} {total:8.2f} s au total, médiane {statistics.median(durees) * 1000:8.1f} ms/document, "
+          f"{taille / len(copies) / 1024:.1f} Kio/document")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Comparaison des moteurs de rendu PDF")
+    parser.add_argument("--eleves", type=int, default=200)
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--moteur", choices=["latex", "natif"], help="ne mesurer qu'un moteur")
+    args = parser.parse_args()
+    
+    devoir, copies = donnees(args.eleves, args.questions)
+    moteurs = [args.moteur] if args.moteur else ["latex", "natif"]
+    
+    print(f"{args.eleves} comptes-rendus, {args.questions} questions :")
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)  # dossier d'export par défaut du générateur
+        for nom_moteur in moteurs:
+            mesurer(nom_moteur, devoir, copies, tmp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# benchmarks/bench_startup.py
+"""Mesure du temps de démarrage de l'application (plateforme Qt offscreen)
+
+Chaque essai lance un nouveau processus Python et relève :
+  - le temps d'import des modules de l'interface,
+  - le temps jusqu'au premier affichage de la fenêtre (premier paintEvent),
+  - le temps jusqu'au chargement des statistiques du tableau de bord.
+
+Usage :
+    python benchmarks/bench_startup.py [--db nota.db] [--runs 5] [--eager]
+
+--eager construit toutes les pages au démarrage (comportement d'avant le
+chargement à la demande), pour comparaison. La base est copiée dans un
+dossier temporaire : l'original n'est jamais modifié.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_child(db_path, eager):
+    """Démarre l'application et affiche les jalons en JSON sur la sortie standard"""
+    start = time.perf_counter()
+    sys.path.insert(0, ROOT)
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    
+    from PyQt6.QtWidgets import QApplication
+    from PyQt6.QtCore import QObject, QEvent, QTimer
+    from database.db_manager import DatabaseManager
+    from ui.main_window import MainWindow
+    from ui.pages.dashboard import DashboardPage
+    imports_done = time.perf_counter()
+    
+    jalons = {'imports': imports_done - start}
+    
+    app = QApplication(sys.argv[:1])
+    db = DatabaseManager(db_path)
+    db.connect()
+    
+    # Instrumente le premier calcul des statistiques
+    load_stats = DashboardPage.load_stats
+    
+    def timed_load_stats(page):
+        load_stats(page)
+        jalons.setdefault('stats', time.perf_counter() - start)
+        QTimer.singleShot(0, app.quit)
+    DashboardPage.load_stats = timed_load_stats
+    
+    class FirstPaint(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Type.Paint and 'premier_affichage' not in jalons:
+                jalons['premier_affichage'] = time.perf_counter() - start
+            return False
+    
+    first_paint = FirstPaint()
+    app.installEventFilter(first_paint)
+    
+    window = MainWindow()
+    if eager:
+        for index in range(len(window.PAGES)):
+            window.get_page(index)
+        window.show_page(0)
+    window.show()
+    jalons['fenetre_construite'] = time.perf_counter() - start
+    
+    # Garde-fou si les statistiques ne sont jamais chargées
+    QTimer.singleShot(30000, app.quit)
+    app.exec()
+    db.close()
+    
+    print(json.dumps(jalons))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mesure du temps de démarrage")
+    parser.add_argument("--db", default=os.path.join(ROOT, "nota.db"))
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--eager", action="store_true", help="construire toutes les pages au démarrage")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.child:
+        run_child(args.db, args.eager)
+        return
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db_copy = os.path.join(tmp, "bench.db")
+        shutil.copy(args.db, db_copy)
+        
+        env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+        command = [sys.executable, os.path.abspath(__file__), "--child", "--db", db_copy]
+        if args.eager:
+            command.append("--eager")
+        
+        resultats = []
+        totaux = []
+        for _ in range(args.runs):
+            debut = time.perf_counter()
+            output = subprocess.run(command, env=env, capture_output=True, text=True, check=True).stdout
+            totaux.append(time.perf_counter() - debut)
+            resultats.append(json.loads(output.strip().splitlines()[-1]))
+    
+    mode = "toutes les pages" if args.eager else "pages à la demande"
+    print(f"Démarrage ({mode}), médiane sur {args.runs} essais :")
+    for cle in ('imports', 'fenetre_construite', 'premier_affichage', 'stats'):
+        valeurs = [r[cle] for r in resultats if cle in r]
+        if valeurs:
+            print(f"  {cle:<20} {statistics.median(valeurs) * 1000:8.1f} ms")
+    print(f"  {'processus complet':<20} {statistics.median(totaux) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
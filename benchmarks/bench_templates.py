@@ -0,0 +1,104 @@
+# benchmarks/bench_templates.py
+"""Mesure de la génération du code LaTeX des comptes-rendus (sans compilation PDF)
+
+Relève le temps de compilation des gabarits (premier rendu, puis cache) et
+le temps de rendu de N comptes-rendus à partir de données synthétiques.
+
+Usage :
+    python benchmarks/bench_templates.py [--eleves 1000] [--questions 20] [--compare REV]
+
+--compare REV mesure aussi la version de utils/latex_generator.py de la
+révision git REV (concaténation de chaînes, avant les gabarits).
+"""
+import argparse
+import importlib.util
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils import templates
+from utils.latex_generator import LatexGenerator
+
+
+def donnees(nb_eleves, nb_questions):
+    """Devoir, élèves et notes synthétiques (avec caractères spéciaux LaTeX)"""
+    rng = random.Random(42)
+    devoir = {'nom': 'DS n°3 — Fonctions & dérivées', 'classe_nom': '1ère S_2', 'date': '2024-03-14'}
+    commentaires = ["", "Bien", "Attention aux signes", "Revoir le cours (50% juste)", "Très bien : 100 $ !"]
+    copies = []
+    for i in range(nb_eleves):
+        notes = []
+        for q in range(1, nb_questions + 1):
+            points_max = rng.choice([1, 2, 3, 4])
+            notes.append({
+                'numero': str(q),
+                'intitule': f"Question {q} : calcul de f'(x) & tableau",
+                'points_max': points_max,
+                'coefficient': 1,
+                'points_obtenus': rng.uniform(0, points_max),
+                'commentaire': rng.choice(commentaires)
+            })
+        eleve = {'nom': f"Nom{i}", 'prenom': f"Prénom{i}"}
+        copies.append((eleve, notes, rng.uniform(0, 20), rng.choice(["", "Bon trimestre, continuez ainsi."])))
+    return devoir, copies
+
+
+def mesurer(generator, devoir, copies):
+    debut = time.perf_counter()
+    for eleve, notes, note_finale, appreciation in copies:
+        generator._generate_cr_latex(devoir, eleve, notes, note_finale, 11.5, appreciation)
+    return time.perf_counter() - debut
+
+
+def charger_ancienne_version(revision, tmp):
+    source = subprocess.run(
+        ["git", "show", f"{revision}:utils/latex_generator.py"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    path = os.path.join(tmp, "ancien_latex_generator.py")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(source)
+    spec = importlib.util.spec_from_file_location("ancien_latex_generator", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.LatexGenerator
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mesure du rendu des gabarits LaTeX")
+    parser.add_argument("--eleves", type=int, default=1000)
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--compare", metavar="REV", help="révision git à comparer")
+    args = parser.parse_args()
+    
+    devoir, copies = donnees(args.eleves, args.questions)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)  # les générateurs créent leur dossier d'export dans le répertoire courant
+        generator = LatexGenerator()
+        
+        templates._cache.clear()
+        debut = time.perf_counter()
+        templates.get_template(os.path.join(generator.templates_dir, "compte_rendu.tex"))
+        compilation = time.perf_counter() - debut
+        
+        rendu = mesurer(generator, devoir, copies)
+        
+        print(f"{args.eleves} comptes-rendus, {args.questions} questions :")
+        print(f"  compilation du gabarit   {compilation * 1000:8.2f} ms (une fois)")
+        print(f"  rendu (gabarits)         {rendu * 1000:8.1f} ms ({rendu / args.eleves * 1e6:.0f} µs/copie)")
+        
+        if args.compare:
+            ancien = charger_ancienne_version(args.compare, tmp)()
+            rendu_ancien = mesurer(ancien, devoir, copies)
+            print(f"  rendu ({args.compare:<16}) {rendu_ancien * 1000:8.1f} ms ({rendu_ancien / args.eleves * 1e6:.0f} µs/copie)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,468 @@
+# cli.py
+"""Ligne de commande pour les traitements par lot (sans interface graphique)
+
+Utilisable depuis cron ou un script, sur une machine sans écran : aucun
+module Qt n'est importé. Les modules lourds (génération PDF, imports) ne
+sont chargés que par la sous-commande qui s'en sert, pour un démarrage
+rapide.
+
+Usage :
+    python -m cli generate-reports [DEVOIR ...] [--classe C] [--tous] [--format dossier|zip|livret]
+    python -m cli generate-bulletins CLASSE [...] [--periode P] [--format dossier|zip|livret]
+    python -m cli periods [--ajouter NOM DEBUT FIN] [--supprimer P]
+    python -m cli export-grades [DEVOIR ...] [--classe C] [--tous] [--detail] [-o notes.csv]
+    python -m cli import-roster eleves.csv [--classe C] [--dry-run]
+    python -m cli recompute-aggregates [--index]
+    python -m cli serve [--host 0.0.0.0] [--port 8080] [--jeton SECRET]
+    python -m cli benchmark [NOM [ARGS ...]]
+
+Les devoirs sont désignés par leur id, les classes et les périodes par leur id ou leur nom.
+"""
+import argparse
+import os
+import sys
+import time
+
+from config import DB_PATH
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+BENCHMARKS_DIR = os.path.join(ROOT, "benchmarks")
+
+
+def _db(args):
+    from database.db_manager import DatabaseManager
+    
+    if not os.path.exists(args.db):
+        raise Exception(f"Base de données introuvable : {args.db}")
+    db = DatabaseManager(args.db)
+    db.connect()
+    return db
+
+
+def _format_note(valeur):
+    """Nombre pour un tableur français (virgule décimale), vide si absent"""
+    if valeur is None:
+        return ""
+    return f"{valeur:.2f}".rstrip('0').rstrip('.').replace('.', ',')
+
+
+# ========== SÉLECTION DES DEVOIRS ==========
+
+def _ajouter_selection(parser):
+    parser.add_argument("devoirs", nargs="*", type=int, metavar="DEVOIR", help="id des devoirs")
+    parser.add_argument("--classe", action="append", default=[], metavar="C",
+                        help="tous les devoirs d'une classe (id ou nom, répétable)")
+    parser.add_argument("--tous", action="store_true", help="tous les devoirs")
+
+
+def _classe_ids(db, classes):
+    """Ids des classes désignées par id ou par nom (sans tenir compte de la casse)"""
+    from utils.text import normalize_text
+    
+    par_nom = {normalize_text(c['nom']): c['id'] for c in db.get_all_classes()}
+    ids = []
+    for classe in classes:
+        if classe.isdigit() and db.get_classe(int(classe)):
+            ids.append(int(classe))
+        elif normalize_text(classe) in par_nom:
+            ids.append(par_nom[normalize_text(classe)])
+        else:
+            raise Exception(f"Classe inconnue : {classe}")
+    return ids
+
+
+def _devoirs_selectionnes(db, args):
+    """Devoirs choisis sur la ligne de commande, dans l'ordre de la liste des devoirs"""
+    devoirs = db.get_all_devoirs_avec_stats()
+    if args.tous:
+        return devoirs
+    
+    connus = {d['id'] for d in devoirs}
+    for devoir_id in args.devoirs:
+        if devoir_id not in connus:
+            raise Exception(f"Devoir {devoir_id} introuvable")
+    
+    devoir_ids = set(args.devoirs)
+    classe_ids = set(_classe_ids(db, args.classe))
+    if not devoir_ids and not classe_ids:
+        raise Exception("Aucun devoir sélectionné (DEVOIR, --classe ou --tous)")
+    return [d for d in devoirs if d['id'] in devoir_ids or d['id_classe'] in classe_ids]
+
+
+# ========== GENERATE-REPORTS ==========
+
+def cmd_generate_reports(args):
+    """Comptes-rendus (et barèmes) des devoirs sélectionnés"""
+    db = _db(args)
+    devoirs = _devoirs_selectionnes(db, args)
+    racine = os.path.abspath(args.sortie)
+    
+    if args.format == "dossier":
+        return _generer_dossiers(db, devoirs, racine, args)
+    
+    from utils.latex_generator import LatexGenerator, nom_fichier_archive, nom_fichier_livret
+    from utils.generation_queue import dossier_lot
+    
+    generator = LatexGenerator(db, renderer=args.moteur)
+    print(f"{len(devoirs)} devoir(s), format {args.format}, moteur {generator.renderer.nom}", flush=True)
+    nb_erreurs = 0
+    for devoir in devoirs:
+        if not devoir['nb_corriges']:
+            print(f"  {devoir['nom']} ({devoir['classe_nom']}) : aucune copie complète", flush=True)
+            continue
+        dossier = os.path.dirname(dossier_lot(devoir, racine))
+        os.makedirs(dossier, exist_ok=True)
+        debut = time.perf_counter()
+        if args.format == "zip":
+            chemin = os.path.join(dossier, nom_fichier_archive(devoir))
+            nombre, erreurs = generator.generate_archive(devoir['id'], chemin, args.bareme)
+            resultat = f"{nombre} document(s)"
+        else:
+            chemin = os.path.join(dossier, nom_fichier_livret(devoir))
+            nombre, erreurs = generator.generate_livret(devoir['id'], chemin, args.bareme)
+            resultat = f"{nombre} page(s)"
+        print(f"  {chemin} : {resultat} en {time.perf_counter() - debut:.1f} s", flush=True)
+        for eleve, message in erreurs:
+            print(f"  ! {eleve['nom']} {eleve['prenom']} : {message}", file=sys.stderr)
+        nb_erreurs += len(erreurs)
+    return 1 if nb_erreurs else 0
+
+
+def _generer_dossiers(db, devoirs, racine, args):
+    """Un PDF par élève, via la file de génération (threads et contextes partagés)"""
+    import threading
+    from utils.generation_queue import planifier_lot, lancer_lot, GenerationScheduler
+    
+    plan = planifier_lot(db, [d['id'] for d in devoirs], (), racine, avec_bareme=args.bareme)
+    if not plan['taches']:
+        print("Aucune copie complète : rien à générer")
+        return 0
+    
+    scheduler = GenerationScheduler.instance()
+    scheduler.renderer = args.moteur
+    if args.threads:
+        scheduler.nb_threads = args.threads
+    print(f"{len(plan['devoirs'])} devoir(s) : {plan['nb_comptes_rendus']} compte(s)-rendu(s) et "
+          f"{plan['nb_baremes']} barème(s) sur {scheduler.nb_threads} thread(s) -> {racine}", flush=True)
+    
+    changement = threading.Event()
+    scheduler.subscribe(lambda event: changement.set())
+    lot = lancer_lot(db, plan)
+    # Seules les tâches dont le bail a expiré sont reprises : celles de
+    # l'application ouverte restent à elle
+    scheduler.start()
+    
+    debut = time.perf_counter()
+    dernier = None
+    try:
+        while True:
+            changement.wait(1.0)
+            changement.clear()
+            counts = db.get_generation_batch_counts(lot)
+            total = sum(counts.values())
+            restants = counts.get('en_attente', 0) + counts.get('en_cours', 0)
+            avancement = (total - restants, counts.get('echec', 0))
+            if avancement != dernier:
+                dernier = avancement
+                print(f"  [{(total - restants) * 100 // total:3d}%] {total - restants}/{total} document(s)"
+                      + (f", {counts['echec']} échec(s)" if counts.get('echec') else ""), flush=True)
+            if restants == 0:
+                break
+    except KeyboardInterrupt:
+        # Les documents restants resteront en file pour l'application
+        print("Interrompu : les documents non générés restent en file", file=sys.stderr)
+        return 130
+    finally:
+        scheduler.stop()
+    
+    print(f"Terminé en {time.perf_counter() - debut:.1f} s : {counts.get('terminee', 0)} généré(s), "
+          f"{counts.get('ignoree', 0)} ignoré(s), {counts.get('echec', 0)} échec(s)")
+    for tache in db.get_generation_jobs(statuts=['echec'], limit=len(plan['taches'])):
+        if tache['lot'] == lot:
+            print(f"  ! {tache['chemin']} : {tache['erreur']}", file=sys.stderr)
+    return 1 if counts.get('echec') else 0
+
+
+# ========== BULLETINS ==========
+
+def _periode_id(db, periode):
+    """Id de la période désignée par id ou par nom ; None (toute l'année) si non précisée"""
+    from utils.text import normalize_text
+    
+    if periode is None:
+        return None
+    for p in db.get_all_periodes():
+        if str(p['id']) == periode or normalize_text(p['nom']) == normalize_text(periode):
+            return p['id']
+    raise Exception(f"Période inconnue : {periode}")
+
+
+def cmd_generate_bulletins(args):
+    """Bulletins de période des classes sélectionnées (moyennes calculées une fois par classe)"""
+    from utils.latex_generator import (LatexGenerator, dossier_bulletins, nom_fichier_archive_bulletins,
+                                       nom_fichier_livret_bulletins)
+    
+    db = _db(args)
+    classe_ids = _classe_ids(db, args.classes)
+    periode_id = _periode_id(db, args.periode)
+    generator = LatexGenerator(db, renderer=args.moteur)
+    racine = os.path.abspath(args.sortie)
+    print(f"{len(classe_ids)} classe(s), format {args.format}, moteur {generator.renderer.nom}", flush=True)
+    
+    nb_erreurs = 0
+    for classe_id in classe_ids:
+        debut = time.perf_counter()
+        bulletins = generator.load_bulletins(classe_id, periode_id)
+        classe, periode = bulletins['classe'], bulletins['periode']
+        if not bulletins['stats']['nb']:
+            print(f"  {classe['nom']} ({periode['nom']}) : aucune copie complète", flush=True)
+            continue
+        dossier = dossier_bulletins(classe, periode, racine)
+        if args.format == "zip":
+            chemin = os.path.join(os.path.dirname(dossier), nom_fichier_archive_bulletins(classe, periode))
+            os.makedirs(os.path.dirname(chemin), exist_ok=True)
+            nombre, erreurs = generator.generate_archive_bulletins(classe_id, periode_id, chemin)
+            resultat = f"{nombre} bulletin(s)"
+        elif args.format == "livret":
+            chemin = os.path.join(os.path.dirname(dossier), nom_fichier_livret_bulletins(classe, periode))
+            os.makedirs(os.path.dirname(chemin), exist_ok=True)
+            nombre, erreurs = generator.generate_livret_bulletins(classe_id, periode_id, chemin)
+            resultat = f"{nombre} page(s)"
+        else:
+            chemin = dossier
+            fichiers, erreurs = generator.generate_bulletins(classe_id, periode_id, chemin)
+            resultat = f"{len(fichiers)} bulletin(s)"
+        stats = bulletins['stats']
+        print(f"  {chemin} : {resultat} en {time.perf_counter() - debut:.1f} s "
+              f"(moyenne de classe {stats['moyenne']:.2f}, {stats['nb']} élève(s) classé(s))", flush=True)
+        for eleve, message in erreurs:
+            print(f"  ! {eleve['nom']} {eleve['prenom']} : {message}", file=sys.stderr)
+        nb_erreurs += len(erreurs)
+    return 1 if nb_erreurs else 0
+
+
+def cmd_periods(args):
+    """Liste, ajout et suppression des périodes de notation"""
+    db = _db(args)
+    if args.ajouter:
+        nom, date_debut, date_fin = args.ajouter
+        periode_id = db.add_periode(nom, date_debut, date_fin)
+        print(f"Période {periode_id} ajoutée : {nom}")
+    if args.supprimer:
+        db.delete_periode(_periode_id(db, args.supprimer))
+        print(f"Période supprimée : {args.supprimer}")
+    
+    for periode in db.get_all_periodes():
+        print(f"  {periode['id']:>3}  {periode['nom']:<20} {periode['date_debut']} -> {periode['date_fin']}")
+    return 0
+
+
+# ========== EXPORT-GRADES ==========
+
+def cmd_export_grades(args):
+    """Notes des devoirs sélectionnés au format CSV (séparateur ';')"""
+    import csv
+    from utils.devoir_context import DevoirContext
+    
+    db = _db(args)
+    devoirs = _devoirs_selectionnes(db, args)
+    if args.detail and len(devoirs) != 1:
+        raise Exception("--detail exporte les notes par question d'un seul devoir")
+    
+    if args.sortie:
+        # BOM : le fichier s'ouvre directement dans un tableur
+        sortie = open(args.sortie, 'w', encoding='utf-8-sig', newline='')
+    else:
+        sortie = sys.stdout
+    try:
+        writer = csv.writer(sortie, delimiter=';', lineterminator='\n')
+        lignes = 0
+        for numero, devoir in enumerate(devoirs):
+            context = DevoirContext.load(db, devoir['id'])
+            questions = context.questions if args.detail else []
+            if numero == 0:
+                writer.writerow(["Classe", "Devoir", "Date", "Nom", "Prénom"]
+                                + [f"Q{q['numero']} /{_format_note(q['points_max'])}" for q in questions]
+                                + ["Note /20", "Rang"])
+            
+            for i, eleve in enumerate(context.eleves):
+                writer.writerow(
+                    [devoir['classe_nom'] or "", devoir['nom'], devoir['date'] or "", eleve['nom'], eleve['prenom']]
+                    + [_format_note(colonne[i]) for colonne in (context.colonnes if args.detail else [])]
+                    + [_format_note(context.notes_finales[eleve['id']]), context.rangs.get(eleve['id'], "")]
+                )
+                lignes += 1
+    finally:
+        if sortie is not sys.stdout:
+            sortie.close()
+    
+    if args.sortie:
+        print(f"{lignes} ligne(s) exportée(s) pour {len(devoirs)} devoir(s) dans {args.sortie}")
+    return 0
+
+
+# ========== IMPORT-ROSTER ==========
+
+def cmd_import_roster(args):
+    """Import d'une liste d'élèves (CSV/XLSX), en une transaction"""
+    from utils.importers import import_roster, format_plan
+    
+    if not os.path.exists(args.fichier):
+        raise Exception(f"Fichier introuvable : {args.fichier}")
+    db = _db(args)
+    plan = import_roster(db, args.fichier, default_classe=args.classe, dry_run=args.dry_run)
+    print(format_plan(plan))
+    if args.dry_run:
+        print("\n(simulation : rien n'a été enregistré)")
+    return 1 if plan['erreurs'] else 0
+
+
+# ========== RECOMPUTE-AGGREGATES ==========
+
+def cmd_recompute_aggregates(args):
+    """Recalcule les moyennes des devoirs (et l'index de recherche)"""
+    db = _db(args)
+    debut = time.perf_counter()
+    nombre = db.recalculate_all_moyennes()
+    print(f"Moyennes de {nombre} devoir(s) recalculées en {(time.perf_counter() - debut) * 1000:.0f} ms")
+    
+    if args.index:
+        if not db.fts_enabled:
+            raise Exception("Index plein texte indisponible (SQLite sans FTS5)")
+        debut = time.perf_counter()
+        db.rebuild_search_index()
+        print(f"Index de recherche reconstruit en {(time.perf_counter() - debut) * 1000:.0f} ms")
+    return 0
+
+
+# ========== SERVE ==========
+
+def cmd_serve(args):
+    """Serveur HTTP local (API JSON) sur la base"""
+    from utils.api_server import ApiServer
+    
+    if not os.path.exists(args.db):
+        raise Exception(f"Base de données introuvable : {args.db}")
+    serveur = ApiServer(args.db, args.host, args.port, args.lecteurs, args.jeton)
+    print(f"API NotaBene sur {serveur.adresse}/api/ ({args.lecteurs} lecteurs"
+          f"{', écritures protégées par jeton' if args.jeton else ''}) - Ctrl+C pour arrêter", flush=True)
+    try:
+        serveur.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        serveur.close()
+    return 0
+
+
+# ========== BENCHMARK ==========
+
+def _benchmarks():
+    """Scripts de benchmarks/ : nom court -> chemin (bench_templates.py -> templates)"""
+    return {
+        nom[len("bench_"):-len(".py")].replace('_', '-'): os.path.join(BENCHMARKS_DIR, nom)
+        for nom in sorted(os.listdir(BENCHMARKS_DIR))
+        if nom.startswith("bench_") and nom.endswith(".py")
+    }
+
+
+def cmd_benchmark(args):
+    """Lance un script de benchmarks/ avec ses propres arguments"""
+    import runpy
+    
+    scripts = _benchmarks()
+    if not args.nom:
+        for nom, chemin in scripts.items():
+            print(f"  {nom:<14} benchmarks/{os.path.basename(chemin)}")
+        return 0
+    if args.nom not in scripts:
+        raise Exception(f"Benchmark inconnu : {args.nom} (disponibles : {', '.join(scripts)})")
+    
+    # Les scripts importent leurs voisins (bench_renderers -> bench_templates)
+    sys.path.insert(0, BENCHMARKS_DIR)
+    sys.argv = [scripts[args.nom]] + args.arguments
+    runpy.run_path(scripts[args.nom], run_name="__main__")
+    return 0
+
+
+# ========== ANALYSE DES ARGUMENTS ==========
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m cli", description="Traitements par lot de NotaBene (sans interface)")
+    parser.add_argument("--db", default=DB_PATH, help=f"base de données (défaut : {DB_PATH})")
+    commandes = parser.add_subparsers(dest="commande", metavar="COMMANDE", required=True)
+    
+    generate = commandes.add_parser("generate-reports", help="générer les comptes-rendus PDF")
+    _ajouter_selection(generate)
+    generate.add_argument("--format", choices=["dossier", "zip", "livret"], default="dossier",
+                          help="un PDF par élève (défaut), une archive ZIP ou un livret par devoir")
+    generate.add_argument("--sortie", default="exports", help="dossier racine (un sous-dossier par classe)")
+    generate.add_argument("--sans-bareme", dest="bareme", action="store_false", help="ne pas générer les barèmes")
+    generate.add_argument("--moteur", choices=["auto", "latex", "natif"], default=None,
+                          help="moteur PDF (défaut : celui de config.py)")
+    generate.add_argument("--threads", type=int, default=None, help="threads de génération (format dossier)")
+    generate.set_defaults(fonction=cmd_generate_reports)
+    
+    bulletins = commandes.add_parser("generate-bulletins", help="générer les bulletins de période PDF")
+    bulletins.add_argument("classes", nargs="+", metavar="CLASSE", help="classes (id ou nom)")
+    bulletins.add_argument("--periode", metavar="P", help="période (id ou nom ; défaut : toute l'année)")
+    bulletins.add_argument("--format", choices=["dossier", "zip", "livret"], default="dossier",
+                           help="un PDF par élève (défaut), une archive ZIP ou un livret par classe")
+    bulletins.add_argument("--sortie", default="exports", help="dossier racine (un sous-dossier par classe)")
+    bulletins.add_argument("--moteur", choices=["auto", "latex", "natif"], default=None,
+                           help="moteur PDF (défaut : celui de config.py)")
+    bulletins.set_defaults(fonction=cmd_generate_bulletins)
+    
+    periods = commandes.add_parser("periods", help="lister ou modifier les périodes de notation")
+    periods.add_argument("--ajouter", nargs=3, metavar=("NOM", "DEBUT", "FIN"),
+                         help="ajouter une période (dates AAAA-MM-JJ, bornes incluses)")
+    periods.add_argument("--supprimer", metavar="P", help="supprimer une période (id ou nom)")
+    periods.set_defaults(fonction=cmd_periods)
+    
+    export = commandes.add_parser("export-grades", help="exporter les notes en CSV")
+    _ajouter_selection(export)
+    export.add_argument("--detail", action="store_true", help="une colonne par question (un seul devoir)")
+    export.add_argument("-o", "--sortie", help="fichier CSV (défaut : sortie standard)")
+    export.set_defaults(fonction=cmd_export_grades)
+    
+    roster = commandes.add_parser("import-roster", help="importer une liste d'élèves (CSV/XLSX)")
+    roster.add_argument("fichier")
+    roster.add_argument("--classe", help="classe des lignes qui n'en indiquent pas")
+    roster.add_argument("--dry-run", action="store_true", help="afficher le plan sans rien enregistrer")
+    roster.set_defaults(fonction=cmd_import_roster)
+    
+    recompute = commandes.add_parser("recompute-aggregates", help="recalculer les moyennes des devoirs")
+    recompute.add_argument("--index", action="store_true", help="reconstruire aussi l'index de recherche")
+    recompute.set_defaults(fonction=cmd_recompute_aggregates)
+    
+    serve = commandes.add_parser("serve", help="servir la base en JSON sur le réseau local")
+    serve.add_argument("--host", default="127.0.0.1", help="adresse d'écoute (0.0.0.0 : tout le réseau)")
+    serve.add_argument("--port", type=int, default=8080)
+    serve.add_argument("--lecteurs", type=int, default=4, help="connexions de lecture du pool")
+    serve.add_argument("--jeton", help="jeton exigé pour les écritures (Authorization: Bearer ...)")
+    serve.set_defaults(fonction=cmd_serve)
+    
+    benchmark = commandes.add_parser("benchmark", help="lancer un benchmark (sans nom : liste)")
+    benchmark.add_argument("nom", nargs="?")
+    benchmark.add_argument("arguments", nargs=argparse.REMAINDER, help="arguments du benchmark")
+    benchmark.set_defaults(fonction=cmd_benchmark)
+    
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.fonction(args)
+    except Exception as e:
+        print(f"Erreur : {e}", file=sys.stderr)
+        return 1
+    finally:
+        from database.db_manager import DatabaseManager
+        
+        if DatabaseManager._instance is not None:
+            DatabaseManager._instance.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -17,4 +17,7 @@ COLORS = {
     "danger": "#e74c3c",
     "light": "#ecf0f1",
     "dark": "#2c3e50"
-}
\ No newline at end of file
+}
+
+# Moteur PDF des comptes-rendus : "latex" (pdflatex), "natif" (sans dépendance) ou "auto"
+PDF_RENDERER = "auto"
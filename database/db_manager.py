@@ -1,23 +1,206 @@
 # database/db_manager.py
 import sqlite3
 import json
+import os
+import re
 from typing import List, Dict, Optional
-from datetime import datetime
+from datetime import datetime, timedelta
+
+# Note /20 de chaque élève pour chaque devoir de sa classe, avec la complétude de sa copie.
+# {eleves} et {devoirs} permettent de restreindre le calcul (ex: à une page de résultats).
+NOTES_FINALES_SQL = """
+    SELECT e.id as id_eleve, d.id as id_devoir,
+           (SUM(nq.points_obtenus * q.coefficient) / 
+            SUM(q.points_max * q.coefficient) * 20) as note_finale,
+           COUNT(nq.points_obtenus) as nb_notes,
+           COUNT(q.id) as nb_questions
+    FROM {eleves} e
+    JOIN {devoirs} d ON d.id_classe = e.id_classe
+    JOIN questions q ON q.id_devoir = d.id
+    LEFT JOIN note_question nq ON nq.id_question = q.id AND nq.id_eleve = e.id
+    GROUP BY e.id, d.id
+"""
+
+# Date d'un devoir au format AAAA-MM-JJ (les premières versions l'enregistraient en JJ/MM/AAAA)
+DATE_ISO_SQL = """
+    CASE WHEN {date} LIKE '__/__/____'
+         THEN substr({date}, 7, 4) || '-' || substr({date}, 4, 2) || '-' || substr({date}, 1, 2)
+         ELSE {date} END
+"""
+
+# Périodes de notation (trimestres, semestres...) communes à toutes les classes.
+# Un devoir appartient à la période qui contient sa date (bornes incluses).
+PERIODES_SCHEMA_SQL = """
+    CREATE TABLE IF NOT EXISTS periodes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        nom TEXT NOT NULL,
+        date_debut TEXT NOT NULL,
+        date_fin TEXT NOT NULL
+    );
+"""
+
+# Types d'entrées de l'index plein texte : rowid = id * NB_TYPES_RECHERCHE + code du type.
+# Les requêtes d'index ci-dessous sont formatées avec ces constantes (voir RECHERCHE_FORMAT).
+TYPES_RECHERCHE = {'eleve': 0, 'devoir': 1, 'question': 2, 'commentaire': 3}
+NB_TYPES_RECHERCHE = len(TYPES_RECHERCHE)
+RECHERCHE_FORMAT = dict(TYPES_RECHERCHE, nb=NB_TYPES_RECHERCHE)
+
+RECHERCHE_SCHEMA_SQL = """
+    CREATE VIRTUAL TABLE recherche USING fts5(
+        texte,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    );
+    
+    CREATE TRIGGER recherche_eleves_ai AFTER INSERT ON eleves BEGIN
+        INSERT INTO recherche(rowid, texte)
+        VALUES (new.id * {nb} + {eleve}, COALESCE(new.nom, '') || ' ' || COALESCE(new.prenom, ''));
+    END;
+    CREATE TRIGGER recherche_eleves_au AFTER UPDATE OF nom, prenom ON eleves BEGIN
+        DELETE FROM recherche WHERE rowid = old.id * {nb} + {eleve};
+        INSERT INTO recherche(rowid, texte)
+        VALUES (new.id * {nb} + {eleve}, COALESCE(new.nom, '') || ' ' || COALESCE(new.prenom, ''));
+    END;
+    CREATE TRIGGER recherche_eleves_ad AFTER DELETE ON eleves BEGIN
+        DELETE FROM recherche WHERE rowid = old.id * {nb} + {eleve};
+    END;
+    
+    CREATE TRIGGER recherche_devoirs_ai AFTER INSERT ON devoirs BEGIN
+        INSERT INTO recherche(rowid, texte) VALUES (new.id * {nb} + {devoir}, COALESCE(new.nom, ''));
+    END;
+    CREATE TRIGGER recherche_devoirs_au AFTER UPDATE OF nom ON devoirs BEGIN
+        DELETE FROM recherche WHERE rowid = old.id * {nb} + {devoir};
+        INSERT INTO recherche(rowid, texte) VALUES (new.id * {nb} + {devoir}, COALESCE(new.nom, ''));
+    END;
+    CREATE TRIGGER recherche_devoirs_ad AFTER DELETE ON devoirs BEGIN
+        DELETE FROM recherche WHERE rowid = old.id * {nb} + {devoir};
+    END;
+    
+    CREATE TRIGGER recherche_questions_ai AFTER INSERT ON questions BEGIN
+        INSERT INTO recherche(rowid, texte) VALUES (new.id * {nb} + {question}, COALESCE(new.intitule, ''));
+    END;
+    CREATE TRIGGER recherche_questions_au AFTER UPDATE OF intitule ON questions BEGIN
+        DELETE FROM recherche WHERE rowid = old.id * {nb} + {question};
+        INSERT INTO recherche(rowid, texte) VALUES (new.id * {nb} + {question}, COALESCE(new.intitule, ''));
+    END;
+    CREATE TRIGGER recherche_questions_ad AFTER DELETE ON questions BEGIN
+        DELETE FROM recherche WHERE rowid = old.id * {nb} + {question};
+    END;
+    
+    CREATE TRIGGER recherche_commentaires_ai AFTER INSERT ON note_question
+    WHEN COALESCE(new.commentaire, '') <> '' BEGIN
+        INSERT INTO recherche(rowid, texte) VALUES (new.id * {nb} + {commentaire}, new.commentaire);
+    END;
+    CREATE TRIGGER recherche_commentaires_au AFTER UPDATE OF commentaire ON note_question BEGIN
+        DELETE FROM recherche WHERE rowid = old.id * {nb} + {commentaire};
+        INSERT INTO recherche(rowid, texte)
+        SELECT new.id * {nb} + {commentaire}, new.commentaire WHERE COALESCE(new.commentaire, '') <> '';
+    END;
+    CREATE TRIGGER recherche_commentaires_ad AFTER DELETE ON note_question BEGIN
+        DELETE FROM recherche WHERE rowid = old.id * {nb} + {commentaire};
+    END;
+"""
+
+RECHERCHE_REBUILD_SQL = """
+    INSERT INTO recherche(rowid, texte)
+    SELECT id * {nb} + {eleve}, COALESCE(nom, '') || ' ' || COALESCE(prenom, '') FROM eleves
+    UNION ALL
+    SELECT id * {nb} + {devoir}, COALESCE(nom, '') FROM devoirs
+    UNION ALL
+    SELECT id * {nb} + {question}, COALESCE(intitule, '') FROM questions
+    UNION ALL
+    SELECT id * {nb} + {commentaire}, commentaire FROM note_question WHERE COALESCE(commentaire, '') <> ''
+"""
+
+# Index des listes paginées par clé (get_eleves_page, get_devoirs_page) : mêmes
+# expressions que leurs ORDER BY, sans filtre puis avec filtre de classe.
+PAGINATION_INDEX_SQL = """
+    CREATE INDEX IF NOT EXISTS idx_eleves_tri
+        ON eleves(COALESCE(nom, ''), COALESCE(prenom, ''), id);
+    CREATE INDEX IF NOT EXISTS idx_eleves_classe_tri
+        ON eleves(id_classe, COALESCE(nom, ''), COALESCE(prenom, ''), id);
+    CREATE INDEX IF NOT EXISTS idx_devoirs_tri
+        ON devoirs(COALESCE(date, ''), id);
+    CREATE INDEX IF NOT EXISTS idx_devoirs_classe_tri
+        ON devoirs(id_classe, COALESCE(date, ''), id);
+"""
+
+# File persistante des documents à générer en arrière-plan (voir utils/generation_queue.py).
+# statut : 'en_attente', 'en_cours', 'terminee', 'echec', 'ignoree' ou 'annulee'
+TACHES_GENERATION_SCHEMA_SQL = """
+    CREATE TABLE IF NOT EXISTS taches_generation (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        document TEXT NOT NULL,
+        id_devoir INTEGER NOT NULL REFERENCES devoirs(id),
+        id_eleve INTEGER REFERENCES eleves(id),
+        chemin TEXT NOT NULL,
+        statut TEXT NOT NULL DEFAULT 'en_attente',
+        priorite INTEGER NOT NULL DEFAULT 0,
+        tentatives INTEGER NOT NULL DEFAULT 0,
+        disponible_le TEXT NOT NULL,
+        hash_sortie TEXT,
+        erreur TEXT,
+        lot TEXT,
+        proprietaire TEXT,
+        bail_expire_le TEXT,
+        cree_le TEXT NOT NULL,
+        maj_le TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_taches_generation_file
+        ON taches_generation(statut, priorite DESC, id);
+    CREATE INDEX IF NOT EXISTS idx_taches_generation_document
+        ON taches_generation(id_devoir, id_eleve);
+"""
+
+# Durée de réservation d'une tâche 'en_cours' (secondes) : passé ce délai, le
+# processus qui l'a prise est considéré comme arrêté. Un rendu pdflatex est
+# interrompu bien avant (30 s par passe).
+BAIL_GENERATION = 10 * 60
+
+
+def _horodatage(delai=0):
+    """Date et heure au format texte triable, éventuellement décalée de `delai` secondes"""
+    return (datetime.now() + timedelta(seconds=delai)).strftime("%Y-%m-%d %H:%M:%S")
+
 
 class DatabaseManager:
     _instance = None
+    # Abonnés aux notifications de modification (partagés par toutes les instances)
+    _listeners = []
     
     def __new__(cls, db_path="nota.db"):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
             cls._instance.db_path = db_path
             cls._instance.conn = None
+            cls._instance.fts_enabled = False
+            cls._instance.check_same_thread = True
         return cls._instance
     
+    @classmethod
+    def open_separate(cls, db_path=None, check_same_thread=True):
+        """Ouvre une instance indépendante du singleton, avec sa propre connexion
+        
+        À utiliser dans les threads de travail : une connexion SQLite ne doit
+        pas être partagée entre threads. `check_same_thread=False` autorise
+        une connexion passée d'un thread à l'autre, jamais utilisée par deux
+        threads à la fois (pool de connexions, voir database.pool).
+        """
+        if db_path is None:
+            db_path = cls._instance.db_path if cls._instance else "nota.db"
+        instance = object.__new__(cls)
+        instance.db_path = db_path
+        instance.conn = None
+        instance.fts_enabled = False
+        instance.check_same_thread = check_same_thread
+        instance.connect()
+        return instance
+    
     def connect(self):
         if self.conn is None:
-            self.conn = sqlite3.connect(self.db_path)
+            self.conn = sqlite3.connect(self.db_path, check_same_thread=self.check_same_thread)
             self.conn.row_factory = sqlite3.Row
+            self._ensure_schema()
         return self.conn
     
     def close(self):
@@ -25,13 +208,196 @@ class DatabaseManager:
             self.conn.close()
             self.conn = None
     
+    # ========== NOTIFICATIONS ==========
+    
+    @classmethod
+    def subscribe(cls, callback):
+        """Abonne `callback(event)` aux modifications écrites en base
+        
+        `event` est un dict : 'type' ('classe', 'eleve', 'devoir' ou 'note'),
+        'action' ('insert', 'update' ou 'delete') et les ids concernés par
+        type dans 'eleves', 'devoirs' et 'classes' (None = tous).
+        Le callback est appelé dans le thread qui a écrit.
+        """
+        if callback not in cls._listeners:
+            cls._listeners.append(callback)
+    
+    @classmethod
+    def unsubscribe(cls, callback):
+        if callback in cls._listeners:
+            cls._listeners.remove(callback)
+    
+    def _emit(self, type_modif, action, eleves=(), devoirs=(), classes=()):
+        """Notifie les abonnés d'une écriture validée"""
+        def ids(values):
+            return None if values is None else frozenset(v for v in values if v is not None)
+        
+        event = {
+            'type': type_modif,
+            'action': action,
+            'eleves': ids(eleves),
+            'devoirs': ids(devoirs),
+            'classes': ids(classes)
+        }
+        for callback in list(self._listeners):
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"Erreur dans un abonné aux modifications: {e}")
+    
+    def _classe_of(self, table, row_id):
+        row = self.conn.execute(f"SELECT id_classe FROM {table} WHERE id=?", (row_id,)).fetchone()
+        return row['id_classe'] if row else None
+    
+    # ========== SCHÉMA ==========
+    
+    def _ensure_schema(self):
+        """Crée les tables et index ajoutés depuis la première version de la base"""
+        self._ensure_search_index()
+        self.conn.executescript(TACHES_GENERATION_SCHEMA_SQL)
+        self._ensure_column('taches_generation', 'lot', 'TEXT')
+        self._ensure_column('taches_generation', 'proprietaire', 'TEXT')
+        self._ensure_column('taches_generation', 'bail_expire_le', 'TEXT')
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_taches_generation_lot ON taches_generation(lot)")
+        self.conn.executescript(PERIODES_SCHEMA_SQL)
+        # Poids du devoir dans la moyenne de période (bulletins)
+        self._ensure_column('devoirs', 'poids', 'REAL NOT NULL DEFAULT 1')
+        self.conn.executescript(PAGINATION_INDEX_SQL)
+    
+    def _ensure_column(self, table, colonne, definition):
+        """Ajoute une colonne à une table créée par une version antérieure"""
+        colonnes = {row['name'] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+        if colonne not in colonnes:
+            self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {colonne} {definition}")
+            self.conn.commit()
+    
+    def _ensure_search_index(self):
+        """Crée l'index plein texte (FTS5) et ses triggers s'ils n'existent pas encore"""
+        exists = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='recherche'"
+        ).fetchone()
+        
+        if exists:
+            self.fts_enabled = True
+            return
+        
+        try:
+            self.conn.executescript("BEGIN;" + RECHERCHE_SCHEMA_SQL.format(**RECHERCHE_FORMAT) + "COMMIT;")
+            self.rebuild_search_index()
+            self.fts_enabled = True
+        except sqlite3.OperationalError as e:
+            # SQLite compilé sans FTS5 : la recherche se rabat sur LIKE
+            print(f"Index plein texte indisponible: {e}")
+            self.conn.rollback()
+            self.fts_enabled = False
+    
+    def rebuild_search_index(self):
+        """Reconstruit entièrement l'index plein texte depuis les tables"""
+        with self.conn:
+            self.conn.execute("DELETE FROM recherche")
+            self.conn.execute(RECHERCHE_REBUILD_SQL.format(**RECHERCHE_FORMAT))
+    
+    # ========== RECHERCHE ==========
+    
+    def _fts_query(self, term):
+        """Transforme une saisie en requête FTS5 : chaque mot est un préfixe, tous sont requis"""
+        mots = re.findall(r'\w+', term)
+        return " ".join(f'"{mot}"*' for mot in mots)
+    
+    def _search_condition(self, column_id, type_recherche, term, like_columns):
+        """Condition SQL (et paramètres) filtrant sur une recherche, via FTS5 ou LIKE à défaut"""
+        if self.fts_enabled:
+            fts_query = self._fts_query(term)
+            if not fts_query:
+                return "1=1", []
+            condition = (f"{column_id} IN (SELECT rowid / {NB_TYPES_RECHERCHE} FROM recherche "
+                         f"WHERE recherche MATCH ? AND rowid % {NB_TYPES_RECHERCHE} = ?)")
+            return condition, [fts_query, TYPES_RECHERCHE[type_recherche]]
+        
+        condition = "(" + " OR ".join(f"{col} LIKE ?" for col in like_columns) + ")"
+        return condition, [f"%{term}%"] * len(like_columns)
+    
+    def search(self, term, types=None, limit=50):
+        """Recherche plein texte (préfixes, sans accents) classée par pertinence (bm25)
+        
+        Retourne des dicts {'type', 'id', 'texte', 'score'} ; `types` restreint
+        aux types voulus ('eleve', 'devoir', 'question', 'commentaire').
+        """
+        fts_query = self._fts_query(term)
+        if not self.fts_enabled or not fts_query:
+            return []
+        
+        query = "SELECT rowid, texte, bm25(recherche) as score FROM recherche WHERE recherche MATCH ?"
+        params = [fts_query]
+        
+        if types:
+            codes = [TYPES_RECHERCHE[t] for t in types]
+            query += f" AND rowid % {NB_TYPES_RECHERCHE} IN ({', '.join('?' * len(codes))})"
+            params.extend(codes)
+        
+        query += " ORDER BY score LIMIT ?"
+        params.append(limit)
+        
+        noms_types = {code: nom for nom, code in TYPES_RECHERCHE.items()}
+        return [
+            {
+                'type': noms_types[row['rowid'] % NB_TYPES_RECHERCHE],
+                'id': row['rowid'] // NB_TYPES_RECHERCHE,
+                'texte': row['texte'],
+                'score': row['score']
+            }
+            for row in self.conn.execute(query, params)
+        ]
+    
+    def search_eleves(self, term, limit=50):
+        """Élèves correspondant à une recherche, les plus pertinents d'abord"""
+        ids = [r['id'] for r in self.search(term, ['eleve'], limit)]
+        return self._rows_in_order(
+            "SELECT e.*, c.nom as classe_nom FROM eleves e LEFT JOIN classes c ON e.id_classe = c.id",
+            "e.id", ids
+        )
+    
+    def search_devoirs(self, term, limit=50):
+        """Devoirs correspondant à une recherche, les plus pertinents d'abord"""
+        ids = [r['id'] for r in self.search(term, ['devoir'], limit)]
+        return self._rows_in_order(
+            "SELECT d.*, c.nom as classe_nom FROM devoirs d LEFT JOIN classes c ON d.id_classe = c.id",
+            "d.id", ids
+        )
+    
+    def _rows_in_order(self, select, column_id, ids):
+        if not ids:
+            return []
+        rows = self.conn.execute(
+            f"{select} WHERE {column_id} IN ({', '.join('?' * len(ids))})", ids
+        ).fetchall()
+        by_id = {row['id']: row for row in rows}
+        return [by_id[i] for i in ids if i in by_id]
+    
     # ========== MÉTHODES DE RECALCUL ==========
     
     def recalculate_all_moyennes(self):
-        """Recalcule toutes les moyennes de tous les devoirs"""
-        devoirs = self.conn.execute("SELECT id FROM devoirs").fetchall()
-        for devoir in devoirs:
-            self.update_moyenne_devoir(devoir['id'])
+        """Recalcule toutes les moyennes de tous les devoirs
+        
+        Une seule requête ensembliste et une seule transaction, au lieu d'un
+        recalcul (et d'un commit) par devoir. Retourne le nombre de devoirs.
+        """
+        notes_sql = NOTES_FINALES_SQL.format(eleves='eleves', devoirs='devoirs')
+        with self.conn:
+            # Même règle que update_moyenne_devoir : copies complètes seulement,
+            # et pas de moyenne (NULL) s'il n'y en a aucune
+            self.conn.execute(f"""
+                UPDATE devoirs SET moyenne = m.moyenne
+                FROM devoirs d
+                LEFT JOIN (
+                    SELECT id_devoir,
+                           NULLIF(AVG(CASE WHEN nb_notes = nb_questions THEN note_finale END), 0) as moyenne
+                    FROM ({notes_sql})
+                    GROUP BY id_devoir
+                ) m ON m.id_devoir = d.id
+                WHERE d.id = devoirs.id
+            """)
+        return self.conn.execute("SELECT COUNT(*) FROM devoirs").fetchone()[0]
     
     def clear_devoir_notes(self, devoir_id):
         """Supprime toutes les notes d'un devoir et recalcule la moyenne"""
@@ -41,6 +407,7 @@ class DatabaseManager:
         """, (devoir_id,))
         self.conn.commit()
         self.update_moyenne_devoir(devoir_id)
+        self._emit_bareme_modifie(devoir_id)
     
     # ========== CLASSES ==========
     
@@ -55,11 +422,13 @@ class DatabaseManager:
     def add_classe(self, nom):
         cursor = self.conn.execute("INSERT INTO classes (nom) VALUES (?)", (nom,))
         self.conn.commit()
+        self._emit('classe', 'insert', classes=[cursor.lastrowid])
         return cursor.lastrowid
     
     def update_classe(self, classe_id, nom):
         self.conn.execute("UPDATE classes SET nom=? WHERE id=?", (nom, classe_id))
         self.conn.commit()
+        self._emit('classe', 'update', classes=[classe_id])
     
     def delete_classe(self, classe_id):
         cursor = self.conn.execute("SELECT COUNT(*) FROM eleves WHERE id_classe=?", (classe_id,))
@@ -68,6 +437,7 @@ class DatabaseManager:
         
         self.conn.execute("DELETE FROM classes WHERE id=?", (classe_id,))
         self.conn.commit()
+        self._emit('classe', 'delete', classes=[classe_id])
         return True, "Classe supprimée"
     
     def get_classe_stats(self, classe_id):
@@ -103,8 +473,9 @@ class DatabaseManager:
             params.append(classe_id)
         
         if search_term:
-            query += " AND (e.nom LIKE ? OR e.prenom LIKE ?)"
-            params.extend([f"%{search_term}%", f"%{search_term}%"])
+            condition, search_params = self._search_condition('e.id', 'eleve', search_term, ['e.nom', 'e.prenom'])
+            query += " AND " + condition
+            params.extend(search_params)
         
         query += " ORDER BY e.nom, e.prenom"
         
@@ -124,14 +495,17 @@ class DatabaseManager:
             (nom, prenom, id_classe)
         )
         self.conn.commit()
+        self._emit('eleve', 'insert', eleves=[cursor.lastrowid], classes=[id_classe])
         return cursor.lastrowid
     
     def update_eleve(self, eleve_id, nom, prenom, id_classe):
+        ancienne_classe = self._classe_of('eleves', eleve_id)
         self.conn.execute(
             "UPDATE eleves SET nom=?, prenom=?, id_classe=? WHERE id=?",
             (nom, prenom, id_classe, eleve_id)
         )
         self.conn.commit()
+        self._emit('eleve', 'update', eleves=[eleve_id], classes={ancienne_classe, id_classe})
     
     def delete_eleve(self, eleve_id):
         cursor = self.conn.execute(
@@ -141,10 +515,33 @@ class DatabaseManager:
         if cursor.fetchone()[0] > 0:
             return False, "Cet élève a des notes, impossible de le supprimer"
         
+        classe_id = self._classe_of('eleves', eleve_id)
         self.conn.execute("DELETE FROM eleves WHERE id=?", (eleve_id,))
         self.conn.commit()
+        self._emit('eleve', 'delete', eleves=[eleve_id], classes=[classe_id])
         return True, "Élève supprimé"
     
+    def import_eleves(self, classes_a_creer, eleves):
+        """Crée les classes manquantes et insère les élèves en une seule transaction
+        
+        `eleves` est une liste de tuples (nom, prenom, nom_classe).
+        """
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO classes (nom) VALUES (?)",
+                [(nom,) for nom in classes_a_creer]
+            )
+            classes = {row['nom']: row['id'] for row in self.conn.execute("SELECT id, nom FROM classes")}
+            self.conn.executemany(
+                "INSERT INTO eleves (nom, prenom, id_classe) VALUES (?, ?, ?)",
+                [(nom, prenom, classes[classe_nom]) for nom, prenom, classe_nom in eleves]
+            )
+        if classes_a_creer:
+            self._emit('classe', 'insert', classes=None)
+        if eleves:
+            self._emit('eleve', 'insert', eleves=None, classes=None)
+        return len(classes_a_creer), len(eleves)
+    
     def get_moyenne_eleve(self, eleve_id):
         """Calcule la moyenne d'un élève en temps réel depuis la base de données"""
         query = """
@@ -181,6 +578,66 @@ class DatabaseManager:
         cursor = self.conn.execute(query, (eleve_id, eleve_id))
         return cursor.fetchone()[0]
     
+    def get_all_eleves_avec_stats(self):
+        """Récupère tous les élèves avec leur moyenne et leur nombre de devoirs corrigés en une requête"""
+        return self.get_eleves_page(limit=-1)
+    
+    def get_eleves_page(self, after=None, limit=200, classe_id=None, search_term="", ids=None):
+        """Page d'élèves avec leurs statistiques, paginée par clé (nom, prénom, id)
+        
+        `after` est la clé (nom, prenom, id) du dernier élève de la page
+        précédente. Les statistiques ne sont calculées que pour la page.
+        `ids` restreint la requête à ces élèves (rafraîchissement de lignes).
+        """
+        conditions = []
+        params = []
+        
+        if ids is not None:
+            ids = list(ids)
+            conditions.append(f"e.id IN ({', '.join('?' * len(ids))})")
+            params.extend(ids)
+        
+        if after is not None:
+            # La borne sur la première clé seule permet de parcourir l'index à
+            # partir de la page (une comparaison de lignes d'expressions ne le permet pas)
+            conditions.append("COALESCE(e.nom, '') >= ?")
+            conditions.append("(COALESCE(e.nom, ''), COALESCE(e.prenom, ''), e.id) > (?, ?, ?)")
+            params.append(after[0])
+            params.extend(after)
+        
+        if classe_id:
+            conditions.append("e.id_classe = ?")
+            params.append(classe_id)
+        
+        if search_term:
+            condition, search_params = self._search_condition('e.id', 'eleve', search_term, ['e.nom', 'e.prenom'])
+            conditions.append(condition)
+            params.extend(search_params)
+        
+        where = "WHERE " + " AND ".join(conditions) if conditions else ""
+        params.append(limit)
+        
+        notes_sql = NOTES_FINALES_SQL.format(eleves='page', devoirs='devoirs')
+        query = f"""
+            WITH page AS (
+                SELECT e.* FROM eleves e
+                {where}
+                ORDER BY COALESCE(e.nom, ''), COALESCE(e.prenom, ''), e.id
+                LIMIT ?
+            ),
+            notes AS ({notes_sql})
+            SELECT e.*, c.nom as classe_nom,
+                   COALESCE(ROUND(AVG(n.note_finale), 2), 0) as moyenne,
+                   COUNT(n.id_devoir) as nb_devoirs
+            FROM page e
+            LEFT JOIN classes c ON e.id_classe = c.id
+            LEFT JOIN notes n ON n.id_eleve = e.id AND n.nb_notes = n.nb_questions
+            -- Regroupement sur les clés du tri : il donne directement l'ordre de la page
+            GROUP BY COALESCE(e.nom, ''), COALESCE(e.prenom, ''), e.id
+            ORDER BY COALESCE(e.nom, ''), COALESCE(e.prenom, ''), e.id
+        """
+        return self.conn.execute(query, params).fetchall()
+    
     # ========== DEVOIRS ==========
     
     def get_all_devoirs(self, classe_id=None, search_term=""):
@@ -209,14 +666,76 @@ class DatabaseManager:
             params.append(classe_id)
         
         if search_term:
-            query += " AND d.nom LIKE ?"
-            params.append(f"%{search_term}%")
+            condition, search_params = self._search_condition('d.id', 'devoir', search_term, ['d.nom'])
+            query += " AND " + condition
+            params.extend(search_params)
         
         query += " ORDER BY d.date DESC"
         
         cursor = self.conn.execute(query, params)
         return cursor.fetchall()
     
+    def get_all_devoirs_avec_stats(self):
+        """Récupère tous les devoirs avec moyenne et avancement de la correction en une requête"""
+        return self.get_devoirs_page(limit=-1)
+    
+    def get_devoirs_page(self, after=None, limit=100, classe_id=None, search_term="", ids=None):
+        """Page de devoirs avec leurs statistiques, paginée par clé (date décroissante, id)
+        
+        `after` est la clé (date, id) du dernier devoir de la page précédente.
+        Les statistiques ne sont calculées que pour la page.
+        `ids` restreint la requête à ces devoirs (rafraîchissement de lignes).
+        """
+        conditions = []
+        params = []
+        
+        if ids is not None:
+            ids = list(ids)
+            conditions.append(f"d.id IN ({', '.join('?' * len(ids))})")
+            params.extend(ids)
+        
+        if after is not None:
+            # Borne sur la première clé seule : voir get_eleves_page
+            conditions.append("COALESCE(d.date, '') <= ?")
+            conditions.append("(COALESCE(d.date, ''), d.id) < (?, ?)")
+            params.append(after[0])
+            params.extend(after)
+        
+        if classe_id:
+            conditions.append("d.id_classe = ?")
+            params.append(classe_id)
+        
+        if search_term:
+            condition, search_params = self._search_condition('d.id', 'devoir', search_term, ['d.nom'])
+            conditions.append(condition)
+            params.extend(search_params)
+        
+        where = "WHERE " + " AND ".join(conditions) if conditions else ""
+        params.append(limit)
+        
+        notes_sql = NOTES_FINALES_SQL.format(eleves='eleves', devoirs='page')
+        query = f"""
+            WITH page AS (
+                SELECT d.* FROM devoirs d
+                {where}
+                ORDER BY COALESCE(d.date, '') DESC, d.id DESC
+                LIMIT ?
+            ),
+            notes AS ({notes_sql})
+            SELECT d.id, d.nom, d.date, d.id_classe, c.nom as classe_nom,
+                   (SELECT COUNT(*) FROM questions WHERE id_devoir = d.id) as nb_questions,
+                   COALESCE(SUM(n.nb_notes = n.nb_questions), 0) as nb_corriges,
+                   (SELECT COUNT(*) FROM eleves WHERE id_classe = d.id_classe) as nb_eleves_total,
+                   AVG(CASE WHEN n.nb_notes = n.nb_questions THEN n.note_finale END) as moyenne
+            FROM page d
+            LEFT JOIN classes c ON d.id_classe = c.id
+            LEFT JOIN notes n ON n.id_devoir = d.id
+            -- Regroupement sur les clés du tri : il donne directement l'ordre de la page
+            GROUP BY COALESCE(d.date, ''), d.id
+            ORDER BY COALESCE(d.date, '') DESC, d.id DESC
+        """
+        return self.conn.execute(query, params).fetchall()
+    
     def get_devoir(self, devoir_id):
         cursor = self.conn.execute(
             "SELECT d.*, c.nom as classe_nom FROM devoirs d LEFT JOIN classes c ON d.id_classe = c.id WHERE d.id=?",
@@ -224,21 +743,24 @@ class DatabaseManager:
         )
         return cursor.fetchone()
     
-    def add_devoir(self, nom, date, id_classe, bareme=None):
+    def add_devoir(self, nom, date, id_classe, bareme=None, poids=1):
         cursor = self.conn.execute(
-            "INSERT INTO devoirs (nom, date, id_classe, bareme) VALUES (?, ?, ?, ?)",
-            (nom, date, id_classe, bareme)
+            "INSERT INTO devoirs (nom, date, id_classe, bareme, poids) VALUES (?, ?, ?, ?, ?)",
+            (nom, date, id_classe, bareme, poids)
         )
         devoir_id = cursor.lastrowid
         self.conn.commit()
+        self._emit('devoir', 'insert', devoirs=[devoir_id], classes=[id_classe])
         return devoir_id
     
-    def update_devoir(self, devoir_id, nom, date):
+    def update_devoir(self, devoir_id, nom, date, poids=None):
+        """Modifie un devoir ; `poids` None conserve le poids actuel"""
         self.conn.execute(
-            "UPDATE devoirs SET nom=?, date=? WHERE id=?",
-            (nom, date, devoir_id)
+            "UPDATE devoirs SET nom=?, date=?, poids=COALESCE(?, poids) WHERE id=?",
+            (nom, date, poids, devoir_id)
         )
         self.conn.commit()
+        self._emit('devoir', 'update', devoirs=[devoir_id])
     
     def delete_devoir(self, devoir_id):
         cursor = self.conn.execute("""
@@ -250,9 +772,12 @@ class DatabaseManager:
         if cursor.fetchone()[0] > 0:
             return False, "Ce devoir a des notes, impossible de le supprimer"
         
+        classe_id = self._classe_of('devoirs', devoir_id)
         self.conn.execute("DELETE FROM questions WHERE id_devoir=?", (devoir_id,))
+        self.conn.execute("DELETE FROM taches_generation WHERE id_devoir=?", (devoir_id,))
         self.conn.execute("DELETE FROM devoirs WHERE id=?", (devoir_id,))
         self.conn.commit()
+        self._emit('devoir', 'delete', devoirs=[devoir_id], classes=[classe_id])
         return True, "Devoir supprimé"
     
     def update_moyenne_devoir(self, devoir_id):
@@ -295,6 +820,7 @@ class DatabaseManager:
             (id_devoir, numero, intitule, points_max, coefficient)
         )
         self.conn.commit()
+        self._emit_bareme_modifie(id_devoir)
         return cursor.lastrowid
     
     def update_question(self, question_id, numero, intitule, points_max, coefficient):
@@ -303,11 +829,84 @@ class DatabaseManager:
             (numero, intitule, points_max, coefficient, question_id)
         )
         self.conn.commit()
+        self._emit_bareme_modifie(self._devoir_of_question(question_id))
     
     def delete_question(self, question_id):
+        devoir_id = self._devoir_of_question(question_id)
         self.conn.execute("DELETE FROM note_question WHERE id_question=?", (question_id,))
         self.conn.execute("DELETE FROM questions WHERE id=?", (question_id,))
         self.conn.commit()
+        self._emit_bareme_modifie(devoir_id)
+    
+    def _devoir_of_question(self, question_id):
+        row = self.conn.execute("SELECT id_devoir FROM questions WHERE id=?", (question_id,)).fetchone()
+        return row['id_devoir'] if row else None
+    
+    def _emit_bareme_modifie(self, devoir_id):
+        """Un changement de barème (ou l'effacement des notes) concerne toute la classe du devoir"""
+        if devoir_id is not None:
+            self._emit('devoir', 'update', devoirs=[devoir_id],
+                       classes=[self._classe_of('devoirs', devoir_id)])
+    
+    def sync_questions(self, devoir_id, questions):
+        """Synchronise les questions d'un devoir avec la liste fournie (diff par id)
+        
+        Seuls les UPDATE/INSERT/DELETE nécessaires sont exécutés, dans une seule
+        transaction. Les notes des questions conservées sont préservées et la
+        moyenne du devoir n'est recalculée que si le barème a changé.
+        """
+        existing = {q['id']: q for q in self.get_questions_devoir(devoir_id)}
+        
+        to_update = []
+        to_insert = []
+        kept_ids = set()
+        bareme_modifie = False
+        
+        for q in questions:
+            question_id = q.get('id')
+            values = (q['numero'], q['intitule'], q['points_max'], q['coefficient'])
+            
+            if question_id in existing:
+                kept_ids.add(question_id)
+                old = existing[question_id]
+                old_values = (old['numero'], old['intitule'], old['points_max'], old['coefficient'])
+                if old_values != values:
+                    to_update.append(values + (question_id,))
+                if old['points_max'] != q['points_max'] or old['coefficient'] != q['coefficient']:
+                    bareme_modifie = True
+            else:
+                to_insert.append((devoir_id,) + values)
+        
+        to_delete = [(question_id,) for question_id in existing if question_id not in kept_ids]
+        
+        with self.conn:
+            if to_update:
+                self.conn.executemany(
+                    "UPDATE questions SET numero=?, intitule=?, points_max=?, coefficient=? WHERE id=?",
+                    to_update
+                )
+            if to_insert:
+                self.conn.executemany(
+                    "INSERT INTO questions (id_devoir, numero, intitule, points_max, coefficient) VALUES (?, ?, ?, ?, ?)",
+                    to_insert
+                )
+            if to_delete:
+                self.conn.executemany("DELETE FROM note_question WHERE id_question=?", to_delete)
+                self.conn.executemany("DELETE FROM questions WHERE id=?", to_delete)
+        
+        # Ajouter ou supprimer une question modifie aussi le barème (et la complétude des copies)
+        if bareme_modifie or to_insert or to_delete:
+            self.update_moyenne_devoir(devoir_id)
+            self._emit_bareme_modifie(devoir_id)
+        elif to_update:
+            self._emit('devoir', 'update', devoirs=[devoir_id])
+        
+        return {
+            'updated': len(to_update),
+            'inserted': len(to_insert),
+            'deleted': len(to_delete),
+            'recalcule': bool(bareme_modifie or to_insert or to_delete)
+        }
     
     def get_bareme_total(self, devoir_id):
         cursor = self.conn.execute(
@@ -329,6 +928,52 @@ class DatabaseManager:
                          commentaire = excluded.commentaire
         """, (id_eleve, id_question, points_obtenus, commentaire))
         self.conn.commit()
+        devoir_id = self._devoir_of_question(id_question)
+        self._emit('note', 'update', eleves=[id_eleve], devoirs=[devoir_id],
+                   classes=[self._classe_of('devoirs', devoir_id)])
+    
+    def save_notes_batch(self, devoir_id, notes, appreciations=None):
+        """Sauvegarde un lot de notes en une seule transaction puis recalcule la moyenne une fois
+        
+        `notes` est une liste de tuples (id_eleve, id_question, points_obtenus, commentaire).
+        Un commentaire None conserve le commentaire existant ; des points None
+        suppriment la note saisie. `appreciations` ({id_eleve: texte}) est
+        enregistré dans la même transaction que les notes.
+        """
+        appreciations = appreciations or {}
+        upserts = [n for n in notes if n[2] is not None]
+        deletions = [(n[0], n[1]) for n in notes if n[2] is None]
+        
+        with self.conn:
+            if upserts:
+                self.conn.executemany("""
+                    INSERT INTO note_question (id_eleve, id_question, points_obtenus, commentaire)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(id_eleve, id_question) 
+                    DO UPDATE SET points_obtenus = excluded.points_obtenus,
+                                 commentaire = COALESCE(excluded.commentaire, note_question.commentaire)
+                """, upserts)
+            if deletions:
+                self.conn.executemany(
+                    "DELETE FROM note_question WHERE id_eleve=? AND id_question=?",
+                    deletions
+                )
+            for id_eleve, appreciation in appreciations.items():
+                cursor = self.conn.execute(
+                    "UPDATE compte_rendus SET appreciation=? WHERE id_devoir=? AND id_eleve=?",
+                    (appreciation, devoir_id, id_eleve)
+                )
+                if cursor.rowcount == 0:
+                    self.conn.execute(
+                        "INSERT INTO compte_rendus (id_devoir, id_eleve, appreciation) VALUES (?, ?, ?)",
+                        (devoir_id, id_eleve, appreciation)
+                    )
+        
+        self.update_moyenne_devoir(devoir_id)
+        if notes or appreciations:
+            self._emit('note', 'update', eleves={n[0] for n in notes} | set(appreciations), devoirs=[devoir_id],
+                       classes=[self._classe_of('devoirs', devoir_id)])
+        return len(upserts) + len(deletions)
     
     def get_notes_eleve_devoir(self, id_eleve, id_devoir):
         query = """
@@ -368,6 +1013,49 @@ class DatabaseManager:
         note_sur_20 = (total_points / total_max) * 20
         return round(note_sur_20, 2)
     
+    def get_notes_matrix(self, devoir_id, avec_commentaires=False):
+        """Charge la matrice élèves × questions d'un devoir en trois requêtes
+        
+        Retourne un dict avec les élèves de la classe, les questions du devoir
+        et, pour chaque id de question, la colonne des points obtenus par élève
+        (dans l'ordre des élèves, None si non saisi). Avec `avec_commentaires`,
+        'commentaires' contient de la même façon les commentaires par question.
+        """
+        eleves = self.conn.execute("""
+            SELECT e.id, e.nom, e.prenom
+            FROM eleves e
+            WHERE e.id_classe = (SELECT id_classe FROM devoirs WHERE id = ?)
+            ORDER BY e.nom, e.prenom
+        """, (devoir_id,)).fetchall()
+        questions = self.get_questions_devoir(devoir_id)
+        
+        index_eleves = {e['id']: i for i, e in enumerate(eleves)}
+        colonnes = {q['id']: [None] * len(eleves) for q in questions}
+        commentaires = {q['id']: [None] * len(eleves) for q in questions}
+        
+        cursor = self.conn.execute(f"""
+            SELECT nq.id_eleve, nq.id_question, nq.points_obtenus
+                   {", nq.commentaire" if avec_commentaires else ""}
+            FROM note_question nq
+            JOIN questions q ON nq.id_question = q.id
+            WHERE q.id_devoir = ?
+        """, (devoir_id,))
+        for row in cursor:
+            i = index_eleves.get(row['id_eleve'])
+            if i is not None:
+                colonnes[row['id_question']][i] = row['points_obtenus']
+                if avec_commentaires:
+                    commentaires[row['id_question']][i] = row['commentaire']
+        
+        matrix = {
+            'eleves': eleves,
+            'questions': questions,
+            'colonnes': colonnes
+        }
+        if avec_commentaires:
+            matrix['commentaires'] = commentaires
+        return matrix
+    
     def get_eleves_classe_avec_notes(self, devoir_id):
         """Récupère les élèves avec leur statut de correction EN TEMPS RÉEL"""
         query = """
@@ -385,6 +1073,40 @@ class DatabaseManager:
         cursor = self.conn.execute(query, (devoir_id, devoir_id, devoir_id))
         return cursor.fetchall()
     
+    def get_etats_correction(self, devoir_id, eleve_ids=None):
+        """État de correction de chaque élève de la classe d'un devoir, en une requête
+        
+        Pour chaque élève : nombre de notes saisies, nombre de questions et note
+        /20 (None tant que la copie n'est pas complète). `eleve_ids` restreint
+        le calcul à quelques élèves (mise à jour d'une ligne après sauvegarde).
+        """
+        conditions = ["id_classe = (SELECT id_classe FROM devoirs WHERE id = ?)"]
+        params = [devoir_id]
+        
+        if eleve_ids is not None:
+            eleve_ids = list(eleve_ids)
+            conditions.append(f"id IN ({', '.join('?' * len(eleve_ids))})")
+            params.extend(eleve_ids)
+        
+        params.extend([devoir_id, devoir_id])
+        
+        notes_sql = NOTES_FINALES_SQL.format(eleves='cible', devoirs='devoir')
+        query = f"""
+            WITH cible AS (
+                SELECT * FROM eleves WHERE {" AND ".join(conditions)}
+            ),
+            devoir AS (SELECT * FROM devoirs WHERE id = ?),
+            notes AS ({notes_sql})
+            SELECT e.id, e.nom, e.prenom,
+                   COALESCE(n.nb_notes, 0) as nb_notes_saisies,
+                   (SELECT COUNT(*) FROM questions WHERE id_devoir = ?) as nb_questions_total,
+                   CASE WHEN n.nb_notes = n.nb_questions THEN n.note_finale END as note_finale
+            FROM cible e
+            LEFT JOIN notes n ON n.id_eleve = e.id
+            ORDER BY e.nom, e.prenom
+        """
+        return self.conn.execute(query, params).fetchall()
+    
     # ========== COMPTES-RENDUS ==========
     
     def save_compte_rendu(self, id_devoir, id_eleve, pdf_data, appreciation=""):
@@ -395,6 +1117,23 @@ class DatabaseManager:
         self.conn.commit()
         return cursor.lastrowid
     
+    def save_appreciation(self, id_devoir, id_eleve, appreciation):
+        """Enregistre l'appréciation générale d'une copie (compte-rendu créé sans PDF si besoin)"""
+        if self.get_compte_rendu(id_devoir, id_eleve):
+            self.conn.execute("""
+                UPDATE compte_rendus 
+                SET appreciation = ?
+                WHERE id_devoir = ? AND id_eleve = ?
+            """, (appreciation, id_devoir, id_eleve))
+        else:
+            self.conn.execute("""
+                INSERT INTO compte_rendus (id_devoir, id_eleve, appreciation)
+                VALUES (?, ?, ?)
+            """, (id_devoir, id_eleve, appreciation))
+        self.conn.commit()
+        self._emit('note', 'update', eleves=[id_eleve], devoirs=[id_devoir],
+                   classes=[self._classe_of('devoirs', id_devoir)])
+    
     def get_compte_rendu(self, id_devoir, id_eleve):
         cursor = self.conn.execute(
             "SELECT * FROM compte_rendus WHERE id_devoir=? AND id_eleve=?",
@@ -413,10 +1152,376 @@ class DatabaseManager:
         cursor = self.conn.execute(query, (devoir_id,))
         return cursor.fetchall()
     
+    def get_appreciations_devoir(self, devoir_id):
+        """Appréciations générales d'un devoir par élève (sans charger les PDF)"""
+        cursor = self.conn.execute("""
+            SELECT id_eleve, appreciation FROM compte_rendus
+            WHERE id_devoir = ? AND COALESCE(appreciation, '') <> ''
+            ORDER BY id DESC
+        """, (devoir_id,))
+        return {row['id_eleve']: row['appreciation'] for row in cursor}
+    
     def delete_compte_rendu(self, cr_id):
         self.conn.execute("DELETE FROM compte_rendus WHERE id=?", (cr_id,))
         self.conn.commit()
     
+    # ========== PÉRIODES ==========
+    
+    def get_all_periodes(self):
+        return self.conn.execute("SELECT * FROM periodes ORDER BY date_debut, id").fetchall()
+    
+    def get_periode(self, periode_id):
+        return self.conn.execute("SELECT * FROM periodes WHERE id=?", (periode_id,)).fetchone()
+    
+    def _verifier_periode(self, nom, date_debut, date_fin):
+        if not nom.strip():
+            raise Exception("Le nom de la période est obligatoire")
+        for date in (date_debut, date_fin):
+            try:
+                datetime.strptime(date, "%Y-%m-%d")
+            except (TypeError, ValueError):
+                raise Exception(f"Date invalide : {date} (format attendu AAAA-MM-JJ)")
+        if date_fin < date_debut:
+            raise Exception("La fin de la période précède son début")
+    
+    def add_periode(self, nom, date_debut, date_fin):
+        """Ajoute une période de notation ; dates au format AAAA-MM-JJ, bornes incluses"""
+        self._verifier_periode(nom, date_debut, date_fin)
+        cursor = self.conn.execute(
+            "INSERT INTO periodes (nom, date_debut, date_fin) VALUES (?, ?, ?)",
+            (nom.strip(), date_debut, date_fin)
+        )
+        self.conn.commit()
+        return cursor.lastrowid
+    
+    def update_periode(self, periode_id, nom, date_debut, date_fin):
+        self._verifier_periode(nom, date_debut, date_fin)
+        self.conn.execute(
+            "UPDATE periodes SET nom=?, date_debut=?, date_fin=? WHERE id=?",
+            (nom.strip(), date_debut, date_fin, periode_id)
+        )
+        self.conn.commit()
+    
+    def delete_periode(self, periode_id):
+        self.conn.execute("DELETE FROM periodes WHERE id=?", (periode_id,))
+        self.conn.commit()
+    
+    # ========== BULLETINS ==========
+    
+    def get_bulletins_classe(self, classe_id, periode_id=None):
+        """Données des bulletins de toute une classe pour une période (None : toute l'année)
+        
+        Une seule requête ensembliste : note de chaque élève à chaque devoir
+        de la période, moyenne pondérée par le poids des devoirs (copies
+        complètes seulement), rang (les ex aequo au centième partagent le
+        même rang) et statistiques de la classe et de chaque devoir.
+        
+        Retourne {'classe', 'periode', 'devoirs': [{'id', 'nom', 'date',
+        'poids', 'moyenne', 'min', 'max', 'nb'}], 'eleves': [{'id', 'nom',
+        'prenom', 'moyenne', 'rang', 'nb_devoirs', 'notes': {id_devoir: note}}],
+        'stats': {'nb', 'moyenne', 'min', 'max'}} ; une moyenne ou une note
+        absente vaut None.
+        """
+        classe = self.get_classe(classe_id)
+        if classe is None:
+            raise Exception(f"Classe {classe_id} introuvable")
+        
+        if periode_id is None:
+            periode = {'id': None, 'nom': "Année", 'date_debut': None, 'date_fin': None}
+        else:
+            periode = self.get_periode(periode_id)
+            if periode is None:
+                raise Exception(f"Période {periode_id} introuvable")
+            periode = dict(periode)
+        
+        date_iso = DATE_ISO_SQL.format(date='d.date')
+        notes_sql = NOTES_FINALES_SQL.format(eleves='classe_eleves', devoirs='periode_devoirs')
+        query = f"""
+            WITH classe_eleves AS (
+                SELECT * FROM eleves WHERE id_classe = ?
+            ),
+            periode_devoirs AS (
+                SELECT d.*, {date_iso} as date_iso
+                FROM devoirs d
+                WHERE d.id_classe = ?
+                AND (? IS NULL OR {date_iso} BETWEEN ? AND ?)
+            ),
+            notes AS ({notes_sql}),
+            completes AS (
+                SELECT n.id_eleve, n.id_devoir, n.note_finale, d.poids
+                FROM notes n
+                JOIN periode_devoirs d ON d.id = n.id_devoir
+                WHERE n.nb_notes = n.nb_questions AND n.note_finale IS NOT NULL
+            ),
+            par_eleve AS (
+                SELECT e.id as id_eleve,
+                       SUM(c.note_finale * c.poids) / NULLIF(SUM(c.poids), 0) as moyenne,
+                       COUNT(c.id_devoir) as nb_devoirs
+                FROM classe_eleves e
+                LEFT JOIN completes c ON c.id_eleve = e.id
+                GROUP BY e.id
+            ),
+            classement AS (
+                SELECT id_eleve, moyenne, nb_devoirs,
+                       CASE WHEN moyenne IS NOT NULL
+                            THEN RANK() OVER (ORDER BY moyenne IS NULL, ROUND(moyenne, 2) DESC) END as rang,
+                       COUNT(moyenne) OVER () as classe_nb,
+                       AVG(moyenne) OVER () as classe_moyenne,
+                       MIN(moyenne) OVER () as classe_min,
+                       MAX(moyenne) OVER () as classe_max
+                FROM par_eleve
+            ),
+            par_devoir AS (
+                SELECT id_devoir, AVG(note_finale) as moyenne, MIN(note_finale) as min,
+                       MAX(note_finale) as max, COUNT(*) as nb
+                FROM completes
+                GROUP BY id_devoir
+            )
+            SELECT e.id as id_eleve, e.nom, e.prenom,
+                   cl.moyenne, cl.rang, cl.nb_devoirs,
+                   cl.classe_nb, cl.classe_moyenne, cl.classe_min, cl.classe_max,
+                   d.id as id_devoir, d.nom as devoir_nom, d.date_iso, d.poids,
+                   c.note_finale,
+                   pd.moyenne as devoir_moyenne, pd.min as devoir_min, pd.max as devoir_max,
+                   COALESCE(pd.nb, 0) as devoir_nb
+            FROM classe_eleves e
+            JOIN classement cl ON cl.id_eleve = e.id
+            LEFT JOIN periode_devoirs d ON d.id_classe = e.id_classe
+            LEFT JOIN completes c ON c.id_eleve = e.id AND c.id_devoir = d.id
+            LEFT JOIN par_devoir pd ON pd.id_devoir = d.id
+            ORDER BY e.nom, e.prenom, e.id, d.date_iso, d.id
+        """
+        debut, fin = periode['date_debut'], periode['date_fin']
+        rows = self.conn.execute(query, (classe_id, classe_id, debut, debut, fin)).fetchall()
+        
+        eleves = []
+        devoirs = {}
+        for row in rows:
+            if not eleves or eleves[-1]['id'] != row['id_eleve']:
+                eleves.append({
+                    'id': row['id_eleve'],
+                    'nom': row['nom'],
+                    'prenom': row['prenom'],
+                    'moyenne': row['moyenne'],
+                    'rang': row['rang'],
+                    'nb_devoirs': row['nb_devoirs'],
+                    'notes': {}
+                })
+            if row['id_devoir'] is None:
+                continue
+            if row['id_devoir'] not in devoirs:
+                devoirs[row['id_devoir']] = {
+                    'id': row['id_devoir'],
+                    'nom': row['devoir_nom'],
+                    'date': row['date_iso'],
+                    'poids': row['poids'],
+                    'moyenne': row['devoir_moyenne'],
+                    'min': row['devoir_min'],
+                    'max': row['devoir_max'],
+                    'nb': row['devoir_nb']
+                }
+            eleves[-1]['notes'][row['id_devoir']] = row['note_finale']
+        
+        premier = rows[0] if rows else None
+        return {
+            'classe': dict(classe),
+            'periode': periode,
+            'devoirs': list(devoirs.values()),
+            'eleves': eleves,
+            'stats': {
+                'nb': premier['classe_nb'] if premier else 0,
+                'moyenne': premier['classe_moyenne'] if premier else None,
+                'min': premier['classe_min'] if premier else None,
+                'max': premier['classe_max'] if premier else None
+            }
+        }
+    
+    # ========== FILE DE GÉNÉRATION ==========
+    
+    def add_generation_jobs(self, taches, priorite=0, lot=None):
+        """Ajoute des documents à produire à la file de génération
+        
+        `taches` : dicts {'document', 'id_devoir', 'id_eleve', 'chemin'}. Un
+        document déjà en attente n'est pas ajouté deux fois : sa priorité est
+        seulement relevée, et il rejoint le `lot` indiqué (suivi d'une
+        génération groupée). Retourne le nombre de tâches ajoutées.
+        """
+        maintenant = _horodatage()
+        ajoutees = 0
+        with self.conn:
+            for tache in taches:
+                existante = self.conn.execute("""
+                    SELECT id FROM taches_generation
+                    WHERE id_devoir = ? AND id_eleve IS ? AND document = ? AND statut = 'en_attente'
+                """, (tache['id_devoir'], tache.get('id_eleve'), tache['document'])).fetchone()
+                
+                if existante:
+                    self.conn.execute("""
+                        UPDATE taches_generation
+                        SET chemin = ?, priorite = MAX(priorite, ?), lot = COALESCE(?, lot), maj_le = ?
+                        WHERE id = ?
+                    """, (tache['chemin'], priorite, lot, maintenant, existante['id']))
+                else:
+                    self.conn.execute("""
+                        INSERT INTO taches_generation
+                            (document, id_devoir, id_eleve, chemin, priorite, lot, disponible_le, cree_le, maj_le)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """, (tache['document'], tache['id_devoir'], tache.get('id_eleve'), tache['chemin'],
+                          priorite, lot, maintenant, maintenant, maintenant))
+                    ajoutees += 1
+        return ajoutees
+    
+    def claim_generation_job(self, proprietaire=None):
+        """Réserve la prochaine tâche prête (priorité la plus haute, puis la plus ancienne)
+        
+        La réservation tient en une seule requête : deux threads ou deux
+        instances de l'application ne prennent jamais la même tâche. Elle
+        est notée au nom de `proprietaire` (machine et processus) et expire
+        après BAIL_GENERATION secondes (voir requeue_running_generation_jobs).
+        """
+        maintenant = _horodatage()
+        with self.conn:
+            row = self.conn.execute("""
+                UPDATE taches_generation
+                SET statut = 'en_cours', tentatives = tentatives + 1, maj_le = ?,
+                    proprietaire = ?, bail_expire_le = ?
+                WHERE id = (
+                    SELECT id FROM taches_generation
+                    WHERE statut = 'en_attente' AND disponible_le <= ?
+                    ORDER BY priorite DESC, id
+                    LIMIT 1
+                )
+                RETURNING *
+            """, (maintenant, proprietaire, _horodatage(BAIL_GENERATION), maintenant)).fetchone()
+        return dict(row) if row else None
+    
+    def finish_generation_job(self, tache_id, statut='terminee', hash_sortie=None, erreur=None):
+        with self.conn:
+            self.conn.execute("""
+                UPDATE taches_generation SET statut = ?, hash_sortie = ?, erreur = ?, maj_le = ?
+                WHERE id = ?
+            """, (statut, hash_sortie, erreur, _horodatage(), tache_id))
+    
+    def fail_generation_job(self, tache_id, erreur, max_tentatives=3):
+        """Enregistre l'échec d'une tâche : nouvel essai différé, ou échec définitif
+        
+        Retourne le nouveau statut ('en_attente' ou 'echec').
+        """
+        with self.conn:
+            tache = self.conn.execute(
+                "SELECT tentatives FROM taches_generation WHERE id = ?", (tache_id,)
+            ).fetchone()
+            if tache is None:
+                return 'echec'
+            
+            if tache['tentatives'] < max_tentatives:
+                # Attente croissante entre les essais : 30 s, 1 min, 2 min...
+                statut = 'en_attente'
+                disponible_le = _horodatage(30 * 2 ** (tache['tentatives'] - 1))
+            else:
+                statut = 'echec'
+                disponible_le = _horodatage()
+            
+            self.conn.execute("""
+                UPDATE taches_generation SET statut = ?, erreur = ?, disponible_le = ?, maj_le = ?
+                WHERE id = ?
+            """, (statut, erreur, disponible_le, _horodatage(), tache_id))
+        return statut
+    
+    def release_generation_job(self, tache_id):
+        """Remet en attente une tâche interrompue (arrêt de l'application), sans compter d'essai"""
+        with self.conn:
+            self.conn.execute("""
+                UPDATE taches_generation
+                SET statut = 'en_attente', tentatives = MAX(tentatives - 1, 0), maj_le = ?
+                WHERE id = ? AND statut = 'en_cours'
+            """, (_horodatage(), tache_id))
+    
+    def requeue_running_generation_jobs(self):
+        """Remet en attente les tâches restées « en cours » dont la réservation a expiré
+        
+        Seules les tâches d'un processus arrêté (application fermée ou
+        plantée) sont concernées : celles qu'un autre processus encore actif
+        exécute (ligne de commande, seconde instance) gardent leur bail. Les
+        tâches réservées par une version sans bail sont reprises.
+        """
+        maintenant = _horodatage()
+        with self.conn:
+            cursor = self.conn.execute("""
+                UPDATE taches_generation SET statut = 'en_attente', maj_le = ?
+                WHERE statut = 'en_cours' AND (bail_expire_le IS NULL OR bail_expire_le <= ?)
+            """, (maintenant, maintenant))
+        return cursor.rowcount
+    
+    def cancel_generation_jobs(self, devoir_id=None):
+        """Annule les tâches en attente (d'un devoir ou de toute la file)"""
+        query = "UPDATE taches_generation SET statut = 'annulee', maj_le = ? WHERE statut = 'en_attente'"
+        params = [_horodatage()]
+        if devoir_id is not None:
+            query += " AND id_devoir = ?"
+            params.append(devoir_id)
+        with self.conn:
+            cursor = self.conn.execute(query, params)
+        return cursor.rowcount
+    
+    def has_pending_generation_jobs(self):
+        """Vrai s'il reste des tâches à exécuter (en attente, ou en cours avec un bail expiré)"""
+        row = self.conn.execute("""
+            SELECT EXISTS (SELECT 1 FROM taches_generation WHERE statut = 'en_attente')
+                OR EXISTS (SELECT 1 FROM taches_generation
+                           WHERE statut = 'en_cours' AND (bail_expire_le IS NULL OR bail_expire_le <= ?))
+        """, (_horodatage(),)).fetchone()
+        return bool(row[0])
+    
+    def get_generation_queue_counts(self):
+        """Nombre de tâches par statut"""
+        cursor = self.conn.execute("SELECT statut, COUNT(*) as nb FROM taches_generation GROUP BY statut")
+        return {row['statut']: row['nb'] for row in cursor}
+    
+    def get_generation_batch_counts(self, lot):
+        """Nombre de tâches par statut d'une génération groupée"""
+        cursor = self.conn.execute(
+            "SELECT statut, COUNT(*) as nb FROM taches_generation WHERE lot = ? GROUP BY statut", (lot,)
+        )
+        return {row['statut']: row['nb'] for row in cursor}
+    
+    def get_generation_jobs(self, statuts=None, devoir_id=None, limit=200):
+        """Tâches de la file (les plus récentes d'abord), avec le nom du devoir et de l'élève"""
+        query = """
+            SELECT t.*, d.nom as devoir_nom, e.nom as eleve_nom, e.prenom as eleve_prenom
+            FROM taches_generation t
+            LEFT JOIN devoirs d ON d.id = t.id_devoir
+            LEFT JOIN eleves e ON e.id = t.id_eleve
+            WHERE 1=1
+        """
+        params = []
+        if statuts:
+            query += f" AND t.statut IN ({', '.join('?' * len(statuts))})"
+            params.extend(statuts)
+        if devoir_id is not None:
+            query += " AND t.id_devoir = ?"
+            params.append(devoir_id)
+        query += " ORDER BY t.id DESC LIMIT ?"
+        params.append(limit)
+        return self.conn.execute(query, params).fetchall()
+    
+    def get_generation_output_dir(self, devoir_id):
+        """Dossier des derniers comptes-rendus mis en file pour un devoir (None si aucun)"""
+        row = self.conn.execute("""
+            SELECT chemin FROM taches_generation
+            WHERE id_devoir = ? AND document = 'compte_rendu'
+            ORDER BY id DESC LIMIT 1
+        """, (devoir_id,)).fetchone()
+        return os.path.dirname(row['chemin']) if row else None
+    
+    def clear_finished_generation_jobs(self):
+        """Supprime de la file les tâches terminées, ignorées ou annulées"""
+        with self.conn:
+            cursor = self.conn.execute(
+                "DELETE FROM taches_generation WHERE statut IN ('terminee', 'ignoree', 'annulee')"
+            )
+        return cursor.rowcount
+    
     # ========== STATISTIQUES ==========
     
     def get_moyenne_classe(self, classe_id):
@@ -0,0 +1,133 @@
+# database/pool.py
+"""Accès concurrent à la base pour le mode serveur
+
+SQLite accepte plusieurs lecteurs simultanés mais un seul écrivain : les
+lectures passent par un pool de connexions en lecture seule, les écritures
+par un thread écrivain unique qui les exécute l'une après l'autre. La base
+est passée en journal WAL pour que les lectures ne soient pas bloquées
+pendant une écriture.
+"""
+import queue
+import threading
+from concurrent.futures import Future
+from database.db_manager import DatabaseManager
+
+
+class PoolSature(Exception):
+    """Aucune connexion libérée dans le délai imparti"""
+
+
+class ConnectionPool:
+    """Pool de connexions en lecture (DatabaseManager indépendants)"""
+    
+    def __init__(self, db_path, taille=4, delai=10.0):
+        self.db_path = db_path
+        self.taille = taille
+        self.delai = delai
+        self._libres = queue.LifoQueue()
+        self._toutes = []
+        for _ in range(taille):
+            db = DatabaseManager.open_separate(db_path, check_same_thread=False)
+            # Garde-fou : une connexion du pool ne modifie jamais la base
+            db.conn.execute("PRAGMA query_only = ON")
+            db.conn.execute("PRAGMA busy_timeout = 5000")
+            self._toutes.append(db)
+            self._libres.put(db)
+    
+    def acquire(self):
+        try:
+            return self._libres.get(timeout=self.delai)
+        except queue.Empty:
+            raise PoolSature(f"Aucune connexion disponible après {self.delai:.0f} s")
+    
+    def release(self, db):
+        # Une transaction de lecture restée ouverte figerait l'instantané WAL
+        if db.conn.in_transaction:
+            db.conn.rollback()
+        self._libres.put(db)
+    
+    def connexion(self):
+        """Contexte `with pool.connexion() as db:` qui rend la connexion au pool"""
+        return _Emprunt(self)
+    
+    def close(self):
+        for db in self._toutes:
+            db.close()
+        self._toutes = []
+
+
+class _Emprunt:
+    def __init__(self, pool):
+        self.pool = pool
+        self.db = None
+    
+    def __enter__(self):
+        self.db = self.pool.acquire()
+        return self.db
+    
+    def __exit__(self, *exc):
+        self.pool.release(self.db)
+        return False
+
+
+class SerializedWriter:
+    """Thread écrivain unique : les écritures sont exécutées dans l'ordre d'arrivée
+    
+    `submit(fonction, *args)` met `fonction(db, *args)` en file et retourne un
+    Future ; `db` est la connexion propre à l'écrivain.
+    """
+    
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._file = queue.Queue()
+        self._pret = threading.Event()
+        self._erreur = None
+        self._thread = threading.Thread(target=self._run, name="ecrivain", daemon=True)
+        self._thread.start()
+        self._pret.wait()
+        if self._erreur is not None:
+            raise self._erreur
+    
+    def submit(self, fonction, *args):
+        future = Future()
+        self._file.put((fonction, args, future))
+        return future
+    
+    def execute(self, fonction, *args, timeout=30):
+        """Exécute une écriture et attend son résultat (ses exceptions sont relancées)"""
+        return self.submit(fonction, *args).result(timeout)
+    
+    def close(self):
+        self._file.put(None)
+        self._thread.join()
+    
+    def _run(self):
+        try:
+            db = DatabaseManager.open_separate(self.db_path)
+            # Lecteurs et écrivain simultanés ; réglage enregistré dans le fichier
+            db.conn.execute("PRAGMA journal_mode = WAL")
+            # En WAL, NORMAL reste cohérent après une coupure et évite un fsync par commit
+            db.conn.execute("PRAGMA synchronous = NORMAL")
+            db.conn.execute("PRAGMA busy_timeout = 5000")
+        except Exception as e:
+            self._erreur = e
+            self._pret.set()
+            return
+        self._pret.set()
+        
+        try:
+            while True:
+                element = self._file.get()
+                if element is None:
+                    break
+                fonction, args, future = element
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    future.set_result(fonction(db, *args))
+                except Exception as e:
+                    if db.conn.in_transaction:
+                        db.conn.rollback()
+                    future.set_exception(e)
+        finally:
+            db.close()
@@ -0,0 +1,383 @@
+# dialogs/bulletins_dialog.py
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QLabel, QPushButton,
+                              QProgressBar, QTextEdit, QFileDialog, QMessageBox, QGroupBox, QRadioButton,
+                              QComboBox, QLineEdit, QDateEdit, QTableWidget, QTableWidgetItem,
+                              QAbstractItemView, QHeaderView)
+from PyQt6.QtCore import Qt, QDate, QThread, pyqtSignal
+from database.db_manager import DatabaseManager
+from utils.latex_generator import (LatexGenerator, nom_fichier_archive_bulletins, nom_fichier_livret_bulletins,
+                                   dossier_bulletins)
+import os
+import threading
+import traceback
+
+
+class BulletinsThread(QThread):
+    """Génère les bulletins d'une classe sans bloquer l'interface"""
+    progress = pyqtSignal(int, str)  # pourcentage, message
+    finished = pyqtSignal(list, str)  # fichiers générés, dossier
+    error = pyqtSignal(str)
+    
+    def __init__(self, classe_id, periode_id, output_dir, mode="dossier"):
+        super().__init__()
+        self.classe_id = classe_id
+        self.periode_id = periode_id
+        self.output_dir = output_dir
+        # "dossier" (un PDF par élève), "zip" (archive) ou "livret" (un seul PDF)
+        self.mode = mode
+        self.annulation = threading.Event()
+    
+    def cancel(self):
+        self.annulation.set()
+    
+    def run(self):
+        db = None
+        try:
+            # Connexion propre à ce thread (celle du singleton appartient à l'interface)
+            db = DatabaseManager.open_separate()
+            generator = LatexGenerator(db, annulation=self.annulation)
+            self.progress.emit(0, f"Moteur PDF : {generator.renderer.nom}")
+            
+            def progress(i, total, eleve):
+                self.progress.emit(5 + int((i / total) * 90), f"Bulletin : {eleve['nom']} {eleve['prenom']}")
+            
+            classe = db.get_classe(self.classe_id)
+            periode = db.get_periode(self.periode_id) if self.periode_id else {'nom': "Année"}
+            os.makedirs(self.output_dir, exist_ok=True)
+            if self.mode == "zip":
+                output_path = os.path.join(self.output_dir, nom_fichier_archive_bulletins(classe, periode))
+                nombre, erreurs = generator.generate_archive_bulletins(self.classe_id, self.periode_id,
+                                                                       output_path, progress)
+                fichiers, resume = [output_path], f"{nombre} bulletin(s) dans l'archive"
+            elif self.mode == "livret":
+                output_path = os.path.join(self.output_dir, nom_fichier_livret_bulletins(classe, periode))
+                nombre, erreurs = generator.generate_livret_bulletins(self.classe_id, self.periode_id,
+                                                                      output_path, progress)
+                fichiers, resume = [output_path], f"Livret de {nombre} page(s)"
+            else:
+                fichiers, erreurs = generator.generate_bulletins(self.classe_id, self.periode_id,
+                                                                 self.output_dir, progress)
+                resume = f"{len(fichiers)} bulletin(s)"
+            
+            for eleve, message in erreurs:
+                error_msg = f"Erreur: {eleve['nom']} {eleve['prenom']} - {message}"
+                self.progress.emit(95, error_msg)
+                print(error_msg)
+            
+            if generator.is_cancelled():
+                self.progress.emit(100, "Génération annulée")
+            else:
+                self.progress.emit(100, f"Génération terminée! {resume}")
+            self.finished.emit(fichiers, self.output_dir)
+        
+        except Exception as e:
+            error_msg = f"{str(e)}\n\n{traceback.format_exc()}"
+            self.error.emit(error_msg)
+            print(error_msg)
+        finally:
+            if db:
+                db.close()
+
+
+class BulletinsDialog(QDialog):
+    """Périodes de notation et génération des bulletins d'une classe
+    
+    La moyenne de chaque élève est la moyenne de ses notes aux devoirs de la
+    période, pondérée par le poids de chaque devoir (copies complètes seulement).
+    """
+    
+    def __init__(self, parent=None, classe_id=None):
+        super().__init__(parent)
+        self.db = DatabaseManager()
+        self.thread = None
+        self.output_dir = None
+        
+        self.setWindowTitle("Bulletins")
+        self.setMinimumSize(750, 700)
+        
+        self.init_ui()
+        self.load_periodes()
+        
+        index = self.classe_combo.findData(classe_id)
+        if index >= 0:
+            self.classe_combo.setCurrentIndex(index)
+        self.update_apercu()
+    
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+        
+        # Périodes
+        periodes_group = QGroupBox("Périodes de notation")
+        periodes_layout = QVBoxLayout()
+        
+        self.periodes_table = QTableWidget(0, 3)
+        self.periodes_table.setHorizontalHeaderLabels(["Nom", "Début", "Fin"])
+        self.periodes_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.periodes_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.periodes_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.periodes_table.verticalHeader().setVisible(False)
+        self.periodes_table.setMaximumHeight(150)
+        periodes_layout.addWidget(self.periodes_table)
+        
+        ajout_layout = QHBoxLayout()
+        self.periode_nom_input = QLineEdit()
+        self.periode_nom_input.setPlaceholderText("Ex: Trimestre 1")
+        ajout_layout.addWidget(self.periode_nom_input, 1)
+        
+        self.periode_debut_input = QDateEdit(QDate.currentDate())
+        self.periode_fin_input = QDateEdit(QDate.currentDate().addMonths(3))
+        for date_input in (self.periode_debut_input, self.periode_fin_input):
+            date_input.setCalendarPopup(True)
+            date_input.setDisplayFormat("dd/MM/yyyy")
+        ajout_layout.addWidget(QLabel("du"))
+        ajout_layout.addWidget(self.periode_debut_input)
+        ajout_layout.addWidget(QLabel("au"))
+        ajout_layout.addWidget(self.periode_fin_input)
+        
+        add_btn = QPushButton("➕ Ajouter")
+        add_btn.clicked.connect(self.add_periode)
+        ajout_layout.addWidget(add_btn)
+        
+        delete_btn = QPushButton("🗑️")
+        delete_btn.setToolTip("Supprimer la période sélectionnée")
+        delete_btn.clicked.connect(self.delete_periode)
+        ajout_layout.addWidget(delete_btn)
+        
+        periodes_layout.addLayout(ajout_layout)
+        periodes_group.setLayout(periodes_layout)
+        layout.addWidget(periodes_group)
+        
+        # Bulletins
+        bulletins_group = QGroupBox("Bulletins")
+        bulletins_layout = QVBoxLayout()
+        
+        form = QFormLayout()
+        self.classe_combo = QComboBox()
+        for classe in self.db.get_all_classes():
+            self.classe_combo.addItem(classe['nom'], classe['id'])
+        self.classe_combo.currentIndexChanged.connect(self.update_apercu)
+        form.addRow("Classe", self.classe_combo)
+        
+        self.periode_combo = QComboBox()
+        self.periode_combo.currentIndexChanged.connect(self.update_apercu)
+        form.addRow("Période", self.periode_combo)
+        bulletins_layout.addLayout(form)
+        
+        self.apercu_label = QLabel("")
+        self.apercu_label.setStyleSheet("color: #555; font-size: 12px; background-color: #e8f4f8; padding: 8px; border-radius: 5px;")
+        self.apercu_label.setWordWrap(True)
+        bulletins_layout.addWidget(self.apercu_label)
+        
+        self.mode_dossier_radio = QRadioButton("Un PDF par élève")
+        self.mode_dossier_radio.setChecked(True)
+        bulletins_layout.addWidget(self.mode_dossier_radio)
+        
+        self.mode_zip_radio = QRadioButton("Archive ZIP des PDF")
+        bulletins_layout.addWidget(self.mode_zip_radio)
+        
+        self.mode_livret_radio = QRadioButton("Livret PDF unique à imprimer (un signet par élève)")
+        bulletins_layout.addWidget(self.mode_livret_radio)
+        
+        output_layout = QHBoxLayout()
+        self.output_label = QLabel("")
+        output_layout.addWidget(self.output_label, 1)
+        browse_btn = QPushButton("📁 Parcourir")
+        browse_btn.clicked.connect(self.browse_output_dir)
+        output_layout.addWidget(browse_btn)
+        bulletins_layout.addLayout(output_layout)
+        
+        bulletins_group.setLayout(bulletins_layout)
+        layout.addWidget(bulletins_group)
+        
+        # Barre de progression
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setMaximum(100)
+        layout.addWidget(self.progress_bar)
+        
+        self.log_text = QTextEdit()
+        self.log_text.setReadOnly(True)
+        self.log_text.setMaximumHeight(150)
+        layout.addWidget(self.log_text)
+        
+        # Boutons
+        buttons_layout = QHBoxLayout()
+        
+        self.generate_btn = QPushButton("🚀 Générer")
+        self.generate_btn.setObjectName("primary-button")
+        self.generate_btn.clicked.connect(self.start_generation)
+        buttons_layout.addWidget(self.generate_btn)
+        
+        self.cancel_btn = QPushButton("⏹ Annuler")
+        self.cancel_btn.setEnabled(False)
+        self.cancel_btn.clicked.connect(self.cancel_generation)
+        buttons_layout.addWidget(self.cancel_btn)
+        
+        self.open_folder_btn = QPushButton("📁 Ouvrir le dossier")
+        self.open_folder_btn.setEnabled(False)
+        self.open_folder_btn.clicked.connect(self.open_output_folder)
+        buttons_layout.addWidget(self.open_folder_btn)
+        
+        close_btn = QPushButton("Fermer")
+        close_btn.clicked.connect(self.accept)
+        buttons_layout.addWidget(close_btn)
+        
+        layout.addLayout(buttons_layout)
+    
+    # ========== PÉRIODES ==========
+    
+    def load_periodes(self):
+        """Remplit la table et la liste des périodes (en gardant la période choisie)"""
+        selection = self.periode_combo.currentData()
+        periodes = self.db.get_all_periodes()
+        
+        self.periodes_table.setRowCount(len(periodes))
+        for row, periode in enumerate(periodes):
+            item = QTableWidgetItem(periode['nom'])
+            item.setData(Qt.ItemDataRole.UserRole, periode['id'])
+            self.periodes_table.setItem(row, 0, item)
+            for col, date in ((1, periode['date_debut']), (2, periode['date_fin'])):
+                self.periodes_table.setItem(row, col, QTableWidgetItem(QDate.fromString(date, "yyyy-MM-dd").toString("dd/MM/yyyy")))
+        
+        self.periode_combo.blockSignals(True)
+        self.periode_combo.clear()
+        self.periode_combo.addItem("Année complète (tous les devoirs)", None)
+        for periode in periodes:
+            self.periode_combo.addItem(periode['nom'], periode['id'])
+        index = self.periode_combo.findData(selection)
+        self.periode_combo.setCurrentIndex(max(index, 0))
+        self.periode_combo.blockSignals(False)
+    
+    def add_periode(self):
+        try:
+            periode_id = self.db.add_periode(
+                self.periode_nom_input.text(),
+                self.periode_debut_input.date().toString("yyyy-MM-dd"),
+                self.periode_fin_input.date().toString("yyyy-MM-dd")
+            )
+        except Exception as e:
+            QMessageBox.warning(self, "Erreur", str(e))
+            return
+        
+        self.periode_nom_input.clear()
+        self.load_periodes()
+        self.periode_combo.setCurrentIndex(self.periode_combo.findData(periode_id))
+    
+    def delete_periode(self):
+        row = self.periodes_table.currentRow()
+        if row < 0:
+            return
+        item = self.periodes_table.item(row, 0)
+        reply = QMessageBox.question(
+            self, "Confirmation",
+            f"Supprimer la période « {item.text()} » ?\n\nLes devoirs et les notes ne sont pas modifiés."
+        )
+        if reply == QMessageBox.StandardButton.Yes:
+            self.db.delete_periode(item.data(Qt.ItemDataRole.UserRole))
+            self.load_periodes()
+            self.update_apercu()
+    
+    # ========== GÉNÉRATION ==========
+    
+    def update_apercu(self):
+        """Résumé de la classe pour la période choisie (une seule requête)"""
+        classe_id = self.classe_combo.currentData()
+        if classe_id is None:
+            self.apercu_label.setText("Aucune classe")
+            self.generate_btn.setEnabled(False)
+            return
+        
+        bulletins = self.db.get_bulletins_classe(classe_id, self.periode_combo.currentData())
+        stats = bulletins['stats']
+        self.output_label.setText(dossier_bulletins(bulletins['classe'], bulletins['periode']))
+        
+        if stats['nb'] == 0:
+            self.apercu_label.setText(
+                f"{len(bulletins['devoirs'])} devoir(s) dans la période, aucun élève n'a de copie complète"
+            )
+        else:
+            self.apercu_label.setText(
+                f"{len(bulletins['devoirs'])} devoir(s) dans la période | "
+                f"{stats['nb']}/{len(bulletins['eleves'])} élève(s) classé(s) | "
+                f"moyenne {stats['moyenne']:.2f}/20 | min {stats['min']:.2f} | max {stats['max']:.2f}"
+            )
+        self.generate_btn.setEnabled(stats['nb'] > 0 and not (self.thread and self.thread.isRunning()))
+    
+    def browse_output_dir(self):
+        dir_path = QFileDialog.getExistingDirectory(self, "Sélectionner le dossier de sortie", "exports")
+        if dir_path:
+            self.output_label.setText(dir_path)
+    
+    def start_generation(self):
+        self.generate_btn.setEnabled(False)
+        self.log_text.clear()
+        self.progress_bar.setValue(0)
+        
+        if self.mode_zip_radio.isChecked():
+            mode = "zip"
+        elif self.mode_livret_radio.isChecked():
+            mode = "livret"
+        else:
+            mode = "dossier"
+        
+        self.thread = BulletinsThread(
+            self.classe_combo.currentData(),
+            self.periode_combo.currentData(),
+            self.output_label.text(),
+            mode
+        )
+        self.thread.progress.connect(self.update_progress)
+        self.thread.finished.connect(self.generation_finished)
+        self.thread.error.connect(self.generation_error)
+        
+        self.cancel_btn.setEnabled(True)
+        self.thread.start()
+    
+    def cancel_generation(self):
+        if self.thread and self.thread.isRunning():
+            self.thread.cancel()
+            self.cancel_btn.setEnabled(False)
+            self.log_text.append("Annulation en cours...")
+    
+    def update_progress(self, percentage, message):
+        self.progress_bar.setValue(percentage)
+        self.log_text.append(f"[{percentage}%] {message}")
+        self.log_text.verticalScrollBar().setValue(self.log_text.verticalScrollBar().maximum())
+    
+    def generation_finished(self, files, output_dir):
+        self.output_dir = output_dir
+        self.log_text.append(f"\n✅ {len(files)} fichier(s) dans {output_dir}")
+        self.cancel_btn.setEnabled(False)
+        self.generate_btn.setEnabled(True)
+        self.open_folder_btn.setEnabled(bool(files))
+    
+    def generation_error(self, error_message):
+        self.log_text.append(f"\n❌ ERREUR: {error_message}")
+        self.cancel_btn.setEnabled(False)
+        self.generate_btn.setEnabled(True)
+        QMessageBox.critical(self, "Erreur", f"Erreur lors de la génération:\n\n{error_message}")
+    
+    def open_output_folder(self):
+        if self.output_dir and os.path.exists(self.output_dir):
+            import platform
+            import subprocess
+            
+            if platform.system() == "Windows":
+                os.startfile(self.output_dir)
+            elif platform.system() == "Darwin":  # macOS
+                subprocess.run(["open", self.output_dir])
+            else:  # Linux
+                subprocess.run(["xdg-open", self.output_dir])
+    
+    def stop_generation(self):
+        """Annule la génération en cours et attend la fin du thread"""
+        if self.thread and self.thread.isRunning():
+            self.thread.cancel()
+            self.thread.wait()
+    
+    def done(self, result):
+        self.stop_generation()
+        super().done(result)
+    
+    def closeEvent(self, event):
+        self.stop_generation()
+        event.accept()
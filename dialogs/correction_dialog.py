@@ -1,11 +1,12 @@
 # dialogs/correction_dialog.py
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, 
-                              QListWidget, QListWidgetItem, QScrollArea, QWidget,
+                              QListView, QScrollArea, QWidget, QCheckBox,
                               QDoubleSpinBox, QTextEdit, QPushButton, QFrame,
                               QMessageBox, QProgressBar, QLineEdit)
-from PyQt6.QtCore import Qt, pyqtSignal
-from PyQt6.QtGui import QColor
+from PyQt6.QtCore import Qt, pyqtSignal, QSettings
 from database.db_manager import DatabaseManager
+from ui.models.base_table_model import ID_ROLE
+from ui.models.correction_model import EleveStatusModel, EleveStatusFilterProxy
 
 class QuestionNoteWidget(QFrame):
     """Widget pour saisir la note d'une question"""
@@ -120,25 +121,8 @@ class QuestionNoteWidget(QFrame):
         """Retourne le commentaire (toujours une chaîne, jamais None)"""
         return self.commentaire_input.text().strip()
 
-class EleveListItem(QListWidgetItem):
-    """Item de liste pour un élève"""
-    def __init__(self, eleve, is_corrected, note_finale=None):
-        nom_complet = f"{eleve['nom']} {eleve['prenom']}"
-        super().__init__(nom_complet)
-        
-        self.eleve_id = eleve['id']
-        self.eleve_nom = nom_complet
-        
-        # Icône de statut
-        if is_corrected:
-            if note_finale is not None:
-                self.setText(f"✅ {nom_complet} ({note_finale:.2f}/20)")
-                self.setForeground(QColor("#4CAF50"))
-            else:
-                self.setText(f"✅ {nom_complet}")
-        else:
-            self.setText(f"⏳ {nom_complet}")
-            self.setForeground(QColor("#999"))
+# Clé QSettings de l'option « mettre à jour le compte-rendu à chaque sauvegarde »
+AUTO_PDF_SETTING = "correction/regeneration_auto"
 
 class CorrectionDialog(QDialog):
     def __init__(self, parent=None, devoir_id=None):
@@ -154,13 +138,13 @@ class CorrectionDialog(QDialog):
         # Charger les données
         self.devoir = self.db.get_devoir(devoir_id)
         self.questions = self.db.get_questions_devoir(devoir_id)
-        self.eleves = self.db.get_eleves_classe_avec_notes(devoir_id)
+        self.eleves = self.db.get_etats_correction(devoir_id)
         
         self.init_ui()
         
         # Charger le premier élève
         if len(self.eleves) > 0:
-            self.load_eleve(0)
+            self.select_eleve(self.eleves[0]['id'])
     
     def init_ui(self):
         main_layout = QHBoxLayout(self)
@@ -186,9 +170,43 @@ class CorrectionDialog(QDialog):
         self.global_progress.setMaximum(100)
         left_layout.addWidget(self.global_progress)
         
-        # Liste des élèves
-        self.eleve_list = QListWidget()
-        self.eleve_list.currentRowChanged.connect(self.load_eleve)
+        # Filtres de la liste
+        self.non_corriges_check = QCheckBox("Non corrigés uniquement")
+        self.non_corriges_check.toggled.connect(self.apply_list_filters)
+        left_layout.addWidget(self.non_corriges_check)
+        
+        tranche_layout = QHBoxLayout()
+        self.tranche_check = QCheckBox("Notes de")
+        self.tranche_check.toggled.connect(self.apply_list_filters)
+        tranche_layout.addWidget(self.tranche_check)
+        
+        self.note_min_spin = QDoubleSpinBox()
+        self.note_min_spin.setRange(0, 20)
+        self.note_min_spin.setDecimals(1)
+        self.note_min_spin.valueChanged.connect(self.apply_list_filters)
+        tranche_layout.addWidget(self.note_min_spin)
+        
+        tranche_layout.addWidget(QLabel("à"))
+        
+        self.note_max_spin = QDoubleSpinBox()
+        self.note_max_spin.setRange(0, 20)
+        self.note_max_spin.setDecimals(1)
+        self.note_max_spin.setValue(20)
+        self.note_max_spin.valueChanged.connect(self.apply_list_filters)
+        tranche_layout.addWidget(self.note_max_spin)
+        left_layout.addLayout(tranche_layout)
+        
+        # Liste des élèves (modèle : seules les lignes modifiées sont redessinées)
+        self.eleve_model = EleveStatusModel(self)
+        self.eleve_proxy = EleveStatusFilterProxy(self)
+        self.eleve_proxy.setSourceModel(self.eleve_model)
+        
+        self.eleve_list = QListView()
+        self.eleve_list.setUniformItemSizes(True)
+        self.eleve_list.setModel(self.eleve_proxy)
+        self.eleve_list.selectionModel().currentRowChanged.connect(
+            lambda current, previous: self.load_eleve(current.row())
+        )
         left_layout.addWidget(self.eleve_list)
         
         # Boutons de navigation
@@ -280,6 +298,15 @@ class CorrectionDialog(QDialog):
         
         center_layout.addLayout(actions_layout)
         
+        # Régénération du PDF à chaque sauvegarde (choix mémorisé entre les sessions)
+        self.auto_pdf_check = QCheckBox("Mettre à jour le compte-rendu PDF à chaque sauvegarde")
+        self.auto_pdf_check.setToolTip(
+            "Régénère en arrière-plan le PDF de l'élève (et ceux de la classe si la moyenne affichée change)"
+        )
+        self.auto_pdf_check.setChecked(QSettings().value(AUTO_PDF_SETTING, False, type=bool))
+        self.auto_pdf_check.toggled.connect(lambda checked: QSettings().setValue(AUTO_PDF_SETTING, checked))
+        center_layout.addWidget(self.auto_pdf_check)
+        
         main_layout.addWidget(center_panel, stretch=1)
         
         # ========== COLONNE DROITE : Statistiques ==========
@@ -312,6 +339,17 @@ class CorrectionDialog(QDialog):
         
         right_layout.addStretch()
         
+        # Saisie de toute la classe en grille
+        grid_btn = QPushButton("📋 Saisie en grille")
+        grid_btn.setToolTip("Saisir les notes de toute la classe dans un tableau (collage depuis un tableur possible)")
+        grid_btn.clicked.connect(self.open_grid_mode)
+        right_layout.addWidget(grid_btn)
+        
+        import_btn = QPushButton("📥 Importer des notes")
+        import_btn.setToolTip("Importer les notes depuis un tableau (CSV ou XLSX)")
+        import_btn.clicked.connect(self.open_import_notes)
+        right_layout.addWidget(import_btn)
+        
         # Bouton fermer
         close_btn = QPushButton("❌ Fermer")
         close_btn.clicked.connect(self.accept)
@@ -320,40 +358,40 @@ class CorrectionDialog(QDialog):
         main_layout.addWidget(right_panel)
         
         # Charger la liste des élèves
-        self.refresh_eleve_list()
+        self.eleve_model.set_etats(self.eleves)
         self.update_global_progress()
         self.update_stats()
     
     def refresh_eleve_list(self):
-        """Rafraîchit la liste des élèves avec leur statut"""
-        self.eleve_list.clear()
-        
-        eleves_data = self.db.get_eleves_classe_avec_notes(self.devoir_id)
-        
-        for eleve in eleves_data:
-            is_corrected = eleve['nb_notes_saisies'] == eleve['nb_questions_total']
-            
-            # Calculer la note finale si corrigé
-            note_finale = None
-            if is_corrected:
-                note_finale = self.db.calculate_note_finale(eleve['id'], self.devoir_id)
-            
-            item = EleveListItem(eleve, is_corrected, note_finale)
-            self.eleve_list.addItem(item)
+        """Recharge l'état de correction de toute la classe"""
+        self.eleve_model.set_etats(self.db.get_etats_correction(self.devoir_id))
+    
+    def refresh_eleve(self, eleve_id):
+        """Met à jour le statut et la note d'un seul élève dans la liste"""
+        self.eleve_model.update_etats(self.db.get_etats_correction(self.devoir_id, [eleve_id]))
+    
+    def apply_list_filters(self):
+        """Applique les filtres de la liste (non corrigés, tranche de notes)"""
+        self.eleve_proxy.set_non_corriges_seulement(self.non_corriges_check.isChecked())
+        if self.tranche_check.isChecked():
+            self.eleve_proxy.set_tranche_notes(self.note_min_spin.value(), self.note_max_spin.value())
+        else:
+            self.eleve_proxy.set_tranche_notes(None, None)
     
     def load_eleve(self, index):
-        """Charge les données d'un élève"""
-        if index < 0 or index >= self.eleve_list.count():
+        """Charge les données d'un élève (index = ligne dans la liste filtrée)"""
+        if index < 0 or index >= self.eleve_proxy.rowCount():
             return
         
-        item = self.eleve_list.item(index)
-        if item is None:
+        source_row = self.eleve_proxy.mapToSource(self.eleve_proxy.index(index, 0)).row()
+        etat = self.eleve_model.etat(source_row)
+        if etat['id'] == self.current_eleve_id and self.question_widgets:
             return
-            
-        self.current_eleve_id = item.eleve_id
+        
+        self.current_eleve_id = etat['id']
         
         # Mettre à jour le header
-        self.eleve_name_label.setText(f"📝 {item.eleve_nom}")
+        self.eleve_name_label.setText(f"📝 {etat['nom']} {etat['prenom']}")
         
         # Charger les notes
         notes = self.db.get_notes_eleve_devoir(self.current_eleve_id, self.devoir_id)
@@ -437,31 +475,19 @@ class CorrectionDialog(QDialog):
             # Sauvegarder l'appréciation globale dans la table compte_rendus
             appreciation = self.appreciation_text.toPlainText().strip()
             if appreciation:  # Sauvegarder seulement s'il y a une appréciation
-                # Vérifier si un compte-rendu existe déjà
-                existing = self.db.get_compte_rendu(self.devoir_id, self.current_eleve_id)
-                
-                if existing:
-                    # Mettre à jour l'appréciation existante
-                    self.db.conn.execute("""
-                        UPDATE compte_rendus 
-                        SET appreciation = ?
-                        WHERE id_devoir = ? AND id_eleve = ?
-                    """, (appreciation, self.devoir_id, self.current_eleve_id))
-                else:
-                    # Créer un nouveau compte-rendu (sans PDF pour l'instant)
-                    self.db.conn.execute("""
-                        INSERT INTO compte_rendus (id_devoir, id_eleve, appreciation)
-                        VALUES (?, ?, ?)
-                    """, (self.devoir_id, self.current_eleve_id, appreciation))
-                
-                self.db.conn.commit()
+                # Notifiée comme les notes : un compte-rendu en file la reprendra
+                self.db.save_appreciation(self.devoir_id, self.current_eleve_id, appreciation)
                 print(f"Appréciation sauvegardée: '{appreciation}'")
             
             # Recalculer la moyenne du devoir
-            self.db.update_moyenne_devoir(self.devoir_id)
+            moyenne_avant = self.db.get_devoir(self.devoir_id)['moyenne']
+            moyenne_apres = self.db.update_moyenne_devoir(self.devoir_id)
+            
+            if self.auto_pdf_check.isChecked():
+                self.regenerate_pdf(self.current_eleve_id, moyenne_avant, moyenne_apres)
             
-            # Rafraîchir la liste et les stats
-            self.refresh_eleve_list()
+            # Rafraîchir la ligne de l'élève et les stats
+            self.refresh_eleve(self.current_eleve_id)
             self.update_global_progress()
             self.update_stats()
             
@@ -474,6 +500,56 @@ class CorrectionDialog(QDialog):
             print(traceback.format_exc())
             QMessageBox.critical(self, "Erreur", f"Erreur lors de la sauvegarde : {str(e)}")
     
+    def regenerate_pdf(self, eleve_id, moyenne_avant, moyenne_apres):
+        """Met en file la régénération du compte-rendu après une sauvegarde"""
+        # Importé à la demande : tire le générateur et les moteurs PDF
+        from utils.generation_queue import enqueue_apres_correction
+        
+        try:
+            enqueue_apres_correction(self.db, self.devoir_id, eleve_id, moyenne_avant, moyenne_apres)
+        except Exception as e:
+            # Les notes sont enregistrées : un échec de mise en file ne doit pas le masquer
+            print(f"Erreur lors de la mise en file du compte-rendu: {e}")
+    
+    def open_grid_mode(self):
+        """Ouvre la saisie en grille puis recharge l'état de la correction"""
+        from dialogs.notes_grid_dialog import NotesGridDialog
+        
+        dialog = NotesGridDialog(self, self.devoir_id)
+        if dialog.exec():
+            self.reload_after_bulk_change()
+    
+    def open_import_notes(self):
+        """Importe les notes depuis un fichier puis recharge l'état de la correction"""
+        from dialogs.import_notes_dialog import ImportNotesDialog
+        
+        dialog = ImportNotesDialog(self, self.devoir_id)
+        if dialog.exec():
+            self.reload_after_bulk_change()
+    
+    def reload_after_bulk_change(self):
+        """Recharge la liste, les stats et l'élève courant après une saisie groupée"""
+        current_eleve_id = self.current_eleve_id
+        self.refresh_eleve_list()
+        self.update_global_progress()
+        self.update_stats()
+        
+        # Recharger les notes de l'élève affiché
+        self.current_eleve_id = None
+        self.select_eleve(current_eleve_id)
+    
+    def select_eleve(self, eleve_id):
+        """Sélectionne un élève dans la liste filtrée (le premier à défaut)"""
+        matches = self.eleve_proxy.match(self.eleve_proxy.index(0, 0), ID_ROLE, eleve_id, 1,
+                                         Qt.MatchFlag.MatchExactly)
+        row = matches[0].row() if matches else 0
+        if row < self.eleve_proxy.rowCount():
+            self.set_current_row(row)
+            self.load_eleve(row)
+    
+    def set_current_row(self, row):
+        self.eleve_list.setCurrentIndex(self.eleve_proxy.index(row, 0))
+    
     def save_and_next(self):
         """Sauvegarde et passe à l'élève suivant"""
         self.save_current()
@@ -481,22 +557,20 @@ class CorrectionDialog(QDialog):
     
     def previous_eleve(self):
         """Passe à l'élève précédent"""
-        current_row = self.eleve_list.currentRow()
+        current_row = self.eleve_list.currentIndex().row()
         if current_row > 0:
-            self.eleve_list.setCurrentRow(current_row - 1)
+            self.set_current_row(current_row - 1)
     
     def next_eleve(self):
         """Passe à l'élève suivant"""
-        current_row = self.eleve_list.currentRow()
-        if current_row < self.eleve_list.count() - 1:
-            self.eleve_list.setCurrentRow(current_row + 1)
+        current_row = self.eleve_list.currentIndex().row()
+        if current_row < self.eleve_proxy.rowCount() - 1:
+            self.set_current_row(current_row + 1)
     
     def update_global_progress(self):
-        """Met à jour la barre de progression globale"""
-        eleves_data = self.db.get_eleves_classe_avec_notes(self.devoir_id)
-        
-        nb_corriges = sum(1 for e in eleves_data if e['nb_notes_saisies'] == e['nb_questions_total'])
-        nb_total = len(eleves_data)
+        """Met à jour la barre de progression globale (d'après la liste déjà chargée)"""
+        nb_corriges = self.eleve_model.nb_corriges()
+        nb_total = self.eleve_model.rowCount()
         
         self.progress_label.setText(f"{nb_corriges}/{nb_total} corrigés")
         
@@ -506,8 +580,8 @@ class CorrectionDialog(QDialog):
     
     def update_stats(self):
         """Met à jour les statistiques du panneau de droite"""
-        # Récupérer les notes actuelles
-        notes = self.db.get_distribution_notes_devoir(self.devoir_id)
+        # Notes des copies complètes, déjà chargées dans la liste
+        notes = self.eleve_model.notes_finales()
         
         if len(notes) > 0:
             moyenne = sum(notes) / len(notes)
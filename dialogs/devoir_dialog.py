@@ -5,14 +5,17 @@ from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QFormLayout, QLineEdit,
                               QFrame)
 from PyQt6.QtCore import QDate, Qt
 from database.db_manager import DatabaseManager
+from utils.calculs import calculer_notes_finales, statistiques_notes, distribution_notes
 import traceback
 import sys
 
 class QuestionWidget(QFrame):
-    def __init__(self, numero="", intitule="", points_max=0, coefficient=1, parent_dialog=None):
+    def __init__(self, numero="", intitule="", points_max=0, coefficient=1, parent_dialog=None, question_id=None):
         super().__init__()
         try:
             self.parent_dialog = parent_dialog
+            # Id de la question en base (None pour une nouvelle question)
+            self.question_id = question_id
             self.setFrameStyle(QFrame.Shape.StyledPanel)
             self.setStyleSheet("QFrame { background-color: white; border: 1px solid #ddd; border-radius: 5px; padding: 10px; margin: 5px; }")
             
@@ -79,6 +82,7 @@ class QuestionWidget(QFrame):
     def get_data(self):
         try:
             return {
+                'id': self.question_id,
                 'numero': self.numero_input.text().strip(),
                 'intitule': self.intitule_input.text().strip(),
                 'points_max': self.points_input.value(),
@@ -97,6 +101,8 @@ class DevoirDialog(QDialog):
             self.db.connect()  # S'assurer que la connexion est établie
             self.devoir_id = devoir_id
             self.question_widgets = []
+            # Matrice des notes chargée une seule fois pour l'aperçu du barème
+            self.notes_matrix = None
             
             self.setWindowTitle("Créer un devoir" if devoir_id is None else "Modifier un devoir")
             self.setMinimumSize(800, 600)
@@ -136,6 +142,13 @@ class DevoirDialog(QDialog):
             self.load_classes()
             form.addRow("Classe *", self.classe_combo)
             
+            self.poids_input = QDoubleSpinBox()
+            self.poids_input.setRange(0, 100)
+            self.poids_input.setValue(1)
+            self.poids_input.setSingleStep(0.5)
+            self.poids_input.setToolTip("Coefficient du devoir dans la moyenne de période (bulletins)")
+            form.addRow("Poids", self.poids_input)
+            
             info_group.addLayout(form)
             main_layout.addLayout(info_group)
             
@@ -165,6 +178,13 @@ class DevoirDialog(QDialog):
             self.total_label.setStyleSheet("font-weight: bold; font-size: 13px; margin-top: 10px;")
             main_layout.addWidget(self.total_label)
             
+            # Aperçu "what-if" des notes de la classe (mode édition uniquement)
+            self.preview_label = QLabel("")
+            self.preview_label.setStyleSheet("color: #555; font-size: 12px; background-color: #e8f4f8; padding: 8px; border-radius: 5px;")
+            self.preview_label.setWordWrap(True)
+            self.preview_label.setVisible(False)
+            main_layout.addWidget(self.preview_label)
+            
             # Boutons
             buttons = QHBoxLayout()
             
@@ -207,12 +227,12 @@ class DevoirDialog(QDialog):
             traceback.print_exc()
             QMessageBox.critical(self, "Erreur", f"Erreur lors de l'ajout de la question:\n{str(e)}\n\n{traceback.format_exc()}")
     
-    def add_question(self, numero="", intitule="", points_max=0, coefficient=1):
+    def add_question(self, numero="", intitule="", points_max=0, coefficient=1, question_id=None):
         """Ajoute une nouvelle question au formulaire"""
         try:
             print(f"Création d'une QuestionWidget: numero={numero}, intitule={intitule}, points={points_max}, coef={coefficient}")
             
-            question_widget = QuestionWidget(numero, intitule, points_max, coefficient, self)
+            question_widget = QuestionWidget(numero, intitule, points_max, coefficient, self, question_id)
             print("QuestionWidget créé avec succès")
             
             self.question_widgets.append(question_widget)
@@ -259,10 +279,44 @@ class DevoirDialog(QDialog):
             total_points = sum(q.points_input.value() * q.coef_input.value() for q in self.question_widgets)
             
             self.total_label.setText(f"📊 Total: {total_questions} questions | {total_points:.1f} points")
+            
+            self.update_preview()
         except Exception as e:
             print(f"ERREUR dans update_bareme_total: {e}")
             traceback.print_exc()
     
+    def update_preview(self):
+        """Recalcule en mémoire les notes de toute la classe avec le barème en cours d'édition"""
+        if not self.notes_matrix or not self.notes_matrix['eleves']:
+            return
+        
+        nb_eleves = len(self.notes_matrix['eleves'])
+        colonnes = []
+        points_max = []
+        coefficients = []
+        
+        for q in self.question_widgets:
+            # Une nouvelle question n'a encore aucune note saisie
+            colonnes.append(self.notes_matrix['colonnes'].get(q.question_id, [None] * nb_eleves))
+            points_max.append(q.points_input.value())
+            coefficients.append(q.coef_input.value())
+        
+        notes = calculer_notes_finales(colonnes, points_max, coefficients)
+        stats = statistiques_notes(notes)
+        
+        if stats['nb'] == 0:
+            self.preview_label.setText(f"🔮 Aperçu classe : aucune copie complète (0/{nb_eleves})")
+        else:
+            tranches = distribution_notes(notes)
+            self.preview_label.setText(
+                f"🔮 Aperçu classe ({stats['nb']}/{nb_eleves} copies complètes) : "
+                f"moyenne {stats['moyenne']:.2f}/20 | médiane {stats['mediane']:.2f} | "
+                f"min {stats['min']:.2f} | max {stats['max']:.2f}<br>"
+                f"Répartition : [0-5[ : {tranches[0]} | [5-10[ : {tranches[1]} | "
+                f"[10-15[ : {tranches[2]} | [15-20] : {tranches[3]}"
+            )
+        self.preview_label.setVisible(True)
+    
     def load_devoir_data(self):
         """Charge les données d'un devoir existant"""
         try:
@@ -280,12 +334,17 @@ class DevoirDialog(QDialog):
                 index = self.classe_combo.findData(devoir['id_classe'])
                 if index >= 0:
                     self.classe_combo.setCurrentIndex(index)
+                
+                self.poids_input.setValue(devoir['poids'])
+            
+            # Charger la matrice des notes une seule fois (aperçu du barème)
+            self.notes_matrix = self.db.get_notes_matrix(self.devoir_id)
             
             # Charger les questions
-            questions = self.db.get_questions_devoir(self.devoir_id)
+            questions = self.notes_matrix['questions']
             print(f"Questions à charger: {len(questions)}")
             for q in questions:
-                self.add_question(q['numero'], q['intitule'], q['points_max'], q['coefficient'])
+                self.add_question(q['numero'], q['intitule'], q['points_max'], q['coefficient'], q['id'])
             
         except Exception as e:
             print(f"ERREUR dans load_devoir_data: {e}")
@@ -298,6 +357,7 @@ class DevoirDialog(QDialog):
             nom = self.nom_input.text().strip()
             date = self.date_input.date().toString("yyyy-MM-dd")
             classe_id = self.classe_combo.currentData()
+            poids = self.poids_input.value()
             
             if not nom:
                 QMessageBox.warning(self, "Erreur", "Le nom du devoir est obligatoire")
@@ -320,27 +380,15 @@ class DevoirDialog(QDialog):
             
             if self.devoir_id is None:
                 # Créer le devoir
-                devoir_id = self.db.add_devoir(nom, date, classe_id)
+                devoir_id = self.db.add_devoir(nom, date, classe_id, poids=poids)
             else:
                 # Modifier le devoir
                 devoir_id = self.devoir_id
-                self.db.update_devoir(devoir_id, nom, date)
-                
-                # Supprimer les anciennes questions
-                old_questions = self.db.get_questions_devoir(devoir_id)
-                for q in old_questions:
-                    self.db.delete_question(q['id'])
+                self.db.update_devoir(devoir_id, nom, date, poids)
             
-            # Ajouter les questions
-            for q_widget in self.question_widgets:
-                data = q_widget.get_data()
-                self.db.add_question(
-                    devoir_id,
-                    data['numero'],
-                    data['intitule'],
-                    data['points_max'],
-                    data['coefficient']
-                )
+            # Synchroniser les questions (diff par id, les notes existantes sont conservées)
+            questions = [q_widget.get_data() for q_widget in self.question_widgets]
+            self.db.sync_questions(devoir_id, questions)
             
             self.accept()
             
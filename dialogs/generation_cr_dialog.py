@@ -4,37 +4,46 @@ from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
                               QCheckBox, QMessageBox, QGroupBox, QRadioButton)
 from PyQt6.QtCore import Qt, QThread, pyqtSignal
 from database.db_manager import DatabaseManager
-from utils.latex_generator import LatexGenerator
+from utils.latex_generator import (LatexGenerator, nom_fichier_compte_rendu, nom_fichier_bareme,
+                                   nom_fichier_archive, nom_fichier_livret, dossier_comptes_rendus)
+from utils.renderers import GenerationAnnulee
 import os
+import threading
 import traceback
 
 class GenerationThread(QThread):
     """Thread pour générer les PDFs sans bloquer l'interface"""
     progress = pyqtSignal(int, str)  # pourcentage, message
     finished = pyqtSignal(list, str)  # liste des fichiers générés, dossier
+    cancelled = pyqtSignal(list, str)  # fichiers terminés avant l'annulation, dossier
     error = pyqtSignal(str)
     
-    def __init__(self, devoir_id, output_dir, generate_bareme=False):
+    def __init__(self, devoir_id, output_dir, generate_bareme=False, mode="dossier"):
         super().__init__()
         self.devoir_id = devoir_id
         self.output_dir = output_dir
         self.generate_bareme = generate_bareme
+        # "dossier" (un PDF par élève), "zip" (archive) ou "livret" (un seul PDF)
+        self.mode = mode
+        self.annulation = threading.Event()
+    
+    def cancel(self):
+        """Arrête la génération au plus vite (appelable depuis l'interface)"""
+        self.annulation.set()
     
     def run(self):
-        conn = None
+        db = None
         try:
-            import sqlite3
-            
-            # Créer une connexion SQLite directe dans ce thread
-            conn = sqlite3.connect("nota.db")
-            conn.row_factory = sqlite3.Row
-            
-            # Créer un DatabaseManager qui utilisera cette connexion
-            db = DatabaseManager()
-            db.conn = conn  # Forcer l'utilisation de notre connexion
+            # Connexion propre à ce thread (celle du singleton appartient à l'interface)
+            db = DatabaseManager.open_separate()
             
             # Passer cette connexion au générateur
-            generator = LatexGenerator(db)
+            generator = LatexGenerator(db, annulation=self.annulation)
+            self.progress.emit(0, f"Moteur PDF : {generator.renderer.nom}")
+            
+            if self.mode != "dossier":
+                self.run_export(db, generator)
+                return
             
             generated_files = []
             
@@ -43,22 +52,22 @@ class GenerationThread(QThread):
                 try:
                     self.progress.emit(0, "Génération du barème...")
                     devoir = db.get_devoir(self.devoir_id)
-                    bareme_path = os.path.join(self.output_dir, f"Bareme_{devoir['nom']}.pdf".replace(' ', '_'))
+                    bareme_path = os.path.join(self.output_dir, nom_fichier_bareme(devoir))
                     bareme_file = generator.generate_bareme_pdf(self.devoir_id, bareme_path)
                     generated_files.append(bareme_file)
                     self.progress.emit(10, "Barème généré")
+                except GenerationAnnulee:
+                    pass
                 except Exception as e:
                     error_msg = f"Erreur lors de la génération du barème: {str(e)}"
                     self.progress.emit(10, error_msg)
                     print(error_msg)
                     print(traceback.format_exc())
             
-            # Générer les comptes-rendus
+            # Générer les comptes-rendus (données du devoir chargées une seule fois)
             self.progress.emit(15, "Génération des comptes-rendus...")
-            eleves = db.get_eleves_classe_avec_notes(self.devoir_id)
-            
-            # Filtrer les élèves corrigés
-            eleves_corriges = [e for e in eleves if e['nb_notes_saisies'] == e['nb_questions_total']]
+            context = generator.load_context(self.devoir_id)
+            eleves_corriges = context.eleves_corriges()
             total_eleves = len(eleves_corriges)
             
             if total_eleves == 0:
@@ -66,41 +75,79 @@ class GenerationThread(QThread):
                 return
             
             for i, eleve in enumerate(eleves_corriges):
+                if generator.is_cancelled():
+                    break
                 progress_pct = 15 + int((i / total_eleves) * 80)
                 self.progress.emit(progress_pct, f"Génération CR: {eleve['nom']} {eleve['prenom']}")
                 
                 try:
-                    filename = f"CR_{eleve['nom']}_{eleve['prenom']}.pdf".replace(' ', '_')
-                    output_path = os.path.join(self.output_dir, filename)
+                    output_path = os.path.join(self.output_dir, nom_fichier_compte_rendu(eleve))
                     
                     pdf_path = generator.generate_compte_rendu_pdf(
                         self.devoir_id, 
                         eleve['id'], 
-                        output_path
+                        output_path,
+                        context
                     )
                     generated_files.append(pdf_path)
-                    
+                
+                except GenerationAnnulee:
+                    break
                 except Exception as e:
                     error_msg = f"Erreur: {eleve['nom']} {eleve['prenom']} - {str(e)}"
                     self.progress.emit(progress_pct, error_msg)
                     print(error_msg)
                     print(traceback.format_exc())
             
+            if generator.is_cancelled():
+                self.cancelled.emit(generated_files, self.output_dir)
+                return
+            
             self.progress.emit(100, "Génération terminée!")
             self.finished.emit(generated_files, self.output_dir)
-            
+        
+        except GenerationAnnulee:
+            self.cancelled.emit([], self.output_dir)
         except Exception as e:
             error_msg = f"{str(e)}\n\n{traceback.format_exc()}"
             self.error.emit(error_msg)
             print(error_msg)
         finally:
             # IMPORTANT: Fermer la connexion pour libérer le verrou
-            if conn:
+            if db:
                 try:
-                    conn.close()
+                    db.close()
                 except Exception as e:
                     print(f"Erreur lors de la fermeture de la connexion: {e}")
 
+    def run_export(self, db, generator):
+        """Archive ZIP ou livret PDF : un seul fichier, publié seulement s'il est complet"""
+        if not generator.load_context(self.devoir_id).eleves_corriges():
+            self.error.emit("Aucun élève n'a été corrigé pour ce devoir")
+            return
+        
+        devoir = db.get_devoir(self.devoir_id)
+        
+        def progress(i, total, eleve):
+            self.progress.emit(5 + int((i / total) * 90), f"Génération CR: {eleve['nom']} {eleve['prenom']}")
+        
+        if self.mode == "zip":
+            output_path = os.path.join(self.output_dir, nom_fichier_archive(devoir))
+            nombre, erreurs = generator.generate_archive(self.devoir_id, output_path, self.generate_bareme, progress)
+            resume = f"{nombre} PDF dans l'archive"
+        else:
+            output_path = os.path.join(self.output_dir, nom_fichier_livret(devoir))
+            nombre, erreurs = generator.generate_livret(self.devoir_id, output_path, self.generate_bareme, progress)
+            resume = f"Livret de {nombre} page(s)"
+        
+        for eleve, message in erreurs:
+            error_msg = f"Erreur: {eleve['nom']} {eleve['prenom']} - {message}"
+            self.progress.emit(95, error_msg)
+            print(error_msg)
+        
+        self.progress.emit(100, f"Génération terminée! {resume}")
+        self.finished.emit([output_path], self.output_dir)
+
 class GenerationCRDialog(QDialog):
     def __init__(self, parent=None, devoir_id=None):
         super().__init__(parent)
@@ -136,6 +183,17 @@ class GenerationCRDialog(QDialog):
         self.bareme_checkbox.setChecked(True)
         options_layout.addWidget(self.bareme_checkbox)
         
+        # Format de sortie
+        self.mode_dossier_radio = QRadioButton("Un PDF par élève")
+        self.mode_dossier_radio.setChecked(True)
+        options_layout.addWidget(self.mode_dossier_radio)
+        
+        self.mode_zip_radio = QRadioButton("Archive ZIP des PDF")
+        options_layout.addWidget(self.mode_zip_radio)
+        
+        self.mode_livret_radio = QRadioButton("Livret PDF unique à imprimer (un signet par élève)")
+        options_layout.addWidget(self.mode_livret_radio)
+        
         options_group.setLayout(options_layout)
         layout.addWidget(options_group)
         
@@ -143,7 +201,7 @@ class GenerationCRDialog(QDialog):
         output_group = QGroupBox("Dossier de sortie")
         output_layout = QHBoxLayout()
         
-        self.output_label = QLabel("exports/CR_" + devoir['nom'].replace(' ', '_'))
+        self.output_label = QLabel(dossier_comptes_rendus(devoir))
         output_layout.addWidget(self.output_label)
         
         browse_btn = QPushButton("📁 Parcourir")
@@ -172,6 +230,16 @@ class GenerationCRDialog(QDialog):
         self.generate_btn.clicked.connect(self.start_generation)
         buttons_layout.addWidget(self.generate_btn)
         
+        self.background_btn = QPushButton("📄 En arrière-plan")
+        self.background_btn.setToolTip("Mettre la génération en file et continuer à travailler")
+        self.background_btn.clicked.connect(self.enqueue_generation)
+        buttons_layout.addWidget(self.background_btn)
+        
+        self.cancel_btn = QPushButton("⏹ Annuler")
+        self.cancel_btn.setEnabled(False)
+        self.cancel_btn.clicked.connect(self.cancel_generation)
+        buttons_layout.addWidget(self.cancel_btn)
+        
         self.open_folder_btn = QPushButton("📁 Ouvrir le dossier")
         self.open_folder_btn.setEnabled(False)
         self.open_folder_btn.clicked.connect(self.open_output_folder)
@@ -203,19 +271,58 @@ class GenerationCRDialog(QDialog):
         output_dir = self.output_label.text()
         os.makedirs(output_dir, exist_ok=True)
         
+        if self.mode_zip_radio.isChecked():
+            mode = "zip"
+        elif self.mode_livret_radio.isChecked():
+            mode = "livret"
+        else:
+            mode = "dossier"
+        
         # Créer et démarrer le thread
         self.thread = GenerationThread(
             self.devoir_id,
             output_dir,
-            self.bareme_checkbox.isChecked()
+            self.bareme_checkbox.isChecked(),
+            mode
         )
         
         self.thread.progress.connect(self.update_progress)
         self.thread.finished.connect(self.generation_finished)
+        self.thread.cancelled.connect(self.generation_cancelled)
         self.thread.error.connect(self.generation_error)
         
+        self.cancel_btn.setEnabled(True)
         self.thread.start()
     
+    def enqueue_generation(self):
+        """Confie la génération à la file en arrière-plan et ferme le dialog"""
+        from utils.generation_queue import enqueue_comptes_rendus
+        
+        try:
+            nb = enqueue_comptes_rendus(
+                self.db,
+                self.devoir_id,
+                self.output_label.text(),
+                avec_bareme=self.bareme_checkbox.isChecked()
+            )
+        except Exception as e:
+            QMessageBox.critical(self, "Erreur", f"Impossible de mettre la génération en file:\n\n{e}")
+            return
+        
+        QMessageBox.information(
+            self,
+            "Génération en arrière-plan",
+            f"{nb} document(s) mis en file.\n\nIls seront générés dans:\n{self.output_label.text()}"
+        )
+        self.accept()
+    
+    def cancel_generation(self):
+        """Interrompt la génération en cours (les PDF déjà terminés sont conservés)"""
+        if self.thread and self.thread.isRunning():
+            self.thread.cancel()
+            self.cancel_btn.setEnabled(False)
+            self.log_text.append("Annulation en cours...")
+    
     def update_progress(self, percentage, message):
         """Met à jour la barre de progression et le log"""
         self.progress_bar.setValue(percentage)
@@ -233,6 +340,7 @@ class GenerationCRDialog(QDialog):
         self.log_text.append(f"\n✅ Génération terminée!")
         self.log_text.append(f"{len(files)} fichier(s) générés")
         
+        self.cancel_btn.setEnabled(False)
         self.generate_btn.setEnabled(True)
         self.open_folder_btn.setEnabled(True)
         
@@ -242,9 +350,22 @@ class GenerationCRDialog(QDialog):
             f"Génération terminée!\n\n{len(files)} fichier(s) générés dans:\n{output_dir}"
         )
     
+    def generation_cancelled(self, files, output_dir):
+        """Appelé quand la génération a été annulée"""
+        self.generated_files = files
+        self.output_dir = output_dir
+        
+        self.log_text.append(f"\n⏹ Génération annulée")
+        self.log_text.append(f"{len(files)} fichier(s) générés avant l'annulation")
+        
+        self.cancel_btn.setEnabled(False)
+        self.generate_btn.setEnabled(True)
+        self.open_folder_btn.setEnabled(bool(files))
+    
     def generation_error(self, error_message):
         """Appelé en cas d'erreur"""
         self.log_text.append(f"\n❌ ERREUR: {error_message}")
+        self.cancel_btn.setEnabled(False)
         self.generate_btn.setEnabled(True)
         
         QMessageBox.critical(
@@ -266,9 +387,19 @@ class GenerationCRDialog(QDialog):
             else:  # Linux
                 subprocess.run(["xdg-open", self.output_dir])
     
-    def closeEvent(self, event):
-        """S'assurer que le thread est arrêté avant de fermer"""
+    def stop_generation(self):
+        """Annule la génération en cours et attend la fin du thread"""
         if self.thread and self.thread.isRunning():
-            self.thread.quit()
+            # Le thread n'a pas de boucle d'événements : quit() n'aurait aucun effet
+            self.thread.cancel()
             self.thread.wait()
+    
+    def done(self, result):
+        """Fermeture par un bouton ou Échap : arrêter d'abord la génération"""
+        self.stop_generation()
+        super().done(result)
+    
+    def closeEvent(self, event):
+        """S'assurer que le thread est arrêté avant de fermer"""
+        self.stop_generation()
         event.accept()
\ No newline at end of file
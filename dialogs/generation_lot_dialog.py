@@ -0,0 +1,264 @@
+# dialogs/generation_lot_dialog.py
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+                              QProgressBar, QFileDialog, QCheckBox, QMessageBox, QGroupBox,
+                              QListWidget, QListWidgetItem)
+from PyQt6.QtCore import Qt
+from database.db_manager import DatabaseManager
+from ui.change_notifier import GenerationJobNotifier
+import os
+import time
+
+# Statuts d'une tâche qui ne sera plus exécutée
+STATUTS_FINIS = ('terminee', 'echec', 'ignoree', 'annulee')
+
+
+def format_duree(secondes):
+    """Durée lisible : '45 s', '3 min 05 s', '1 h 12 min'"""
+    secondes = int(round(secondes))
+    if secondes < 60:
+        return f"{secondes} s"
+    minutes, secondes = divmod(secondes, 60)
+    if minutes < 60:
+        return f"{minutes} min {secondes:02d} s"
+    heures, minutes = divmod(minutes, 60)
+    return f"{heures} h {minutes:02d} min"
+
+
+class GenerationLotDialog(QDialog):
+    """Génération groupée des comptes-rendus de plusieurs devoirs et classes
+    
+    Les documents sont planifiés puis mis en file en un seul lot, exécuté par
+    les threads de la file de génération : fermer le dialog n'interrompt pas
+    la génération.
+    """
+    
+    def __init__(self, parent=None, devoir_ids=()):
+        super().__init__(parent)
+        self.db = DatabaseManager()
+        self.plan = None
+        self.lot = None
+        self.debut = None
+        self.output_root = os.path.abspath("exports")
+        
+        self.setWindowTitle("Génération groupée des comptes-rendus")
+        self.setMinimumSize(750, 600)
+        
+        self.init_ui(set(devoir_ids))
+        GenerationJobNotifier.instance().job_changed.connect(self.refresh_progress)
+    
+    def init_ui(self, devoir_ids):
+        layout = QVBoxLayout(self)
+        
+        # Sélection
+        selection_layout = QHBoxLayout()
+        
+        classes_group = QGroupBox("Classes (tous leurs devoirs)")
+        classes_layout = QVBoxLayout()
+        self.classes_list = QListWidget()
+        for classe in self.db.get_all_classes():
+            item = QListWidgetItem(classe['nom'])
+            item.setData(Qt.ItemDataRole.UserRole, classe['id'])
+            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+            item.setCheckState(Qt.CheckState.Unchecked)
+            self.classes_list.addItem(item)
+        self.classes_list.itemChanged.connect(self.invalidate_plan)
+        classes_layout.addWidget(self.classes_list)
+        classes_group.setLayout(classes_layout)
+        selection_layout.addWidget(classes_group, 1)
+        
+        devoirs_group = QGroupBox("Devoirs")
+        devoirs_layout = QVBoxLayout()
+        self.devoirs_list = QListWidget()
+        for devoir in self.db.get_all_devoirs_avec_stats():
+            item = QListWidgetItem(
+                f"{devoir['nom']} — {devoir['classe_nom'] or 'Sans classe'} "
+                f"({devoir['nb_corriges']} corrigé(s))"
+            )
+            item.setData(Qt.ItemDataRole.UserRole, devoir['id'])
+            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+            item.setCheckState(Qt.CheckState.Checked if devoir['id'] in devoir_ids else Qt.CheckState.Unchecked)
+            self.devoirs_list.addItem(item)
+        self.devoirs_list.itemChanged.connect(self.invalidate_plan)
+        devoirs_layout.addWidget(self.devoirs_list)
+        devoirs_group.setLayout(devoirs_layout)
+        selection_layout.addWidget(devoirs_group, 2)
+        
+        layout.addLayout(selection_layout)
+        
+        # Options
+        options_group = QGroupBox("Options de génération")
+        options_layout = QVBoxLayout()
+        
+        self.bareme_checkbox = QCheckBox("Générer aussi le barème de chaque devoir")
+        self.bareme_checkbox.setChecked(True)
+        self.bareme_checkbox.toggled.connect(self.invalidate_plan)
+        options_layout.addWidget(self.bareme_checkbox)
+        
+        output_layout = QHBoxLayout()
+        self.output_label = QLabel(self.output_root)
+        self.output_label.setToolTip("Un sous-dossier par classe, puis par devoir")
+        output_layout.addWidget(self.output_label, 1)
+        
+        browse_btn = QPushButton("📁 Parcourir")
+        browse_btn.clicked.connect(self.browse_output_dir)
+        output_layout.addWidget(browse_btn)
+        options_layout.addLayout(output_layout)
+        
+        options_group.setLayout(options_layout)
+        layout.addWidget(options_group)
+        
+        # Plan et avancement
+        self.plan_label = QLabel("Cochez des devoirs ou des classes puis planifiez la génération.")
+        self.plan_label.setWordWrap(True)
+        layout.addWidget(self.plan_label)
+        
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setMaximum(100)
+        layout.addWidget(self.progress_bar)
+        
+        self.progress_label = QLabel("")
+        self.progress_label.setStyleSheet("color: #666;")
+        layout.addWidget(self.progress_label)
+        
+        # Boutons
+        buttons_layout = QHBoxLayout()
+        
+        self.plan_btn = QPushButton("🧮 Planifier")
+        self.plan_btn.clicked.connect(self.plan_generation)
+        buttons_layout.addWidget(self.plan_btn)
+        
+        self.launch_btn = QPushButton("🚀 Lancer")
+        self.launch_btn.setObjectName("primary-button")
+        self.launch_btn.setEnabled(False)
+        self.launch_btn.clicked.connect(self.launch_generation)
+        buttons_layout.addWidget(self.launch_btn)
+        
+        self.open_folder_btn = QPushButton("📁 Ouvrir le dossier")
+        self.open_folder_btn.setEnabled(False)
+        self.open_folder_btn.clicked.connect(self.open_output_folder)
+        buttons_layout.addWidget(self.open_folder_btn)
+        
+        close_btn = QPushButton("Fermer")
+        close_btn.setToolTip("La génération lancée continue en arrière-plan")
+        close_btn.clicked.connect(self.accept)
+        buttons_layout.addWidget(close_btn)
+        
+        layout.addLayout(buttons_layout)
+    
+    def checked_ids(self, list_widget):
+        ids = []
+        for row in range(list_widget.count()):
+            item = list_widget.item(row)
+            if item.checkState() == Qt.CheckState.Checked:
+                ids.append(item.data(Qt.ItemDataRole.UserRole))
+        return ids
+    
+    def browse_output_dir(self):
+        """Sélectionner le dossier racine des exports"""
+        dir_path = QFileDialog.getExistingDirectory(self, "Sélectionner le dossier de sortie", self.output_root)
+        if dir_path:
+            self.output_root = dir_path
+            self.output_label.setText(dir_path)
+            self.invalidate_plan()
+    
+    def invalidate_plan(self, *args):
+        """La sélection a changé : le plan doit être recalculé avant de lancer"""
+        if self.plan is not None:
+            self.plan = None
+            self.plan_label.setText("Sélection modifiée : planifiez à nouveau la génération.")
+        self.launch_btn.setEnabled(False)
+    
+    def plan_generation(self):
+        """Calcule les documents à produire pour la sélection"""
+        from utils.generation_queue import planifier_lot, GenerationScheduler
+        
+        devoir_ids = self.checked_ids(self.devoirs_list)
+        classe_ids = self.checked_ids(self.classes_list)
+        if not devoir_ids and not classe_ids:
+            QMessageBox.information(self, "Génération groupée", "Cochez au moins un devoir ou une classe.")
+            return
+        
+        try:
+            self.plan = planifier_lot(self.db, devoir_ids, classe_ids, self.output_root,
+                                      avec_bareme=self.bareme_checkbox.isChecked())
+        except Exception as e:
+            QMessageBox.critical(self, "Erreur", f"Impossible de planifier la génération:\n\n{e}")
+            return
+        
+        if not self.plan['taches']:
+            self.plan_label.setText("Aucune copie complète dans la sélection : rien à générer.")
+            self.launch_btn.setEnabled(False)
+            return
+        
+        self.plan_label.setText(
+            f"<b>{len(self.plan['devoirs'])} devoir(s)</b> dans {len(self.plan['classes'])} classe(s) : "
+            f"{self.plan['nb_comptes_rendus']} compte(s)-rendu(s) et {self.plan['nb_baremes']} barème(s), "
+            f"soit {len(self.plan['taches'])} document(s) répartis sur "
+            f"{GenerationScheduler.instance().nb_threads} thread(s)."
+        )
+        self.launch_btn.setEnabled(True)
+    
+    def launch_generation(self):
+        """Met en file tous les documents planifiés en un seul lot"""
+        from utils.generation_queue import lancer_lot
+        
+        try:
+            self.lot = lancer_lot(self.db, self.plan)
+        except Exception as e:
+            QMessageBox.critical(self, "Erreur", f"Impossible de lancer la génération:\n\n{e}")
+            return
+        
+        self.debut = time.monotonic()
+        self.launch_btn.setEnabled(False)
+        self.plan_btn.setEnabled(False)
+        self.open_folder_btn.setEnabled(True)
+        self.refresh_progress()
+    
+    def refresh_progress(self, event=None):
+        """Avancement du lot et durée restante estimée au rythme observé"""
+        if self.lot is None:
+            return
+        
+        counts = self.db.get_generation_batch_counts(self.lot)
+        total = sum(counts.values())
+        finis = sum(counts.get(statut, 0) for statut in STATUTS_FINIS)
+        restants = total - finis
+        
+        self.progress_bar.setValue(int(finis * 100 / total) if total else 100)
+        
+        parts = [f"{counts.get('terminee', 0)}/{total} document(s) générés"]
+        if counts.get('ignoree'):
+            parts.append(f"{counts['ignoree']} ignoré(s)")
+        if counts.get('echec'):
+            parts.append(f"⚠️ {counts['echec']} échec(s)")
+        
+        ecoule = time.monotonic() - self.debut
+        if restants == 0:
+            parts.append(f"terminé en {format_duree(ecoule)}")
+            self.plan_btn.setEnabled(True)
+        elif finis:
+            parts.append(f"reste environ {format_duree(ecoule / finis * restants)}")
+        else:
+            parts.append("estimation après les premiers documents")
+        self.progress_label.setText(" — ".join(parts))
+    
+    def open_output_folder(self):
+        """Ouvre le dossier racine des exports dans l'explorateur"""
+        if os.path.exists(self.output_root):
+            import platform
+            import subprocess
+            
+            if platform.system() == "Windows":
+                os.startfile(self.output_root)
+            elif platform.system() == "Darwin":  # macOS
+                subprocess.run(["open", self.output_root])
+            else:  # Linux
+                subprocess.run(["xdg-open", self.output_root])
+    
+    def done(self, result):
+        """Fermeture : le lot continue dans la file, seul le suivi s'arrête"""
+        try:
+            GenerationJobNotifier.instance().job_changed.disconnect(self.refresh_progress)
+        except TypeError:
+            pass  # déjà déconnecté
+        super().done(result)
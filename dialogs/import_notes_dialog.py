@@ -0,0 +1,119 @@
+# dialogs/import_notes_dialog.py
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+                              QLineEdit, QTextEdit, QFileDialog, QMessageBox, QApplication)
+from database.db_manager import DatabaseManager
+from utils.importers import plan_grades_import, format_grades_plan
+
+class ImportNotesDialog(QDialog):
+    """Import des notes d'un devoir depuis un tableau (CSV ou XLSX)"""
+    
+    def __init__(self, parent=None, devoir_id=None):
+        super().__init__(parent)
+        self.devoir_id = devoir_id
+        self.db = DatabaseManager()
+        self.plan = None
+        
+        devoir = self.db.get_devoir(devoir_id)
+        self.setWindowTitle(f"Importer des notes - {devoir['nom']}")
+        self.setMinimumSize(700, 550)
+        
+        self.init_ui()
+    
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+        
+        help_label = QLabel("Une ligne par élève (colonnes Nom et Prénom, ou Élève) et une colonne "
+                            "par question, intitulée par son numéro (ex: 1, Q2, 3.a).")
+        help_label.setWordWrap(True)
+        help_label.setStyleSheet("color: #666; font-size: 11px;")
+        layout.addWidget(help_label)
+        
+        file_layout = QHBoxLayout()
+        self.file_input = QLineEdit()
+        self.file_input.setPlaceholderText("Fichier CSV ou XLSX")
+        self.file_input.textChanged.connect(self.invalidate_plan)
+        file_layout.addWidget(self.file_input)
+        
+        browse_btn = QPushButton("📁 Parcourir")
+        browse_btn.clicked.connect(self.browse_file)
+        file_layout.addWidget(browse_btn)
+        layout.addLayout(file_layout)
+        
+        self.status_label = QLabel("")
+        self.status_label.setStyleSheet("color: #666; font-size: 11px;")
+        layout.addWidget(self.status_label)
+        
+        self.preview_text = QTextEdit()
+        self.preview_text.setReadOnly(True)
+        layout.addWidget(self.preview_text)
+        
+        buttons = QHBoxLayout()
+        
+        analyse_btn = QPushButton("🔍 Analyser")
+        analyse_btn.clicked.connect(self.analyse)
+        buttons.addWidget(analyse_btn)
+        
+        self.import_btn = QPushButton("📥 Importer")
+        self.import_btn.setObjectName("primary-button")
+        self.import_btn.setEnabled(False)
+        self.import_btn.clicked.connect(self.do_import)
+        buttons.addWidget(self.import_btn)
+        
+        cancel_btn = QPushButton("❌ Annuler")
+        cancel_btn.clicked.connect(self.reject)
+        buttons.addWidget(cancel_btn)
+        
+        layout.addLayout(buttons)
+    
+    def browse_file(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self,
+            "Sélectionner un tableau de notes",
+            "",
+            "Tableaux de notes (*.csv *.tsv *.txt *.xlsx)"
+        )
+        if path:
+            self.file_input.setText(path)
+    
+    def invalidate_plan(self):
+        self.plan = None
+        self.import_btn.setEnabled(False)
+    
+    def update_progress(self, nb_lignes):
+        self.status_label.setText(f"Lecture... {nb_lignes} lignes")
+        QApplication.processEvents()
+    
+    def analyse(self):
+        """Analyse le fichier sans rien écrire et affiche le rapport par ligne"""
+        path = self.file_input.text().strip()
+        if not path:
+            QMessageBox.warning(self, "Erreur", "Veuillez sélectionner un fichier")
+            return
+        
+        try:
+            self.plan = plan_grades_import(self.db, self.devoir_id, path, self.update_progress)
+        except Exception as e:
+            self.invalidate_plan()
+            QMessageBox.critical(self, "Erreur", f"Impossible de lire le fichier : {str(e)}")
+            return
+        
+        self.preview_text.setPlainText(format_grades_plan(self.plan))
+        self.status_label.setText("Analyse terminée")
+        self.import_btn.setEnabled(bool(self.plan['notes']))
+    
+    def do_import(self):
+        if self.plan is None:
+            return
+        
+        try:
+            self.db.save_notes_batch(self.devoir_id, self.plan['notes'])
+        except Exception as e:
+            QMessageBox.critical(self, "Erreur", f"Erreur lors de l'import : {str(e)}")
+            return
+        
+        QMessageBox.information(
+            self,
+            "Succès",
+            f"{len(self.plan['notes'])} note(s) importée(s) pour {self.plan['nb_eleves']} élève(s)"
+        )
+        self.accept()
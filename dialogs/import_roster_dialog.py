@@ -0,0 +1,129 @@
+# dialogs/import_roster_dialog.py
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QLabel,
+                              QPushButton, QLineEdit, QTextEdit, QFileDialog,
+                              QMessageBox, QApplication)
+from database.db_manager import DatabaseManager
+from utils.importers import plan_roster_import, format_plan
+
+class ImportRosterDialog(QDialog):
+    """Import d'une liste d'élèves depuis un fichier CSV ou XLSX"""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.db = DatabaseManager()
+        self.plan = None
+        
+        self.setWindowTitle("Importer des élèves")
+        self.setMinimumSize(700, 550)
+        
+        self.init_ui()
+    
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+        
+        form = QFormLayout()
+        
+        file_layout = QHBoxLayout()
+        self.file_input = QLineEdit()
+        self.file_input.setPlaceholderText("Fichier CSV ou XLSX (colonnes Nom, Prénom, Classe)")
+        self.file_input.textChanged.connect(self.invalidate_plan)
+        file_layout.addWidget(self.file_input)
+        
+        browse_btn = QPushButton("📁 Parcourir")
+        browse_btn.clicked.connect(self.browse_file)
+        file_layout.addWidget(browse_btn)
+        form.addRow("Fichier *", file_layout)
+        
+        self.default_classe_input = QLineEdit()
+        self.default_classe_input.setPlaceholderText("Utilisée si le fichier n'a pas de colonne Classe")
+        self.default_classe_input.textChanged.connect(self.invalidate_plan)
+        form.addRow("Classe par défaut", self.default_classe_input)
+        
+        layout.addLayout(form)
+        
+        self.status_label = QLabel("")
+        self.status_label.setStyleSheet("color: #666; font-size: 11px;")
+        layout.addWidget(self.status_label)
+        
+        self.preview_text = QTextEdit()
+        self.preview_text.setReadOnly(True)
+        layout.addWidget(self.preview_text)
+        
+        buttons = QHBoxLayout()
+        
+        analyse_btn = QPushButton("🔍 Analyser")
+        analyse_btn.clicked.connect(self.analyse)
+        buttons.addWidget(analyse_btn)
+        
+        self.import_btn = QPushButton("📥 Importer")
+        self.import_btn.setObjectName("primary-button")
+        self.import_btn.setEnabled(False)
+        self.import_btn.clicked.connect(self.do_import)
+        buttons.addWidget(self.import_btn)
+        
+        cancel_btn = QPushButton("❌ Annuler")
+        cancel_btn.clicked.connect(self.reject)
+        buttons.addWidget(cancel_btn)
+        
+        layout.addLayout(buttons)
+    
+    def browse_file(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self,
+            "Sélectionner une liste d'élèves",
+            "",
+            "Listes d'élèves (*.csv *.tsv *.txt *.xlsx)"
+        )
+        if path:
+            self.file_input.setText(path)
+    
+    def invalidate_plan(self):
+        self.plan = None
+        self.import_btn.setEnabled(False)
+    
+    def update_progress(self, nb_lignes):
+        self.status_label.setText(f"Lecture... {nb_lignes} lignes")
+        QApplication.processEvents()
+    
+    def analyse(self):
+        """Analyse le fichier sans rien écrire et affiche les différences"""
+        path = self.file_input.text().strip()
+        if not path:
+            QMessageBox.warning(self, "Erreur", "Veuillez sélectionner un fichier")
+            return
+        
+        try:
+            self.plan = plan_roster_import(
+                self.db,
+                path,
+                self.default_classe_input.text().strip() or None,
+                self.update_progress
+            )
+        except Exception as e:
+            self.invalidate_plan()
+            QMessageBox.critical(self, "Erreur", f"Impossible de lire le fichier : {str(e)}")
+            return
+        
+        self.preview_text.setPlainText(format_plan(self.plan))
+        self.status_label.setText("Analyse terminée")
+        self.import_btn.setEnabled(bool(self.plan['eleves_a_ajouter']))
+    
+    def do_import(self):
+        if self.plan is None:
+            return
+        
+        try:
+            nb_classes, nb_eleves = self.db.import_eleves(
+                self.plan['classes_a_creer'],
+                self.plan['eleves_a_ajouter']
+            )
+        except Exception as e:
+            QMessageBox.critical(self, "Erreur", f"Erreur lors de l'import : {str(e)}")
+            return
+        
+        QMessageBox.information(
+            self,
+            "Succès",
+            f"{nb_eleves} élève(s) importé(s), {nb_classes} classe(s) créée(s)"
+        )
+        self.accept()
@@ -0,0 +1,160 @@
+# dialogs/notes_grid_dialog.py
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+                              QTableView, QHeaderView, QMessageBox, QApplication,
+                              QAbstractItemView, QAbstractItemDelegate)
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QKeySequence
+from database.db_manager import DatabaseManager
+from ui.models.notes_grid_model import NotesGridModel
+
+
+class NotesGridView(QTableView):
+    """Tableau de saisie façon tableur : Entrée descend, Ctrl+V colle un bloc TSV, Suppr efface"""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.ContiguousSelection)
+        self.setEditTriggers(
+            QAbstractItemView.EditTrigger.AnyKeyPressed
+            | QAbstractItemView.EditTrigger.DoubleClicked
+            | QAbstractItemView.EditTrigger.EditKeyPressed
+        )
+    
+    def keyPressEvent(self, event):
+        if event.matches(QKeySequence.StandardKey.Paste):
+            self.paste_from_clipboard()
+            return
+        
+        if event.key() in (Qt.Key.Key_Delete, Qt.Key.Key_Backspace):
+            self.clear_selection()
+            return
+        
+        if event.key() in (Qt.Key.Key_Return, Qt.Key.Key_Enter):
+            self.move_current(1, 0)
+            return
+        
+        super().keyPressEvent(event)
+    
+    def closeEditor(self, editor, hint):
+        # Entrée valide la cellule puis passe à l'élève suivant (même question)
+        if hint == QAbstractItemDelegate.EndEditHint.SubmitModelCache:
+            super().closeEditor(editor, QAbstractItemDelegate.EndEditHint.NoHint)
+            self.move_current(1, 0)
+            return
+        super().closeEditor(editor, hint)
+    
+    def move_current(self, d_row, d_col):
+        current = self.currentIndex()
+        if not current.isValid():
+            return
+        target = self.model().index(current.row() + d_row, current.column() + d_col)
+        if target.isValid():
+            self.setCurrentIndex(target)
+    
+    def paste_from_clipboard(self):
+        """Colle un bloc copié depuis un tableur (lignes séparées par des retours, colonnes par des tabulations)"""
+        current = self.currentIndex()
+        if not current.isValid():
+            return
+        
+        text = QApplication.clipboard().text()
+        lignes = [ligne.split('\t') for ligne in text.rstrip('\r\n').splitlines()]
+        self.model().paste_block(current.row(), current.column(), lignes)
+    
+    def clear_selection(self):
+        model = self.model()
+        for index in self.selectedIndexes():
+            if model.flags(index) & Qt.ItemFlag.ItemIsEditable:
+                model.setData(index, "")
+
+
+class NotesGridDialog(QDialog):
+    """Saisie des notes de toute la classe dans une grille élèves × questions"""
+    
+    def __init__(self, parent=None, devoir_id=None):
+        super().__init__(parent)
+        self.devoir_id = devoir_id
+        self.db = DatabaseManager()
+        
+        self.devoir = self.db.get_devoir(devoir_id)
+        self.model = NotesGridModel(self.db.get_notes_matrix(devoir_id), self)
+        
+        self.setWindowTitle(f"Saisie en grille - {self.devoir['nom']}")
+        self.setMinimumSize(1000, 700)
+        
+        self.init_ui()
+    
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+        
+        help_label = QLabel("Flèches/Tab pour naviguer, Entrée pour valider et descendre, "
+                            "Ctrl+V pour coller un bloc copié depuis un tableur, Suppr pour effacer.")
+        help_label.setStyleSheet("color: #666; font-size: 11px;")
+        layout.addWidget(help_label)
+        
+        self.table = NotesGridView()
+        self.table.setModel(self.model)
+        self.table.setAlternatingRowColors(True)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        layout.addWidget(self.table)
+        
+        if self.model.rowCount() > 0:
+            self.table.setCurrentIndex(self.model.index(0, 0))
+        
+        self.info_label = QLabel("Aucune modification")
+        self.info_label.setStyleSheet("color: #666; font-size: 11px; margin-top: 5px;")
+        layout.addWidget(self.info_label)
+        self.model.modificationsChanged.connect(self.update_info)
+        
+        buttons = QHBoxLayout()
+        
+        save_btn = QPushButton("💾 Enregistrer")
+        save_btn.setObjectName("primary-button")
+        save_btn.clicked.connect(self.save)
+        buttons.addWidget(save_btn)
+        
+        cancel_btn = QPushButton("❌ Fermer")
+        cancel_btn.clicked.connect(self.reject)
+        buttons.addWidget(cancel_btn)
+        
+        layout.addLayout(buttons)
+    
+    def update_info(self, nb_modifications):
+        text = f"{nb_modifications} note(s) modifiée(s)" if nb_modifications else "Aucune modification"
+        if self.model.erreurs:
+            text += f" | ⚠️ {len(self.model.erreurs)} saisie(s) invalide(s) ignorée(s)"
+        self.info_label.setText(text)
+    
+    def save(self):
+        """Enregistre toutes les modifications en une seule transaction"""
+        modifications = self.model.get_modifications()
+        
+        if self.model.erreurs:
+            reply = QMessageBox.question(
+                self,
+                "Saisies invalides",
+                f"{len(self.model.erreurs)} saisie(s) invalide(s) seront ignorées. Continuer ?",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+            )
+            if reply != QMessageBox.StandardButton.Yes:
+                return
+        
+        try:
+            if modifications:
+                self.db.save_notes_batch(self.devoir_id, modifications)
+                self.model.mark_saved()
+            self.accept()
+        except Exception as e:
+            QMessageBox.critical(self, "Erreur", f"Erreur lors de la sauvegarde : {str(e)}")
+    
+    def reject(self):
+        if self.model.get_modifications():
+            reply = QMessageBox.question(
+                self,
+                "Modifications non enregistrées",
+                "Des notes ont été modifiées. Fermer sans enregistrer ?",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+            )
+            if reply != QMessageBox.StandardButton.Yes:
+                return
+        super().reject()
@@ -0,0 +1,43 @@
+# tests/test_importers.py
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.importers import read_rows
+
+
+class ReadCsvRowsTest(unittest.TestCase):
+    
+    def test_accent_tardif_cp1252(self):
+        """Un premier accent après plusieurs Ko ne doit pas dupliquer les lignes"""
+        lignes = ["Nom;Prenom;Classe"]
+        lignes += [f"Nom{i:04d};Prenom{i};2nde A" for i in range(1000)]
+        lignes.append("Hélène;Zoé;2nde A")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "eleves.csv")
+            with open(path, 'w', encoding='cp1252', newline='') as f:
+                f.write("\r\n".join(lignes) + "\r\n")
+            self.assertGreater(os.path.getsize(path), 8192)
+            
+            rows = list(read_rows(path))
+        
+        self.assertEqual(len(rows), len(lignes))
+        self.assertEqual(sum(row == ["Nom", "Prenom", "Classe"] for row in rows), 1)
+        self.assertEqual(rows[-1], ["Hélène", "Zoé", "2nde A"])
+    
+    def test_utf8_avec_bom(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "eleves.csv")
+            with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+                f.write("Nom,Prénom,Classe\nÉlise,Noël,1re B\n")
+            
+            rows = list(read_rows(path))
+        
+        self.assertEqual(rows, [["Nom", "Prénom", "Classe"], ["Élise", "Noël", "1re B"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
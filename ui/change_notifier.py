@@ -0,0 +1,100 @@
+# ui/change_notifier.py
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from database.db_manager import DatabaseManager
+
+
+class DataChangeNotifier(QObject):
+    """Relaie les notifications de DatabaseManager sous forme de signal Qt
+    
+    Le signal est remis dans le thread de l'interface même quand l'écriture
+    a eu lieu dans un thread de travail.
+    """
+    changed = pyqtSignal(object)
+    
+    _instance = None
+    
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+            DatabaseManager.subscribe(cls._instance.changed.emit)
+        return cls._instance
+
+
+class GenerationJobNotifier(QObject):
+    """Relaie les événements de la file de génération (voir GenerationScheduler.subscribe)"""
+    job_changed = pyqtSignal(object)
+    
+    _instance = None
+    
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            # Importé à la demande : tire le générateur et les moteurs PDF
+            from utils.generation_queue import GenerationScheduler
+            cls._instance = cls()
+            GenerationScheduler.instance().subscribe(cls._instance.job_changed.emit)
+        return cls._instance
+
+
+class ChangeTracker(QObject):
+    """Accumule les modifications destinées à une page et les applique quand elle est visible
+    
+    Une page masquée est simplement marquée comme à rafraîchir ; une page
+    visible applique les modifications regroupées au prochain tour de boucle.
+    """
+    
+    def __init__(self, page, apply_changes):
+        super().__init__(page)
+        self.page = page
+        self.apply_changes = apply_changes
+        self.changes = []
+        
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(0)
+        self.timer.timeout.connect(self.flush)
+        
+        DataChangeNotifier.instance().changed.connect(self.on_change)
+    
+    def on_change(self, event):
+        self.changes.append(event)
+        if self.page.isVisible():
+            self.timer.start()
+    
+    def is_dirty(self):
+        return bool(self.changes)
+    
+    def clear(self):
+        """Oublie les modifications en attente (après un rechargement complet)"""
+        self.timer.stop()
+        self.changes = []
+    
+    def flush(self):
+        """Applique les modifications en attente, s'il y en a"""
+        self.timer.stop()
+        if self.changes:
+            changes, self.changes = self.changes, []
+            self.apply_changes(changes)
+
+
+def affected_ids(changes, key, types=None, actions=None):
+    """Union des ids `key` ('eleves', 'devoirs', 'classes') des modifications filtrées
+    
+    Retourne None si l'une d'elles concerne tous les enregistrements.
+    """
+    ids = set()
+    for change in changes:
+        if types and change['type'] not in types:
+            continue
+        if actions and change['action'] not in actions:
+            continue
+        if change[key] is None:
+            return None
+        ids.update(change[key])
+    return ids
+
+
+def has_change(changes, types, actions=None):
+    return any(change['type'] in types and (not actions or change['action'] in actions)
+               for change in changes)
@@ -2,11 +2,21 @@
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QHBoxLayout, 
                               QVBoxLayout, QPushButton, QStackedWidget,
                               QLabel, QFrame)
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QIcon
+import importlib
 import os
 
 class MainWindow(QMainWindow):
+    # Pages de la barre latérale (module, classe), construites à la première visite
+    PAGES = [
+        ("ui.pages.dashboard", "DashboardPage"),
+        ("ui.pages.eleves", "ElevesPage"),
+        ("ui.pages.classes", "ClassesPage"),
+        ("ui.pages.devoirs", "DevoirsPage"),
+        ("ui.pages.statistiques", "StatistiquesPage"),
+    ]
+    
     def __init__(self):
         super().__init__()
         self.setWindowTitle("GestionProf - Gestion de notes")
@@ -30,6 +40,17 @@ class MainWindow(QMainWindow):
         self.load_stylesheet()
         
         self.show_page(0)
+        
+        # File de génération : consultée après le premier affichage, démarrée
+        # seulement s'il reste des tâches ou à la première mise en file
+        self.generation_label = QLabel("")
+        self.statusBar().addPermanentWidget(self.generation_label)
+        self.generation_timer = QTimer(self)
+        self.generation_timer.setSingleShot(True)
+        self.generation_timer.setInterval(300)
+        self.generation_timer.timeout.connect(self.update_generation_status)
+        self.generation_started = False
+        self.generation_checked = False
     
     def create_sidebar(self):
         sidebar = QFrame()
@@ -78,24 +99,81 @@ class MainWindow(QMainWindow):
         return sidebar
     
     def add_pages(self):
-        from ui.pages.dashboard import DashboardPage
-        from ui.pages.eleves import ElevesPage
-        from ui.pages.classes import ClassesPage
-        from ui.pages.devoirs import DevoirsPage
-        from ui.pages.statistiques import StatistiquesPage
-        
-        self.content_stack.addWidget(DashboardPage())
-        self.content_stack.addWidget(ElevesPage())
-        self.content_stack.addWidget(ClassesPage())
-        self.content_stack.addWidget(DevoirsPage())
-        self.content_stack.addWidget(StatistiquesPage())
+        """Réserve une place vide par page ; la vraie page est créée par get_page"""
+        self.pages = {}
+        for _ in self.PAGES:
+            self.content_stack.addWidget(QWidget())
+    
+    def get_page(self, index):
+        """Importe et construit la page à sa première utilisation"""
+        if index not in self.pages:
+            module_name, class_name = self.PAGES[index]
+            page_class = getattr(importlib.import_module(module_name), class_name)
+            page = page_class()
+            
+            placeholder = self.content_stack.widget(index)
+            self.content_stack.insertWidget(index, page)
+            self.content_stack.removeWidget(placeholder)
+            placeholder.deleteLater()
+            self.pages[index] = page
+        return self.pages[index]
     
     def show_page(self, index):
-        self.content_stack.setCurrentIndex(index)
+        self.content_stack.setCurrentWidget(self.get_page(index))
         
         for i, btn in enumerate(self.nav_buttons):
             btn.setChecked(i == index)
     
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.generation_checked:
+            self.generation_checked = True
+            QTimer.singleShot(0, self.check_generation_queue)
+    
+    def check_generation_queue(self):
+        """Démarre la file s'il reste des tâches d'une session précédente, sinon à la première mise en file"""
+        from database.db_manager import DatabaseManager
+        from ui.change_notifier import GenerationJobNotifier
+        
+        GenerationJobNotifier.instance().job_changed.connect(self.on_generation_job_changed)
+        if DatabaseManager().has_pending_generation_jobs():
+            self.start_generation_queue()
+        else:
+            self.update_generation_status()
+    
+    def on_generation_job_changed(self, event):
+        if not self.generation_started and event['statut'] == 'en_attente':
+            self.start_generation_queue()
+        self.generation_timer.start()
+    
+    def start_generation_queue(self):
+        """Démarre la génération en arrière-plan (reprise des tâches d'une session précédente)"""
+        from utils.generation_queue import GenerationScheduler
+        
+        GenerationScheduler.instance().start()
+        self.generation_started = True
+        self.update_generation_status()
+    
+    def update_generation_status(self):
+        """Résumé de la file de génération dans la barre d'état"""
+        from database.db_manager import DatabaseManager
+        
+        counts = DatabaseManager().get_generation_queue_counts()
+        parts = []
+        if counts.get('en_cours') or counts.get('en_attente'):
+            parts.append(f"📄 Génération : {counts.get('en_cours', 0)} en cours, "
+                         f"{counts.get('en_attente', 0)} en attente")
+        if counts.get('echec'):
+            parts.append(f"⚠️ {counts['echec']} échec(s)")
+        self.generation_label.setText("   ".join(parts))
+    
+    def closeEvent(self, event):
+        """Arrête la file de génération : les documents non générés reprendront au prochain lancement"""
+        if self.generation_started:
+            from utils.generation_queue import GenerationScheduler
+            GenerationScheduler.instance().stop()
+        super().closeEvent(event)
+    
     def load_stylesheet(self):
         qss_path = os.path.join(os.path.dirname(__file__), "styles", "style.qss")
         if os.path.exists(qss_path):
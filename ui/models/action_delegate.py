@@ -0,0 +1,88 @@
+# ui/models/action_delegate.py
+from PyQt6.QtWidgets import (QStyledItemDelegate, QStyle, QStyleOptionButton,
+                              QApplication, QToolTip)
+from PyQt6.QtCore import Qt, QEvent, QRect, QSize, pyqtSignal
+from ui.models.base_table_model import ID_ROLE
+
+
+class ActionButtonsDelegate(QStyledItemDelegate):
+    """Dessine des boutons d'action dans une cellule au lieu de créer des widgets par ligne
+    
+    `actions` est une liste de tuples (clé, texte, infobulle). Un clic émet
+    actionTriggered(clé, id de l'enregistrement).
+    """
+    actionTriggered = pyqtSignal(str, int)
+    
+    BUTTON_SIZE = 30
+    SPACING = 4
+    MARGIN = 5
+    
+    def __init__(self, actions, parent=None):
+        super().__init__(parent)
+        self.actions = actions
+        self.pressed = None  # (ligne, clé) du bouton enfoncé
+    
+    def button_rects(self, rect):
+        top = rect.top() + (rect.height() - self.BUTTON_SIZE) // 2
+        left = rect.left() + self.MARGIN
+        rects = []
+        for _ in self.actions:
+            rects.append(QRect(left, top, self.BUTTON_SIZE, self.BUTTON_SIZE))
+            left += self.BUTTON_SIZE + self.SPACING
+        return rects
+    
+    def action_at(self, rect, pos):
+        for (key, _, tooltip), button_rect in zip(self.actions, self.button_rects(rect)):
+            if button_rect.contains(pos):
+                return key, tooltip
+        return None, None
+    
+    def paint(self, painter, option, index):
+        # Fond, sélection et couleurs alternées
+        super().paint(painter, option, index)
+        
+        widget = option.widget
+        style = widget.style() if widget else QApplication.style()
+        
+        for (key, text, _), rect in zip(self.actions, self.button_rects(option.rect)):
+            button = QStyleOptionButton()
+            button.rect = rect
+            button.text = text
+            button.state = QStyle.StateFlag.State_Enabled
+            if self.pressed == (index.row(), key):
+                button.state |= QStyle.StateFlag.State_Sunken
+            else:
+                button.state |= QStyle.StateFlag.State_Raised
+            style.drawControl(QStyle.ControlElement.CE_PushButton, button, painter, widget)
+    
+    def sizeHint(self, option, index):
+        count = len(self.actions)
+        width = count * self.BUTTON_SIZE + (count - 1) * self.SPACING + 2 * self.MARGIN
+        return QSize(width, self.BUTTON_SIZE + 4)
+    
+    def editorEvent(self, event, model, option, index):
+        if event.type() not in (QEvent.Type.MouseButtonPress, QEvent.Type.MouseButtonRelease):
+            return False
+        if event.button() != Qt.MouseButton.LeftButton:
+            return False
+        
+        key, _ = self.action_at(option.rect, event.position().toPoint())
+        
+        if event.type() == QEvent.Type.MouseButtonPress:
+            self.pressed = (index.row(), key) if key else None
+            return key is not None
+        
+        was_pressed = self.pressed == (index.row(), key)
+        self.pressed = None
+        if key and was_pressed:
+            self.actionTriggered.emit(key, index.data(ID_ROLE))
+            return True
+        return False
+    
+    def helpEvent(self, event, view, option, index):
+        if event.type() == QEvent.Type.ToolTip:
+            _, tooltip = self.action_at(option.rect, event.pos())
+            if tooltip:
+                QToolTip.showText(event.globalPos(), tooltip, view)
+                return True
+        return super().helpEvent(event, view, option, index)
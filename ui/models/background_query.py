@@ -0,0 +1,90 @@
+# ui/models/background_query.py
+import sqlite3
+import threading
+from PyQt6.QtCore import QObject, QThread, pyqtSignal
+from database.db_manager import DatabaseManager
+
+
+class PageQueryThread(QThread):
+    """Charge la première page d'un modèle dans un thread, avec sa propre connexion"""
+    pageReady = pyqtSignal(object, str, list)  # classe_id, recherche, lignes
+    
+    def __init__(self, model, db_path, classe_id, search_term):
+        super().__init__()
+        self.model = model
+        self.db_path = db_path
+        self.classe_id = classe_id
+        self.search_term = search_term
+        self.cancelled = False
+        self.db = None
+        self.lock = threading.Lock()
+    
+    def run(self):
+        try:
+            with self.lock:
+                if self.cancelled:
+                    return
+                self.db = DatabaseManager.open_separate(self.db_path)
+            
+            rows = self.model.query_page(self.db, None, self.model.PAGE_SIZE,
+                                         self.classe_id, self.search_term)
+            rows = [dict(r) for r in rows]
+            
+            if not self.cancelled:
+                self.pageReady.emit(self.classe_id, self.search_term, rows)
+        except sqlite3.OperationalError as e:
+            # Une requête interrompue par une frappe plus récente n'est pas une erreur
+            if not self.cancelled:
+                print(f"Erreur lors de la recherche: {e}")
+        finally:
+            with self.lock:
+                if self.db:
+                    self.db.close()
+                    self.db = None
+    
+    def cancel(self):
+        """Abandonne la requête en cours (sqlite3 interrupt)"""
+        with self.lock:
+            self.cancelled = True
+            if self.db and self.db.conn:
+                self.db.conn.interrupt()
+
+
+class BackgroundPageLoader(QObject):
+    """Lance les recherches en arrière-plan ; une nouvelle demande annule la précédente"""
+    
+    def __init__(self, model, parent=None):
+        super().__init__(parent)
+        self.model = model
+        self.current = None
+        self.threads = []
+    
+    def request(self, classe_id, search_term):
+        if self.current:
+            self.current.cancel()
+        
+        # Les threads terminés peuvent être libérés
+        self.threads = [t for t in self.threads if not t.isFinished()]
+        
+        thread = PageQueryThread(self.model, self.model.db.db_path, classe_id, search_term)
+        # Connexion à une méthode de cet objet : le résultat arrive dans le thread de l'interface
+        thread.pageReady.connect(self.on_page_ready)
+        self.threads.append(thread)
+        self.current = thread
+        thread.start()
+    
+    def on_page_ready(self, classe_id, search_term, rows):
+        # Ignorer le résultat d'une recherche dépassée entre-temps
+        thread = self.sender()
+        if thread is self.current:
+            self.current = None
+            self.model.set_first_page(classe_id, search_term, rows)
+    
+    def cancel(self):
+        if self.current:
+            self.current.cancel()
+            self.current = None
+    
+    def wait(self):
+        for thread in list(self.threads):
+            thread.wait()
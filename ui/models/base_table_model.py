@@ -0,0 +1,209 @@
+# ui/models/base_table_model.py
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel
+from utils.text import normalize_text
+
+# Rôles personnalisés partagés par les modèles de tableaux
+ID_ROLE = Qt.ItemDataRole.UserRole + 1
+SORT_ROLE = Qt.ItemDataRole.UserRole + 2
+
+
+class RecordsTableModel(QAbstractTableModel):
+    """Modèle de tableau en lecture seule au-dessus d'une liste d'enregistrements (dicts)
+    
+    Les enregistrements sont chargés par pages (pagination par clé) : la vue
+    demande la suite via canFetchMore/fetchMore quand on fait défiler. Les
+    sous-classes définissent COLUMNS (titre, clé), `query_page` et
+    `page_cursor`, et peuvent surcharger `display_value` / `cell_role`.
+    """
+    COLUMNS = []
+    PAGE_SIZE = 200
+    
+    def __init__(self, db, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.records = []
+        self.cursor = None
+        self.complete = False
+        # Filtres appliqués côté SQL quand le jeu de données n'est pas entièrement chargé
+        self.classe_id = None
+        self.search_term = ""
+    
+    def query_page(self, db, after, limit, classe_id, search_term):
+        """Exécute la requête d'une page sur `db` (peut être appelée depuis un autre thread)"""
+        raise NotImplementedError
+    
+    def query_rows(self, db, ids):
+        """Recharge les enregistrements d'ids donnés, avec leurs statistiques"""
+        raise NotImplementedError
+    
+    def page_cursor(self, record):
+        """Clé de pagination du dernier enregistrement d'une page"""
+        raise NotImplementedError
+    
+    def set_filters(self, classe_id=None, search_term=""):
+        """Change les filtres SQL et recharge la première page"""
+        self.classe_id = classe_id
+        self.search_term = search_term
+        self.load()
+    
+    def is_filtered(self):
+        return self.classe_id is not None or bool(self.search_term)
+    
+    def holds_everything(self):
+        """Vrai si tous les enregistrements (sans filtre SQL) sont en mémoire"""
+        return self.complete and not self.is_filtered()
+    
+    def load(self):
+        """Recharge la première page depuis la base"""
+        self.beginResetModel()
+        self.records = []
+        self.cursor = None
+        self.complete = False
+        self.records = self._fetch_next_page()
+        self.endResetModel()
+    
+    def set_first_page(self, classe_id, search_term, rows):
+        """Installe une première page déjà chargée (ex: par une requête en arrière-plan)"""
+        self.beginResetModel()
+        self.classe_id = classe_id
+        self.search_term = search_term
+        self.records = []
+        self.cursor = None
+        self.complete = False
+        self.records = self._prepare_page(rows)
+        self.endResetModel()
+    
+    def _fetch_next_page(self):
+        rows = self.query_page(self.db, self.cursor, self.PAGE_SIZE, self.classe_id, self.search_term)
+        return self._prepare_page(rows)
+    
+    def _prepare_page(self, rows):
+        records = [self.prepare_record(dict(r)) for r in rows]
+        if len(records) < self.PAGE_SIZE:
+            self.complete = True
+        if records:
+            self.cursor = self.page_cursor(records[-1])
+        return records
+    
+    def refresh_rows(self, ids=None, classe_ids=None):
+        """Recharge en place les enregistrements chargés concernés par une modification
+        
+        Une ligne est rechargée si son id est dans `ids` ou sa classe dans
+        `classe_ids`. Les lignes qui n'existent plus en base sont retirées.
+        """
+        ids = ids or set()
+        classe_ids = classe_ids or set()
+        rows = [i for i, record in enumerate(self.records)
+                if record['id'] in ids or record.get('id_classe') in classe_ids]
+        if not rows:
+            return
+        
+        wanted = [self.records[i]['id'] for i in rows]
+        fresh = {}
+        # Par lots pour rester sous la limite de paramètres de SQLite
+        for start in range(0, len(wanted), 500):
+            for row in self.query_rows(self.db, wanted[start:start + 500]):
+                record = self.prepare_record(dict(row))
+                fresh[record['id']] = record
+        
+        last_col = len(self.COLUMNS) - 1
+        for i in reversed(rows):
+            record = fresh.get(self.records[i]['id'])
+            if record is None:
+                self.beginRemoveRows(QModelIndex(), i, i)
+                del self.records[i]
+                self.endRemoveRows()
+            else:
+                self.records[i] = record
+                self.dataChanged.emit(self.index(i, 0), self.index(i, last_col))
+    
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.complete
+    
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self.complete:
+            return
+        records = self._fetch_next_page()
+        if records:
+            first = len(self.records)
+            self.beginInsertRows(QModelIndex(), first, first + len(records) - 1)
+            self.records.extend(records)
+            self.endInsertRows()
+    
+    def prepare_record(self, record):
+        """Point d'extension pour précalculer des champs (clés de recherche...)"""
+        return record
+    
+    def record(self, row):
+        return self.records[row]
+    
+    def column_key(self, col):
+        return self.COLUMNS[col][1]
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.records)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+    
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.COLUMNS[section][0]
+        return None
+    
+    def display_value(self, record, key):
+        value = record.get(key)
+        return "" if value is None else str(value)
+    
+    def sort_value(self, record, key):
+        value = record.get(key)
+        # Les valeurs manquantes sont triées en premier
+        return value if value is not None else ""
+    
+    def cell_role(self, record, key, role):
+        """Rôles de mise en forme (alignement, couleurs) ; None par défaut"""
+        return None
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        
+        record = self.records[index.row()]
+        key = self.column_key(index.column())
+        
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.display_value(record, key)
+        if role == ID_ROLE:
+            return record['id']
+        if role == SORT_ROLE:
+            return self.sort_value(record, key)
+        return self.cell_role(record, key, role)
+
+
+class RecordsFilterProxy(QSortFilterProxyModel):
+    """Filtre par classe et recherche (sans accents) en mémoire, tri sur les valeurs brutes
+    
+    La recherche porte sur le champ `search_key` précalculé par le modèle source.
+    """
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.classe_id = None
+        self.search = ""
+        self.setSortRole(SORT_ROLE)
+    
+    def set_classe(self, classe_id):
+        self.classe_id = classe_id
+        self.invalidateFilter()
+    
+    def set_search(self, text):
+        self.search = normalize_text(text)
+        self.invalidateFilter()
+    
+    def filterAcceptsRow(self, source_row, source_parent):
+        record = self.sourceModel().record(source_row)
+        if self.classe_id is not None and record['id_classe'] != self.classe_id:
+            return False
+        if self.search and self.search not in record['search_key']:
+            return False
+        return True
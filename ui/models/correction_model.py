@@ -0,0 +1,113 @@
+# ui/models/correction_model.py
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QSortFilterProxyModel
+from PyQt6.QtGui import QColor
+from ui.models.base_table_model import ID_ROLE
+
+
+class EleveStatusModel(QAbstractListModel):
+    """Liste des élèves d'un devoir avec leur état de correction et leur note
+
+    Les états viennent de `DatabaseManager.get_etats_correction` ; après une
+    sauvegarde, seule la ligne de l'élève concerné est mise à jour.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.etats = []
+        self.rows_by_id = {}
+
+    def set_etats(self, etats):
+        """Remplace toute la liste (ouverture du dialogue, saisie groupée)"""
+        self.beginResetModel()
+        self.etats = [dict(e) for e in etats]
+        self.rows_by_id = {e['id']: row for row, e in enumerate(self.etats)}
+        self.endResetModel()
+
+    def update_etats(self, etats):
+        """Met à jour en place les lignes des élèves fournis"""
+        for etat in etats:
+            row = self.rows_by_id.get(etat['id'])
+            if row is not None:
+                self.etats[row] = dict(etat)
+                index = self.index(row)
+                self.dataChanged.emit(index, index)
+
+    def etat(self, row):
+        return self.etats[row]
+
+    def is_corrected(self, etat):
+        return etat['nb_notes_saisies'] == etat['nb_questions_total']
+
+    def nb_corriges(self):
+        return sum(1 for e in self.etats if self.is_corrected(e))
+
+    def notes_finales(self):
+        return [e['note_finale'] for e in self.etats if e['note_finale'] is not None]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.etats)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+
+        etat = self.etats[index.row()]
+        nom_complet = f"{etat['nom']} {etat['prenom']}"
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            if not self.is_corrected(etat):
+                return f"⏳ {nom_complet}"
+            if etat['note_finale'] is not None:
+                return f"✅ {nom_complet} ({etat['note_finale']:.2f}/20)"
+            return f"✅ {nom_complet}"
+        if role == Qt.ItemDataRole.ForegroundRole:
+            if not self.is_corrected(etat):
+                return QColor("#999")
+            if etat['note_finale'] is not None:
+                return QColor("#4CAF50")
+            return None
+        if role == ID_ROLE:
+            return etat['id']
+        return None
+
+
+class EleveStatusFilterProxy(QSortFilterProxyModel):
+    """Filtre la liste de correction : non corrigés uniquement et/ou tranche de notes
+
+    Le filtre n'est réévalué que lorsqu'on le change, pas à chaque sauvegarde :
+    l'élève en cours de correction ne disparaît pas de la liste.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.non_corriges_seulement = False
+        self.note_min = None
+        self.note_max = None
+        self.setDynamicSortFilter(False)
+
+    def set_non_corriges_seulement(self, actif):
+        self.non_corriges_seulement = actif
+        self.invalidateFilter()
+
+    def set_tranche_notes(self, note_min=None, note_max=None):
+        """Ne garde que les copies corrigées dont la note est dans [note_min, note_max]"""
+        self.note_min = note_min
+        self.note_max = note_max
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        model = self.sourceModel()
+        etat = model.etat(source_row)
+
+        if self.non_corriges_seulement and model.is_corrected(etat):
+            return False
+
+        if self.note_min is not None or self.note_max is not None:
+            note = etat['note_finale']
+            if note is None:
+                return False
+            if self.note_min is not None and note < self.note_min:
+                return False
+            if self.note_max is not None and note > self.note_max:
+                return False
+        return True
@@ -0,0 +1,75 @@
+# ui/models/devoirs_model.py
+from PyQt6.QtCore import Qt
+from ui.models.base_table_model import RecordsTableModel
+from utils.text import normalize_text
+
+
+class DevoirsTableModel(RecordsTableModel):
+    COLUMNS = [
+        ("Nom", 'nom'),
+        ("Date", 'date'),
+        ("Classe", 'classe_nom'),
+        ("Nb Questions", 'nb_questions'),
+        ("Moyenne", 'moyenne'),
+        ("Correction", 'correction'),
+        ("Actions", 'actions'),
+    ]
+    
+    PAGE_SIZE = 100
+    
+    def query_page(self, db, after, limit, classe_id, search_term):
+        return db.get_devoirs_page(after, limit, classe_id, search_term)
+    
+    def query_rows(self, db, ids):
+        return db.get_devoirs_page(limit=-1, ids=ids)
+    
+    def page_cursor(self, record):
+        return (record['date'] or "", record['id'])
+    
+    def prepare_record(self, record):
+        record['search_key'] = normalize_text(record['nom'])
+        # Avancement de la correction, trié sur la proportion de copies corrigées
+        nb_total = record['nb_eleves_total']
+        record['correction'] = record['nb_corriges'] / nb_total if nb_total else 0
+        return record
+    
+    def sort_value(self, record, key):
+        if key == 'date':
+            # Les dates sont stockées en "yyyy-MM-dd" ou "dd/MM/yyyy"
+            date = record['date'] or ""
+            if '/' in date:
+                return '-'.join(reversed(date.split('/')))
+            return date
+        return super().sort_value(record, key)
+    
+    def display_value(self, record, key):
+        if key == 'moyenne':
+            moyenne = record['moyenne']
+            return f"{moyenne:.2f}/20" if moyenne is not None else "N/A"
+        if key == 'correction':
+            return self.correction_text(record)
+        if key == 'actions':
+            return None
+        return super().display_value(record, key)
+    
+    def correction_text(self, record):
+        nb_corriges = record['nb_corriges']
+        nb_total = record['nb_eleves_total']
+        text = f"{nb_corriges}/{nb_total}"
+        
+        # Badge de statut coloré
+        if nb_total == 0:
+            text += " ⚪"  # Pas d'élèves
+        elif nb_corriges == 0:
+            text += " 🔴"  # Non commencé
+        elif nb_corriges < nb_total:
+            text += " 🟡"  # En cours
+        else:
+            text += " 🟢"  # Terminé
+        return text
+    
+    def cell_role(self, record, key, role):
+        if role == Qt.ItemDataRole.TextAlignmentRole and key in ('nb_questions', 'moyenne', 'correction'):
+            return Qt.AlignmentFlag.AlignCenter
+        return None
+
@@ -0,0 +1,56 @@
+# ui/models/eleves_model.py
+from PyQt6.QtCore import Qt
+from ui.models.base_table_model import RecordsTableModel
+from utils.text import normalize_text
+
+
+class ElevesTableModel(RecordsTableModel):
+    COLUMNS = [
+        ("Nom", 'nom'),
+        ("Prénom", 'prenom'),
+        ("Classe", 'classe_nom'),
+        ("Moyenne", 'moyenne'),
+        ("Nb Devoirs", 'nb_devoirs'),
+        ("Actions", 'actions'),
+    ]
+    
+    def query_page(self, db, after, limit, classe_id, search_term):
+        return db.get_eleves_page(after, limit, classe_id, search_term)
+    
+    def query_rows(self, db, ids):
+        return db.get_eleves_page(limit=-1, ids=ids)
+    
+    def page_cursor(self, record):
+        return (record['nom'] or "", record['prenom'] or "", record['id'])
+    
+    def prepare_record(self, record):
+        record['search_key'] = normalize_text(f"{record['nom']} {record['prenom']}")
+        return record
+    
+    def display_value(self, record, key):
+        if key == 'classe_nom':
+            return record['classe_nom'] or "Sans classe"
+        if key == 'moyenne':
+            return f"{record['moyenne']:.2f}/20"
+        if key == 'actions':
+            return None
+        return super().display_value(record, key)
+    
+    def cell_role(self, record, key, role):
+        if role == Qt.ItemDataRole.TextAlignmentRole and key in ('moyenne', 'nb_devoirs'):
+            return Qt.AlignmentFlag.AlignCenter
+        
+        if key == 'moyenne':
+            moyenne = record['moyenne']
+            # Colorer selon la moyenne
+            if role == Qt.ItemDataRole.BackgroundRole:
+                if moyenne >= 15:
+                    return Qt.GlobalColor.green
+                if moyenne >= 10:
+                    return Qt.GlobalColor.yellow
+                if moyenne > 0:
+                    return Qt.GlobalColor.red
+            if role == Qt.ItemDataRole.ForegroundRole and (moyenne >= 15 or 0 < moyenne < 10):
+                return Qt.GlobalColor.white
+        return None
+
@@ -0,0 +1,159 @@
+# ui/models/notes_grid_model.py
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSignal
+from PyQt6.QtGui import QColor
+from utils.calculs import calculer_notes_finales
+from utils.validators import validate_note, parse_points
+
+
+class NotesGridModel(QAbstractTableModel):
+    """Modèle élèves × questions au-dessus de la matrice des notes d'un devoir
+    
+    Les saisies restent en mémoire jusqu'à `get_modifications`, pour être
+    enregistrées en un seul lot. La dernière colonne affiche la note /20.
+    """
+    modificationsChanged = pyqtSignal(int)
+    
+    def __init__(self, notes_matrix, parent=None):
+        super().__init__(parent)
+        self.eleves = list(notes_matrix['eleves'])
+        self.questions = list(notes_matrix['questions'])
+        # Copie de travail des colonnes (une liste de points par question)
+        self.colonnes = [list(notes_matrix['colonnes'][q['id']]) for q in self.questions]
+        self.originales = [list(colonne) for colonne in self.colonnes]
+        self.points_max = [q['points_max'] for q in self.questions]
+        self.coefficients = [q['coefficient'] for q in self.questions]
+        self.erreurs = {}
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.eleves)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.questions) + 1
+    
+    def is_note_column(self, col):
+        return col == len(self.questions)
+    
+    def note_finale(self, row):
+        colonnes = [[colonne[row]] for colonne in self.colonnes]
+        return calculer_notes_finales(colonnes, self.points_max, self.coefficients)[0] if colonnes else None
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        
+        row, col = index.row(), index.column()
+        
+        if self.is_note_column(col):
+            if role == Qt.ItemDataRole.DisplayRole:
+                note = self.note_finale(row)
+                return f"{note:.2f}" if note is not None else "-"
+            if role == Qt.ItemDataRole.TextAlignmentRole:
+                return Qt.AlignmentFlag.AlignCenter
+            if role == Qt.ItemDataRole.BackgroundRole:
+                return QColor("#ecf0f1")
+            return None
+        
+        points = self.colonnes[col][row]
+        
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            if points is None:
+                return ""
+            return f"{points:g}"
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return Qt.AlignmentFlag.AlignCenter
+        if role == Qt.ItemDataRole.BackgroundRole:
+            if (row, col) in self.erreurs:
+                return QColor("#f8d7da")
+            if points != self.originales[col][row]:
+                return QColor("#fff3cd")
+        if role == Qt.ItemDataRole.ToolTipRole and (row, col) in self.erreurs:
+            return self.erreurs[(row, col)]
+        return None
+    
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        
+        if orientation == Qt.Orientation.Horizontal:
+            if self.is_note_column(section):
+                return "Note /20"
+            q = self.questions[section]
+            return f"Q{q['numero']} (/{q['points_max']:g})"
+        
+        eleve = self.eleves[section]
+        return f"{eleve['nom']} {eleve['prenom']}"
+    
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        if self.is_note_column(index.column()):
+            return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsEditable
+    
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if role != Qt.ItemDataRole.EditRole or not index.isValid() or self.is_note_column(index.column()):
+            return False
+        
+        self._set_cell(index.row(), index.column(), value)
+        self._emit_row_changed(index.row(), index.column(), index.column())
+        self.modificationsChanged.emit(len(self.get_modifications()))
+        return True
+    
+    def _set_cell(self, row, col, value):
+        """Valide et enregistre une saisie dans la copie de travail"""
+        self.erreurs.pop((row, col), None)
+        try:
+            points = parse_points(value)
+        except ValueError:
+            self.erreurs[(row, col)] = f"Valeur invalide : {value}"
+            return
+        
+        if points is not None:
+            is_valid, message = validate_note(points, self.points_max[col])
+            if not is_valid:
+                self.erreurs[(row, col)] = message
+                return
+        
+        self.colonnes[col][row] = points
+    
+    def _emit_row_changed(self, row, first_col, last_col):
+        self.dataChanged.emit(self.index(row, first_col), self.index(row, last_col))
+        # La note /20 de la ligne dépend de toutes ses cellules
+        note_col = len(self.questions)
+        self.dataChanged.emit(self.index(row, note_col), self.index(row, note_col))
+    
+    def paste_block(self, top, left, lignes):
+        """Colle un bloc de valeurs (liste de lignes) à partir de la cellule (top, left)"""
+        if not lignes:
+            return 0
+        
+        nb_collees = 0
+        last_row = min(top + len(lignes), len(self.eleves))
+        for row in range(top, last_row):
+            valeurs = lignes[row - top]
+            last_col = min(left + len(valeurs), len(self.questions))
+            for col in range(left, last_col):
+                self._set_cell(row, col, valeurs[col - left])
+                nb_collees += 1
+            if last_col > left:
+                self._emit_row_changed(row, left, last_col - 1)
+        
+        self.modificationsChanged.emit(len(self.get_modifications()))
+        return nb_collees
+    
+    def get_modifications(self):
+        """Retourne les notes modifiées sous forme de tuples pour DatabaseManager.save_notes_batch"""
+        modifications = []
+        for col, q in enumerate(self.questions):
+            colonne = self.colonnes[col]
+            originale = self.originales[col]
+            for row, eleve in enumerate(self.eleves):
+                if colonne[row] != originale[row]:
+                    modifications.append((eleve['id'], q['id'], colonne[row], None))
+        return modifications
+    
+    def mark_saved(self):
+        """Considère la copie de travail comme enregistrée"""
+        self.originales = [list(colonne) for colonne in self.colonnes]
+        self.dataChanged.emit(self.index(0, 0), self.index(self.rowCount() - 1, self.columnCount() - 1))
+        self.modificationsChanged.emit(0)
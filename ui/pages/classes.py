@@ -4,6 +4,7 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
 from PyQt6.QtCore import Qt
 from database.db_manager import DatabaseManager
 from dialogs.classe_dialog import ClasseDialog
+from ui.change_notifier import ChangeTracker, affected_ids, has_change
 
 class ClasseCard(QFrame):
     def __init__(self, classe_id, nom, nb_eleves, moyenne, nb_devoirs, parent_page):
@@ -14,23 +15,25 @@ class ClasseCard(QFrame):
         
         layout = QVBoxLayout(self)
         
-        nom_label = QLabel(nom)
-        nom_label.setStyleSheet("font-size: 18px; font-weight: bold;")
-        nom_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        layout.addWidget(nom_label)
+        self.nom_label = QLabel()
+        self.nom_label.setStyleSheet("font-size: 18px; font-weight: bold;")
+        self.nom_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(self.nom_label)
         
-        eleves_label = QLabel(f"👥 {nb_eleves} élèves")
-        eleves_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        layout.addWidget(eleves_label)
+        self.eleves_label = QLabel()
+        self.eleves_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(self.eleves_label)
         
-        moyenne_label = QLabel(f"📊 Moyenne: {moyenne:.2f}/20")
-        moyenne_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        layout.addWidget(moyenne_label)
+        self.moyenne_label = QLabel()
+        self.moyenne_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(self.moyenne_label)
         
-        devoirs_label = QLabel(f"📝 {nb_devoirs} devoirs")
-        devoirs_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        devoirs_label.setStyleSheet("color: #666; font-size: 12px;")
-        layout.addWidget(devoirs_label)
+        self.devoirs_label = QLabel()
+        self.devoirs_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.devoirs_label.setStyleSheet("color: #666; font-size: 12px;")
+        layout.addWidget(self.devoirs_label)
+        
+        self.update_stats(nom, nb_eleves, moyenne, nb_devoirs)
         
         buttons_layout = QHBoxLayout()
         
@@ -39,6 +42,11 @@ class ClasseCard(QFrame):
         edit_btn.clicked.connect(self.edit_classe)
         buttons_layout.addWidget(edit_btn)
         
+        bulletins_btn = QPushButton("📑")
+        bulletins_btn.setToolTip("Bulletins de la classe")
+        bulletins_btn.clicked.connect(self.open_bulletins)
+        buttons_layout.addWidget(bulletins_btn)
+        
         delete_btn = QPushButton("🗑️")
         delete_btn.setToolTip("Supprimer la classe")
         delete_btn.clicked.connect(self.delete_classe)
@@ -46,16 +54,27 @@ class ClasseCard(QFrame):
         
         layout.addLayout(buttons_layout)
     
+    def update_stats(self, nom, nb_eleves, moyenne, nb_devoirs):
+        self.nom_label.setText(nom)
+        self.eleves_label.setText(f"👥 {nb_eleves} élèves")
+        self.moyenne_label.setText(f"📊 Moyenne: {moyenne:.2f}/20")
+        self.devoirs_label.setText(f"📝 {nb_devoirs} devoirs")
+    
     def edit_classe(self):
         self.parent_page.edit_classe(self.classe_id)
     
     def delete_classe(self):
         self.parent_page.delete_classe(self.classe_id)
+    
+    def open_bulletins(self):
+        self.parent_page.open_bulletins(self.classe_id)
 
 class ClassesPage(QWidget):
     def __init__(self):
         super().__init__()
         self.db = DatabaseManager()
+        self.cards = {}
+        self.changes = ChangeTracker(self, self.apply_changes)
         self.init_ui()
     
     def init_ui(self):
@@ -109,6 +128,9 @@ class ClassesPage(QWidget):
         QTimer.singleShot(3000, lambda: self.info_label.setText(""))
     
     def load_data(self):
+        self.changes.clear()
+        self.cards = {}
+        
         # Nettoyer la grille
         for i in reversed(range(self.grid_layout.count())): 
             widget = self.grid_layout.itemAt(i).widget()
@@ -134,6 +156,7 @@ class ClassesPage(QWidget):
                 stats['nb_devoirs'],
                 self
             )
+            self.cards[classe['id']] = card
             
             self.grid_layout.addWidget(card, row, col)
             
@@ -142,15 +165,39 @@ class ClassesPage(QWidget):
                 col = 0
                 row += 1
     
+    def apply_changes(self, changes):
+        """Met à jour les seules cartes des classes concernées par les modifications"""
+        classes = affected_ids(changes, 'classes')
+        
+        # Une classe créée ou supprimée change la disposition de la grille
+        if has_change(changes, ('classe',), ('insert', 'delete')) or classes is None:
+            self.load_data()
+            return
+        
+        for classe_id in classes:
+            card = self.cards.get(classe_id)
+            classe = self.db.get_classe(classe_id)
+            if card and classe:
+                stats = self.db.get_classe_stats(classe_id)
+                card.update_stats(classe['nom'], stats['nb_eleves'], stats['moyenne'], stats['nb_devoirs'])
+    
+    # Les dialogues écrivent en base : la page est mise à jour par apply_changes
+    
     def add_classe(self):
         dialog = ClasseDialog(self)
-        if dialog.exec():
-            self.load_data()
+        dialog.exec()
     
     def edit_classe(self, classe_id):
         dialog = ClasseDialog(self, classe_id)
-        if dialog.exec():
-            self.load_data()
+        dialog.exec()
+    
+    def open_bulletins(self, classe_id):
+        """Périodes et bulletins de la classe"""
+        # Importé à la demande : tire le générateur PDF et ses dépendances
+        from dialogs.bulletins_dialog import BulletinsDialog
+        
+        dialog = BulletinsDialog(self, classe_id)
+        dialog.exec()
     
     def delete_classe(self, classe_id):
         reply = QMessageBox.question(
@@ -165,11 +212,10 @@ class ClassesPage(QWidget):
             
             if success:
                 QMessageBox.information(self, "Succès", message)
-                self.load_data()
             else:
                 QMessageBox.warning(self, "Erreur", message)
     
     def showEvent(self, event):
-        """Recharge les données à chaque affichage de la page"""
+        """Applique les modifications survenues pendant que la page était masquée"""
         super().showEvent(event)
-        self.load_data()
\ No newline at end of file
+        self.changes.flush()
\ No newline at end of file
@@ -1,7 +1,8 @@
 # ui/pages/dashboard.py
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QGridLayout, QFrame, QPushButton, QHBoxLayout
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer
 from database.db_manager import DatabaseManager
+from ui.change_notifier import ChangeTracker
 
 class StatCard(QFrame):
     def __init__(self, title, value, icon="📊"):
@@ -26,6 +27,9 @@ class DashboardPage(QWidget):
     def __init__(self):
         super().__init__()
         self.db = DatabaseManager()
+        # Toute écriture peut changer les totaux : la page est simplement marquée à recalculer
+        self.changes = ChangeTracker(self, lambda changes: self.load_stats())
+        self.stats_pending = True
         self.init_ui()
     
     def init_ui(self):
@@ -51,10 +55,10 @@ class DashboardPage(QWidget):
         stats_grid = QGridLayout()
         stats_grid.setSpacing(20)
         
-        self.card_eleves = StatCard("Élèves", "0", "👥")
-        self.card_classes = StatCard("Classes", "0", "🏫")
-        self.card_devoirs = StatCard("Devoirs", "0", "📝")
-        self.card_moyenne = StatCard("Moyenne générale", "0.0", "📈")
+        self.card_eleves = StatCard("Élèves", "…", "👥")
+        self.card_classes = StatCard("Classes", "…", "🏫")
+        self.card_devoirs = StatCard("Devoirs", "…", "📝")
+        self.card_moyenne = StatCard("Moyenne générale", "…", "📈")
         
         stats_grid.addWidget(self.card_eleves, 0, 0)
         stats_grid.addWidget(self.card_classes, 0, 1)
@@ -70,8 +74,6 @@ class DashboardPage(QWidget):
         layout.addWidget(self.info_label)
         
         layout.addStretch()
-        
-        self.load_stats()
     
     def force_refresh(self):
         """Force le recalcul de toutes les statistiques"""
@@ -82,11 +84,12 @@ class DashboardPage(QWidget):
         self.info_label.setText("✅ Statistiques recalculées depuis la base de données")
         
         # Effacer le message après 3 secondes
-        from PyQt6.QtCore import QTimer
         QTimer.singleShot(3000, lambda: self.info_label.setText(""))
     
     def load_stats(self):
         """Charge les statistiques EN TEMPS RÉEL depuis la base de données"""
+        self.stats_pending = False
+        self.changes.clear()
         stats = self.db.get_stats_globales()
         
         self.update_card(self.card_eleves, stats['nb_eleves'])
@@ -97,7 +100,14 @@ class DashboardPage(QWidget):
     def update_card(self, card, value):
         card.value_label.setText(f"{card.icon} {value}")
     
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        # Les agrégats ne sont calculés qu'une fois la page affichée une première fois
+        if self.stats_pending:
+            self.stats_pending = False
+            QTimer.singleShot(0, self.load_stats)
+    
     def showEvent(self, event):
-        """Recharge les stats à chaque affichage de la page"""
+        """Recalcule les stats si la base a été modifiée depuis le dernier affichage"""
         super().showEvent(event)
-        self.load_stats()
\ No newline at end of file
+        self.changes.flush()
\ No newline at end of file
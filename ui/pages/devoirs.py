@@ -1,17 +1,20 @@
 # ui/pages/devoirs.py
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
-                              QLineEdit, QComboBox, QTableWidget, QTableWidgetItem,
+                              QLineEdit, QComboBox, QTableView,
                               QHeaderView, QMessageBox, QLabel)
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer
 from database.db_manager import DatabaseManager
-from dialogs.devoir_dialog import DevoirDialog
-from dialogs.correction_dialog import CorrectionDialog
-from dialogs.generation_cr_dialog import GenerationCRDialog
+from ui.models.base_table_model import RecordsFilterProxy, ID_ROLE
+from ui.models.devoirs_model import DevoirsTableModel
+from ui.models.action_delegate import ActionButtonsDelegate
+from ui.models.background_query import BackgroundPageLoader
+from ui.change_notifier import ChangeTracker, affected_ids, has_change
 
 class DevoirsPage(QWidget):
     def __init__(self):
         super().__init__()
         self.db = DatabaseManager()
+        self.changes = ChangeTracker(self, self.apply_changes)
         self.init_ui()
     
     def init_ui(self):
@@ -26,13 +29,18 @@ class DevoirsPage(QWidget):
         
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("🔍 Rechercher un devoir...")
-        self.search_input.textChanged.connect(self.load_data)
+        # Recherche différée : on attend une courte pause dans la frappe
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(250)
+        self.search_timer.timeout.connect(self.apply_filters)
+        self.search_input.textChanged.connect(self.search_timer.start)
         toolbar.addWidget(self.search_input)
         
         self.classe_filter = QComboBox()
         self.classe_filter.addItem("Toutes les classes", None)
         self.load_classes_filter()
-        self.classe_filter.currentIndexChanged.connect(self.load_data)
+        self.classe_filter.currentIndexChanged.connect(self.apply_filters)
         toolbar.addWidget(self.classe_filter)
         
         # Bouton de rafraîchissement
@@ -43,6 +51,11 @@ class DevoirsPage(QWidget):
         
         toolbar.addStretch()
         
+        queue_btn = QPushButton("📄 Génération groupée")
+        queue_btn.setToolTip("Générer en arrière-plan les comptes-rendus de plusieurs devoirs et classes")
+        queue_btn.clicked.connect(self.open_batch_generation)
+        toolbar.addWidget(queue_btn)
+        
         add_btn = QPushButton("➕ Créer un devoir")
         add_btn.setObjectName("primary-button")
         add_btn.clicked.connect(self.add_devoir)
@@ -50,7 +63,7 @@ class DevoirsPage(QWidget):
         
         layout.addLayout(toolbar)
         
-        self.table = QTableWidget()
+        self.table = QTableView()
         self.setup_table()
         layout.addWidget(self.table)
         
@@ -62,34 +75,56 @@ class DevoirsPage(QWidget):
         self.load_data()
     
     def setup_table(self):
-        self.table.setColumnCount(8)
-        self.table.setHorizontalHeaderLabels([
-            "ID", "Nom", "Date", "Classe", "Nb Questions", "Moyenne", "Correction", "Actions"
-        ])
-        
-        self.table.setColumnHidden(0, True)
+        self.model = DevoirsTableModel(self.db, self)
+        self.proxy = RecordsFilterProxy(self)
+        self.proxy.setSourceModel(self.model)
+        self.table.setModel(self.proxy)
+        self.background_loader = BackgroundPageLoader(self.model, self)
         
         header = self.table.horizontalHeader()
-        header.setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        header.setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)
         header.setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents)
         header.setSectionResizeMode(3, QHeaderView.ResizeMode.ResizeToContents)
         header.setSectionResizeMode(4, QHeaderView.ResizeMode.ResizeToContents)
         header.setSectionResizeMode(5, QHeaderView.ResizeMode.ResizeToContents)
         header.setSectionResizeMode(6, QHeaderView.ResizeMode.ResizeToContents)
-        header.setSectionResizeMode(7, QHeaderView.ResizeMode.ResizeToContents)
+        self.table.verticalHeader().setDefaultSectionSize(38)
+        
+        # Boutons dessinés par un délégué (aucun widget créé par ligne)
+        self.actions_delegate = ActionButtonsDelegate([
+            ('correct', "📊", "Corriger le devoir"),
+            ('generate', "📄", "Générer les comptes-rendus PDF"),
+            ('edit', "✏️", "Modifier le devoir"),
+            ('delete', "🗑️", "Supprimer le devoir"),
+        ], self.table)
+        self.actions_delegate.actionTriggered.connect(self.on_action)
+        self.table.setItemDelegateForColumn(6, self.actions_delegate)
         
         self.table.setAlternatingRowColors(True)
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setSortingEnabled(True)
+        self.table.sortByColumn(1, Qt.SortOrder.DescendingOrder)
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
         
         self.table.doubleClicked.connect(self.edit_devoir)
     
     def load_classes_filter(self):
+        """Recharge la liste des classes en conservant la classe sélectionnée"""
+        selection = self.classe_filter.currentData()
+        
+        self.classe_filter.blockSignals(True)
         self.classe_filter.clear()
         self.classe_filter.addItem("Toutes les classes", None)
         classes = self.db.get_all_classes()
         for classe in classes:
             self.classe_filter.addItem(classe['nom'], classe['id'])
+        self.classe_filter.setCurrentIndex(max(self.classe_filter.findData(selection), 0))
+        self.classe_filter.blockSignals(False)
+        
+        # La classe sélectionnée a été supprimée
+        if self.classe_filter.currentData() != selection:
+            self.apply_filters()
     
     def force_refresh(self):
         """Force le rafraîchissement complet des données depuis la base"""
@@ -97,6 +132,7 @@ class DevoirsPage(QWidget):
         self.db.recalculate_all_moyennes()
         
         # Recharger les données
+        self.load_classes_filter()
         self.load_data()
         
         # Message de confirmation
@@ -107,113 +143,98 @@ class DevoirsPage(QWidget):
         QTimer.singleShot(3000, lambda: self.info_label.setText(""))
     
     def load_data(self):
-        search_term = self.search_input.text()
+        """Recharge la première page des devoirs (avec leurs statistiques) depuis la base"""
+        self.changes.clear()
+        self.background_loader.cancel()
+        self.model.set_filters(None, "")
+        self.apply_filters()
+    
+    def apply_filters(self):
+        """Filtre en mémoire si tout est chargé, sinon interroge la base en arrière-plan"""
+        self.search_timer.stop()
         classe_id = self.classe_filter.currentData()
+        search_term = self.search_input.text().strip()
         
-        # Les données sont maintenant TOUJOURS chargées en temps réel depuis la base
-        devoirs = self.db.get_all_devoirs(classe_id, search_term)
+        if self.model.holds_everything():
+            self.background_loader.cancel()
+            self.proxy.set_classe(classe_id)
+            self.proxy.set_search(search_term)
+        else:
+            self.proxy.set_classe(None)
+            self.proxy.set_search("")
+            if (classe_id, search_term) != (self.model.classe_id, self.model.search_term):
+                # Une nouvelle frappe annule la requête encore en cours
+                self.background_loader.request(classe_id, search_term)
+            else:
+                self.background_loader.cancel()
+    
+    def on_action(self, action, devoir_id):
+        if action == 'correct':
+            self.open_correction(devoir_id)
+        elif action == 'generate':
+            self.generate_comptes_rendus(devoir_id)
+        elif action == 'edit':
+            self.edit_devoir_by_id(devoir_id)
+        elif action == 'delete':
+            self.delete_devoir(devoir_id)
+    
+    def apply_changes(self, changes):
+        """Met à jour la page d'après les modifications notifiées par la base"""
+        if has_change(changes, ('classe',)):
+            self.load_classes_filter()
         
-        self.table.setRowCount(len(devoirs))
+        # Seules les lignes concernées sont rechargées ; un nouveau devoir
+        # doit en revanche trouver sa place dans l'ordre de pagination
+        devoirs = affected_ids(changes, 'devoirs', ('devoir', 'note'))
+        # Un élève ajouté, déplacé ou supprimé change l'avancement des devoirs de sa classe
+        classes = affected_ids(changes, 'classes', ('eleve',))
+        classes_renommees = affected_ids(changes, 'classes', ('classe',), ('update',))
         
-        for row, devoir in enumerate(devoirs):
-            self.table.setItem(row, 0, QTableWidgetItem(str(devoir['id'])))
-            self.table.setItem(row, 1, QTableWidgetItem(devoir['nom']))
-            self.table.setItem(row, 2, QTableWidgetItem(devoir['date']))
-            self.table.setItem(row, 3, QTableWidgetItem(devoir['classe_nom']))
-            
-            nb_q = QTableWidgetItem(str(devoir['nb_questions']))
-            nb_q.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.table.setItem(row, 4, nb_q)
-            
-            # Recalculer la moyenne en temps réel
-            moyenne = self.db.update_moyenne_devoir(devoir['id'])
-            moyenne_text = f"{moyenne:.2f}/20" if moyenne else "N/A"
-            moyenne_item = QTableWidgetItem(moyenne_text)
-            moyenne_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.table.setItem(row, 5, moyenne_item)
-            
-            # Les compteurs de correction sont calculés en temps réel dans la requête
-            nb_corriges = devoir['nb_corriges']
-            nb_total = devoir['nb_eleves_total']
-            correction_text = f"{nb_corriges}/{nb_total}"
-            
-            # Ajouter un badge de statut coloré
-            if nb_total == 0:
-                correction_text += " ⚪"  # Pas d'élèves
-            elif nb_corriges == 0:
-                correction_text += " 🔴"  # Non commencé
-            elif nb_corriges < nb_total:
-                correction_text += " 🟡"  # En cours
-            else:
-                correction_text += " 🟢"  # Terminé
-            
-            correction_item = QTableWidgetItem(correction_text)
-            correction_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.table.setItem(row, 6, correction_item)
-            
-            actions_widget = self.create_actions_widget(devoir['id'])
-            self.table.setCellWidget(row, 7, actions_widget)
-    
-    def create_actions_widget(self, devoir_id):
-        widget = QWidget()
-        layout = QHBoxLayout(widget)
-        layout.setContentsMargins(5, 0, 5, 0)
-        
-        # Bouton Corriger
-        correct_btn = QPushButton("📊")
-        correct_btn.setFixedSize(30, 30)
-        correct_btn.setToolTip("Corriger le devoir")
-        correct_btn.clicked.connect(lambda: self.open_correction(devoir_id))
-        layout.addWidget(correct_btn)
-        
-        # Bouton Générer CR
-        cr_btn = QPushButton("📄")
-        cr_btn.setFixedSize(30, 30)
-        cr_btn.setToolTip("Générer les comptes-rendus PDF")
-        cr_btn.clicked.connect(lambda: self.generate_comptes_rendus(devoir_id))
-        layout.addWidget(cr_btn)
-        
-        edit_btn = QPushButton("✏️")
-        edit_btn.setFixedSize(30, 30)
-        edit_btn.setToolTip("Modifier le devoir")
-        edit_btn.clicked.connect(lambda: self.edit_devoir_by_id(devoir_id))
-        layout.addWidget(edit_btn)
-        
-        delete_btn = QPushButton("🗑️")
-        delete_btn.setFixedSize(30, 30)
-        delete_btn.setToolTip("Supprimer le devoir")
-        delete_btn.clicked.connect(lambda: self.delete_devoir(devoir_id))
-        layout.addWidget(delete_btn)
-        
-        return widget
+        if has_change(changes, ('devoir',), ('insert',)) or None in (devoirs, classes, classes_renommees):
+            self.load_data()
+        else:
+            self.model.refresh_rows(devoirs, classes | classes_renommees)
+    
+    # Les dialogues écrivent en base : la page est mise à jour par apply_changes
     
     def add_devoir(self):
+        from dialogs.devoir_dialog import DevoirDialog
+        
         dialog = DevoirDialog(self)
-        if dialog.exec():
-            self.load_data()
+        dialog.exec()
     
     def open_correction(self, devoir_id):
         """Ouvre l'interface de correction pour un devoir"""
+        from dialogs.correction_dialog import CorrectionDialog
+        
         dialog = CorrectionDialog(self, devoir_id)
         dialog.exec()
-        # Recharger les données après la correction
-        self.load_data()
     
     def generate_comptes_rendus(self, devoir_id):
         """Ouvre le dialog de génération des comptes-rendus"""
+        # Importé à la demande : tire le générateur LaTeX et ses dépendances
+        from dialogs.generation_cr_dialog import GenerationCRDialog
+        
         dialog = GenerationCRDialog(self, devoir_id)
         dialog.exec()
     
-    def edit_devoir(self):
-        current_row = self.table.currentRow()
-        if current_row >= 0:
-            devoir_id = int(self.table.item(current_row, 0).text())
-            self.edit_devoir_by_id(devoir_id)
+    def open_batch_generation(self):
+        """Génération groupée, avec les devoirs sélectionnés déjà cochés"""
+        from dialogs.generation_lot_dialog import GenerationLotDialog
+        
+        devoir_ids = {index.data(ID_ROLE) for index in self.table.selectionModel().selectedRows()}
+        dialog = GenerationLotDialog(self, devoir_ids)
+        dialog.exec()
+    
+    def edit_devoir(self, index):
+        if index.isValid():
+            self.edit_devoir_by_id(index.data(ID_ROLE))
     
     def edit_devoir_by_id(self, devoir_id):
+        from dialogs.devoir_dialog import DevoirDialog
+        
         dialog = DevoirDialog(self, devoir_id)
-        if dialog.exec():
-            self.load_data()
+        dialog.exec()
     
     def delete_devoir(self, devoir_id):
         reply = QMessageBox.question(
@@ -228,12 +249,10 @@ class DevoirsPage(QWidget):
             
             if success:
                 QMessageBox.information(self, "Succès", message)
-                self.load_data()
             else:
                 QMessageBox.warning(self, "Erreur", message)
     
     def showEvent(self, event):
-        """Appelé quand la page devient visible - recharge les données"""
+        """Applique les modifications survenues pendant que la page était masquée"""
         super().showEvent(event)
-        self.load_classes_filter()  # Recharger la liste des classes aussi
-        self.load_data()
\ No newline at end of file
+        self.changes.flush()
\ No newline at end of file
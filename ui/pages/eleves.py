@@ -1,15 +1,21 @@
 # ui/pages/eleves.py
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
-                              QLineEdit, QComboBox, QTableWidget, QTableWidgetItem, 
+                              QLineEdit, QComboBox, QTableView, 
                               QHeaderView, QMessageBox, QLabel)
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer
 from database.db_manager import DatabaseManager
 from dialogs.eleve_dialog import EleveDialog
+from ui.models.base_table_model import RecordsFilterProxy, ID_ROLE
+from ui.models.eleves_model import ElevesTableModel
+from ui.models.action_delegate import ActionButtonsDelegate
+from ui.models.background_query import BackgroundPageLoader
+from ui.change_notifier import ChangeTracker, affected_ids, has_change
 
 class ElevesPage(QWidget):
     def __init__(self):
         super().__init__()
         self.db = DatabaseManager()
+        self.changes = ChangeTracker(self, self.apply_changes)
         self.init_ui()
     
     def init_ui(self):
@@ -24,13 +30,18 @@ class ElevesPage(QWidget):
         
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("🔍 Rechercher un élève...")
-        self.search_input.textChanged.connect(self.load_data)
+        # Recherche différée : on attend une courte pause dans la frappe
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(250)
+        self.search_timer.timeout.connect(self.apply_filters)
+        self.search_input.textChanged.connect(self.search_timer.start)
         toolbar.addWidget(self.search_input)
         
         self.classe_filter = QComboBox()
         self.classe_filter.addItem("Toutes les classes", None)
         self.load_classes_filter()
-        self.classe_filter.currentIndexChanged.connect(self.load_data)
+        self.classe_filter.currentIndexChanged.connect(self.apply_filters)
         toolbar.addWidget(self.classe_filter)
         
         # Bouton de rafraîchissement
@@ -41,6 +52,11 @@ class ElevesPage(QWidget):
         
         toolbar.addStretch()
         
+        import_btn = QPushButton("📥 Importer")
+        import_btn.setToolTip("Importer une liste d'élèves (CSV ou XLSX)")
+        import_btn.clicked.connect(self.import_eleves)
+        toolbar.addWidget(import_btn)
+        
         add_btn = QPushButton("➕ Ajouter un élève")
         add_btn.setObjectName("primary-button")
         add_btn.clicked.connect(self.add_eleve)
@@ -48,7 +64,7 @@ class ElevesPage(QWidget):
         
         layout.addLayout(toolbar)
         
-        self.table = QTableWidget()
+        self.table = QTableView()
         self.setup_table()
         layout.addWidget(self.table)
         
@@ -60,37 +76,58 @@ class ElevesPage(QWidget):
         self.load_data()
     
     def setup_table(self):
-        self.table.setColumnCount(7)
-        self.table.setHorizontalHeaderLabels([
-            "ID", "Nom", "Prénom", "Classe", "Moyenne", "Nb Devoirs", "Actions"
-        ])
-        
-        self.table.setColumnHidden(0, True)
+        self.model = ElevesTableModel(self.db, self)
+        self.proxy = RecordsFilterProxy(self)
+        self.proxy.setSourceModel(self.model)
+        self.table.setModel(self.proxy)
+        self.background_loader = BackgroundPageLoader(self.model, self)
         
         header = self.table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
         header.setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
-        header.setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
+        header.setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents)
         header.setSectionResizeMode(3, QHeaderView.ResizeMode.ResizeToContents)
         header.setSectionResizeMode(4, QHeaderView.ResizeMode.ResizeToContents)
         header.setSectionResizeMode(5, QHeaderView.ResizeMode.ResizeToContents)
-        header.setSectionResizeMode(6, QHeaderView.ResizeMode.ResizeToContents)
+        self.table.verticalHeader().setDefaultSectionSize(38)
+        
+        # Boutons dessinés par un délégué (aucun widget créé par ligne)
+        self.actions_delegate = ActionButtonsDelegate([
+            ('edit', "✏️", "Modifier l'élève"),
+            ('delete', "🗑️", "Supprimer l'élève"),
+        ], self.table)
+        self.actions_delegate.actionTriggered.connect(self.on_action)
+        self.table.setItemDelegateForColumn(5, self.actions_delegate)
         
         self.table.setAlternatingRowColors(True)
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setSortingEnabled(True)
+        self.table.sortByColumn(0, Qt.SortOrder.AscendingOrder)
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
         
         self.table.doubleClicked.connect(self.edit_eleve)
     
     def load_classes_filter(self):
+        """Recharge la liste des classes en conservant la classe sélectionnée"""
+        selection = self.classe_filter.currentData()
+        
+        self.classe_filter.blockSignals(True)
         self.classe_filter.clear()
         self.classe_filter.addItem("Toutes les classes", None)
         classes = self.db.get_all_classes()
         for classe in classes:
             self.classe_filter.addItem(classe['nom'], classe['id'])
+        self.classe_filter.setCurrentIndex(max(self.classe_filter.findData(selection), 0))
+        self.classe_filter.blockSignals(False)
+        
+        # La classe sélectionnée a été supprimée
+        if self.classe_filter.currentData() != selection:
+            self.apply_filters()
     
     def force_refresh(self):
         """Force le rafraîchissement complet des données depuis la base"""
         # Recharger les données
+        self.load_classes_filter()
         self.load_data()
         
         # Message de confirmation
@@ -101,82 +138,72 @@ class ElevesPage(QWidget):
         QTimer.singleShot(3000, lambda: self.info_label.setText(""))
     
     def load_data(self):
-        search_term = self.search_input.text()
+        """Recharge la première page des élèves (avec leurs statistiques) depuis la base"""
+        self.changes.clear()
+        self.background_loader.cancel()
+        self.model.set_filters(None, "")
+        self.apply_filters()
+    
+    def apply_filters(self):
+        """Filtre en mémoire si tout est chargé, sinon interroge la base en arrière-plan"""
+        self.search_timer.stop()
         classe_id = self.classe_filter.currentData()
-        
-        # Les données sont maintenant TOUJOURS chargées en temps réel depuis la base
-        eleves = self.db.get_all_eleves(classe_id, search_term)
-        
-        self.table.setRowCount(len(eleves))
-        
-        for row, eleve in enumerate(eleves):
-            self.table.setItem(row, 0, QTableWidgetItem(str(eleve['id'])))
-            self.table.setItem(row, 1, QTableWidgetItem(eleve['nom']))
-            self.table.setItem(row, 2, QTableWidgetItem(eleve['prenom']))
-            
-            classe_item = QTableWidgetItem(eleve['classe_nom'] or "Sans classe")
-            self.table.setItem(row, 3, classe_item)
-            
-            # Calculer la moyenne en temps réel depuis la base
-            moyenne = self.db.get_moyenne_eleve(eleve['id'])
-            moyenne_item = QTableWidgetItem(f"{moyenne:.2f}/20")
-            moyenne_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            
-            # Colorer selon la moyenne
-            if moyenne >= 15:
-                moyenne_item.setBackground(Qt.GlobalColor.green)
-                moyenne_item.setForeground(Qt.GlobalColor.white)
-            elif moyenne >= 10:
-                moyenne_item.setBackground(Qt.GlobalColor.yellow)
-            elif moyenne > 0:
-                moyenne_item.setBackground(Qt.GlobalColor.red)
-                moyenne_item.setForeground(Qt.GlobalColor.white)
-            
-            self.table.setItem(row, 4, moyenne_item)
-            
-            # Nombre de devoirs corrigés (calculé en temps réel)
-            nb_devoirs = self.db.get_nb_devoirs_eleve(eleve['id'])
-            nb_devoirs_item = QTableWidgetItem(str(nb_devoirs))
-            nb_devoirs_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.table.setItem(row, 5, nb_devoirs_item)
-            
-            actions_widget = self.create_actions_widget(eleve['id'])
-            self.table.setCellWidget(row, 6, actions_widget)
+        search_term = self.search_input.text().strip()
+        
+        if self.model.holds_everything():
+            self.background_loader.cancel()
+            self.proxy.set_classe(classe_id)
+            self.proxy.set_search(search_term)
+        else:
+            self.proxy.set_classe(None)
+            self.proxy.set_search("")
+            if (classe_id, search_term) != (self.model.classe_id, self.model.search_term):
+                # Une nouvelle frappe annule la requête encore en cours
+                self.background_loader.request(classe_id, search_term)
+            else:
+                self.background_loader.cancel()
     
-    def create_actions_widget(self, eleve_id):
-        widget = QWidget()
-        layout = QHBoxLayout(widget)
-        layout.setContentsMargins(5, 0, 5, 0)
-        
-        edit_btn = QPushButton("✏️")
-        edit_btn.setFixedSize(30, 30)
-        edit_btn.setToolTip("Modifier l'élève")
-        edit_btn.clicked.connect(lambda: self.edit_eleve_by_id(eleve_id))
-        layout.addWidget(edit_btn)
-        
-        delete_btn = QPushButton("🗑️")
-        delete_btn.setFixedSize(30, 30)
-        delete_btn.setToolTip("Supprimer l'élève")
-        delete_btn.clicked.connect(lambda: self.delete_eleve(eleve_id))
-        layout.addWidget(delete_btn)
-        
-        return widget
+    def on_action(self, action, eleve_id):
+        if action == 'edit':
+            self.edit_eleve_by_id(eleve_id)
+        elif action == 'delete':
+            self.delete_eleve(eleve_id)
+    
+    def apply_changes(self, changes):
+        """Met à jour la page d'après les modifications notifiées par la base"""
+        if has_change(changes, ('classe',)):
+            self.load_classes_filter()
+        
+        # Seules les lignes concernées sont rechargées ; un nouvel élève
+        # doit en revanche trouver sa place dans l'ordre de pagination
+        eleves = affected_ids(changes, 'eleves', ('eleve', 'note'))
+        classes = affected_ids(changes, 'classes', ('devoir',))
+        classes_renommees = affected_ids(changes, 'classes', ('classe',), ('update',))
+        
+        if has_change(changes, ('eleve',), ('insert',)) or None in (eleves, classes, classes_renommees):
+            self.load_data()
+        else:
+            self.model.refresh_rows(eleves, classes | classes_renommees)
+    
+    # Les dialogues écrivent en base : la page est mise à jour par apply_changes
     
     def add_eleve(self):
         dialog = EleveDialog(self)
-        if dialog.exec():
-            self.load_data()
+        dialog.exec()
     
-    def edit_eleve(self):
-        current_row = self.table.currentRow()
-        if current_row >= 0:
-            eleve_id = int(self.table.item(current_row, 0).text())
-            self.edit_eleve_by_id(eleve_id)
+    def import_eleves(self):
+        from dialogs.import_roster_dialog import ImportRosterDialog
+        
+        dialog = ImportRosterDialog(self)
+        dialog.exec()
+    
+    def edit_eleve(self, index):
+        if index.isValid():
+            self.edit_eleve_by_id(index.data(ID_ROLE))
     
     def edit_eleve_by_id(self, eleve_id):
         dialog = EleveDialog(self, eleve_id)
-        if dialog.exec():
-            self.load_data()
+        dialog.exec()
     
     def delete_eleve(self, eleve_id):
         reply = QMessageBox.question(
@@ -191,12 +218,10 @@ class ElevesPage(QWidget):
             
             if success:
                 QMessageBox.information(self, "Succès", message)
-                self.load_data()
             else:
                 QMessageBox.warning(self, "Erreur", message)
     
     def showEvent(self, event):
-        """Recharge les données à chaque affichage de la page"""
+        """Applique les modifications survenues pendant que la page était masquée"""
         super().showEvent(event)
-        self.load_classes_filter()  # Recharger la liste des classes aussi
-        self.load_data()
\ No newline at end of file
+        self.changes.flush()
\ No newline at end of file
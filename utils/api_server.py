@@ -0,0 +1,437 @@
+# utils/api_server.py
+"""Serveur HTTP local exposant la base de notes en JSON (mode serveur)
+
+Lancé par `python -m cli serve`, il permet de consulter nota.db depuis un
+navigateur sur le réseau de l'établissement. Bibliothèque standard
+uniquement (http.server, un thread par requête).
+
+Lectures (GET) :
+    /api/classes                    /api/classes/<id>       /api/classes/<id>/eleves
+    /api/eleves?classe=&q=          /api/eleves/<id>
+    /api/devoirs?classe=&q=         /api/devoirs/<id>       /api/devoirs/<id>/notes
+    /api/devoirs/<id>/stats         /api/stats
+Écritures (PUT, corps JSON) :
+    /api/devoirs/<id>/notes                  {"notes": [{"eleve", "question", "points", "commentaire"}]}
+    /api/devoirs/<id>/eleves/<id>/notes      {"notes": {"<question>": points}, "appreciation": "..."}
+
+Les lectures empruntent une connexion d'un pool, les écritures passent par
+un écrivain unique (database.pool). Chaque réponse porte un ETag calculé sur
+son contenu ; les réponses agrégées (statistiques, matrices de notes) sont
+de plus gardées en cache tant que la base n'a pas changé, quel que soit le
+processus qui l'a modifiée (PRAGMA data_version). Avec un jeton, les
+écritures exigent l'en-tête `Authorization: Bearer <jeton>`.
+"""
+import hashlib
+import hmac
+import json
+import math
+import re
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+from database.db_manager import DatabaseManager
+from database.pool import ConnectionPool, SerializedWriter, PoolSature
+from utils.calculs import distribution_notes
+from utils.devoir_context import DevoirContext
+from utils.validators import validate_note
+
+# Taille maximale du corps d'une requête d'écriture
+TAILLE_MAX_CORPS = 1024 * 1024
+
+
+class ErreurApi(Exception):
+    """Erreur renvoyée au client avec un code HTTP"""
+    
+    def __init__(self, statut, message):
+        super().__init__(message)
+        self.statut = statut
+
+
+# ========== ROUTES ==========
+
+ROUTES = []
+
+
+def route(methode, motif, agregat=False):
+    """Déclare un point d'entrée ; `agregat` : réponse mise en cache côté serveur"""
+    def decorateur(fonction):
+        ROUTES.append((methode, re.compile(f"^{motif}$"), fonction, agregat))
+        return fonction
+    return decorateur
+
+
+def _ligne(row, nom):
+    if row is None:
+        raise ErreurApi(404, f"{nom} introuvable")
+    return dict(row)
+
+
+def _entier(params, nom):
+    valeur = params.get(nom, [""])[0]
+    if not valeur:
+        return None
+    if not valeur.isdigit():
+        raise ErreurApi(400, f"Paramètre {nom} invalide : {valeur}")
+    return int(valeur)
+
+
+@route("GET", r"/api/classes")
+def lire_classes(db, params):
+    return [dict(c) for c in db.get_all_classes()]
+
+
+@route("GET", r"/api/classes/(\d+)", agregat=True)
+def lire_classe(db, params, classe_id):
+    classe = _ligne(db.get_classe(classe_id), "Classe")
+    classe.update(db.get_classe_stats(classe_id))
+    return classe
+
+
+@route("GET", r"/api/classes/(\d+)/eleves")
+def lire_eleves_classe(db, params, classe_id):
+    _ligne(db.get_classe(classe_id), "Classe")
+    return [dict(e) for e in db.get_all_eleves(classe_id)]
+
+
+@route("GET", r"/api/eleves")
+def lire_eleves(db, params):
+    return [dict(e) for e in db.get_all_eleves(_entier(params, "classe"), params.get("q", [""])[0])]
+
+
+@route("GET", r"/api/eleves/(\d+)", agregat=True)
+def lire_eleve(db, params, eleve_id):
+    eleve = _ligne(db.get_eleve(eleve_id), "Élève")
+    eleve['moyenne'] = db.get_moyenne_eleve(eleve_id)
+    eleve['nb_devoirs'] = db.get_nb_devoirs_eleve(eleve_id)
+    return eleve
+
+
+@route("GET", r"/api/devoirs", agregat=True)
+def lire_devoirs(db, params):
+    devoirs = db.get_devoirs_page(limit=-1, classe_id=_entier(params, "classe"), search_term=params.get("q", [""])[0])
+    return [dict(d) for d in devoirs]
+
+
+@route("GET", r"/api/devoirs/(\d+)")
+def lire_devoir(db, params, devoir_id):
+    devoir = _ligne(db.get_devoir(devoir_id), "Devoir")
+    devoir['questions'] = [dict(q) for q in db.get_questions_devoir(devoir_id)]
+    return devoir
+
+
+def _context(db, devoir_id):
+    _ligne(db.get_devoir(devoir_id), "Devoir")
+    return DevoirContext.load(db, devoir_id)
+
+
+@route("GET", r"/api/devoirs/(\d+)/notes", agregat=True)
+def lire_notes_devoir(db, params, devoir_id):
+    context = _context(db, devoir_id)
+    return {
+        'devoir': context.devoir,
+        'questions': context.questions,
+        'eleves': [
+            {
+                'id': eleve['id'],
+                'nom': eleve['nom'],
+                'prenom': eleve['prenom'],
+                'points': {str(q['id']): colonne[i] for q, colonne in zip(context.questions, context.colonnes)},
+                'note_finale': context.note_finale(eleve['id']),
+                'rang': context.rangs.get(eleve['id']),
+                'appreciation': context.appreciation(eleve['id']),
+            }
+            for i, eleve in enumerate(context.eleves)
+        ],
+    }
+
+
+@route("GET", r"/api/devoirs/(\d+)/stats", agregat=True)
+def lire_stats_devoir(db, params, devoir_id):
+    context = _context(db, devoir_id)
+    notes = list(context.notes_finales.values())
+    return {
+        'id_devoir': devoir_id,
+        'nb_eleves': len(context.eleves),
+        'stats': context.stats,
+        'distribution': dict(zip(["0-5", "5-10", "10-15", "15-20"], distribution_notes(notes))),
+    }
+
+
+@route("GET", r"/api/stats", agregat=True)
+def lire_stats(db, params):
+    return db.get_stats_globales()
+
+
+# ========== ÉCRITURES ==========
+
+def _points(valeur):
+    if valeur is None or valeur == "":
+        return None
+    try:
+        points = float(str(valeur).replace(',', '.'))
+    except ValueError:
+        raise ErreurApi(400, f"Points invalides : {valeur}")
+    # float() et json.loads acceptent NaN et l'infini
+    if not math.isfinite(points):
+        raise ErreurApi(400, f"Points invalides : {valeur}")
+    return points
+
+
+def _enregistrer_notes(db, devoir_id, notes, appreciations=None):
+    """Vérifie puis enregistre un lot de notes (exécuté par l'écrivain)"""
+    devoir = db.get_devoir(devoir_id)
+    if devoir is None:
+        raise ErreurApi(404, "Devoir introuvable")
+    questions = {q['id']: q['points_max'] for q in db.get_questions_devoir(devoir_id)}
+    eleves = {e['id'] for e in db.get_all_eleves(devoir['id_classe'])}
+    
+    for eleve_id, question_id, points, _ in notes:
+        if eleve_id not in eleves:
+            raise ErreurApi(400, f"L'élève {eleve_id} n'est pas dans la classe du devoir")
+        if question_id not in questions:
+            raise ErreurApi(400, f"La question {question_id} n'appartient pas au devoir")
+        if points is not None:
+            valide, message = validate_note(points, questions[question_id])
+            if not valide:
+                raise ErreurApi(400, f"Question {question_id} : {message}")
+    
+    nombre = db.save_notes_batch(devoir_id, notes, appreciations)
+    return {'enregistrees': nombre, 'moyenne': db.get_devoir(devoir_id)['moyenne']}
+
+
+@route("PUT", r"/api/devoirs/(\d+)/notes")
+def ecrire_notes(api, corps, devoir_id):
+    try:
+        notes = [
+            (int(n['eleve']), int(n['question']), _points(n.get('points')), n.get('commentaire'))
+            for n in corps['notes']
+        ]
+    except (KeyError, TypeError, ValueError):
+        raise ErreurApi(400, 'Corps attendu : {"notes": [{"eleve", "question", "points", "commentaire"}]}')
+    return api.writer.execute(_enregistrer_notes, devoir_id, notes)
+
+
+def _enregistrer_copie(db, devoir_id, eleve_id, notes, appreciation):
+    """Notes et appréciation d'une copie, écrites dans une même transaction"""
+    devoir = db.get_devoir(devoir_id)
+    if devoir is None:
+        raise ErreurApi(404, "Devoir introuvable")
+    eleve = db.get_eleve(eleve_id)
+    if eleve is None:
+        raise ErreurApi(404, "Élève introuvable")
+    # Vérifié même sans note : une appréciation seule créerait un compte-rendu orphelin
+    if eleve['id_classe'] != devoir['id_classe']:
+        raise ErreurApi(400, f"L'élève {eleve_id} n'est pas dans la classe du devoir")
+    appreciations = {eleve_id: appreciation} if appreciation is not None else {}
+    return _enregistrer_notes(db, devoir_id, notes, appreciations)
+
+
+@route("PUT", r"/api/devoirs/(\d+)/eleves/(\d+)/notes")
+def ecrire_copie(api, corps, devoir_id, eleve_id):
+    try:
+        notes = [(eleve_id, int(question_id), _points(points), None)
+                 for question_id, points in corps.get('notes', {}).items()]
+        appreciation = corps.get('appreciation')
+    except (AttributeError, TypeError, ValueError):
+        raise ErreurApi(400, 'Corps attendu : {"notes": {"<question>": points}, "appreciation": "..."}')
+    if appreciation is not None and not isinstance(appreciation, str):
+        raise ErreurApi(400, "L'appréciation doit être une chaîne")
+    return api.writer.execute(_enregistrer_copie, devoir_id, eleve_id, notes, appreciation)
+
+
+# ========== SERVEUR ==========
+
+class ApiServer:
+    """Serveur HTTP : pool de lecture, écrivain unique et cache des agrégats"""
+    
+    TAILLE_CACHE = 256
+    
+    def __init__(self, db_path, host="127.0.0.1", port=8080, nb_lecteurs=4, jeton=None):
+        self.db_path = db_path
+        self.jeton = jeton
+        # L'écrivain d'abord : il passe la base en WAL avant l'ouverture des lecteurs
+        self.writer = SerializedWriter(db_path)
+        self.pool = ConnectionPool(db_path, nb_lecteurs)
+        
+        # Connexion témoin : PRAGMA data_version change à chaque écriture
+        # d'une autre connexion, y compris celles de l'application
+        self._temoin = DatabaseManager.open_separate(db_path, check_same_thread=False)
+        self._verrou = threading.Lock()
+        self._data_version = None
+        self._generation = 0
+        self._cache = OrderedDict()  # (méthode, chemin, requête) -> (génération, etag, corps)
+        
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.api = self
+    
+    @property
+    def adresse(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def serve_forever(self):
+        self.httpd.serve_forever()
+    
+    def shutdown(self):
+        """Arrête le serveur (depuis un autre thread que serve_forever)"""
+        self.httpd.shutdown()
+    
+    def close(self):
+        self.httpd.server_close()
+        self.writer.close()
+        self.pool.close()
+        self._temoin.close()
+    
+    # ========== CACHE ==========
+    
+    def generation(self):
+        """Numéro de version des données, incrémenté à chaque modification de la base"""
+        with self._verrou:
+            data_version = self._temoin.conn.execute("PRAGMA data_version").fetchone()[0]
+            if data_version != self._data_version:
+                self._data_version = data_version
+                self._generation += 1
+                self._cache.clear()
+            return self._generation
+    
+    def _cache_get(self, cle, generation):
+        with self._verrou:
+            entree = self._cache.get(cle)
+            if entree is None or entree[0] != generation:
+                return None
+            self._cache.move_to_end(cle)
+            return entree[1], entree[2]
+    
+    def _cache_put(self, cle, generation, etag, corps):
+        with self._verrou:
+            # Réponse calculée pendant une écriture : ne pas la garder
+            if generation != self._generation:
+                return
+            self._cache[cle] = (generation, etag, corps)
+            while len(self._cache) > self.TAILLE_CACHE:
+                self._cache.popitem(last=False)
+    
+    # ========== TRAITEMENT DES REQUÊTES ==========
+    
+    def lire(self, chemin, requete):
+        """Réponse d'un GET : (etag, corps JSON)"""
+        fonction, ids, agregat = self._route("GET", chemin)
+        cle = (chemin, requete)
+        if agregat:
+            generation = self.generation()
+            entree = self._cache_get(cle, generation)
+            if entree is not None:
+                return entree
+        
+        with self.pool.connexion() as db:
+            corps = _json(fonction(db, parse_qs(requete), *ids))
+        etag = '"' + hashlib.sha1(corps).hexdigest()[:20] + '"'
+        if agregat:
+            self._cache_put(cle, generation, etag, corps)
+        return etag, corps
+    
+    def ecrire(self, chemin, corps, autorisation):
+        fonction, ids, _ = self._route("PUT", chemin)
+        if self.jeton and not hmac.compare_digest(autorisation or "", f"Bearer {self.jeton}"):
+            raise ErreurApi(401, "Jeton d'accès manquant ou invalide")
+        try:
+            donnees = json.loads(corps or b"{}")
+        except ValueError:
+            raise ErreurApi(400, "Corps JSON invalide")
+        if not isinstance(donnees, dict):
+            raise ErreurApi(400, "Corps JSON invalide")
+        return _json(fonction(self, donnees, *ids))
+    
+    def _route(self, methode, chemin):
+        trouve = False
+        for methode_route, motif, fonction, agregat in ROUTES:
+            match = motif.match(chemin)
+            if match:
+                trouve = True
+                if methode_route == methode:
+                    return fonction, [int(g) for g in match.groups()], agregat
+        if trouve:
+            raise ErreurApi(405, f"Méthode {methode} non autorisée sur {chemin}")
+        raise ErreurApi(404, f"Ressource inconnue : {chemin}")
+
+
+def _json(donnees):
+    return json.dumps(donnees, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "NotaBene"
+    protocol_version = "HTTP/1.1"
+    # En-têtes et corps envoyés en une fois (vidé à la fin de chaque requête) :
+    # deux petits envois successifs coûtent ~40 ms (Nagle et ACK retardé)
+    wbufsize = 64 * 1024
+    
+    def do_GET(self):
+        url = urlsplit(self.path)
+        # Un GET n'a pas de corps : s'il y en a un, il n'est pas lu
+        if self.headers.get('Content-Length', '0') != '0':
+            self.close_connection = True
+        try:
+            etag, corps = self.server.api.lire(url.path.rstrip('/') or '/', url.query)
+        except Exception as e:
+            self._erreur(e)
+            return
+        
+        if etag in self.headers.get('If-None-Match', ''):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self._repondre(200, corps, etag)
+    
+    def do_PUT(self):
+        url = urlsplit(self.path)
+        try:
+            try:
+                longueur = int(self.headers.get('Content-Length') or 0)
+            except ValueError:
+                raise ErreurApi(400, "En-tête Content-Length invalide")
+            if longueur < 0 or longueur > TAILLE_MAX_CORPS:
+                raise ErreurApi(413, "Corps de requête trop volumineux")
+            corps = self.rfile.read(longueur)
+        except Exception as e:
+            # Corps non lu : le reste du flux ne peut plus être interprété comme une requête
+            self.close_connection = True
+            self._erreur(e)
+            return
+        try:
+            reponse = self.server.api.ecrire(url.path.rstrip('/'), corps, self.headers.get('Authorization'))
+        except Exception as e:
+            self._erreur(e)
+            return
+        self._repondre(200, reponse)
+    
+    def _erreur(self, e):
+        if isinstance(e, ErreurApi):
+            statut = e.statut
+        elif isinstance(e, PoolSature):
+            statut = 503
+        else:
+            print(f"Erreur API ({self.command} {self.path}): {e}")
+            statut = 500
+        self._repondre(statut, _json({'erreur': str(e)}))
+    
+    def _repondre(self, statut, corps, etag=None):
+        self.send_response(statut)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(corps)))
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        if etag:
+            self.send_header('ETag', etag)
+            # Toujours revalider : les notes changent pendant la correction
+            self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(corps)
+    
+    def log_message(self, format, *args):
+        # Pas de journal par requête (tests de charge)
+        pass
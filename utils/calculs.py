@@ -0,0 +1,66 @@
+# utils/calculs.py
+
+
+def calculer_notes_finales(colonnes, points_max, coefficients):
+    """Calcule la note /20 de chaque élève à partir de la matrice des notes
+    
+    `colonnes` contient, pour chaque question, la liste des points obtenus par
+    chaque élève (None si non saisi). Le calcul est fait colonne par colonne,
+    sans aucune requête. Une copie incomplète donne None.
+    """
+    total_max = sum(p * c for p, c in zip(points_max, coefficients))
+    nb_eleves = len(colonnes[0]) if colonnes else 0
+    
+    if total_max == 0:
+        return [None] * nb_eleves
+    
+    totaux = [0.0] * nb_eleves
+    complets = [True] * nb_eleves
+    
+    for colonne, coef in zip(colonnes, coefficients):
+        for i, points in enumerate(colonne):
+            if points is None:
+                complets[i] = False
+            else:
+                totaux[i] += points * coef
+    
+    return [
+        (total / total_max) * 20 if complet else None
+        for total, complet in zip(totaux, complets)
+    ]
+
+
+def statistiques_notes(notes):
+    """Moyenne, médiane, min et max d'une liste de notes (les None sont ignorés)"""
+    valeurs = sorted(n for n in notes if n is not None)
+    nb = len(valeurs)
+    
+    if nb == 0:
+        return {'nb': 0, 'moyenne': None, 'mediane': None, 'min': None, 'max': None}
+    
+    milieu = nb // 2
+    mediane = valeurs[milieu] if nb % 2 else (valeurs[milieu - 1] + valeurs[milieu]) / 2
+    
+    return {
+        'nb': nb,
+        'moyenne': sum(valeurs) / nb,
+        'mediane': mediane,
+        'min': valeurs[0],
+        'max': valeurs[-1]
+    }
+
+
+def distribution_notes(notes, bornes=(0, 5, 10, 15, 20)):
+    """Compte les notes par tranche [b0, b1[, ..., [bn-1, bn] (les None sont ignorés)"""
+    compteurs = [0] * (len(bornes) - 1)
+    
+    for note in notes:
+        if note is None:
+            continue
+        for i in range(len(compteurs)):
+            derniere = i == len(compteurs) - 1
+            if note < bornes[i + 1] or derniere:
+                compteurs[i] += 1
+                break
+    
+    return compteurs
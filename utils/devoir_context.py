@@ -0,0 +1,102 @@
+# utils/devoir_context.py
+import re
+from utils.calculs import calculer_notes_finales, statistiques_notes
+
+_NUMERO_RE = re.compile(r'(\d+)')
+
+
+def question_sort_key(question):
+    """Tri des questions par numéro en tenant compte des nombres (2 avant 10)"""
+    numero = str(question.get('numero', '0'))
+    match = _NUMERO_RE.search(numero)
+    if match:
+        return (int(match.group(1)), numero)
+    return (0, numero)
+
+
+class DevoirContext:
+    """Données d'un devoir partagées par tous les comptes-rendus d'un lot
+    
+    Chargé en un nombre fixe de requêtes (devoir, élèves, questions, notes,
+    appréciations), quel que soit le nombre d'élèves : le rendu de chaque
+    compte-rendu ne fait ensuite plus aucune requête.
+    """
+    
+    def __init__(self, devoir, eleves, questions, colonnes, commentaires, appreciations):
+        self.devoir = dict(devoir)
+        self.eleves = [dict(e) for e in eleves]
+        self.questions = sorted((dict(q) for q in questions), key=question_sort_key)
+        self.appreciations = appreciations
+        
+        self.index_eleves = {e['id']: i for i, e in enumerate(self.eleves)}
+        self.colonnes = [colonnes[q['id']] for q in self.questions]
+        self.commentaires = [commentaires[q['id']] for q in self.questions]
+        
+        notes = calculer_notes_finales(
+            self.colonnes,
+            [q['points_max'] for q in self.questions],
+            [q['coefficient'] for q in self.questions]
+        )
+        self.notes_finales = {e['id']: note for e, note in zip(self.eleves, notes)}
+        
+        # Statistiques de classe sur les copies complètes
+        notes_completes = [n for n in notes if n is not None]
+        self.stats = statistiques_notes(notes_completes)
+        self.moyenne_classe = self.stats['moyenne'] if self.stats['nb'] else 0
+        
+        # Rang de chaque copie complète (les ex aequo partagent le même rang)
+        premier_rang = {}
+        for position, note in enumerate(sorted(notes_completes, reverse=True), start=1):
+            premier_rang.setdefault(note, position)
+        self.rangs = {eid: premier_rang[n] for eid, n in self.notes_finales.items() if n is not None}
+    
+    @classmethod
+    def load(cls, db, devoir_id):
+        devoir = db.get_devoir(devoir_id)
+        if devoir is None:
+            raise Exception(f"Devoir {devoir_id} introuvable")
+        
+        matrix = db.get_notes_matrix(devoir_id, avec_commentaires=True)
+        return cls(
+            devoir,
+            matrix['eleves'],
+            matrix['questions'],
+            matrix['colonnes'],
+            matrix['commentaires'],
+            db.get_appreciations_devoir(devoir_id)
+        )
+    
+    def eleve(self, eleve_id):
+        return self.eleves[self.index_eleves[eleve_id]]
+    
+    def eleves_corriges(self):
+        """Élèves dont toutes les questions sont notées, dans l'ordre alphabétique"""
+        return [e for e in self.eleves if self.is_corrected(e['id'])]
+    
+    def is_corrected(self, eleve_id):
+        i = self.index_eleves[eleve_id]
+        return all(colonne[i] is not None for colonne in self.colonnes)
+    
+    def notes_eleve(self, eleve_id):
+        """Détail par question d'un élève (mêmes champs que get_notes_eleve_devoir)"""
+        i = self.index_eleves[eleve_id]
+        return [
+            {
+                'id': q['id'],
+                'numero': q['numero'],
+                'intitule': q['intitule'],
+                'points_max': q['points_max'],
+                'coefficient': q['coefficient'],
+                'points_obtenus': colonne[i],
+                'commentaire': commentaires[i]
+            }
+            for q, colonne, commentaires in zip(self.questions, self.colonnes, self.commentaires)
+        ]
+    
+    def note_finale(self, eleve_id):
+        """Note /20 arrondie au centième (comme calculate_note_finale), None si incomplète"""
+        note = self.notes_finales.get(eleve_id)
+        return round(note, 2) if note is not None else None
+    
+    def appreciation(self, eleve_id):
+        return self.appreciations.get(eleve_id) or ""
@@ -0,0 +1,385 @@
+# utils/generation_queue.py
+"""File de génération en arrière-plan des comptes-rendus et barèmes
+
+Les documents à produire sont des tâches enregistrées en base (table
+taches_generation) : elles survivent à la fermeture de l'application et
+reprennent au démarrage suivant. Le GenerationScheduler les exécute dans
+quelques threads de travail, chacun avec sa propre connexion SQLite et son
+propre générateur ; un échec est retenté plus tard, jusqu'à MAX_TENTATIVES.
+
+On peut ainsi mettre plusieurs devoirs en file et continuer à corriger
+pendant la génération. Une génération groupée (planifier_lot / lancer_lot)
+met en file en une fois tous les documents de plusieurs devoirs et classes,
+suivis ensemble grâce à leur identifiant de lot.
+"""
+import hashlib
+import os
+import socket
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from database.db_manager import DatabaseManager
+# Le générateur et les moteurs PDF sont importés à la demande : l'application
+# importe ce module dès son ouverture pour suivre la file
+
+# Régénération automatique après une correction : passe après les lots demandés
+PRIORITE_AUTO = -10
+
+
+def enqueue_comptes_rendus(db, devoir_id, output_dir=None, avec_bareme=False, priorite=0, eleve_ids=None,
+                           existants_seulement=False):
+    """Met en file les comptes-rendus des élèves corrigés d'un devoir
+    
+    `eleve_ids` limite la génération à certains élèves ; avec
+    `existants_seulement`, seuls les PDF déjà présents sont régénérés.
+    Retourne le nombre de documents ajoutés (un document déjà en attente
+    n'est pas dupliqué).
+    """
+    from utils.latex_generator import dossier_comptes_rendus
+    
+    devoir = db.get_devoir(devoir_id)
+    if devoir is None:
+        raise Exception(f"Devoir {devoir_id} introuvable")
+    
+    # Chemins absolus : les threads de travail ne dépendent pas du dossier courant
+    output_dir = os.path.abspath(output_dir or dossier_comptes_rendus(devoir))
+    taches = _taches_devoir(db, devoir, output_dir, avec_bareme, eleve_ids, existants_seulement)
+    
+    ajoutees = db.add_generation_jobs(taches, priorite)
+    _signaler_mise_en_file(devoir_id, output_dir)
+    return ajoutees
+
+
+def _taches_devoir(db, devoir, output_dir, avec_bareme=False, eleve_ids=None, existants_seulement=False):
+    """Documents à produire pour un devoir : barème éventuel puis copies complètes"""
+    from utils.latex_generator import nom_fichier_compte_rendu, nom_fichier_bareme
+    
+    devoir_id = devoir['id']
+    os.makedirs(output_dir, exist_ok=True)
+    
+    taches = []
+    if avec_bareme:
+        taches.append({
+            'document': 'bareme',
+            'id_devoir': devoir_id,
+            'id_eleve': None,
+            'chemin': os.path.join(output_dir, nom_fichier_bareme(devoir))
+        })
+    
+    for eleve in db.get_eleves_classe_avec_notes(devoir_id):
+        if eleve_ids is not None and eleve['id'] not in eleve_ids:
+            continue
+        if eleve['nb_questions_total'] == 0 or eleve['nb_notes_saisies'] < eleve['nb_questions_total']:
+            continue
+        chemin = os.path.join(output_dir, nom_fichier_compte_rendu(eleve))
+        if existants_seulement and not os.path.exists(chemin):
+            continue
+        taches.append({
+            'document': 'compte_rendu',
+            'id_devoir': devoir_id,
+            'id_eleve': eleve['id'],
+            'chemin': chemin
+        })
+    return taches
+
+
+def _signaler_mise_en_file(devoir_id, chemin):
+    scheduler = GenerationScheduler.instance()
+    scheduler.wake()
+    scheduler._notify({'id': None, 'document': None, 'id_devoir': devoir_id, 'id_eleve': None,
+                       'chemin': chemin}, 'en_attente')
+
+
+def enqueue_apres_correction(db, devoir_id, eleve_id, moyenne_avant, moyenne_apres):
+    """Régénération incrémentale après la sauvegarde de la copie d'un élève
+    
+    Le compte-rendu de l'élève est mis en file avec une priorité basse. Les
+    autres élèves ne sont concernés que par la moyenne de classe imprimée
+    sur leur compte-rendu : leurs PDF existants ne sont régénérés que si
+    elle a changé au centième près.
+    """
+    output_dir = db.get_generation_output_dir(devoir_id)
+    ajoutees = enqueue_comptes_rendus(db, devoir_id, output_dir, priorite=PRIORITE_AUTO, eleve_ids=[eleve_id])
+    
+    if f"{moyenne_avant or 0:.2f}" != f"{moyenne_apres or 0:.2f}":
+        ajoutees += enqueue_comptes_rendus(db, devoir_id, output_dir, priorite=PRIORITE_AUTO,
+                                           existants_seulement=True)
+    return ajoutees
+
+
+def planifier_lot(db, devoir_ids=(), classe_ids=(), output_root="exports", avec_bareme=True):
+    """Planifie la génération groupée de plusieurs devoirs et classes
+    
+    Les devoirs retenus sont ceux de `devoir_ids` et tous ceux des classes de
+    `classe_ids` ; un devoir sélectionné deux fois n'est planifié qu'une fois
+    (un seul barème, un seul contexte chargé pour toutes ses copies). Chaque
+    devoir a son dossier, rangé par classe sous `output_root`.
+    
+    Retourne {'devoirs': [...], 'classes': [...], 'taches': [...],
+    'nb_comptes_rendus', 'nb_baremes'} ; rien n'est encore mis en file.
+    """
+    devoir_ids = set(devoir_ids)
+    classe_ids = set(classe_ids)
+    racine = os.path.abspath(output_root)
+    
+    devoirs = []
+    taches = []
+    # Ordre de la liste des devoirs : les tâches d'un même devoir se suivent
+    # dans la file, et les threads partagent son contexte
+    for devoir in db.get_all_devoirs_avec_stats():
+        if devoir['id'] not in devoir_ids and devoir['id_classe'] not in classe_ids:
+            continue
+        output_dir = dossier_lot(devoir, racine)
+        taches_devoir = _taches_devoir(db, devoir, output_dir, avec_bareme)
+        if not taches_devoir:
+            continue
+        devoirs.append(devoir)
+        taches.extend(taches_devoir)
+    
+    return {
+        'devoirs': devoirs,
+        'classes': sorted({d['classe_nom'] or "" for d in devoirs}),
+        'taches': taches,
+        'nb_comptes_rendus': sum(1 for t in taches if t['document'] == 'compte_rendu'),
+        'nb_baremes': sum(1 for t in taches if t['document'] == 'bareme'),
+    }
+
+
+def dossier_lot(devoir, racine):
+    """Dossier d'un devoir dans une génération groupée : racine/<classe>/CR_<devoir>"""
+    from utils.latex_generator import dossier_comptes_rendus
+    
+    classe = (devoir['classe_nom'] or "Sans_classe").replace(' ', '_')
+    return dossier_comptes_rendus(devoir, os.path.join(racine, classe))
+
+
+def lancer_lot(db, plan, priorite=0):
+    """Met en file les tâches d'un plan (voir planifier_lot)
+    
+    Retourne l'identifiant du lot, à passer à db.get_generation_batch_counts
+    pour suivre l'avancement.
+    """
+    lot = datetime.now().strftime("lot-%Y%m%d-%H%M%S-%f")
+    db.add_generation_jobs(plan['taches'], priorite, lot=lot)
+    _signaler_mise_en_file(None, lot)
+    return lot
+
+
+def _hash_fichier(path):
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for bloc in iter(lambda: f.read(65536), b""):
+            sha.update(bloc)
+    return sha.hexdigest()
+
+
+class GenerationScheduler:
+    """Exécute les tâches de la file de génération dans des threads de travail"""
+    
+    MAX_TENTATIVES = 3
+    # Contextes de devoir gardés en mémoire (les plus récemment utilisés)
+    CONTEXTES_MAX = 16
+    _instance = None
+    
+    @classmethod
+    def instance(cls):
+        """Ordonnanceur partagé par l'application"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+    
+    def __init__(self, db_path=None, nb_threads=None, renderer=None, intervalle=5.0):
+        self.db_path = db_path
+        # pdflatex est gourmand : quelques threads suffisent, sans saturer le poste
+        self.nb_threads = nb_threads or max(1, min(4, (os.cpu_count() or 2) // 2))
+        self.renderer = renderer
+        # Délai maximal entre deux consultations de la file (tâches différées)
+        self.intervalle = intervalle
+        # Nom inscrit sur les tâches réservées (voir claim_generation_job)
+        self.proprietaire = f"{socket.gethostname()}:{os.getpid()}"
+        self.threads = []
+        self.arret = threading.Event()
+        # Partagé avec les générateurs : interrompt pdflatex à l'arrêt
+        self.annulation = threading.Event()
+        self.reveil = threading.Condition()
+        self._listeners = []
+        
+        # Versions des données par devoir : un contexte chargé avant une
+        # modification n'est plus réutilisé
+        self._verrou = threading.Lock()
+        self._versions = {}
+        self._epoque = 0
+        
+        # Contextes partagés par les threads : devoir -> (version, DevoirContext)
+        self._contextes = OrderedDict()
+        # Un verrou par devoir : un seul thread charge un contexte donné
+        self._chargements = {}
+    
+    # ========== CYCLE DE VIE ==========
+    
+    def start(self, reprendre=True):
+        """Reprend les tâches interrompues et démarre les threads de travail
+        
+        Seules les tâches 'en_cours' dont la réservation a expiré sont
+        reprises : celles d'un processus encore actif (ligne de commande,
+        autre instance) ne sont pas touchées. Avec `reprendre=False`, aucune
+        tâche 'en_cours' n'est reprise.
+        """
+        if self.is_running():
+            return
+        self.arret.clear()
+        self.annulation.clear()
+        
+        if reprendre:
+            db = DatabaseManager.open_separate(self.db_path)
+            try:
+                reprises = db.requeue_running_generation_jobs()
+            finally:
+                db.close()
+            if reprises:
+                print(f"File de génération : {reprises} tâche(s) interrompue(s) remise(s) en attente")
+        
+        DatabaseManager.subscribe(self._on_data_change)
+        self.threads = [
+            threading.Thread(target=self._run, name=f"generation-{i + 1}", daemon=True)
+            for i in range(self.nb_threads)
+        ]
+        for thread in self.threads:
+            thread.start()
+    
+    def stop(self, timeout=10):
+        """Arrête les threads ; les documents en cours retournent dans la file"""
+        self.arret.set()
+        self.annulation.set()
+        self.wake()
+        for thread in self.threads:
+            thread.join(timeout)
+        self.threads = []
+        DatabaseManager.unsubscribe(self._on_data_change)
+    
+    def is_running(self):
+        return any(thread.is_alive() for thread in self.threads)
+    
+    def wake(self):
+        """Signale de nouvelles tâches aux threads en attente"""
+        with self.reveil:
+            self.reveil.notify_all()
+    
+    # ========== NOTIFICATIONS ==========
+    
+    def subscribe(self, callback):
+        """Abonne `callback(event)` aux mises en file et à la fin de chaque tâche
+        
+        `event` reprend les champs de la tâche ('id', 'document', 'id_devoir',
+        'id_eleve', 'chemin') avec son nouveau 'statut' et l''erreur'
+        éventuelle ; une mise en file a le statut 'en_attente' et 'id' None.
+        Le callback est appelé dans le thread qui a mis en file ou généré.
+        """
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+    
+    def unsubscribe(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+    
+    def _notify(self, tache, statut, erreur=None):
+        event = {key: tache[key] for key in ('id', 'document', 'id_devoir', 'id_eleve', 'chemin')}
+        event['statut'] = statut
+        event['erreur'] = erreur
+        for callback in list(self._listeners):
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"Erreur dans un abonné à la file de génération: {e}")
+    
+    def _on_data_change(self, event):
+        """Note les devoirs dont les données ont changé"""
+        with self._verrou:
+            if event['type'] in ('note', 'devoir') and event['devoirs'] is not None:
+                for devoir_id in event['devoirs']:
+                    self._versions[devoir_id] = self._versions.get(devoir_id, 0) + 1
+            else:
+                # Élève renommé, classe modifiée... : tous les contextes sont périmés
+                self._epoque += 1
+    
+    def _version(self, devoir_id):
+        with self._verrou:
+            return (self._epoque, self._versions.get(devoir_id, 0))
+    
+    # ========== THREADS DE TRAVAIL ==========
+    
+    def _run(self):
+        from utils.latex_generator import LatexGenerator
+        
+        db = DatabaseManager.open_separate(self.db_path)
+        generator = LatexGenerator(db, renderer=self.renderer, annulation=self.annulation)
+        try:
+            while not self.arret.is_set():
+                try:
+                    tache = db.claim_generation_job(self.proprietaire)
+                except Exception as e:
+                    # Base verrouillée par une longue écriture : nouvel essai plus tard
+                    print(f"File de génération indisponible: {e}")
+                    tache = None
+                if tache is None:
+                    with self.reveil:
+                        if not self.arret.is_set():
+                            self.reveil.wait(self.intervalle)
+                    continue
+                self._executer(db, generator, tache)
+        finally:
+            db.close()
+    
+    def _context(self, generator, devoir_id):
+        """Contexte du devoir, partagé par les threads et rechargé seulement si ses données ont changé
+        
+        Les threads qui demandent en même temps un contexte absent attendent
+        celui qui le charge au lieu de le charger chacun de leur côté.
+        """
+        with self._verrou:
+            chargement = self._chargements.setdefault(devoir_id, threading.Lock())
+        
+        with chargement:
+            version = self._version(devoir_id)
+            with self._verrou:
+                cache = self._contextes.get(devoir_id)
+                if cache is not None and cache[0] == version:
+                    self._contextes.move_to_end(devoir_id)
+                    return cache[1]
+            
+            context = generator.load_context(devoir_id)
+            with self._verrou:
+                self._contextes[devoir_id] = (version, context)
+                self._contextes.move_to_end(devoir_id)
+                while len(self._contextes) > self.CONTEXTES_MAX:
+                    self._contextes.popitem(last=False)
+            return context
+    
+    def _executer(self, db, generator, tache):
+        from utils.renderers import GenerationAnnulee
+        
+        try:
+            os.makedirs(os.path.dirname(tache['chemin']) or ".", exist_ok=True)
+            if tache['document'] == 'bareme':
+                generator.generate_bareme_pdf(tache['id_devoir'], tache['chemin'])
+            else:
+                context = self._context(generator, tache['id_devoir'])
+                eleve_id = tache['id_eleve']
+                if eleve_id not in context.index_eleves or not context.is_corrected(eleve_id):
+                    # Copie modifiée depuis la mise en file : rien à générer
+                    erreur = "Copie incomplète ou élève absent du devoir"
+                    db.finish_generation_job(tache['id'], 'ignoree', erreur=erreur)
+                    self._notify(tache, 'ignoree', erreur)
+                    return
+                generator.generate_compte_rendu_pdf(tache['id_devoir'], eleve_id, tache['chemin'], context)
+        except GenerationAnnulee:
+            db.release_generation_job(tache['id'])
+            return
+        except Exception as e:
+            statut = db.fail_generation_job(tache['id'], str(e), self.MAX_TENTATIVES)
+            print(f"Erreur de génération ({tache['document']} {tache['chemin']}): {e}")
+            self._notify(tache, statut, str(e))
+            return
+        
+        db.finish_generation_job(tache['id'], 'terminee', hash_sortie=_hash_fichier(tache['chemin']))
+        self._notify(tache, 'terminee')
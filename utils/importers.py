@@ -0,0 +1,407 @@
+# utils/importers.py
+import codecs
+import csv
+import os
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from utils.text import normalize_text
+from utils.validators import validate_note, parse_points
+
+XLSX_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+
+# En-têtes reconnus (normalisés) pour chaque champ d'une liste d'élèves
+ROSTER_HEADERS = {
+    'nom': {'nom', 'nom de famille', 'last name'},
+    'prenom': {'prenom', 'prenoms', 'first name'},
+    'classe': {'classe', 'division', 'groupe'},
+    'eleve': {'eleve', 'eleves', 'nom prenom', 'nom et prenom'},
+}
+
+
+# ========== LECTURE DES FICHIERS ==========
+
+def read_rows(path):
+    """Lit un fichier CSV ou XLSX ligne par ligne (générateur de listes de chaînes)"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.xlsx':
+        yield from _read_xlsx_rows(path)
+    else:
+        yield from _read_csv_rows(path)
+
+
+def _detect_encoding(path):
+    """Premier encodage qui décode tout le fichier
+    
+    Le fichier entier est vérifié avant de lire la moindre ligne : un
+    caractère accentué tardif ne doit pas faire relire (et donc renvoyer
+    deux fois) des lignes déjà produites.
+    """
+    # Les exports de tableurs français sont souvent en Windows-1252
+    for encoding in ('utf-8-sig', 'cp1252'):
+        decoder = codecs.getincrementaldecoder(encoding)()
+        try:
+            with open(path, 'rb') as f:
+                for bloc in iter(lambda: f.read(65536), b""):
+                    decoder.decode(bloc)
+            decoder.decode(b"", final=True)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    raise Exception(f"Encodage du fichier non reconnu : {path}")
+
+
+def _read_csv_rows(path):
+    encoding = _detect_encoding(path)
+    with open(path, 'r', encoding=encoding, newline='') as f:
+        # Le séparateur est déduit de la ligne d'en-tête (les virgules
+        # décimales rendent csv.Sniffer peu fiable sur les notes)
+        header = f.readline()
+        f.seek(0)
+        delimiter = max(';\t,', key=header.count)
+        for row in csv.reader(f, delimiter=delimiter):
+            yield [cell.strip() for cell in row]
+
+
+def _column_index(cell_ref):
+    """Convertit une référence de cellule (ex: 'AB12') en index de colonne (base 0)"""
+    letters = re.match(r'[A-Z]+', cell_ref).group(0)
+    index = 0
+    for letter in letters:
+        index = index * 26 + (ord(letter) - ord('A') + 1)
+    return index - 1
+
+
+def _read_xlsx_rows(path):
+    """Lit la première feuille d'un classeur XLSX en flux (zipfile + iterparse)"""
+    with zipfile.ZipFile(path) as archive:
+        shared_strings = []
+        if 'xl/sharedStrings.xml' in archive.namelist():
+            with archive.open('xl/sharedStrings.xml') as f:
+                for _, elem in ET.iterparse(f):
+                    if elem.tag == XLSX_NS + 'si':
+                        shared_strings.append(''.join(t.text or '' for t in elem.iter(XLSX_NS + 't')))
+                        elem.clear()
+        
+        sheets = sorted(n for n in archive.namelist() if re.match(r'xl/worksheets/sheet\d+\.xml$', n))
+        if not sheets:
+            raise Exception("Aucune feuille trouvée dans le classeur")
+        
+        with archive.open(sheets[0]) as f:
+            for _, elem in ET.iterparse(f):
+                if elem.tag != XLSX_NS + 'row':
+                    continue
+                
+                row = []
+                for cell in elem.iter(XLSX_NS + 'c'):
+                    ref = cell.get('r')
+                    if ref:
+                        # Les cellules vides ne sont pas écrites : combler les trous
+                        row.extend([''] * (_column_index(ref) - len(row)))
+                    
+                    cell_type = cell.get('t')
+                    value = cell.find(XLSX_NS + 'v')
+                    if cell_type == 'inlineStr':
+                        text = ''.join(t.text or '' for t in cell.iter(XLSX_NS + 't'))
+                    elif value is None or value.text is None:
+                        text = ''
+                    elif cell_type == 's':
+                        text = shared_strings[int(value.text)]
+                    else:
+                        text = value.text
+                    row.append(text.strip())
+                
+                elem.clear()
+                yield row
+
+
+def map_headers(header_row, known_headers):
+    """Associe chaque champ connu à l'index de sa colonne dans la ligne d'en-tête"""
+    mapping = {}
+    for i, cell in enumerate(header_row):
+        key = normalize_text(cell)
+        for field, aliases in known_headers.items():
+            if key in aliases and field not in mapping:
+                mapping[field] = i
+    return mapping
+
+
+def split_nom_prenom(text):
+    """Sépare "DUPONT Jean" en ("DUPONT", "Jean") : les mots en majuscules forment le nom"""
+    mots = text.split()
+    nom = [m for m in mots if m.isupper()]
+    prenom = [m for m in mots if not m.isupper()]
+    if not nom or not prenom:
+        return (mots[0], ' '.join(mots[1:])) if len(mots) > 1 else (text, '')
+    return ' '.join(nom), ' '.join(prenom)
+
+
+# ========== IMPORT D'ÉLÈVES ==========
+
+def plan_roster_import(db, path, default_classe=None, progress=None):
+    """Analyse une liste d'élèves sans rien écrire (dry-run)
+    
+    Retourne un dict avec les classes à créer, les élèves à ajouter
+    (nom, prenom, nom de classe), les doublons ignorés et les erreurs par ligne.
+    """
+    classes = {normalize_text(c['nom']): c['nom'] for c in db.get_all_classes()}
+    existants = {
+        (normalize_text(e['nom']), normalize_text(e['prenom']), normalize_text(e['classe_nom']))
+        for e in db.get_all_eleves()
+    }
+    
+    plan = {
+        'classes_a_creer': [],
+        'eleves_a_ajouter': [],
+        'doublons': [],
+        'erreurs': []
+    }
+    
+    rows = read_rows(path)
+    header = next(rows, None)
+    if header is None:
+        return plan
+    
+    mapping = map_headers(header, ROSTER_HEADERS)
+    if not mapping:
+        # Pas d'en-tête reconnu : colonnes nom, prénom, classe dans l'ordre
+        mapping = {'nom': 0, 'prenom': 1, 'classe': 2}
+        rows = _prepend(header, rows)
+        first_line = 1
+    else:
+        first_line = 2
+    
+    def cell(row, field):
+        i = mapping.get(field)
+        return row[i].strip() if i is not None and i < len(row) else ''
+    
+    for line, row in enumerate(rows, start=first_line):
+        if progress and line % 200 == 0:
+            progress(line)
+        
+        if not any(row):
+            continue
+        
+        nom, prenom = cell(row, 'nom'), cell(row, 'prenom')
+        if not nom and not prenom and cell(row, 'eleve'):
+            nom, prenom = split_nom_prenom(cell(row, 'eleve'))
+        classe_nom = cell(row, 'classe') or default_classe
+        
+        if not nom or not prenom:
+            plan['erreurs'].append((line, "Nom ou prénom manquant"))
+            continue
+        if not classe_nom:
+            plan['erreurs'].append((line, f"Classe manquante pour {nom} {prenom}"))
+            continue
+        
+        classe_key = normalize_text(classe_nom)
+        if classe_key not in classes:
+            classes[classe_key] = classe_nom
+            plan['classes_a_creer'].append(classe_nom)
+        
+        key = (normalize_text(nom), normalize_text(prenom), classe_key)
+        if key in existants:
+            plan['doublons'].append((line, f"{nom} {prenom} ({classes[classe_key]})"))
+            continue
+        existants.add(key)
+        
+        plan['eleves_a_ajouter'].append((nom, prenom, classes[classe_key]))
+    
+    return plan
+
+
+def import_roster(db, path, default_classe=None, dry_run=False, progress=None):
+    """Importe une liste d'élèves (CSV/XLSX) en une seule transaction ; retourne le plan appliqué"""
+    plan = plan_roster_import(db, path, default_classe, progress)
+    
+    if not dry_run and (plan['classes_a_creer'] or plan['eleves_a_ajouter']):
+        db.import_eleves(plan['classes_a_creer'], plan['eleves_a_ajouter'])
+    
+    return plan
+
+
+def format_plan(plan):
+    """Résumé lisible d'un plan d'import"""
+    lines = [
+        f"Classes à créer : {len(plan['classes_a_creer'])}",
+        f"Élèves à ajouter : {len(plan['eleves_a_ajouter'])}",
+        f"Doublons ignorés : {len(plan['doublons'])}",
+        f"Lignes en erreur : {len(plan['erreurs'])}",
+    ]
+    if plan['classes_a_creer']:
+        lines.append("")
+        lines.append("Nouvelles classes : " + ", ".join(plan['classes_a_creer']))
+    if plan['eleves_a_ajouter']:
+        lines.append("")
+        lines.extend(f"+ {nom} {prenom} ({classe})" for nom, prenom, classe in plan['eleves_a_ajouter'])
+    if plan['doublons']:
+        lines.append("")
+        lines.extend(f"= ligne {line} : {text} existe déjà" for line, text in plan['doublons'])
+    if plan['erreurs']:
+        lines.append("")
+        lines.extend(f"! ligne {line} : {message}" for line, message in plan['erreurs'])
+    return "\n".join(lines)
+
+
+# ========== IMPORT DE NOTES ==========
+
+def build_name_index(eleves):
+    """Index des élèves par nom normalisé ("nom prenom", "prenom nom" et nom seul)
+    
+    Une clé partagée par plusieurs élèves est marquée ambiguë (valeur None).
+    """
+    index = {}
+    
+    def add(key, eleve_id):
+        if key in index and index[key] != eleve_id:
+            index[key] = None
+        else:
+            index[key] = eleve_id
+    
+    for e in eleves:
+        nom, prenom = normalize_text(e['nom']), normalize_text(e['prenom'])
+        add(f"{nom} {prenom}", e['id'])
+        add(f"{prenom} {nom}", e['id'])
+    
+    # Le nom seul n'est utilisable que s'il ne désigne pas déjà une autre clé
+    noms = {}
+    for e in eleves:
+        noms.setdefault(normalize_text(e['nom']), set()).add(e['id'])
+    for nom, ids in noms.items():
+        if nom not in index:
+            index[nom] = ids.pop() if len(ids) == 1 else None
+    
+    return index
+
+
+def _question_key(text):
+    """Normalise un en-tête de colonne de question : "Q1.a", "Question 1.a" et "1.a" sont équivalents"""
+    key = normalize_text(text)
+    key = re.sub(r'^(question|q)\s*', '', key)
+    return key.replace(' ', '')
+
+
+def plan_grades_import(db, devoir_id, path, progress=None):
+    """Analyse un tableau de notes (une ligne par élève, une colonne par question) sans rien écrire
+    
+    Retourne un dict avec les notes à enregistrer (tuples pour
+    DatabaseManager.save_notes_batch), les colonnes ignorées, les élèves du
+    fichier non reconnus et les erreurs par ligne.
+    """
+    matrix = db.get_notes_matrix(devoir_id)
+    name_index = build_name_index(matrix['eleves'])
+    questions_par_numero = {_question_key(q['numero']): q for q in matrix['questions']}
+    
+    plan = {
+        'notes': [],
+        'nb_eleves': 0,
+        'colonnes_ignorees': [],
+        'erreurs': []
+    }
+    
+    rows = read_rows(path)
+    header = next(rows, None)
+    if header is None:
+        return plan
+    
+    mapping = map_headers(header, ROSTER_HEADERS)
+    if 'nom' not in mapping and 'eleve' not in mapping:
+        raise Exception("Colonne Nom (ou Élève) introuvable dans l'en-tête")
+    
+    name_columns = set(mapping.values())
+    question_columns = []
+    for i, cell in enumerate(header):
+        if i in name_columns or not cell.strip():
+            continue
+        question = questions_par_numero.get(_question_key(cell))
+        if question is None:
+            plan['colonnes_ignorees'].append(cell)
+        else:
+            question_columns.append((i, question))
+    
+    def cell(row, i):
+        return row[i].strip() if i is not None and i < len(row) else ''
+    
+    deja_vus = set()
+    
+    for line, row in enumerate(rows, start=2):
+        if progress and line % 200 == 0:
+            progress(line)
+        
+        if not any(row):
+            continue
+        
+        if 'nom' in mapping:
+            nom = cell(row, mapping['nom'])
+            prenom = cell(row, mapping.get('prenom'))
+            key = normalize_text(f"{nom} {prenom}")
+            libelle = f"{nom} {prenom}".strip()
+        else:
+            libelle = cell(row, mapping['eleve'])
+            key = normalize_text(libelle)
+        
+        if key not in name_index:
+            plan['erreurs'].append((line, f"Élève non reconnu : {libelle}"))
+            continue
+        eleve_id = name_index[key]
+        if eleve_id is None:
+            plan['erreurs'].append((line, f"Nom ambigu : {libelle}"))
+            continue
+        if eleve_id in deja_vus:
+            plan['erreurs'].append((line, f"{libelle} apparaît plusieurs fois"))
+            continue
+        deja_vus.add(eleve_id)
+        
+        notes_ligne = []
+        erreurs_ligne = []
+        for i, question in question_columns:
+            valeur = cell(row, i)
+            try:
+                points = parse_points(valeur)
+            except ValueError:
+                erreurs_ligne.append(f"Q{question['numero']} : valeur invalide \"{valeur}\"")
+                continue
+            if points is None:
+                continue
+            is_valid, message = validate_note(points, question['points_max'])
+            if not is_valid:
+                erreurs_ligne.append(f"Q{question['numero']} : {message}")
+                continue
+            notes_ligne.append((eleve_id, question['id'], points, None))
+        
+        if erreurs_ligne:
+            plan['erreurs'].append((line, f"{libelle} - " + " ; ".join(erreurs_ligne)))
+        if notes_ligne:
+            plan['notes'].extend(notes_ligne)
+            plan['nb_eleves'] += 1
+    
+    return plan
+
+
+def import_grades(db, devoir_id, path, dry_run=False, progress=None):
+    """Importe un tableau de notes en une seule transaction (moyenne recalculée une fois)"""
+    plan = plan_grades_import(db, devoir_id, path, progress)
+    
+    if not dry_run and plan['notes']:
+        db.save_notes_batch(devoir_id, plan['notes'])
+    
+    return plan
+
+
+def format_grades_plan(plan):
+    """Résumé lisible d'un plan d'import de notes"""
+    lines = [
+        f"Notes à enregistrer : {len(plan['notes'])} ({plan['nb_eleves']} élève(s))",
+        f"Lignes en erreur : {len(plan['erreurs'])}",
+    ]
+    if plan['colonnes_ignorees']:
+        lines.append("Colonnes ignorées : " + ", ".join(plan['colonnes_ignorees']))
+    if plan['erreurs']:
+        lines.append("")
+        lines.extend(f"! ligne {line} : {message}" for line, message in plan['erreurs'])
+    return "\n".join(lines)
+
+
+def _prepend(first, rows):
+    yield first
+    yield from rows
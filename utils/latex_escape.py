@@ -0,0 +1,75 @@
+# utils/latex_escape.py
+"""Échappement du texte saisi (intitulés, commentaires, appréciations) pour LaTeX
+
+Un seul parcours du texte avec une expression régulière précompilée : chaque
+caractère spécial est remplacé d'après la table _REMPLACEMENTS. Contrairement
+aux remplacements successifs, un remplacement n'est jamais ré-échappé
+(« \\ » donne bien \\textbackslash{} et non \\textbackslash\\{\\}).
+
+Sont aussi gérés :
+  - les retours à la ligne (appréciations sur plusieurs lignes) -> \\newline{},
+    sans retour à la ligne en début ou en fin de texte ;
+  - les espaces insécables, y compris l'espace fine de la typographie française ;
+  - la ponctuation Unicode courante (guillemets anglais, tirets, points de
+    suspension) et les caractères de contrôle, qui sont supprimés.
+"""
+import re
+
+_REMPLACEMENTS = {
+    # Caractères spéciaux de LaTeX
+    '\\': r'\textbackslash{}',
+    '&': r'\&',
+    '%': r'\%',
+    '$': r'\$',
+    '#': r'\#',
+    '_': r'\_',
+    '{': r'\{',
+    '}': r'\}',
+    '~': r'\textasciitilde{}',
+    '^': r'\textasciicircum{}',
+    # Retours à la ligne
+    '\r\n': r'\newline{}',
+    '\r': r'\newline{}',
+    '\n': r'\newline{}',
+    '\t': ' ',
+    # Espaces insécables (normale, fine insécable) et espace fine
+    '\u00a0': '~',
+    '\u2009': r'\,',
+    '\u202f': r'\,',
+    # Ponctuation Unicode
+    '‘': '`',
+    '’': "'",
+    '“': '``',
+    '”': "''",
+    '–': '--',
+    '—': '---',
+    '…': r'\ldots{}',
+}
+
+# Caractères de contrôle restants : supprimés (pdflatex les refuse)
+for _code in list(range(0x00, 0x20)) + [0x7f]:
+    _REMPLACEMENTS.setdefault(chr(_code), '')
+
+_SPECIAUX_RE = re.compile(
+    r'\r\n|[' + ''.join(re.escape(c) for c in _REMPLACEMENTS if len(c) == 1) + ']'
+)
+
+
+# Supprimés en bordure d'un texte sur plusieurs lignes : espaces et caractères de contrôle
+_BORDURES = "".join(chr(code) for code in range(0x00, 0x21)) + "\x7f"
+
+
+def _remplacement(match):
+    return _REMPLACEMENTS[match.group()]
+
+
+def escape_latex(text):
+    """Échappe un texte pour l'insérer tel quel dans un document LaTeX"""
+    if text is None:
+        return ""
+    
+    text = str(text)
+    if '\n' in text or '\r' in text:
+        # Pas de \newline en début ou fin de paragraphe (erreur LaTeX)
+        text = text.strip(_BORDURES)
+    return _SPECIAUX_RE.sub(_remplacement, text)
@@ -1,13 +1,84 @@
 # utils/latex_generator.py
 import os
-import subprocess
+import threading
+import zipfile
 from datetime import datetime
 from database.db_manager import DatabaseManager
+from utils.devoir_context import DevoirContext, question_sort_key
+from utils.latex_escape import escape_latex
+from utils.renderers import LatexRenderer, GenerationAnnulee, get_renderer, fichier_atomique, publier
+from config import TEMPLATES_DIR, PDF_RENDERER
+
+
+def nom_fichier_compte_rendu(eleve):
+    """Nom du PDF d'un compte-rendu dans le dossier d'un devoir"""
+    return f"CR_{eleve['nom']}_{eleve['prenom']}.pdf".replace(' ', '_')
+
+
+def nom_fichier_bareme(devoir):
+    return f"Bareme_{devoir['nom']}.pdf".replace(' ', '_')
+
+
+def nom_fichier_archive(devoir):
+    return f"CR_{devoir['nom']}.zip".replace(' ', '_')
+
+
+def nom_fichier_livret(devoir):
+    return f"Livret_{devoir['nom']}.pdf".replace(' ', '_')
+
+
+def dossier_comptes_rendus(devoir, racine="exports"):
+    """Dossier d'export par défaut des comptes-rendus d'un devoir"""
+    return os.path.join(racine, "CR_" + devoir['nom'].replace(' ', '_'))
+
+
+def nom_fichier_bulletin(eleve, periode):
+    return f"Bulletin_{periode['nom']}_{eleve['nom']}_{eleve['prenom']}.pdf".replace(' ', '_')
+
+
+def nom_fichier_archive_bulletins(classe, periode):
+    return f"Bulletins_{classe['nom']}_{periode['nom']}.zip".replace(' ', '_')
+
+
+def nom_fichier_livret_bulletins(classe, periode):
+    return f"Bulletins_{classe['nom']}_{periode['nom']}.pdf".replace(' ', '_')
+
+
+def dossier_bulletins(classe, periode, racine="exports"):
+    """Dossier d'export par défaut des bulletins : racine/<classe>/Bulletins_<période>"""
+    return os.path.join(racine, classe['nom'].replace(' ', '_'), "Bulletins_" + periode['nom'].replace(' ', '_'))
+
+
+def couleur_note(note, intensite=70):
+    """Couleur xcolor d'une note /20 : vert, orange ou rouge"""
+    if note >= 15:
+        return f"green!{intensite}"
+    elif note >= 10:
+        return f"orange!{intensite}"
+    return f"red!{intensite}"
+
+
+def _note_texte(note):
+    return f"{note:.2f}" if note is not None else "–"
+
+
+def _date_affichee(date):
+    """Date AAAA-MM-JJ -> JJ/MM/AAAA (inchangée si elle n'est pas dans ce format)"""
+    try:
+        return datetime.strptime(date, "%Y-%m-%d").strftime("%d/%m/%Y")
+    except (TypeError, ValueError):
+        return date or ""
+
 
 class LatexGenerator:
-    def __init__(self, db=None):
+    def __init__(self, db=None, templates_dir=None, renderer=None, annulation=None):
         self.db = db
-        self.templates_dir = "resources/templates"
+        # Gabarits compte_rendu.tex, bareme.tex et bulletin.tex (modifiables sans toucher au code)
+        self.templates_dir = templates_dir or TEMPLATES_DIR
+        # Moteur PDF : "latex" (pdflatex), "natif" (sans dépendance) ou "auto"
+        self.renderer = get_renderer(renderer or PDF_RENDERER, self.templates_dir)
+        # Événement partagé avec le thread appelant pour interrompre une génération
+        self.annulation = annulation or threading.Event()
         self.output_dir = "exports"
         
         # Créer les dossiers s'ils n'existent pas
@@ -21,6 +92,13 @@ class LatexGenerator:
             self.db.connect()
         return self.db
     
+    def cancel(self):
+        """Demande l'arrêt : plus aucun document n'est commencé et pdflatex est interrompu"""
+        self.annulation.set()
+    
+    def is_cancelled(self):
+        return self.annulation.is_set()
+    
     def generate_bareme_pdf(self, devoir_id, output_path=None):
         """Génère le PDF du barème d'un devoir"""
         db = self._get_db()
@@ -30,163 +108,295 @@ class LatexGenerator:
         if not output_path:
             output_path = os.path.join(self.output_dir, f"bareme_{devoir['nom'].replace(' ', '_')}.pdf")
         
-        # Générer le contenu LaTeX
-        latex_content = self._generate_bareme_latex(devoir, questions)
-        
-        # Compiler en PDF
-        pdf_path = self._compile_latex(latex_content, output_path)
-        
-        return pdf_path
+        return self.renderer.render("bareme", self._bareme_vue(devoir, questions), output_path, self.annulation)
     
-    def generate_compte_rendu_pdf(self, devoir_id, eleve_id, output_path=None):
-        """Génère le PDF du compte-rendu d'un élève"""
-        db = self._get_db()
-        devoir = db.get_devoir(devoir_id)
-        eleve = db.get_eleve(eleve_id)
-        notes = db.get_notes_eleve_devoir(eleve_id, devoir_id)
-        note_finale = db.calculate_note_finale(eleve_id, devoir_id)
+    def load_context(self, devoir_id):
+        """Charge en une fois les données d'un devoir communes à tous ses comptes-rendus"""
+        return DevoirContext.load(self._get_db(), devoir_id)
+    
+    def generate_compte_rendu_pdf(self, devoir_id, eleve_id, output_path=None, context=None):
+        """Génère le PDF du compte-rendu d'un élève
         
-        # Calculer les stats du devoir
-        distribution = db.get_distribution_notes_devoir(devoir_id)
-        moyenne_classe = sum(distribution) / len(distribution) if distribution else 0
+        Pour un lot, passer le même `context` (voir load_context) à chaque appel
+        ou utiliser generate_comptes_rendus.
+        """
+        if context is None:
+            context = self.load_context(devoir_id)
         
-        # Récupérer l'appréciation globale depuis la table compte_rendus
-        compte_rendu = db.get_compte_rendu(devoir_id, eleve_id)
-        appreciation = ""
-        if compte_rendu and compte_rendu['appreciation']:
-            appreciation = compte_rendu['appreciation']
+        devoir = context.devoir
+        eleve = context.eleve(eleve_id)
         
         if not output_path:
             filename = f"CR_{devoir['nom']}_{eleve['nom']}_{eleve['prenom']}.pdf".replace(' ', '_')
             output_path = os.path.join(self.output_dir, filename)
         
-        # Générer le contenu LaTeX
-        latex_content = self._generate_cr_latex(devoir, eleve, notes, note_finale, moyenne_classe, appreciation)
-        
-        # Compiler en PDF
-        pdf_path = self._compile_latex(latex_content, output_path)
+        return self.renderer.render("compte_rendu", self._cr_vue_context(context, eleve_id), output_path, self.annulation)
+    
+    def _cr_vue_context(self, context, eleve_id):
+        return self._cr_vue(
+            context.devoir,
+            context.eleve(eleve_id),
+            context.notes_eleve(eleve_id),
+            context.note_finale(eleve_id),
+            context.moyenne_classe,
+            context.appreciation(eleve_id),
+            mediane_classe=context.stats['mediane'],
+            rang=context.rangs.get(eleve_id),
+            nb_copies=context.stats['nb']
+        )
+    
+    def generate_comptes_rendus(self, devoir_id, output_dir, progress=None):
+        """Génère les comptes-rendus de tous les élèves corrigés d'un devoir
+        
+        Le contexte du devoir est chargé une seule fois pour tout le lot.
+        `progress(index, total, eleve)` est appelé avant chaque élève.
+        Retourne (fichiers générés, erreurs) où erreurs est une liste de
+        (eleve, message). Après cancel(), le lot s'arrête et seuls les
+        fichiers déjà terminés sont retournés (voir is_cancelled).
+        """
+        context = self.load_context(devoir_id)
+        os.makedirs(output_dir, exist_ok=True)
         
-        return pdf_path
+        eleves = context.eleves_corriges()
+        generated_files = []
+        erreurs = []
+        
+        for i, eleve in enumerate(eleves):
+            if self.is_cancelled():
+                break
+            if progress:
+                progress(i, len(eleves), eleve)
+            try:
+                output_path = os.path.join(output_dir, nom_fichier_compte_rendu(eleve))
+                
+                pdf_path = self.generate_compte_rendu_pdf(devoir_id, eleve['id'], output_path, context)
+                generated_files.append(pdf_path)
+            except GenerationAnnulee:
+                break
+            except Exception as e:
+                erreurs.append((eleve, str(e)))
+        
+        return generated_files, erreurs
+    
+    def _documents(self, devoir_id, avec_bareme, progress, erreurs):
+        """Génère en mémoire les PDF d'un devoir : (nom de fichier, titre, contenu)
+        
+        Un élève en erreur est ajouté à `erreurs` et sauté ; l'annulation
+        lève GenerationAnnulee.
+        """
+        context = self.load_context(devoir_id)
+        devoir = context.devoir
+        
+        if avec_bareme:
+            questions = self._get_db().get_questions_devoir(devoir_id)
+            vue = self._bareme_vue(devoir, questions)
+            nom = nom_fichier_bareme(devoir)
+            yield nom, "Barème", self.renderer.render_bytes("bareme", vue, self.annulation, nom[:-4])
+        
+        eleves = context.eleves_corriges()
+        for i, eleve in enumerate(eleves):
+            if self.is_cancelled():
+                raise GenerationAnnulee("Génération annulée")
+            if progress:
+                progress(i, len(eleves), eleve)
+            nom = nom_fichier_compte_rendu(eleve)
+            try:
+                vue = self._cr_vue_context(context, eleve['id'])
+                data = self.renderer.render_bytes("compte_rendu", vue, self.annulation, nom[:-4])
+            except GenerationAnnulee:
+                raise
+            except Exception as e:
+                erreurs.append((eleve, str(e)))
+                continue
+            yield nom, f"{eleve['nom']} {eleve['prenom']}", data
+    
+    def generate_archive(self, devoir_id, output_path, avec_bareme=False, progress=None):
+        """Génère les comptes-rendus d'un devoir directement dans une archive ZIP
+        
+        Chaque PDF est ajouté à l'archive dès qu'il est produit, sans passer
+        par un fichier sur disque. L'archive n'apparaît qu'une fois complète :
+        après cancel(), GenerationAnnulee est levée et rien n'est écrit.
+        Retourne (nombre de documents, erreurs).
+        """
+        erreurs = []
+        nombre = self._ecrire_archive(self._documents(devoir_id, avec_bareme, progress, erreurs), output_path)
+        return nombre, erreurs
+    
+    def _ecrire_archive(self, documents, output_path):
+        """Archive ZIP des documents (nom, titre, contenu) ; retourne leur nombre"""
+        nombre = 0
+        with fichier_atomique(output_path) as f:
+            # PDF déjà compressés : stockés sans recompression
+            with zipfile.ZipFile(f, 'w', zipfile.ZIP_STORED) as archive:
+                for nom, _, data in documents:
+                    archive.writestr(zipfile.ZipInfo(nom, datetime.now().timetuple()[:6]), data)
+                    nombre += 1
+        return nombre
+    
+    def generate_livret(self, devoir_id, output_path, avec_bareme=False, progress=None):
+        """Génère un seul PDF à imprimer regroupant les comptes-rendus d'un devoir
+        
+        Les PDF produits sont assemblés au niveau des objets (sans nouveau
+        rendu) avec un signet par élève. Même publication et même annulation
+        que generate_archive. Retourne (nombre de pages, erreurs).
+        """
+        erreurs = []
+        titre = self._get_db().get_devoir(devoir_id)['nom']
+        pages = self._ecrire_livret(self._documents(devoir_id, avec_bareme, progress, erreurs), output_path, titre)
+        return pages, erreurs
+    
+    def _ecrire_livret(self, documents, output_path, titre):
+        """Livret PDF des documents (nom, titre, contenu), un signet par document ; retourne le nombre de pages"""
+        from utils.pdf_merge import LivretPdf
+        
+        with fichier_atomique(output_path) as f:
+            livret = LivretPdf(f, titre=titre)
+            pages = 0
+            for _, signet, data in documents:
+                pages += livret.ajouter(data, signet)
+            livret.fermer()
+        return pages
     
     def generate_all_comptes_rendus(self, devoir_id, output_dir=None):
         """Génère tous les comptes-rendus d'un devoir"""
         db = self._get_db()
         if not output_dir:
-            devoir = db.get_devoir(devoir_id)
-            devoir_name = devoir['nom'].replace(' ', '_')
-            output_dir = os.path.join(self.output_dir, f"CR_{devoir_name}")
+            output_dir = dossier_comptes_rendus(db.get_devoir(devoir_id), self.output_dir)
+        
+        generated_files, erreurs = self.generate_comptes_rendus(devoir_id, output_dir)
+        for eleve, message in erreurs:
+            print(f"Erreur pour {eleve['nom']} {eleve['prenom']}: {message}")
         
+        return generated_files, output_dir
+    
+    # ========== BULLETINS ==========
+    
+    def load_bulletins(self, classe_id, periode_id=None):
+        """Moyennes, rangs et statistiques de toute la classe, calculés en une requête"""
+        return self._get_db().get_bulletins_classe(classe_id, periode_id)
+    
+    def _bulletins(self, bulletins, progress, erreurs):
+        """Génère en mémoire les bulletins des élèves ayant au moins une copie complète
+        
+        Même forme et même gestion des erreurs que _documents ; aucune
+        requête n'est faite pendant le rendu.
+        """
+        eleves = [e for e in bulletins['eleves'] if e['moyenne'] is not None]
+        for i, eleve in enumerate(eleves):
+            if self.is_cancelled():
+                raise GenerationAnnulee("Génération annulée")
+            if progress:
+                progress(i, len(eleves), eleve)
+            nom = nom_fichier_bulletin(eleve, bulletins['periode'])
+            try:
+                vue = self._bulletin_vue(bulletins, eleve)
+                data = self.renderer.render_bytes("bulletin", vue, self.annulation, nom[:-4])
+            except GenerationAnnulee:
+                raise
+            except Exception as e:
+                erreurs.append((eleve, str(e)))
+                continue
+            yield nom, f"{eleve['nom']} {eleve['prenom']}", data
+    
+    def generate_bulletins(self, classe_id, periode_id, output_dir, progress=None):
+        """Génère le bulletin de chaque élève d'une classe pour une période (None : l'année)
+        
+        Les moyennes de toute la classe sont calculées une seule fois avant
+        le lot. Retourne (fichiers générés, erreurs) comme
+        generate_comptes_rendus ; après cancel(), seuls les fichiers déjà
+        terminés sont retournés.
+        """
+        bulletins = self.load_bulletins(classe_id, periode_id)
         os.makedirs(output_dir, exist_ok=True)
         
-        eleves = db.get_eleves_classe_avec_notes(devoir_id)
         generated_files = []
-        
-        for eleve in eleves:
-            # Vérifier que l'élève a toutes ses notes
-            if eleve['nb_notes_saisies'] == eleve['nb_questions_total']:
-                try:
-                    filename = f"CR_{eleve['nom']}_{eleve['prenom']}.pdf".replace(' ', '_')
-                    output_path = os.path.join(output_dir, filename)
-                    
-                    pdf_path = self.generate_compte_rendu_pdf(devoir_id, eleve['id'], output_path)
-                    generated_files.append(pdf_path)
-                except Exception as e:
-                    print(f"Erreur pour {eleve['nom']} {eleve['prenom']}: {e}")
-        
-        return generated_files, output_dir
+        erreurs = []
+        try:
+            for nom, _, data in self._bulletins(bulletins, progress, erreurs):
+                generated_files.append(publier(data, os.path.join(output_dir, nom)))
+        except GenerationAnnulee:
+            pass
+        return generated_files, erreurs
+    
+    def generate_archive_bulletins(self, classe_id, periode_id, output_path, progress=None):
+        """Bulletins d'une classe dans une archive ZIP (voir generate_archive)"""
+        erreurs = []
+        bulletins = self.load_bulletins(classe_id, periode_id)
+        nombre = self._ecrire_archive(self._bulletins(bulletins, progress, erreurs), output_path)
+        return nombre, erreurs
+    
+    def generate_livret_bulletins(self, classe_id, periode_id, output_path, progress=None):
+        """Bulletins d'une classe dans un seul PDF à imprimer (voir generate_livret)"""
+        erreurs = []
+        bulletins = self.load_bulletins(classe_id, periode_id)
+        titre = f"Bulletins {bulletins['classe']['nom']} – {bulletins['periode']['nom']}"
+        pages = self._ecrire_livret(self._bulletins(bulletins, progress, erreurs), output_path, titre)
+        return pages, erreurs
+    
+    def _bulletin_vue(self, bulletins, eleve):
+        """Données du bulletin d'un élève pour le moteur de rendu"""
+        periode = bulletins['periode']
+        stats = bulletins['stats']
+        moyenne = eleve['moyenne']
+        
+        lignes = []
+        for devoir in bulletins['devoirs']:
+            note = eleve['notes'].get(devoir['id'])
+            lignes.append({
+                'nom': devoir['nom'],
+                'date': _date_affichee(devoir['date']),
+                'poids': devoir['poids'],
+                'note': _note_texte(note),
+                'moyenne': _note_texte(devoir['moyenne']),
+                'min': _note_texte(devoir['min']),
+                'max': _note_texte(devoir['max']),
+                'couleur': couleur_note(note, 20) if note is not None else "gray!10"
+            })
+        
+        if periode['date_debut']:
+            dates = f"du {_date_affichee(periode['date_debut'])} au {_date_affichee(periode['date_fin'])}"
+        else:
+            dates = ""
+        
+        return {
+            'classe': bulletins['classe'],
+            'periode': {'nom': periode['nom'], 'dates': dates},
+            'eleve': eleve,
+            'moyenne': moyenne,
+            'couleur_moyenne': couleur_note(moyenne),
+            'rang': eleve['rang'],
+            'nb_classes': stats['nb'],
+            'moyenne_classe': stats['moyenne'],
+            'min_classe': stats['min'],
+            'max_classe': stats['max'],
+            'ecart': moyenne - stats['moyenne'],
+            'nb_devoirs': eleve['nb_devoirs'],
+            'nb_devoirs_periode': len(lignes),
+            'incomplet': eleve['nb_devoirs'] < len(lignes),
+            'lignes': lignes,
+            'date_generation': datetime.now().strftime("%d/%m/%Y à %H:%M")
+        }
     
     def _generate_bareme_latex(self, devoir, questions):
         """Génère le code LaTeX pour le barème"""
+        return LatexRenderer(self.templates_dir).source("bareme", self._bareme_vue(devoir, questions))
+    
+    def _bareme_vue(self, devoir, questions):
+        """Données du barème pour le moteur de rendu"""
         # Trier les questions par numéro (en gérant les nombres)
-        def sort_key(q):
-            import re
-            # Extraire le premier nombre de la question
-            match = re.search(r'(\d+)', str(q['numero']))
-            if match:
-                return (int(match.group(1)), str(q['numero']))
-            return (0, str(q['numero']))
-        
-        questions_triees = sorted(questions, key=sort_key)
-        
-        total_points = sum(q['points_max'] * q['coefficient'] for q in questions_triees)
-        
-        latex = r"""\documentclass[11pt,a4paper]{article}
-\usepackage[utf8]{inputenc}
-\usepackage[french]{babel}
-\usepackage[T1]{fontenc}
-\usepackage{geometry}
-\usepackage{array}
-\usepackage{booktabs}
-\usepackage{colortbl}
-\usepackage{xcolor}
-
-\geometry{margin=2cm}
-
-\begin{document}
-
-\begin{center}
-    {\LARGE\bfseries """ + devoir['nom'] + r"""}\\[0.5cm]
-    {\large """ + devoir['classe_nom'] + r""" -- """ + devoir['date'] + r"""}\\[0.3cm]
-    {\large\textbf{Barème}}
-\end{center}
-
-\vspace{1cm}
-
-\begin{table}[h]
-\centering
-\begin{tabular}{|c|p{10cm}|c|c|c|}
-\hline
-\rowcolor{gray!30}
-\textbf{N°} & \textbf{Question} & \textbf{Points} & \textbf{Coef.} & \textbf{Total} \\
-\hline
-"""
-        
+        questions_triees = sorted((dict(q) for q in questions), key=question_sort_key)
         for q in questions_triees:
-            points_ponderes = q['points_max'] * q['coefficient']
-            # Afficher plus de décimales pour les coefficients
-            latex += f"{q['numero']} & {q['intitule']} & {q['points_max']:.2f} & {q['coefficient']:.2f} & {points_ponderes:.2f} \\\\\n\\hline\n"
-        
-        latex += r"""\rowcolor{gray!20}
-\multicolumn{4}{|r|}{\textbf{Total des points :}} & \textbf{""" + f"{total_points:.2f}" + r"""} \\
-\hline
-\end{tabular}
-\end{table}
-
-\vspace{1cm}
-
-\textbf{Note finale sur 20} (conversion automatique)
-
-\vspace{0.5cm}
-
-\textit{Formule de calcul :} Note finale = $\frac{\text{Points obtenus}}{\text{""" + f"{total_points:.2f}" + r"""}} \times 20$
-
-\end{document}
-"""
-        return latex
+            q['points_ponderes'] = q['points_max'] * q['coefficient']
+        
+        return {
+            'devoir': devoir,
+            'questions': questions_triees,
+            'total_points': sum(q['points_ponderes'] for q in questions_triees)
+        }
     
     def _escape_latex(self, text):
         """Échappe les caractères spéciaux LaTeX"""
-        if text is None:
-            return ""
-        
-        text = str(text)
-        replacements = {
-            '\\': r'\textbackslash{}',
-            '&': r'\&',
-            '%': r'\%',
-            '$': r'\$',
-            '#': r'\#',
-            '_': r'\_',
-            '{': r'\{',
-            '}': r'\}',
-            '~': r'\textasciitilde{}',
-            '^': r'\textasciicircum{}',
-        }
-        
-        for old, new in replacements.items():
-            text = text.replace(old, new)
-        
-        return text
+        return escape_latex(text)
     
     def _row_to_dict(self, row):
         """Convertit un sqlite3.Row en dictionnaire pour un accès sûr"""
@@ -196,101 +406,31 @@ class LatexGenerator:
     
     def _generate_cr_latex(self, devoir, eleve, notes, note_finale, moyenne_classe, appreciation=""):
         """Génère le code LaTeX pour un compte-rendu individuel"""
+        vue = self._cr_vue(devoir, eleve, notes, note_finale, moyenne_classe, appreciation)
+        return LatexRenderer(self.templates_dir).source("compte_rendu", vue)
+    
+    def _cr_vue(self, devoir, eleve, notes, note_finale, moyenne_classe, appreciation="",
+                mediane_classe=None, rang=None, nb_copies=None):
+        """Données d'un compte-rendu individuel pour le moteur de rendu
+        
+        Médiane, rang et nombre de copies ne sont affichés que s'ils sont
+        fournis (voir _cr_vue_context).
+        """
         
         # Convertir les Row en dict pour un accès plus sûr
         notes_list = [self._row_to_dict(n) for n in notes]
         
         # Trier les questions par numéro
-        def sort_key(n):
-            import re
-            match = re.search(r'(\d+)', str(n.get('numero', '0')))
-            if match:
-                return (int(match.group(1)), str(n.get('numero', '0')))
-            return (0, str(n.get('numero', '0')))
-        
-        notes_triees = sorted(notes_list, key=sort_key)
+        notes_triees = sorted(notes_list, key=question_sort_key)
         
         # Calculer les statistiques
         total_points = sum(n.get('points_max', 0) * n.get('coefficient', 1) for n in notes_triees)
         points_obtenus = sum((n.get('points_obtenus') or 0) * n.get('coefficient', 1) for n in notes_triees)
         
         # Déterminer la couleur selon la note
-        if note_finale >= 15:
-            color = "green!70"
-        elif note_finale >= 10:
-            color = "orange!70"
-        else:
-            color = "red!70"
-        
-        latex = r"""\documentclass[11pt,a4paper]{article}
-\usepackage[utf8]{inputenc}
-\usepackage[french]{babel}
-\usepackage[T1]{fontenc}
-\usepackage{geometry}
-\usepackage{array}
-\usepackage{booktabs}
-\usepackage{colortbl}
-\usepackage{xcolor}
-\usepackage{tikz}
-
-\geometry{margin=2cm}
-
-\begin{document}
-
-\begin{center}
-    {\LARGE\bfseries Compte-Rendu}\\[0.3cm]
-    {\large """ + devoir['nom'] + r"""}\\[0.5cm]
-\end{center}
-
-\vspace{0.5cm}
-
-\begin{tabular}{ll}
-\textbf{Élève :} & """ + eleve['nom'] + " " + eleve['prenom'] + r""" \\
-\textbf{Classe :} & """ + devoir['classe_nom'] + r""" \\
-\textbf{Date :} & """ + devoir['date'] + r""" \\
-\end{tabular}
-
-\vspace{1cm}
-
-\begin{center}
-\begin{tikzpicture}
-    \draw[line width=2pt, """ + color + r"""] (0,0) rectangle (12,2);
-    \node at (6,1) {\Huge\bfseries """ + f"{note_finale:.2f}" + r""" / 20};
-\end{tikzpicture}
-\end{center}
-
-\vspace{0.5cm}
-
-\begin{center}
-\begin{tabular}{|c|c|c|}
-\hline
-\rowcolor{gray!30}
-\textbf{Points obtenus} & \textbf{Moyenne classe} & \textbf{Écart} \\
-\hline
-""" + f"{points_obtenus:.2f} / {total_points:.2f}" + r""" & """ + f"{moyenne_classe:.2f} / 20" + r""" & """
-
-        ecart = note_finale - moyenne_classe
-        ecart_str = f"+{ecart:.2f}" if ecart >= 0 else f"{ecart:.2f}"
-        
-        latex += ecart_str + r""" \\
-\hline
-\end{tabular}
-\end{center}
-
-\vspace{1cm}
-
-\section*{Détail par question}
-
-\begin{table}[h]
-\centering
-\small
-\begin{tabular}{|c|p{6cm}|c|c|p{4cm}|}
-\hline
-\rowcolor{gray!30}
-\textbf{N°} & \textbf{Question} & \textbf{Points} & \textbf{\%} & \textbf{Commentaire} \\
-\hline
-"""
+        color = couleur_note(note_finale)
         
+        lignes = []
         for n in notes_triees:
             points_max = n.get('points_max', 0) * n.get('coefficient', 1)
             points_obtenu = (n.get('points_obtenus') or 0) * n.get('coefficient', 1)
@@ -306,88 +446,30 @@ class LatexGenerator:
             else:
                 row_color = "gray!10"
             
-            # Échapper l'intitulé et le commentaire
-            intitule_escaped = self._escape_latex(n.get('intitule', ''))
             commentaire = n.get('commentaire') or ''
-            commentaire_escaped = self._escape_latex(commentaire) if commentaire.strip() else ""
-            
-            latex += r"\rowcolor{" + row_color + r"}"
-            latex += f"\n{n.get('numero', '')} & {intitule_escaped} & "
-            latex += f"{points_obtenu:.2f}/{points_max:.2f} & {pourcentage:.0f}\\% & "
-            latex += f"{commentaire_escaped} \\\\\n\\hline\n"
-        
-        latex += r"""\end{tabular}
-\end{table}
-
-"""
-        
-        # Ajouter l'appréciation globale si elle existe
-        if appreciation and appreciation.strip():
-            appreciation_escaped = self._escape_latex(appreciation)
-            latex += r"""
-\vspace{1cm}
-
-\section*{Appréciation générale}
-
-\begin{center}
-\fbox{\begin{minipage}{0.9\textwidth}
-\vspace{0.3cm}
-""" + appreciation_escaped + r"""
-\vspace{0.3cm}
-\end{minipage}}
-\end{center}
-
-"""
-        
-        latex += r"""
-\vspace{1cm}
-
-\textit{Ce compte-rendu a été généré automatiquement le """ + datetime.now().strftime("%d/%m/%Y à %H:%M") + r"""}
-
-\end{document}
-"""
-        return latex
-    
-    def _compile_latex(self, latex_content, output_path):
-        """Compile le code LaTeX en PDF"""
-        # Créer un fichier temporaire .tex
-        base_name = os.path.splitext(output_path)[0]
-        tex_file = base_name + ".tex"
-        
-        # Écrire le contenu LaTeX
-        with open(tex_file, 'w', encoding='utf-8') as f:
-            f.write(latex_content)
-        
-        try:
-            # Compiler avec pdflatex
-            process = subprocess.run(
-                ['pdflatex', '-interaction=nonstopmode', '-output-directory', 
-                 os.path.dirname(output_path) or '.', tex_file],
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            
-            # Vérifier si le PDF a été créé même avec des warnings
-            pdf_path = base_name + ".pdf"
-            if os.path.exists(pdf_path):
-                # Nettoyer les fichiers temporaires
-                for ext in ['.aux', '.log', '.tex']:
-                    temp_file = base_name + ext
-                    if os.path.exists(temp_file):
-                        os.remove(temp_file)
-                return pdf_path
-            else:
-                # Lire le fichier log pour plus de détails
-                log_file = base_name + ".log"
-                error_details = ""
-                if os.path.exists(log_file):
-                    with open(log_file, 'r', encoding='utf-8', errors='ignore') as f:
-                        error_details = f.read()
-                
-                raise Exception(f"PDF non généré. Détails:\n{process.stderr}\n\nLog:\n{error_details[-1000:]}")
-        
-        except FileNotFoundError:
-            raise Exception("pdflatex n'est pas installé. Installez une distribution LaTeX (TeX Live, MiKTeX, etc.)")
-        except subprocess.TimeoutExpired:
-            raise Exception("La compilation LaTeX a pris trop de temps")
\ No newline at end of file
+            lignes.append({
+                'numero': n.get('numero', ''),
+                'intitule': n.get('intitule', ''),
+                'points_obtenus': points_obtenu,
+                'points_max': points_max,
+                'pourcentage': pourcentage,
+                'couleur': row_color,
+                'commentaire': commentaire if commentaire.strip() else ""
+            })
+        
+        return {
+            'devoir': devoir,
+            'eleve': eleve,
+            'note_finale': note_finale,
+            'couleur_note': color,
+            'points_obtenus': points_obtenus,
+            'total_points': total_points,
+            'moyenne_classe': moyenne_classe,
+            'mediane_classe': mediane_classe,
+            'rang': rang,
+            'nb_copies': nb_copies,
+            'ecart': note_finale - moyenne_classe,
+            'lignes': lignes,
+            'appreciation': appreciation if appreciation and appreciation.strip() else "",
+            'date_generation': datetime.now().strftime("%d/%m/%Y à %H:%M")
+        }
@@ -0,0 +1,551 @@
+# utils/pdf_merge.py
+"""Assemblage de PDF existants en un seul livret, sans nouveau rendu
+
+Lecture minimale du format PDF (table xref classique ou flux xref, flux
+d'objets compressés), suffisante pour les fichiers de pdflatex et de
+utils/pdf_writer.py. Les objets utilisés par chaque page (contenu, polices,
+images...) sont recopiés tels quels, flux compris sans décompression, et
+renumérotés dans le livret.
+
+Le livret est écrit au fil de l'eau : un document ajouté est recopié dans
+le fichier de sortie puis oublié, seuls les numéros de ses pages sont
+conservés pour l'arbre des pages et les signets écrits à la fin.
+"""
+import re
+import zlib
+from collections import namedtuple
+from datetime import datetime
+
+_BLANCS = b"\x00\t\n\x0c\r "
+_FIN_MOT = rb"(?=[\x00\t\n\x0c\r ()<>\[\]{}/%]|$)"
+
+_MOT_RE = re.compile(rb"[^\x00\t\n\x0c\r ()<>\[\]{}/%]+")
+_ENTIER_RE = re.compile(rb"[+-]?\d+$")
+_SUITE_REF_RE = re.compile(rb"[\x00\t\n\x0c\r ]+(\d+)[\x00\t\n\x0c\r ]+R" + _FIN_MOT)
+_ENTETE_OBJET_RE = re.compile(rb"[\x00\t\n\x0c\r ]*(\d+)[\x00\t\n\x0c\r ]+(\d+)[\x00\t\n\x0c\r ]+obj" + _FIN_MOT)
+_ENTREE_XREF_RE = re.compile(rb"[\x00\t\n\x0c\r ]*(\d{10})[ ](\d{5})[ ]([nf])")
+_SOUS_SECTION_RE = re.compile(rb"[\x00\t\n\x0c\r ]*(\d+)[ ]+(\d+)")
+_NOM_ECHAPPE_RE = re.compile(rb"#([0-9A-Fa-f]{2})")
+
+# Attributs de page hérités des nœuds de l'arbre des pages
+_HERITES = ('Resources', 'MediaBox', 'CropBox', 'Rotate')
+
+
+class Nom(str):
+    """Nom PDF (/Type, /Page...) ; se compare comme une chaîne ordinaire"""
+    pass
+
+
+class Brut(bytes):
+    """Élément recopié tel quel : chaîne littérale ou hexadécimale, nombre réel"""
+    pass
+
+
+Ref = namedtuple('Ref', 'num gen')
+
+
+class Flux:
+    """Objet flux : dictionnaire et données encore encodées"""
+    
+    def __init__(self, dictionnaire, donnees):
+        self.dictionnaire = dictionnaire
+        self.donnees = donnees
+
+
+# ========== LECTURE ==========
+
+class _Analyseur:
+    """Analyse des objets PDF à partir d'une position dans le fichier"""
+    
+    def __init__(self, data, lecteur=None):
+        self.data = data
+        self.lecteur = lecteur
+        self.pos = 0
+    
+    def blancs(self):
+        data = self.data
+        while self.pos < len(data):
+            octet = data[self.pos]
+            if octet in _BLANCS:
+                self.pos += 1
+            elif octet == 0x25:  # % : commentaire jusqu'à la fin de ligne
+                while self.pos < len(data) and data[self.pos] not in b"\r\n":
+                    self.pos += 1
+            else:
+                break
+    
+    def objet(self):
+        self.blancs()
+        data = self.data
+        if self.pos >= len(data):
+            raise Exception("PDF tronqué")
+        debut = data[self.pos:self.pos + 2]
+        
+        if debut == b"<<":
+            self.pos += 2
+            dictionnaire = {}
+            while True:
+                self.blancs()
+                if data.startswith(b">>", self.pos):
+                    self.pos += 2
+                    return dictionnaire
+                cle = self.objet()
+                dictionnaire[cle] = self.objet()
+        
+        octet = data[self.pos]
+        if octet == 0x2F:  # /
+            fin = _MOT_RE.match(data, self.pos + 1)
+            brut = fin.group() if fin else b""
+            self.pos += 1 + len(brut)
+            return Nom(_NOM_ECHAPPE_RE.sub(lambda m: bytes([int(m.group(1), 16)]), brut).decode('latin-1'))
+        if octet == 0x5B:  # [
+            self.pos += 1
+            tableau = []
+            while True:
+                self.blancs()
+                if data[self.pos] == 0x5D:
+                    self.pos += 1
+                    return tableau
+                tableau.append(self.objet())
+        if octet == 0x28:  # (
+            return self._chaine_litterale()
+        if octet == 0x3C:  # <
+            fin = data.index(b">", self.pos)
+            valeur = Brut(data[self.pos:fin + 1])
+            self.pos = fin + 1
+            return valeur
+        
+        mot = _MOT_RE.match(data, self.pos)
+        if not mot:
+            raise Exception(f"PDF illisible à la position {self.pos}")
+        self.pos = mot.end()
+        mot = mot.group()
+        if _ENTIER_RE.match(mot):
+            reference = _SUITE_REF_RE.match(data, self.pos)
+            if reference:
+                self.pos = reference.end()
+                return Ref(int(mot), int(reference.group(1)))
+            return int(mot)
+        if mot == b"true":
+            return True
+        if mot == b"false":
+            return False
+        if mot == b"null":
+            return None
+        # Nombre réel (ou mot-clé inattendu) : recopié à l'identique
+        return Brut(mot)
+    
+    def _chaine_litterale(self):
+        data = self.data
+        debut = self.pos
+        profondeur = 0
+        while True:
+            octet = data[self.pos]
+            if octet == 0x5C:  # \\ : caractère échappé
+                self.pos += 2
+                continue
+            if octet == 0x28:
+                profondeur += 1
+            elif octet == 0x29:
+                profondeur -= 1
+                if profondeur == 0:
+                    self.pos += 1
+                    return Brut(data[debut:self.pos])
+            self.pos += 1
+    
+    def objet_indirect(self, position):
+        """Lit « n g obj ... endobj » à la position donnée"""
+        entete = _ENTETE_OBJET_RE.match(self.data, position)
+        if not entete:
+            raise Exception(f"Objet PDF attendu à la position {position}")
+        self.pos = entete.end()
+        valeur = self.objet()
+        
+        self.blancs()
+        if isinstance(valeur, dict) and self.data.startswith(b"stream", self.pos):
+            valeur = self._flux(valeur)
+        return int(entete.group(1)), valeur
+    
+    def _flux(self, dictionnaire):
+        data = self.data
+        debut = self.pos + len(b"stream")
+        if data.startswith(b"\r\n", debut):
+            debut += 2
+        elif data[debut:debut + 1] in (b"\n", b"\r"):
+            debut += 1
+        
+        longueur = dictionnaire.get('Length')
+        if isinstance(longueur, Ref) and self.lecteur is not None:
+            longueur = self.lecteur.objet(longueur.num)
+        
+        fin = debut + longueur if isinstance(longueur, int) else -1
+        if fin < 0 or data[fin:fin + 12].lstrip(_BLANCS)[:9] != b"endstream":
+            # Longueur absente ou fausse : chercher la fin du flux
+            fin = data.index(b"endstream", debut)
+            while fin > debut and data[fin - 1] in b"\r\n":
+                fin -= 1
+        self.pos = data.index(b"endstream", fin) + len(b"endstream")
+        return Flux(dictionnaire, data[debut:fin])
+
+
+def _decoder(flux):
+    """Données décodées d'un flux (FlateDecode avec prédicteur PNG éventuel)"""
+    filtres = flux.dictionnaire.get('Filter')
+    if filtres is None:
+        return flux.donnees
+    if not isinstance(filtres, list):
+        filtres = [filtres]
+    if list(filtres) != ['FlateDecode']:
+        raise Exception(f"Filtre PDF non pris en charge : {filtres}")
+    
+    donnees = zlib.decompress(flux.donnees)
+    parametres = flux.dictionnaire.get('DecodeParms') or {}
+    if isinstance(parametres, list):
+        parametres = parametres[0] or {}
+    if parametres.get('Predictor', 1) >= 10:
+        donnees = _predicteur_png(donnees, parametres.get('Columns', 1))
+    return donnees
+
+
+def _predicteur_png(donnees, colonnes):
+    """Annule le filtrage PNG ligne par ligne (flux xref de pdflatex)"""
+    lignes = []
+    precedente = bytearray(colonnes)
+    for debut in range(0, len(donnees), colonnes + 1):
+        filtre = donnees[debut]
+        ligne = bytearray(donnees[debut + 1:debut + 1 + colonnes])
+        for i in range(len(ligne)):
+            gauche = ligne[i - 1] if i else 0
+            haut = precedente[i]
+            if filtre == 1:
+                ligne[i] = (ligne[i] + gauche) & 0xFF
+            elif filtre == 2:
+                ligne[i] = (ligne[i] + haut) & 0xFF
+            elif filtre == 3:
+                ligne[i] = (ligne[i] + (gauche + haut) // 2) & 0xFF
+            elif filtre == 4:
+                haut_gauche = precedente[i - 1] if i else 0
+                p = gauche + haut - haut_gauche
+                pa, pb, pc = abs(p - gauche), abs(p - haut), abs(p - haut_gauche)
+                prediction = gauche if pa <= pb and pa <= pc else haut if pb <= pc else haut_gauche
+                ligne[i] = (ligne[i] + prediction) & 0xFF
+        lignes.append(bytes(ligne))
+        precedente = ligne
+    return b"".join(lignes)
+
+
+class LecteurPdf:
+    """Accès aux objets et aux pages d'un PDF en mémoire"""
+    
+    def __init__(self, data):
+        self.data = data
+        self.xref = {}  # numéro -> ('n', position) ou ('o', flux d'objets, index)
+        self.trailer = {}
+        self._cache = {}
+        self._flux_objets = {}
+        
+        fin = data.rfind(b"startxref")
+        if fin < 0:
+            raise Exception("PDF invalide : startxref introuvable")
+        self._lire_xref(int(data[fin + len(b"startxref"):].split()[0]))
+    
+    def _lire_xref(self, position):
+        vues = set()
+        while position is not None and position not in vues:
+            vues.add(position)
+            analyseur = _Analyseur(self.data, self)
+            analyseur.pos = position
+            analyseur.blancs()
+            
+            if self.data.startswith(b"xref", analyseur.pos):
+                trailer = self._table_xref(analyseur)
+                if isinstance(trailer.get('XRefStm'), int):
+                    self._flux_xref(trailer['XRefStm'])
+            else:
+                trailer = self._flux_xref(analyseur.pos)
+            
+            for cle, valeur in trailer.items():
+                self.trailer.setdefault(cle, valeur)
+            position = trailer.get('Prev')
+    
+    def _table_xref(self, analyseur):
+        """Table xref classique (les sections les plus récentes sont lues en premier)"""
+        data = self.data
+        analyseur.pos += len(b"xref")
+        while True:
+            analyseur.blancs()
+            if data.startswith(b"trailer", analyseur.pos):
+                analyseur.pos += len(b"trailer")
+                return analyseur.objet()
+            section = _SOUS_SECTION_RE.match(data, analyseur.pos)
+            if not section:
+                raise Exception("Table xref illisible")
+            analyseur.pos = section.end()
+            premier, nombre = int(section.group(1)), int(section.group(2))
+            for num in range(premier, premier + nombre):
+                entree = _ENTREE_XREF_RE.match(data, analyseur.pos)
+                if not entree:
+                    raise Exception("Table xref illisible")
+                analyseur.pos = entree.end()
+                if entree.group(3) == b"n":
+                    self.xref.setdefault(num, ('n', int(entree.group(1))))
+    
+    def _flux_xref(self, position):
+        """Flux xref (PDF 1.5) ; retourne son dictionnaire, qui fait office de trailer"""
+        _, flux = _Analyseur(self.data, self).objet_indirect(position)
+        dictionnaire = flux.dictionnaire
+        largeurs = dictionnaire['W']
+        index = dictionnaire.get('Index', [0, dictionnaire['Size']])
+        donnees = _decoder(flux)
+        
+        pos = 0
+        for premier, nombre in zip(index[::2], index[1::2]):
+            for num in range(premier, premier + nombre):
+                champs = []
+                for largeur in largeurs:
+                    champs.append(int.from_bytes(donnees[pos:pos + largeur], 'big') if largeur else None)
+                    pos += largeur
+                type_entree = 1 if champs[0] is None else champs[0]
+                if type_entree == 1:
+                    self.xref.setdefault(num, ('n', champs[1]))
+                elif type_entree == 2:
+                    self.xref.setdefault(num, ('o', champs[1], champs[2] or 0))
+        return dictionnaire
+    
+    def objet(self, num):
+        """Objet numéro `num` (None s'il n'existe pas)"""
+        if num in self._cache:
+            return self._cache[num]
+        entree = self.xref.get(num)
+        if entree is None:
+            valeur = None
+        elif entree[0] == 'n':
+            valeur = _Analyseur(self.data, self).objet_indirect(entree[1])[1]
+        else:
+            valeur = self._objet_compresse(entree[1], entree[2])
+        self._cache[num] = valeur
+        return valeur
+    
+    def _objet_compresse(self, num_flux, index):
+        if num_flux not in self._flux_objets:
+            flux = self.objet(num_flux)
+            donnees = _decoder(flux)
+            premier = flux.dictionnaire['First']
+            entete = donnees[:premier].split()
+            positions = [premier + int(p) for p in entete[1::2]][:flux.dictionnaire['N']]
+            self._flux_objets[num_flux] = (donnees, positions)
+        
+        donnees, positions = self._flux_objets[num_flux]
+        analyseur = _Analyseur(donnees, self)
+        analyseur.pos = positions[index]
+        return analyseur.objet()
+    
+    def resoudre(self, valeur):
+        return self.objet(valeur.num) if isinstance(valeur, Ref) else valeur
+    
+    def pages(self):
+        """(référence, dictionnaire) de chaque page dans l'ordre, attributs hérités recopiés"""
+        racine = self.resoudre(self.trailer['Root'])
+        pages = []
+        
+        def parcourir(reference, herites, vus):
+            if isinstance(reference, Ref):
+                if reference.num in vus:
+                    return
+                vus.add(reference.num)
+            noeud = self.resoudre(reference)
+            if 'Kids' in noeud:
+                herites = dict(herites)
+                for cle in _HERITES:
+                    if cle in noeud:
+                        herites[cle] = noeud[cle]
+                for enfant in self.resoudre(noeud['Kids']):
+                    parcourir(enfant, herites, vus)
+            else:
+                page = dict(noeud)
+                for cle, valeur in herites.items():
+                    page.setdefault(cle, valeur)
+                pages.append((reference, page))
+        
+        parcourir(racine['Pages'], {}, set())
+        return pages
+
+
+# ========== ÉCRITURE ==========
+
+def _nom_pdf(nom):
+    octets = nom.encode('latin-1', errors='replace')
+    return b"/" + b"".join(
+        bytes([o]) if 0x21 <= o <= 0x7E and o not in b"()<>[]{}/%#" else b"#%02X" % o
+        for o in octets
+    )
+
+
+def serialiser(valeur):
+    """Objet PDF (tel que lu par LecteurPdf) -> octets"""
+    if valeur is None:
+        return b"null"
+    if valeur is True:
+        return b"true"
+    if valeur is False:
+        return b"false"
+    if isinstance(valeur, Ref):
+        return b"%d %d R" % (valeur.num, valeur.gen)
+    if isinstance(valeur, Nom):
+        return _nom_pdf(valeur)
+    if isinstance(valeur, Brut):
+        return bytes(valeur)
+    if isinstance(valeur, int):
+        return b"%d" % valeur
+    if isinstance(valeur, float):
+        return f"{valeur:.4f}".rstrip('0').rstrip('.').encode('ascii')
+    if isinstance(valeur, list):
+        return b"[" + b" ".join(serialiser(v) for v in valeur) + b"]"
+    if isinstance(valeur, dict):
+        return b"<<" + b"".join(_nom_pdf(cle) + b" " + serialiser(v) for cle, v in valeur.items()) + b">>"
+    if isinstance(valeur, Flux):
+        dictionnaire = dict(valeur.dictionnaire)
+        dictionnaire['Length'] = len(valeur.donnees)
+        return serialiser(dictionnaire) + b"\nstream\n" + valeur.donnees + b"\nendstream"
+    raise Exception(f"Valeur PDF inattendue : {valeur!r}")
+
+
+def texte_pdf(texte):
+    """Chaîne de texte PDF (titres, signets) en UTF-16 pour les accents"""
+    return Brut(b"<FEFF" + str(texte).encode('utf-16-be').hex().upper().encode('ascii') + b">")
+
+
+class LivretPdf:
+    """Livret PDF écrit au fil de l'eau dans un fichier ouvert en binaire"""
+    
+    _CATALOGUE = 1
+    _PAGES = 2
+    
+    def __init__(self, fichier, titre=""):
+        self.fichier = fichier
+        self.titre = titre
+        self.position = 0
+        self.positions = {}
+        self.prochain = 3
+        self.pages = []
+        self.signets = []  # (titre, numéro de la première page)
+        self._ecrire(b"%PDF-1.5\n%\xe2\xe3\xcf\xd3\n")
+    
+    def _ecrire(self, octets):
+        self.fichier.write(octets)
+        self.position += len(octets)
+    
+    def _numero(self):
+        num = self.prochain
+        self.prochain += 1
+        return num
+    
+    def _ecrire_objet(self, num, contenu):
+        self.positions[num] = self.position
+        self._ecrire(b"%d 0 obj\n" % num + contenu + b"\nendobj\n")
+    
+    def ajouter(self, data, signet=None):
+        """Recopie toutes les pages d'un PDF ; `signet` pointe sur sa première page"""
+        lecteur = LecteurPdf(data)
+        pages = lecteur.pages()
+        if not pages:
+            return 0
+        
+        correspondance = {}
+        a_copier = []
+        
+        # Les pages d'abord : les liens entre pages du document restent valides
+        for reference, _ in pages:
+            if isinstance(reference, Ref):
+                correspondance[reference.num] = self._numero()
+        
+        def renumeroter(valeur):
+            if isinstance(valeur, Ref):
+                if valeur.num not in correspondance:
+                    cible = lecteur.objet(valeur.num)
+                    if isinstance(cible, dict) and cible.get('Type') == 'Pages':
+                        # Nœud de l'ancien arbre des pages (via /Parent) : nouvel arbre
+                        return Ref(self._PAGES, 0)
+                    if cible is None or (isinstance(cible, dict) and cible.get('Type') in ('Catalog', 'Page')):
+                        return None
+                    correspondance[valeur.num] = self._numero()
+                    a_copier.append(valeur.num)
+                return Ref(correspondance[valeur.num], 0)
+            if isinstance(valeur, list):
+                return [renumeroter(v) for v in valeur]
+            if isinstance(valeur, Flux):
+                dictionnaire = {cle: renumeroter(v) for cle, v in valeur.dictionnaire.items() if cle != 'Length'}
+                return Flux(dictionnaire, valeur.donnees)
+            if isinstance(valeur, dict):
+                return {cle: renumeroter(v) for cle, v in valeur.items()}
+            return valeur
+        
+        nouvelles_pages = []
+        for reference, page in pages:
+            page = {cle: v for cle, v in page.items() if cle != 'Parent'}
+            num = correspondance[reference.num] if isinstance(reference, Ref) else self._numero()
+            contenu = renumeroter(page)
+            contenu['Parent'] = Ref(self._PAGES, 0)
+            self._ecrire_objet(num, serialiser(contenu))
+            nouvelles_pages.append(num)
+        
+        while a_copier:
+            ancien = a_copier.pop()
+            self._ecrire_objet(correspondance[ancien], serialiser(renumeroter(lecteur.objet(ancien))))
+        
+        if signet:
+            self.signets.append((signet, nouvelles_pages[0]))
+        self.pages.extend(nouvelles_pages)
+        return len(nouvelles_pages)
+    
+    def fermer(self):
+        """Écrit l'arbre des pages, les signets, le catalogue et la table xref"""
+        self._ecrire_objet(self._PAGES, serialiser({
+            'Type': Nom('Pages'),
+            'Kids': [Ref(num, 0) for num in self.pages],
+            'Count': len(self.pages),
+        }))
+        
+        catalogue = {'Type': Nom('Catalog'), 'Pages': Ref(self._PAGES, 0)}
+        if self.signets:
+            racine = self._numero()
+            numeros = [self._numero() for _ in self.signets]
+            for i, (titre, page) in enumerate(self.signets):
+                signet = {
+                    'Title': texte_pdf(titre),
+                    'Parent': Ref(racine, 0),
+                    'Dest': [Ref(page, 0), Nom('XYZ'), None, None, None],
+                }
+                if i > 0:
+                    signet['Prev'] = Ref(numeros[i - 1], 0)
+                if i < len(numeros) - 1:
+                    signet['Next'] = Ref(numeros[i + 1], 0)
+                self._ecrire_objet(numeros[i], serialiser(signet))
+            self._ecrire_objet(racine, serialiser({
+                'Type': Nom('Outlines'),
+                'First': Ref(numeros[0], 0),
+                'Last': Ref(numeros[-1], 0),
+                'Count': len(numeros),
+            }))
+            catalogue['Outlines'] = Ref(racine, 0)
+            catalogue['PageMode'] = Nom('UseOutlines')
+        self._ecrire_objet(self._CATALOGUE, serialiser(catalogue))
+        
+        infos = self._numero()
+        self._ecrire_objet(infos, serialiser({
+            'Producer': Brut(b"(NotaBene)"),
+            'Title': texte_pdf(self.titre),
+            'CreationDate': Brut(datetime.now().strftime("(D:%Y%m%d%H%M%S)").encode('ascii')),
+        }))
+        
+        debut_xref = self.position
+        lignes = [b"xref\n0 %d\n0000000000 65535 f \n" % self.prochain]
+        for num in range(1, self.prochain):
+            if num in self.positions:
+                lignes.append(b"%010d 00000 n \n" % self.positions[num])
+            else:
+                lignes.append(b"0000000000 65535 f \n")
+        self._ecrire(b"".join(lignes))
+        self._ecrire(b"trailer\n<< /Size %d /Root %d 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+            self.prochain, self._CATALOGUE, infos, debut_xref
+        ))
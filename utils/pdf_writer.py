@@ -0,0 +1,232 @@
+# utils/pdf_writer.py
+"""Écriture directe de documents PDF simples (texte, rectangles, traits)
+
+Utilise les polices standard Helvetica du lecteur PDF (aucune police à
+embarquer) avec l'encodage WinAnsi, qui couvre les caractères français.
+Les coordonnées sont en points, mesurées depuis le coin supérieur gauche de
+la page.
+"""
+import unicodedata
+import zlib
+from datetime import datetime
+
+A4 = (595.28, 841.89)
+CM = 72 / 2.54
+
+POLICES = {
+    'normal': ('F1', 'Helvetica'),
+    'gras': ('F2', 'Helvetica-Bold'),
+    'italique': ('F3', 'Helvetica-Oblique'),
+}
+
+# Chasses (en millièmes de corps) des caractères ASCII 32 à 126
+_CHASSES_ASCII = {
+    'normal': [
+        278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+        556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+        1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+        667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+        333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+        556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+    ],
+    'gras': [
+        278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+        556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+        975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+        667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+        333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+        611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+    ],
+}
+
+# Caractères non ASCII dont la chasse ne se déduit pas de la lettre de base
+_CHASSES_SPECIALES = {
+    'normal': {'€': 556, '–': 556, '—': 1000, '…': 1000, '«': 556, '»': 556, '°': 400,
+               '²': 333, '‘': 222, '’': 222, '“': 333, '”': 333, '\u00a0': 278, '×': 584,
+               'œ': 944, 'Œ': 1000, 'æ': 889, 'Æ': 1000, 'ß': 611, '•': 350},
+    'gras': {'€': 556, '–': 556, '—': 1000, '…': 1000, '«': 556, '»': 556, '°': 400,
+             '²': 333, '‘': 278, '’': 278, '“': 500, '”': 500, '\u00a0': 278, '×': 584,
+             'œ': 944, 'Œ': 1000, 'æ': 889, 'Æ': 1000, 'ß': 611, '•': 350},
+}
+
+
+def _table_chasses(style):
+    """Chasse de chaque octet WinAnsi (cp1252) pour une graisse donnée"""
+    ascii_ = _CHASSES_ASCII[style]
+    speciales = _CHASSES_SPECIALES[style]
+    table = [0] * 256
+    for octet in range(256):
+        if 32 <= octet <= 126:
+            table[octet] = ascii_[octet - 32]
+            continue
+        try:
+            caractere = bytes([octet]).decode('cp1252')
+        except UnicodeDecodeError:
+            continue
+        if caractere in speciales:
+            table[octet] = speciales[caractere]
+        else:
+            # Lettre accentuée : même chasse que la lettre de base
+            base = unicodedata.normalize('NFD', caractere)[0]
+            table[octet] = ascii_[ord(base) - 32] if 32 <= ord(base) <= 126 else 556
+    return table
+
+
+_CHASSES = {
+    'normal': _table_chasses('normal'),
+    'gras': _table_chasses('gras'),
+}
+_CHASSES['italique'] = _CHASSES['normal']
+
+
+# Caractères hors WinAnsi ayant un équivalent proche
+_EQUIVALENTS = str.maketrans({'\u202f': '\u00a0', '\u2009': ' ', '\u2212': '-'})
+
+
+def encoder(texte):
+    """Texte -> octets WinAnsi (caractère non représentable -> ?)"""
+    return str(texte).translate(_EQUIVALENTS).encode('cp1252', errors='replace')
+
+
+def largeur_texte(texte, taille, style='normal'):
+    table = _CHASSES[style]
+    return sum(table[octet] for octet in encoder(texte)) * taille / 1000
+
+
+def couper_lignes(texte, largeur, taille, style='normal'):
+    """Découpe un texte en lignes de largeur maximale donnée (retours à la ligne conservés)"""
+    lignes = []
+    for paragraphe in str(texte).splitlines() or [""]:
+        ligne = ""
+        for mot in paragraphe.split(" "):
+            essai = f"{ligne} {mot}" if ligne else mot
+            if largeur_texte(essai, taille, style) <= largeur:
+                ligne = essai
+                continue
+            if ligne:
+                lignes.append(ligne)
+            # Mot plus long que la ligne : coupé au caractère près
+            while largeur_texte(mot, taille, style) > largeur and len(mot) > 1:
+                coupure = len(mot) - 1
+                while coupure > 1 and largeur_texte(mot[:coupure], taille, style) > largeur:
+                    coupure -= 1
+                lignes.append(mot[:coupure])
+                mot = mot[coupure:]
+            ligne = mot
+        lignes.append(ligne)
+    return lignes
+
+
+def _nombre(valeur):
+    return f"{valeur:.2f}".rstrip('0').rstrip('.')
+
+
+def _chaine_pdf(texte):
+    return b"(" + encoder(texte).replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+class PdfDocument:
+    """Document PDF construit page par page"""
+    
+    def __init__(self, titre="", format_page=A4):
+        self.titre = titre
+        self.largeur, self.hauteur = format_page
+        self.pages = []
+        self.nouvelle_page()
+    
+    def nouvelle_page(self):
+        self.pages.append([])
+        self._page = self.pages[-1]
+    
+    def _y(self, y):
+        return self.hauteur - y
+    
+    def texte(self, x, y, texte, taille=11, style='normal', couleur=(0, 0, 0)):
+        """Écrit une ligne de texte ; y est la ligne de base"""
+        police = POLICES[style][0]
+        r, g, b = couleur
+        self._page.append(
+            f"BT /{police} {_nombre(taille)} Tf {_nombre(r)} {_nombre(g)} {_nombre(b)} rg "
+            f"{_nombre(x)} {_nombre(self._y(y))} Td ".encode('ascii') + _chaine_pdf(texte) + b" Tj ET"
+        )
+    
+    def texte_centre(self, x_centre, y, texte, taille=11, style='normal', couleur=(0, 0, 0)):
+        self.texte(x_centre - largeur_texte(texte, taille, style) / 2, y, texte, taille, style, couleur)
+    
+    def texte_droite(self, x_droite, y, texte, taille=11, style='normal', couleur=(0, 0, 0)):
+        self.texte(x_droite - largeur_texte(texte, taille, style), y, texte, taille, style, couleur)
+    
+    def rectangle(self, x, y, largeur, hauteur, fond=None, contour=None, epaisseur=0.4):
+        """Rectangle de coin supérieur gauche (x, y), rempli et/ou encadré"""
+        if fond is None and contour is None:
+            return
+        operations = [f"{_nombre(epaisseur)} w"]
+        if fond is not None:
+            operations.append("{} {} {} rg".format(*map(_nombre, fond)))
+        if contour is not None:
+            operations.append("{} {} {} RG".format(*map(_nombre, contour)))
+        operations.append(
+            f"{_nombre(x)} {_nombre(self._y(y + hauteur))} {_nombre(largeur)} {_nombre(hauteur)} re "
+            + ("B" if fond is not None and contour is not None else "f" if fond is not None else "S")
+        )
+        self._page.append(" ".join(operations).encode('ascii'))
+    
+    def trait(self, x1, y1, x2, y2, epaisseur=0.4, couleur=(0, 0, 0)):
+        self._page.append(
+            f"{_nombre(epaisseur)} w {_nombre(couleur[0])} {_nombre(couleur[1])} {_nombre(couleur[2])} RG "
+            f"{_nombre(x1)} {_nombre(self._y(y1))} m {_nombre(x2)} {_nombre(self._y(y2))} l S".encode('ascii')
+        )
+    
+    def to_bytes(self):
+        """Sérialise le document (flux de contenu compressés)"""
+        objets = []
+        
+        def ajouter(contenu):
+            objets.append(contenu)
+            return len(objets)
+        
+        catalogue = ajouter(None)
+        racine_pages = ajouter(None)
+        polices = {
+            code: ajouter(f"<< /Type /Font /Subtype /Type1 /BaseFont /{nom} /Encoding /WinAnsiEncoding >>".encode('ascii'))
+            for code, nom in POLICES.values()
+        }
+        ressources = " ".join(f"/{code} {numero} 0 R" for code, numero in polices.items())
+        
+        pages = []
+        for operations in self.pages:
+            flux = zlib.compress(b"\n".join(operations))
+            contenu = ajouter(b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(flux) + flux + b"\nendstream")
+            pages.append(ajouter(
+                f"<< /Type /Page /Parent {racine_pages} 0 R /MediaBox [0 0 {_nombre(self.largeur)} {_nombre(self.hauteur)}] "
+                f"/Resources << /Font << {ressources} >> >> /Contents {contenu} 0 R >>".encode('ascii')
+            ))
+        
+        objets[catalogue - 1] = f"<< /Type /Catalog /Pages {racine_pages} 0 R >>".encode('ascii')
+        objets[racine_pages - 1] = (
+            f"<< /Type /Pages /Kids [{' '.join(f'{p} 0 R' for p in pages)}] /Count {len(pages)} >>".encode('ascii')
+        )
+        infos = ajouter(
+            b"<< /Producer (NotaBene) /Title " + _chaine_pdf(self.titre)
+            + datetime.now().strftime(" /CreationDate (D:%Y%m%d%H%M%S) >>").encode('ascii')
+        )
+        
+        sortie = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        positions = []
+        for numero, contenu in enumerate(objets, start=1):
+            positions.append(len(sortie))
+            sortie += b"%d 0 obj\n" % numero + contenu + b"\nendobj\n"
+        
+        debut_xref = len(sortie)
+        sortie += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objets) + 1)
+        for position in positions:
+            sortie += b"%010d 00000 n \n" % position
+        sortie += b"trailer\n<< /Size %d /Root %d 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+            len(objets) + 1, catalogue, infos, debut_xref
+        )
+        return bytes(sortie)
+    
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+        return path
@@ -0,0 +1,494 @@
+# utils/renderers.py
+"""Moteurs de rendu PDF des comptes-rendus et barèmes
+
+Les deux moteurs reçoivent la même « vue » (dict préparé par LatexGenerator)
+et le nom du document ('compte_rendu', 'bareme' ou 'bulletin') :
+  - LatexRenderer remplit le gabarit resources/templates/<document>.tex et le
+    compile avec pdflatex ;
+  - NativeRenderer dessine directement la même mise en page en PDF, sans
+    dépendance externe.
+"""
+import contextlib
+import os
+import shutil
+import signal
+import subprocess
+import tempfile
+import time
+from utils.templates import render_template
+from utils.latex_escape import escape_latex
+from utils.pdf_writer import PdfDocument, CM, couper_lignes
+
+
+class GenerationAnnulee(Exception):
+    """La génération a été annulée par l'utilisateur"""
+    pass
+
+
+class PdfRenderer:
+    """Interface commune des moteurs de rendu"""
+    nom = ""
+    
+    def is_available(self):
+        return True
+    
+    def render(self, document, vue, output_path, annulation=None):
+        """Produit le PDF `output_path` et retourne son chemin
+        
+        `annulation` (threading.Event) interrompt le rendu en cours ; rien
+        n'est alors écrit et GenerationAnnulee est levée.
+        """
+        titre = os.path.splitext(os.path.basename(output_path))[0]
+        return publier(self.render_bytes(document, vue, annulation, titre), output_path)
+    
+    def render_bytes(self, document, vue, annulation=None, titre=""):
+        """Contenu du PDF, sans rien écrire dans le dossier d'export (archive, livret)"""
+        raise NotImplementedError
+
+
+class LatexRenderer(PdfRenderer):
+    """Gabarit LaTeX compilé par pdflatex"""
+    nom = "latex"
+    
+    def __init__(self, templates_dir):
+        self.templates_dir = templates_dir
+    
+    def is_available(self):
+        return shutil.which('pdflatex') is not None
+    
+    def source(self, document, vue):
+        """Code LaTeX du document (valeurs échappées)"""
+        return render_template(os.path.join(self.templates_dir, f"{document}.tex"), vue, escape_latex)
+    
+    def render_bytes(self, document, vue, annulation=None, titre=""):
+        return self.compile_bytes(self.source(document, vue), annulation)
+    
+    def compile(self, latex_content, output_path, annulation=None):
+        """Compile le code LaTeX dans le PDF `output_path`"""
+        return publier(self.compile_bytes(latex_content, annulation), output_path)
+    
+    def compile_bytes(self, latex_content, annulation=None):
+        """Compile le code LaTeX et retourne le contenu du PDF
+        
+        Chaque compilation a son propre dossier de travail (en mémoire si
+        possible) : les fichiers .tex/.aux/.log n'apparaissent jamais dans le
+        dossier d'export et deux compilations simultanées ne se gênent pas.
+        """
+        with tempfile.TemporaryDirectory(prefix="notabene-", dir=dossier_de_travail()) as travail:
+            tex_file = os.path.join(travail, "document.tex")
+            
+            # Écrire le contenu LaTeX
+            with open(tex_file, 'w', encoding='utf-8') as f:
+                f.write(latex_content)
+            
+            try:
+                # Compiler avec pdflatex
+                process = subprocess.Popen(
+                    ['pdflatex', '-interaction=nonstopmode', '-output-directory', travail, tex_file],
+                    cwd=travail,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                    # Groupe de processus propre, pour arrêter aussi les outils lancés par pdflatex
+                    start_new_session=(os.name == 'posix')
+                )
+            except FileNotFoundError:
+                raise Exception("pdflatex n'est pas installé. Installez une distribution LaTeX (TeX Live, MiKTeX, etc.)")
+            
+            stderr = self._attendre(process, annulation, timeout=30)
+            
+            # Vérifier si le PDF a été créé même avec des warnings
+            pdf_file = os.path.join(travail, "document.pdf")
+            if not os.path.exists(pdf_file):
+                # Lire le fichier log pour plus de détails
+                log_file = os.path.join(travail, "document.log")
+                error_details = ""
+                if os.path.exists(log_file):
+                    with open(log_file, 'r', encoding='utf-8', errors='ignore') as f:
+                        error_details = f.read()
+                
+                raise Exception(f"PDF non généré. Détails:\n{stderr}\n\nLog:\n{error_details[-1000:]}")
+            
+            with open(pdf_file, 'rb') as f:
+                return f.read()
+    
+    def _attendre(self, process, annulation, timeout):
+        """Attend la fin de pdflatex en surveillant l'annulation ; retourne sa sortie d'erreur"""
+        limite = time.monotonic() + timeout
+        while True:
+            try:
+                return process.communicate(timeout=0.1)[1]
+            except subprocess.TimeoutExpired:
+                if annulation is not None and annulation.is_set():
+                    self._arreter(process)
+                    raise GenerationAnnulee("Génération annulée")
+                if time.monotonic() > limite:
+                    self._arreter(process)
+                    raise Exception("La compilation LaTeX a pris trop de temps")
+    
+    def _arreter(self, process):
+        if os.name == 'posix':
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        else:
+            process.kill()
+        process.communicate()
+
+
+def dossier_de_travail():
+    """Racine des dossiers de compilation : /dev/shm (en mémoire) si disponible, sinon le dossier temporaire du système"""
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        return "/dev/shm"
+    return None
+
+
+@contextlib.contextmanager
+def fichier_atomique(output_path):
+    """Fichier d'export écrit à côté de sa destination puis publié par os.replace
+    
+    Un lecteur ou un client de synchronisation ne voit jamais de fichier
+    partiel : si le bloc est interrompu (erreur, annulation), rien n'est
+    publié.
+    """
+    dossier = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(dossier, exist_ok=True)
+    
+    extension = os.path.splitext(output_path)[1]
+    fd, temp_path = tempfile.mkstemp(dir=dossier, prefix=".", suffix=f"{extension}.part")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            yield f
+        os.replace(temp_path, output_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def publier(data, output_path):
+    """Écrit le PDF final de façon atomique (voir fichier_atomique)"""
+    with fichier_atomique(output_path) as f:
+        f.write(data)
+    return output_path
+
+
+# ========== MOTEUR NATIF ==========
+
+_COULEURS_BASE = {
+    'green': (0, 1, 0),
+    'orange': (1, 0.5, 0),
+    'red': (1, 0, 0),
+    'gray': (0.5, 0.5, 0.5),
+    'black': (0, 0, 0),
+    'white': (1, 1, 1),
+}
+
+NOIR = (0, 0, 0)
+MARGE = 2 * CM
+
+
+def couleur_xcolor(spec):
+    """Couleur xcolor simple (« green!70 ») -> RVB, mélangée avec du blanc comme LaTeX"""
+    nom, _, pourcentage = spec.partition('!')
+    r, g, b = _COULEURS_BASE.get(nom, NOIR)
+    t = float(pourcentage) / 100 if pourcentage else 1
+    return (r * t + 1 - t, g * t + 1 - t, b * t + 1 - t)
+
+
+class _MiseEnPage:
+    """Curseur vertical sur un PdfDocument, avec saut de page automatique"""
+    
+    def __init__(self, doc):
+        self.doc = doc
+        self.y = MARGE
+        self.largeur_utile = doc.largeur - 2 * MARGE
+        self.centre = doc.largeur / 2
+    
+    def place(self, hauteur):
+        """Passe à la page suivante si `hauteur` ne tient plus sur la page"""
+        if self.y + hauteur > self.doc.hauteur - MARGE:
+            self.doc.nouvelle_page()
+            self.y = MARGE
+            return True
+        return False
+    
+    def espace(self, hauteur):
+        self.y += hauteur
+    
+    def ligne_centree(self, texte, taille, style='normal'):
+        self.place(taille * 1.3)
+        self.y += taille
+        self.doc.texte_centre(self.centre, self.y, texte, taille, style)
+        self.y += taille * 0.3
+    
+    def paragraphe(self, texte, taille=11, style='normal', x=None, largeur=None):
+        x = MARGE if x is None else x
+        largeur = self.largeur_utile if largeur is None else largeur
+        for ligne in couper_lignes(texte, largeur, taille, style):
+            self.place(taille * 1.25)
+            self.y += taille
+            self.doc.texte(x, self.y, ligne, taille, style)
+            self.y += taille * 0.25
+    
+    def tableau(self, colonnes, lignes, taille=10, entete=None):
+        """Tableau centré à bordures
+        
+        colonnes : [(largeur, alignement 'g'/'c'/'d'), ...]
+        lignes : [(cellules, couleur de fond ou None, style), ...]
+        L'en-tête éventuel (même forme qu'une ligne) est répété après un saut de page.
+        """
+        largeur_totale = sum(largeur for largeur, _ in colonnes)
+        x0 = self.centre - largeur_totale / 2
+        interligne = taille * 1.2
+        marge_cellule = 4
+        
+        def dessiner(ligne):
+            cellules, fond, style = ligne
+            contenus = [
+                couper_lignes(cellule, largeur - 2 * marge_cellule, taille, style)
+                for cellule, (largeur, _) in zip(cellules, colonnes)
+            ]
+            hauteur = max(len(c) for c in contenus) * interligne + 2 * marge_cellule
+            saut = self.place(hauteur)
+            if saut and entete is not None and ligne is not entete:
+                dessiner(entete)
+            
+            self.doc.rectangle(x0, self.y, largeur_totale, hauteur, fond=fond, contour=NOIR)
+            x = x0
+            for contenu, (largeur, alignement) in zip(contenus, colonnes):
+                if x > x0:
+                    self.doc.trait(x, self.y, x, self.y + hauteur)
+                y = self.y + marge_cellule
+                for texte in contenu:
+                    y += taille
+                    if alignement == 'c':
+                        self.doc.texte_centre(x + largeur / 2, y, texte, taille, style)
+                    elif alignement == 'd':
+                        self.doc.texte_droite(x + largeur - marge_cellule, y, texte, taille, style)
+                    else:
+                        self.doc.texte(x + marge_cellule, y, texte, taille, style)
+                    y += interligne - taille
+                x += largeur
+            self.y += hauteur
+        
+        if entete is not None:
+            dessiner(entete)
+        for ligne in lignes:
+            dessiner(ligne)
+
+
+class NativeRenderer(PdfRenderer):
+    """Mise en page des documents écrite directement en PDF (Helvetica)"""
+    nom = "natif"
+    
+    def render_bytes(self, document, vue, annulation=None, titre=""):
+        dessins = {
+            'compte_rendu': self._compte_rendu,
+            'bareme': self._bareme,
+            'bulletin': self._bulletin,
+        }
+        if document not in dessins:
+            raise Exception(f"Document inconnu pour le moteur natif : {document}")
+        
+        doc = PdfDocument(titre=titre)
+        dessins[document](_MiseEnPage(doc), vue)
+        
+        # Rendu de quelques millisecondes : l'annulation n'est vérifiée qu'à la fin
+        if annulation is not None and annulation.is_set():
+            raise GenerationAnnulee("Génération annulée")
+        return doc.to_bytes()
+    
+    def _compte_rendu(self, page, vue):
+        devoir = vue['devoir']
+        eleve = vue['eleve']
+        gris_entete = couleur_xcolor("gray!30")
+        
+        page.ligne_centree("Compte-Rendu", 20, 'gras')
+        page.espace(4)
+        page.ligne_centree(devoir['nom'], 14)
+        page.espace(24)
+        
+        for libelle, valeur in (("Élève :", f"{eleve['nom']} {eleve['prenom']}"),
+                                ("Classe :", devoir['classe_nom']),
+                                ("Date :", devoir['date'])):
+            page.y += 11
+            page.doc.texte(MARGE, page.y, libelle, 11, 'gras')
+            page.doc.texte(MARGE + 2.5 * CM, page.y, str(valeur), 11)
+            page.y += 4
+        page.espace(28)
+        
+        # Cadre de la note
+        largeur_cadre, hauteur_cadre = 12 * CM, 2 * CM
+        page.place(hauteur_cadre)
+        page.doc.rectangle(page.centre - largeur_cadre / 2, page.y, largeur_cadre, hauteur_cadre,
+                           contour=couleur_xcolor(vue['couleur_note']), epaisseur=2)
+        page.doc.texte_centre(page.centre, page.y + hauteur_cadre / 2 + 9,
+                              f"{vue['note_finale']:.2f} / 20", 25, 'gras')
+        page.y += hauteur_cadre
+        page.espace(14)
+        
+        if vue['rang']:
+            page.tableau(
+                [(3.6 * CM, 'c'), (3.4 * CM, 'c'), (3 * CM, 'c'), (2.2 * CM, 'c'), (2.2 * CM, 'c')],
+                [([f"{vue['points_obtenus']:.2f} / {vue['total_points']:.2f}",
+                   f"{vue['moyenne_classe']:.2f} / 20",
+                   f"{vue['mediane_classe']:.2f} / 20",
+                   f"{vue['rang']} / {vue['nb_copies']}",
+                   f"{vue['ecart']:+.2f}"], None, 'normal')],
+                taille=11,
+                entete=(["Points obtenus", "Moyenne classe", "Médiane", "Rang", "Écart"], gris_entete, 'gras')
+            )
+        else:
+            page.tableau(
+                [(4 * CM, 'c'), (4 * CM, 'c'), (3 * CM, 'c')],
+                [([f"{vue['points_obtenus']:.2f} / {vue['total_points']:.2f}",
+                   f"{vue['moyenne_classe']:.2f} / 20",
+                   f"{vue['ecart']:+.2f}"], None, 'normal')],
+                taille=11,
+                entete=(["Points obtenus", "Moyenne classe", "Écart"], gris_entete, 'gras')
+            )
+        page.espace(28)
+        
+        page.place(40)
+        page.y += 14
+        page.doc.texte(MARGE, page.y, "Détail par question", 14, 'gras')
+        page.espace(12)
+        
+        page.tableau(
+            [(1.2 * CM, 'c'), (6 * CM, 'g'), (2.6 * CM, 'c'), (1.4 * CM, 'c'), (4 * CM, 'g')],
+            [([str(ligne['numero']), str(ligne['intitule']),
+               f"{ligne['points_obtenus']:.2f}/{ligne['points_max']:.2f}",
+               f"{ligne['pourcentage']:.0f}%", ligne['commentaire']],
+              couleur_xcolor(ligne['couleur']), 'normal')
+             for ligne in vue['lignes']],
+            taille=9,
+            entete=(["N°", "Question", "Points", "%", "Commentaire"], gris_entete, 'gras')
+        )
+        
+        if vue['appreciation']:
+            page.espace(28)
+            page.place(40)
+            page.y += 14
+            page.doc.texte(MARGE, page.y, "Appréciation générale", 14, 'gras')
+            page.espace(12)
+            
+            largeur_cadre = 0.9 * page.largeur_utile
+            x_cadre = page.centre - largeur_cadre / 2
+            lignes = couper_lignes(vue['appreciation'], largeur_cadre - 20, 11)
+            hauteur_cadre = len(lignes) * 13.75 + 20
+            page.place(hauteur_cadre)
+            page.doc.rectangle(x_cadre, page.y, largeur_cadre, hauteur_cadre, contour=NOIR)
+            page.espace(10)
+            page.paragraphe(vue['appreciation'], 11, x=x_cadre + 10, largeur=largeur_cadre - 20)
+            page.espace(10)
+        
+        page.espace(28)
+        page.paragraphe(f"Ce compte-rendu a été généré automatiquement le {vue['date_generation']}", 11, 'italique')
+    
+    def _bareme(self, page, vue):
+        devoir = vue['devoir']
+        
+        page.ligne_centree(devoir['nom'], 20, 'gras')
+        page.espace(8)
+        page.ligne_centree(f"{devoir['classe_nom']} – {devoir['date']}", 14)
+        page.espace(4)
+        page.ligne_centree("Barème", 14, 'gras')
+        page.espace(28)
+        
+        total = f"{vue['total_points']:.2f}"
+        page.tableau(
+            [(1.2 * CM, 'c'), (10 * CM, 'g'), (1.8 * CM, 'c'), (1.6 * CM, 'c'), (1.8 * CM, 'c')],
+            [([str(q['numero']), str(q['intitule']), f"{q['points_max']:.2f}",
+               f"{q['coefficient']:.2f}", f"{q['points_ponderes']:.2f}"], None, 'normal')
+             for q in vue['questions']],
+            taille=10,
+            entete=(["N°", "Question", "Points", "Coef.", "Total"], couleur_xcolor("gray!30"), 'gras')
+        )
+        page.tableau(
+            [(14.6 * CM, 'd'), (1.8 * CM, 'c')],
+            [(["Total des points :", total], couleur_xcolor("gray!20"), 'gras')],
+            taille=10
+        )
+        
+        page.espace(28)
+        page.paragraphe("Note finale sur 20 (conversion automatique)", 11, 'gras')
+        page.espace(14)
+        page.paragraphe(f"Formule de calcul : Note finale = Points obtenus / {total} × 20", 11, 'italique')
+    
+    def _bulletin(self, page, vue):
+        eleve = vue['eleve']
+        gris_entete = couleur_xcolor("gray!30")
+        
+        page.ligne_centree("Bulletin", 20, 'gras')
+        page.espace(4)
+        page.ligne_centree(vue['periode']['nom'], 14)
+        if vue['periode']['dates']:
+            page.ligne_centree(vue['periode']['dates'], 11)
+        page.espace(24)
+        
+        for libelle, valeur in (("Élève :", f"{eleve['nom']} {eleve['prenom']}"),
+                                ("Classe :", vue['classe']['nom'])):
+            page.y += 11
+            page.doc.texte(MARGE, page.y, libelle, 11, 'gras')
+            page.doc.texte(MARGE + 2.5 * CM, page.y, str(valeur), 11)
+            page.y += 4
+        page.espace(28)
+        
+        # Cadre de la moyenne
+        largeur_cadre, hauteur_cadre = 12 * CM, 2 * CM
+        page.place(hauteur_cadre)
+        page.doc.rectangle(page.centre - largeur_cadre / 2, page.y, largeur_cadre, hauteur_cadre,
+                           contour=couleur_xcolor(vue['couleur_moyenne']), epaisseur=2)
+        page.doc.texte_centre(page.centre, page.y + hauteur_cadre / 2 + 9,
+                              f"{vue['moyenne']:.2f} / 20", 25, 'gras')
+        page.y += hauteur_cadre
+        page.espace(14)
+        
+        page.tableau(
+            [(2.6 * CM, 'c'), (3.6 * CM, 'c'), (3.6 * CM, 'c'), (2.6 * CM, 'c')],
+            [([f"{vue['rang']} / {vue['nb_classes']}",
+               f"{vue['moyenne_classe']:.2f} / 20",
+               f"{vue['min_classe']:.2f} – {vue['max_classe']:.2f}",
+               f"{vue['ecart']:+.2f}"], None, 'normal')],
+            taille=11,
+            entete=(["Rang", "Moyenne classe", "Min – Max", "Écart"], gris_entete, 'gras')
+        )
+        page.espace(28)
+        
+        page.place(40)
+        page.y += 14
+        page.doc.texte(MARGE, page.y, "Détail par devoir", 14, 'gras')
+        page.espace(12)
+        
+        page.tableau(
+            [(5.4 * CM, 'g'), (2.2 * CM, 'c'), (1.4 * CM, 'c'), (1.6 * CM, 'c'), (2.2 * CM, 'c'), (3 * CM, 'c')],
+            [([str(ligne['nom']), ligne['date'], f"{ligne['poids']:g}", ligne['note'], ligne['moyenne'],
+               f"{ligne['min']} – {ligne['max']}"],
+              couleur_xcolor(ligne['couleur']), 'normal')
+             for ligne in vue['lignes']],
+            taille=9,
+            entete=(["Devoir", "Date", "Poids", "Note", "Moy. classe", "Min – Max"], gris_entete, 'gras')
+        )
+        
+        if vue['incomplet']:
+            page.espace(10)
+            page.paragraphe(f"{vue['nb_devoirs']} devoir(s) noté(s) sur {vue['nb_devoirs_periode']} : "
+                            "les copies incomplètes ne comptent pas dans la moyenne.", 10, 'italique')
+        
+        page.espace(28)
+        page.paragraphe("Moyenne pondérée par le poids de chaque devoir. "
+                        f"Ce bulletin a été généré automatiquement le {vue['date_generation']}", 11, 'italique')
+
+
+def get_renderer(nom, templates_dir):
+    """Moteur de rendu par nom ; 'auto' choisit pdflatex s'il est installé, sinon le moteur natif"""
+    if nom == "auto":
+        latex = LatexRenderer(templates_dir)
+        return latex if latex.is_available() else NativeRenderer()
+    if nom == LatexRenderer.nom:
+        return LatexRenderer(templates_dir)
+    if nom == NativeRenderer.nom:
+        return NativeRenderer()
+    raise Exception(f"Moteur de rendu PDF inconnu : {nom}")
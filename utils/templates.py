@@ -0,0 +1,199 @@
+# utils/templates.py
+"""Petit moteur de gabarits pour les documents LaTeX (comptes-rendus, barèmes)
+
+Syntaxe, choisie pour ne pas entrer en conflit avec les accolades de LaTeX :
+
+    << eleve.nom >>                 valeur échappée automatiquement
+    << note|format:.2f >>           filtre de mise en forme (échappé, sauf format numérique)
+    << couleur|raw >>               valeur insérée telle quelle
+    <% for q in questions %> ... <% endfor %>
+    <% if appreciation %> ... <% else %> ... <% endif %>   (aussi : if not ...)
+    <# commentaire, éventuellement sur plusieurs lignes #>
+
+Une balise <% %> ou <# #> seule sur sa ligne supprime la ligne entière, pour
+ne pas laisser de lignes vides dans les tableaux.
+
+Chaque fichier est analysé une seule fois puis converti en fonction Python
+compilée, mise en cache jusqu'à ce que le fichier soit modifié.
+"""
+import os
+import re
+
+# Balises : ligne ne contenant qu'une instruction/un commentaire, instruction, expression, commentaire
+_TOKEN_RE = re.compile(
+    r"(?m)^[ \t]*(?P<line_stmt><%(?:(?!%>).)*%>|<#(?:(?!#>)[\s\S])*#>)[ \t]*\n"
+    r"|(?P<stmt><%(?:(?!%>).)*%>)"
+    r"|(?P<expr><<(?:(?!>>).)*>>)"
+    r"|(?P<comment><#(?:(?!#>)[\s\S])*#>)"
+)
+_NAME_RE = re.compile(r"^[A-Za-z_]\w*(\.\w+)*$")
+_NUMERIC_FORMATS = set("bdeEfFgGoxX")
+
+_cache = {}
+
+
+class TemplateError(Exception):
+    pass
+
+
+def _lookup(context, name):
+    try:
+        return context[name]
+    except KeyError:
+        raise TemplateError(f"Variable inconnue dans le gabarit : {name}")
+
+
+def _get(value, key):
+    """Accès à un champ : clé de dict / sqlite3.Row, sinon attribut"""
+    if value is None:
+        return None
+    try:
+        return value[key]
+    except (KeyError, IndexError, TypeError):
+        return getattr(value, key, None)
+
+
+def _format(value, spec):
+    if value is None:
+        return ""
+    return format(value, spec)
+
+
+def _to_text(value):
+    return "" if value is None else str(value)
+
+
+class Template:
+    """Gabarit compilé : `render(context)` retourne le document sous forme de chaîne"""
+    
+    def __init__(self, source, name="<gabarit>"):
+        self.name = name
+        code = compile(_generate_code(source, name), name, "exec")
+        namespace = {}
+        exec(code, namespace)
+        self._render = namespace["_render"]
+    
+    def render(self, context, escape=_to_text):
+        return self._render(context, escape, _lookup, _get, _format, _to_text)
+
+
+def _generate_code(source, name):
+    """Traduit un gabarit en source Python d'une fonction _render"""
+    lines = ["def _render(_ctx, _escape, _lookup, _get, _format, _text):",
+             "    _out = []",
+             "    _a = _out.append"]
+    indent = 1
+    blocks = []       # pile des blocs ouverts ('for' / 'if' / 'else')
+    loop_vars = []    # variables de boucle visibles (variables locales Python)
+    
+    def emit(line):
+        lines.append("    " * indent + line)
+    
+    def value(path):
+        """Code Python d'accès à une valeur pointée (a.b.c)"""
+        if not _NAME_RE.match(path):
+            raise TemplateError(f"{name} : expression invalide « {path} »")
+        
+        head, *attributes = path.split(".")
+        code = f"_l_{head}" if head in loop_vars else f"_lookup(_ctx, {head!r})"
+        for attribute in attributes:
+            code = f"_get({code}, {attribute!r})"
+        return code
+    
+    def expression(text):
+        """Valeur et ses filtres -> (code Python du texte à insérer, échapper ?)"""
+        parts = [p.strip() for p in text.split("|")]
+        code = value(parts[0])
+        
+        escape = True
+        formatted = False
+        for filtre in parts[1:]:
+            filtre_nom, _, argument = filtre.partition(":")
+            if filtre_nom == "raw":
+                escape = False
+            elif filtre_nom == "format":
+                code = f"_format({code}, {argument!r})"
+                formatted = True
+                # Un nombre mis en forme (.2f, d, ...) ne contient aucun caractère à échapper
+                if argument[-1:] in _NUMERIC_FORMATS:
+                    escape = False
+            else:
+                raise TemplateError(f"{name} : filtre inconnu « {filtre_nom} »")
+        if not formatted:
+            code = f"_text({code})"
+        return code, escape
+    
+    position = 0
+    for match in _TOKEN_RE.finditer(source):
+        text = source[position:match.start()]
+        if text:
+            emit(f"_a({text!r})")
+        position = match.end()
+        
+        token = match.group("line_stmt") or match.group("stmt") or match.group("expr") or match.group("comment")
+        if token.startswith("<#"):
+            continue
+        
+        if token.startswith("<<"):
+            code, escape = expression(token[2:-2].strip())
+            emit(f"_a(_escape({code}))" if escape else f"_a({code})")
+            continue
+        
+        words = token[2:-2].split()
+        keyword = words[0] if words else ""
+        
+        if keyword == "for" and len(words) == 4 and words[2] == "in" and words[1].isidentifier():
+            emit(f"for _l_{words[1]} in ({value(words[3])} or ()):")
+            loop_vars.append(words[1])
+            blocks.append("for")
+            indent += 1
+        elif keyword == "if" and len(words) in (2, 3) and (len(words) == 2 or words[1] == "not"):
+            condition = value(words[-1])
+            emit(f"if not {condition}:" if len(words) == 3 else f"if {condition}:")
+            blocks.append("if")
+            indent += 1
+        elif keyword == "else" and len(words) == 1 and blocks and blocks[-1] == "if":
+            emit("pass")
+            indent -= 1
+            emit("else:")
+            indent += 1
+            blocks[-1] = "else"
+        elif keyword == "endfor" and blocks and blocks[-1] == "for":
+            emit("pass")
+            blocks.pop()
+            loop_vars.pop()
+            indent -= 1
+        elif keyword == "endif" and blocks and blocks[-1] in ("if", "else"):
+            emit("pass")
+            blocks.pop()
+            indent -= 1
+        else:
+            raise TemplateError(f"{name} : instruction invalide « {token} »")
+    
+    if blocks:
+        raise TemplateError(f"{name} : bloc « {blocks[-1]} » non fermé")
+    
+    text = source[position:]
+    if text:
+        emit(f"_a({text!r})")
+    lines.append("    return ''.join(_out)")
+    return "\n".join(lines)
+
+
+def get_template(path):
+    """Retourne le gabarit compilé d'un fichier (recompilé seulement s'il a changé)"""
+    path = os.path.abspath(path)
+    mtime = os.path.getmtime(path)
+    
+    cached = _cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    
+    with open(path, "r", encoding="utf-8") as f:
+        template = Template(f.read(), os.path.basename(path))
+    _cache[path] = (mtime, template)
+    return template
+
+
+def render_template(path, context, escape=_to_text):
+    return get_template(path).render(context, escape)
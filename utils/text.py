@@ -0,0 +1,11 @@
+# utils/text.py
+import unicodedata
+
+
+def normalize_text(text):
+    """Normalise un texte pour les comparaisons : minuscules, sans accents, espaces réduits"""
+    if text is None:
+        return ""
+    text = unicodedata.normalize('NFKD', str(text))
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return ' '.join(text.casefold().replace('-', ' ').split())
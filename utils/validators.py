@@ -1,4 +1,6 @@
 # utils/validators.py
+import math
+
 
 def validate_note(points_obtenus, points_max):
     """Valide qu'une note est correcte"""
@@ -8,6 +10,16 @@ def validate_note(points_obtenus, points_max):
         return False, f"La note ne peut pas dépasser {points_max}"
     return True, ""
 
+def parse_points(text):
+    """Convertit une saisie ("12", "12,5", "") en float ou None ; ValueError si invalide"""
+    text = str(text).strip().replace(',', '.')
+    if not text:
+        return None
+    points = float(text)
+    if not math.isfinite(points):
+        raise ValueError(f"Points invalides : {text}")
+    return points
+
 def validate_nom(nom):
     """Valide un nom"""
     if not nom or not nom.strip():